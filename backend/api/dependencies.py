@@ -12,7 +12,9 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 # Import models
-from models.user import User, TokenData
+from models.user import User, TokenData, UserSnapshot
+from services.db import get_database
+from api.token_cache import token_cache
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -25,41 +27,6 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key")  # In production, us
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Mock user database for prototype
-# In a real app, this would be a database query
-MOCK_USERS = {
-    "user1": {
-        "id": "user1",
-        "email": "parent@example.com",
-        "name": "Parent User",
-        "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # "password"
-        "is_active": True,
-        "is_verified": True,
-        "role": "user",
-        "created_at": datetime.now() - timedelta(days=30),
-        "updated_at": datetime.now(),
-        "is_parent": True,
-        "children": ["child1"],
-        "subscription_status": "active",
-        "subscription_plan": "premium",
-        "subscription_expiry": datetime.now() + timedelta(days=30)
-    },
-    "child1": {
-        "id": "child1",
-        "email": "child@example.com",
-        "name": "Child User",
-        "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # "password"
-        "is_active": True,
-        "is_verified": True,
-        "role": "child",
-        "created_at": datetime.now() - timedelta(days=30),
-        "updated_at": datetime.now(),
-        "is_parent": False,
-        "parent_id": "user1",
-        "age": 10
-    }
-}
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -83,19 +50,54 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     return encoded_jwt
 
+def _build_user(user_data: dict) -> UserSnapshot:
+    """
+    Build an immutable user snapshot from a user record.
+    
+    Args:
+        user_data: The user record
+        
+    Returns:
+        UserSnapshot: The user
+    """
+    return UserSnapshot(
+        id=user_data["id"],
+        email=user_data["email"],
+        name=user_data["name"],
+        created_at=user_data["created_at"],
+        updated_at=user_data["updated_at"],
+        is_active=user_data["is_active"],
+        is_verified=user_data["is_verified"],
+        role=user_data["role"],
+        is_parent=user_data.get("is_parent", False),
+        children=user_data.get("children", []),
+        parent_id=user_data.get("parent_id"),
+        age=user_data.get("age"),
+        subscription_status=user_data.get("subscription_status"),
+        subscription_plan=user_data.get("subscription_plan"),
+        subscription_expiry=user_data.get("subscription_expiry")
+    )
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
     Get the current authenticated user from the token.
     
+    Tokens seen before are answered from the verified-token cache, without
+    decoding the JWT or loading the user again.
+    
     Args:
         token: JWT access token
         
     Returns:
-        User: The authenticated user
+        User: The authenticated user (an immutable snapshot)
         
     Raises:
         HTTPException: If authentication fails
     """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.user
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -121,8 +123,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         raise credentials_exception
         
     # Get the user from the database
-    # In a real app, this would query a database
-    user_data = MOCK_USERS.get(token_data.user_id)
+    user_data = await get_database().users.get(token_data.user_id)
     
     if user_data is None:
         raise credentials_exception
@@ -133,27 +134,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             detail="Inactive user"
         )
         
-    # Convert to User model
-    user = User(
-        id=user_data["id"],
-        email=user_data["email"],
-        name=user_data["name"],
-        created_at=user_data["created_at"],
-        updated_at=user_data["updated_at"],
-        is_active=user_data["is_active"],
-        is_verified=user_data["is_verified"],
-        role=user_data["role"],
-        is_parent=user_data.get("is_parent", False),
-        children=user_data.get("children", []),
-        parent_id=user_data.get("parent_id"),
-        age=user_data.get("age"),
-        subscription_status=user_data.get("subscription_status"),
-        subscription_plan=user_data.get("subscription_plan"),
-        subscription_expiry=user_data.get("subscription_expiry")
-    )
+    # Convert to an immutable User model and cache it until the token expires
+    user = _build_user(user_data)
+    token_cache.set(token, token_data, user)
     
     return user
 
+def invalidate_user(user_id: str) -> None:
+    """
+    Drop cached authentication for a user.
+    
+    Call this whenever a user's account, role or subscription changes, so
+    their next request loads the updated user.
+    
+    Args:
+        user_id: ID of the user
+    """
+    token_cache.invalidate_user(user_id)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
     Get the current active user.
@@ -0,0 +1,185 @@
+"""
+Authentication API routes for the Quranic Quest application.
+This module handles login and signup. Passwords are hashed and verified on
+the bounded password-hashing pool, never on the event loop.
+"""
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, status
+from fastapi.security import OAuth2PasswordRequestForm
+import uuid
+import logging
+from sqlalchemy.exc import IntegrityError
+
+# Import services and models
+from services.auth import PasswordHasherBusy, get_password_hasher
+from services.db import get_database
+from models.user import Token, UserAuth, UserCreate
+from api.dependencies import create_access_token
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter()
+
+def _busy_exception(error: PasswordHasherBusy) -> HTTPException:
+    """Build the response for a login refused by admission control."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+def _issue_token(user_data: dict) -> Token:
+    """Create an access token for a user record."""
+    access_token = create_access_token({
+        "sub": user_data["id"],
+        "email": user_data["email"],
+        "role": user_data["role"],
+    })
+    return Token(access_token=access_token, token_type="bearer")
+
+async def _store_rehash(user_id: str, hashed_password: str) -> None:
+    """
+    Replace a user's password hash with one using the current cost.
+
+    Args:
+        user_id: ID of the user
+        hashed_password: The new hash
+    """
+    try:
+        await get_database().users.update(user_id, hashed_password=hashed_password)
+        logger.info(f"Password hash upgraded for user {user_id}")
+    except Exception as e:
+        logger.error(f"Error upgrading password hash: {str(e)}")
+
+async def _authenticate(email: str, password: str, background_tasks: BackgroundTasks) -> Token:
+    """
+    Check a user's credentials and issue a token.
+
+    Args:
+        email: The user's email address
+        password: The plain-text password
+        background_tasks: Tasks run after the response (used to store upgraded hashes)
+
+    Returns:
+        Token: The access token
+
+    Raises:
+        HTTPException: If the credentials are wrong, the user is inactive, or the hashing pool is full
+    """
+    user_data = await get_database().users.get_by_email(email)
+
+    try:
+        valid, new_hash = await get_password_hasher().verify(
+            password, user_data["hashed_password"] if user_data else None
+        )
+    except PasswordHasherBusy as e:
+        logger.warning("Login refused: password hashing queue is full")
+        raise _busy_exception(e)
+
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not user_data["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+
+    # Upgrade hashes made with an outdated cost after the response is sent
+    if new_hash:
+        background_tasks.add_task(_store_rehash, user_data["id"], new_hash)
+
+    logger.info(f"User {user_data['id']} logged in")
+    return _issue_token(user_data)
+
+@router.post("/token", response_model=Token)
+async def login_for_access_token(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends()
+):
+    """
+    Log in with the OAuth2 password flow (the username is the email address).
+
+    Args:
+        background_tasks: Tasks run after the response
+        form_data: The submitted username and password
+
+    Returns:
+        Token: The access token
+    """
+    try:
+        return await _authenticate(form_data.username, form_data.password, background_tasks)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error logging in: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error logging in: {str(e)}")
+
+@router.post("/login", response_model=Token)
+async def login(credentials: UserAuth, background_tasks: BackgroundTasks):
+    """
+    Log in with a JSON body.
+
+    Args:
+        credentials: The user's email address and password
+        background_tasks: Tasks run after the response
+
+    Returns:
+        Token: The access token
+    """
+    try:
+        return await _authenticate(credentials.email, credentials.password, background_tasks)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error logging in: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error logging in: {str(e)}")
+
+@router.post("/signup", response_model=Token, status_code=201)
+async def signup(user_create: UserCreate):
+    """
+    Create an account and log it in.
+
+    Args:
+        user_create: The new user's email address, name and password
+
+    Returns:
+        Token: The access token for the new account
+    """
+    try:
+        users = get_database().users
+        if await users.get_by_email(user_create.email) is not None:
+            raise HTTPException(status_code=400, detail="Email already registered")
+
+        try:
+            hashed_password = await get_password_hasher().hash(user_create.password)
+        except PasswordHasherBusy as e:
+            logger.warning("Signup refused: password hashing queue is full")
+            raise _busy_exception(e)
+
+        user_data = await users.create({
+            "id": uuid.uuid4().hex,
+            "email": user_create.email,
+            "name": user_create.name,
+            "hashed_password": hashed_password,
+        })
+
+        logger.info(f"User {user_data['id']} signed up")
+        return _issue_token(user_data)
+
+    except HTTPException:
+        raise
+    except IntegrityError:
+        # A concurrent signup registered the same email first
+        raise HTTPException(status_code=400, detail="Email already registered")
+    except Exception as e:
+        logger.error(f"Error signing up: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error signing up: {str(e)}")
@@ -9,7 +9,7 @@ import logging
 from datetime import datetime
 
 # Import services and models
-from services.learning_paths import LearningPathService
+from services.learning_paths import LearningPathService, get_adjustment_scheduler
 from models.learning_path import LearningPath, LearningPathCreate, LearningUnit, LearningProgress
 from models.user import User
 from api.dependencies import get_current_user
@@ -159,13 +159,9 @@ async def update_learning_progress(
             
         updated_progress = await learning_path_service.update_learning_progress(progress)
         
-        # Check if learning path needs adjustment based on progress
-        needs_adjustment = await learning_path_service.check_path_adjustment(user.id, progress)
-        
-        if needs_adjustment:
-            # Adjust the learning path in the background
-            await learning_path_service.adjust_learning_path(user.id, progress)
-            logger.info(f"Learning path adjusted for user {user.id} based on progress")
+        # Check and adjust the learning path in the background, together with
+        # any other updates the user sends within the debounce window
+        get_adjustment_scheduler().submit(updated_progress)
         
         return updated_progress
         
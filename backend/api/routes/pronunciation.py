@@ -3,17 +3,30 @@ Pronunciation assessment API routes for the Quranic Quest application.
 This module handles all endpoints related to pronunciation feedback and assessment.
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, List, Optional
 import os
-import uuid
+import json
+import asyncio
+import hashlib
 import logging
+import zipfile
 from datetime import datetime
 
 # Import services and models
 from services.pronunciation import PronunciationService
 from services.audio import AudioProcessingService
+from services.audio.cache import assessment_cache, feature_cache, make_cache_key
+from services.audio.fingerprint import choose_verse
+from services.audio.streaming import STREAMING_MAX_SAMPLE_RATE, STREAMING_MIN_SAMPLE_RATE, StreamingLimitError, StreamingSession
+from services.audio.templates import get_template_index
+from services.audio.ingest import AUDIO_MAX_LONG_UPLOAD_BYTES, AUDIO_MAX_UPLOAD_BYTES, EmptyUploadError, UploadTooLargeError, ingest_upload
+from services.inference import get_inference_scheduler
+from services.jobs.queue import PRIORITY_LANES, STATUS_COMPLETED, STATUS_FAILED, TERMINAL_STATUSES, job_queue
+from services.jobs.worker import ASSESSMENT_JOB
 from models.pronunciation import PronunciationAssessment, PronunciationFeedback
 from models.user import User
 from api.dependencies import get_current_user
@@ -24,13 +37,16 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter()
 
+# Batch assessment settings
+AUDIO_MAX_BATCH_CLIPS = int(os.getenv("AUDIO_MAX_BATCH_CLIPS", "64"))
+AUDIO_ARCHIVE_EXTENSIONS = (".wav", ".mp3", ".m4a", ".ogg", ".oga", ".opus", ".flac", ".webm", ".aac")
+
 # Initialize services
-pronunciation_service = PronunciationService()
 audio_service = AudioProcessingService()
+pronunciation_service = PronunciationService(audio_service)
 
 @router.post("/assess", response_model=PronunciationAssessment)
 async def assess_pronunciation(
-    background_tasks: BackgroundTasks,
     audio_file: UploadFile = File(...),
     verse_id: str = None,
     user: User = Depends(get_current_user)
@@ -40,47 +56,469 @@ async def assess_pronunciation(
     
     Args:
         audio_file: The audio recording of the user reciting the verse
-        verse_id: The ID of the verse being recited
+        verse_id: The ID of the verse being recited (identified from the recording if omitted)
         user: The authenticated user (from token)
         
     Returns:
         PronunciationAssessment: Assessment results with feedback
     """
+    upload = None
+    
     try:
-        # Generate a unique filename
-        file_extension = os.path.splitext(audio_file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = f"data/audio_uploads/{unique_filename}"
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        # Save the uploaded file
-        with open(file_path, "wb") as buffer:
-            content = await audio_file.read()
-            buffer.write(content)
-        
-        # Process the audio file (normalize, remove noise, etc.)
-        processed_audio_path = await audio_service.process_audio(file_path)
+        # Stream the upload in chunks; large recordings are spooled to disk off the event loop
+        upload = await ingest_upload(audio_file)
         
-        # Perform pronunciation assessment
-        assessment = await pronunciation_service.assess_pronunciation(
-            processed_audio_path, 
+        # Decode once and assess in memory; the route and the job workers share this path,
+        # including the assessment and feature caches and verse identification
+        assessment = await pronunciation_service.assess_upload(
+            upload.source,
+            upload.filename,
+            upload.sha256,
             verse_id,
             user.id
         )
         
-        # Schedule cleanup of audio files in the background
-        background_tasks.add_task(audio_service.cleanup_audio_files, [file_path, processed_audio_path])
-        
         # Log the assessment
-        logger.info(f"Pronunciation assessment completed for user {user.id}, verse {verse_id}")
+        logger.info(f"Pronunciation assessment completed for user {user.id}, verse {assessment.verse_id}")
         
         return assessment
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyUploadError:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
     except Exception as e:
         logger.error(f"Error in pronunciation assessment: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing pronunciation: {str(e)}")
+        
+    finally:
+        if upload:
+            await upload.cleanup()
+
+@router.post("/identify", response_model=dict)
+async def identify_recitation(
+    audio_file: UploadFile = File(...),
+    limit: int = 3,
+    user: User = Depends(get_current_user)
+):
+    """
+    Identify which verse a recording recites, using the reference fingerprint index.
+    
+    Args:
+        audio_file: The audio recording
+        limit: Maximum number of candidate verses to return
+        user: The authenticated user (from token)
+        
+    Returns:
+        dict: The identified verse ID (or None) and the ranked candidates
+    """
+    upload = None
+    
+    try:
+        upload = await ingest_upload(audio_file)
+        processed_audio, _ = await audio_service.prepare_audio(upload.source, upload.filename, upload.sha256)
+        
+        candidates = await audio_service.identify_verse(processed_audio, max(1, min(limit, 10)))
+        verse_id = choose_verse(candidates)
+        
+        logger.info(f"Recitation identified as verse {verse_id} for user {user.id}")
+        
+        return {"verse_id": verse_id, "candidates": candidates}
+        
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyUploadError:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
+    except Exception as e:
+        logger.error(f"Error identifying recitation: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error identifying recitation: {str(e)}")
+        
+    finally:
+        if upload:
+            await upload.cleanup()
+
+def _read_archive(archive_path: str, max_clips: int) -> List[tuple]:
+    """
+    Read the audio clips from a zip archive, in name order.
+    
+    Args:
+        archive_path: Path to the spooled archive
+        max_clips: Maximum number of clips allowed
+        
+    Returns:
+        List[tuple]: (filename, audio bytes) per clip
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        entries = sorted(
+            (entry for entry in archive.infolist()
+             if not entry.is_dir() and entry.filename.lower().endswith(AUDIO_ARCHIVE_EXTENSIONS)),
+            key=lambda entry: entry.filename
+        )
+        if len(entries) > max_clips:
+            raise ValueError(f"Archive contains more than {max_clips} clips")
+        
+        # Report whichever limit was actually exceeded
+        if any(entry.file_size > AUDIO_MAX_UPLOAD_BYTES for entry in entries):
+            raise UploadTooLargeError(AUDIO_MAX_UPLOAD_BYTES)
+        if sum(entry.file_size for entry in entries) > AUDIO_MAX_LONG_UPLOAD_BYTES:
+            raise UploadTooLargeError(AUDIO_MAX_LONG_UPLOAD_BYTES)
+        
+        # Declared sizes can lie, so never read more than declared
+        clips = []
+        for entry in entries:
+            with archive.open(entry) as clip_file:
+                clips.append((os.path.basename(entry.filename), clip_file.read(entry.file_size + 1)[:entry.file_size]))
+        return clips
+
+@router.post("/assess-batch", response_model=dict)
+async def assess_pronunciation_batch(
+    audio_files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    verse_id: str = None,
+    verse_ids: str = None,
+    user: User = Depends(get_current_user)
+):
+    """
+    Assess many short recordings in one request (e.g. a class of children).
+    
+    Clips are sent as several multipart files, or as one zip archive (read
+    in name order). They are denoised, normalized and analyzed together as
+    padded batches and scored concurrently.
+    
+    Args:
+        audio_files: The audio recordings
+        archive: A zip archive of audio recordings, instead of audio_files
+        verse_id: The ID of the verse recited in every clip (identified per clip if omitted)
+        verse_ids: Comma-separated verse IDs, one per clip, overriding verse_id
+        user: The authenticated user (from token)
+        
+    Returns:
+        dict: Per-clip results in upload order, each with an assessment or an error
+    """
+    uploads = []
+    
+    try:
+        # Read every clip, hashing each one for the assessment cache
+        clips = []
+        if archive is not None:
+            try:
+                upload = await ingest_upload(archive, max_bytes=AUDIO_MAX_LONG_UPLOAD_BYTES, spool_threshold=0)
+            except EmptyUploadError:
+                raise HTTPException(status_code=400, detail="Empty archive upload")
+            uploads.append(upload)
+            try:
+                for filename, data in await run_in_threadpool(_read_archive, upload.path, AUDIO_MAX_BATCH_CLIPS):
+                    clips.append((filename, data, hashlib.sha256(data).hexdigest()))
+            except (zipfile.BadZipFile, ValueError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid archive: {str(e)}")
+        else:
+            if not audio_files:
+                raise HTTPException(status_code=400, detail="No audio clips uploaded")
+            if len(audio_files) > AUDIO_MAX_BATCH_CLIPS:
+                raise HTTPException(status_code=400, detail=f"At most {AUDIO_MAX_BATCH_CLIPS} clips per batch")
+            for audio_file in audio_files:
+                upload = await ingest_upload(audio_file)
+                uploads.append(upload)
+                clips.append((upload.filename, upload.source, upload.sha256))
+        
+        clip_verse_ids = [part.strip() or None for part in verse_ids.split(",")] if verse_ids else [verse_id] * len(clips)
+        if len(clip_verse_ids) != len(clips):
+            raise HTTPException(status_code=400, detail="verse_ids must list one verse per clip")
+        
+        # Answer resubmitted clips from the cache; only the rest go through the pipeline
+        keys = [make_cache_key(sha256, "assessment", clip_verse_id, user.id)
+                for (_, _, sha256), clip_verse_id in zip(clips, clip_verse_ids)]
+        cached = await asyncio.gather(*(assessment_cache.get(key) for key in keys))
+        pending = [index for index, assessment in enumerate(cached) if assessment is None]
+        
+        prepared = await audio_service.prepare_batch(
+            [(clips[index][1], clips[index][0]) for index in pending],
+            [clips[index][2] for index in pending]
+        )
+        
+        async def assess_clip(index: int, processed_audio, features: dict) -> PronunciationAssessment:
+            assessment = await pronunciation_service.assess_processed(processed_audio, features, clip_verse_ids[index], user.id)
+            results[index]["verse_id"] = assessment.verse_id
+            await assessment_cache.set(keys[index], assessment)
+            return assessment
+        
+        # Score every clip concurrently, so model requests share micro-batches
+        results = [{"filename": filename, "verse_id": clip_verse_id}
+                   for (filename, _, _), clip_verse_id in zip(clips, clip_verse_ids)]
+        for index, assessment in enumerate(cached):
+            if assessment is not None:
+                results[index]["assessment"] = assessment
+        
+        tasks = {}
+        for index, (processed_audio, features, error) in zip(pending, prepared):
+            if error:
+                results[index]["error"] = error
+            else:
+                tasks[index] = assess_clip(index, processed_audio, features)
+        
+        for index, outcome in zip(tasks, await asyncio.gather(*tasks.values(), return_exceptions=True)):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error assessing batch clip {clips[index][0]}: {str(outcome)}")
+                results[index]["error"] = f"Error processing pronunciation: {str(outcome)}"
+            else:
+                results[index]["assessment"] = outcome
+        
+        logger.info(f"Batch pronunciation assessment of {len(clips)} clips completed for user {user.id}")
+        
+        return jsonable_encoder({"count": len(results), "results": results})
+        
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in batch pronunciation assessment: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error processing pronunciation batch: {str(e)}")
+        
+    finally:
+        for upload in uploads:
+            await upload.cleanup()
+
+@router.post("/assess-long")
+async def assess_long_recitation(
+    audio_file: UploadFile = File(...),
+    start_verse_id: str = None,
+    user: User = Depends(get_current_user)
+):
+    """
+    Assess a long recitation (e.g. a full surah) ayah by ayah.
+    
+    The recording is split on pauses and each segment is assessed on the
+    audio worker pool. Results are streamed back as newline-delimited JSON
+    as soon as each segment finishes.
+    
+    Args:
+        audio_file: The audio recording of the user reciting
+        start_verse_id: The ID of the first verse recited; later segments are
+            assumed to be the following ayahs
+        user: The authenticated user (from token)
+        
+    Returns:
+        StreamingResponse: One JSON object per segment
+    """
+    # Validated before streaming starts, since the response status cannot change after that
+    if start_verse_id:
+        try:
+            surah, ayah = (int(part) for part in start_verse_id.split(":"))
+        except ValueError:
+            surah = ayah = 0
+        if surah < 1 or ayah < 1:
+            raise HTTPException(status_code=400, detail=f"Invalid start_verse_id: {start_verse_id} (expected surah:ayah)")
+
+    try:
+        # Always spool long recordings so segments can be read back from disk
+        upload = await ingest_upload(audio_file, max_bytes=AUDIO_MAX_LONG_UPLOAD_BYTES, spool_threshold=0)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyUploadError:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
+    
+    async def stream_assessments() -> AsyncIterator[str]:
+        try:
+            async for segment in audio_service.process_long_recording(upload.path, start_verse_id):
+                assessment = await pronunciation_service.assess_pronunciation(
+                    segment["audio"],
+                    segment["verse_id"],
+                    user.id,
+                    features=segment["features"],
+                    alignments=segment["alignments"]
+                )
+                yield json.dumps(jsonable_encoder({
+                    "segment": segment["index"],
+                    "start_seconds": segment["start_seconds"],
+                    "end_seconds": segment["end_seconds"],
+                    "verse_id": segment["verse_id"],
+                    "assessment": assessment
+                })) + "\n"
+                
+            logger.info(f"Long recitation assessment completed for user {user.id}")
+            
+        except Exception as e:
+            logger.error(f"Error in long recitation assessment: {str(e)}")
+            yield json.dumps({"error": f"Error processing recitation: {str(e)}"}) + "\n"
+            
+        finally:
+            await upload.cleanup()
+    
+    return StreamingResponse(stream_assessments(), media_type="application/x-ndjson")
+
+@router.websocket("/stream")
+async def stream_pronunciation(
+    websocket: WebSocket,
+    token: str,
+    verse_id: str,
+    sample_rate: int = 16000,
+    reciter: Optional[str] = None
+):
+    """
+    Give real-time pronunciation feedback while the user is reciting.
+    
+    The client sends binary messages of 16-bit little-endian mono PCM as it
+    records, then a text message "end". The server pushes a "word" message
+    as soon as each word aligns, "progress" messages as audio arrives, and a
+    final "complete" message with the full alignment.
+    
+    Args:
+        websocket: The WebSocket connection
+        token: JWT access token (browsers cannot set headers on WebSockets)
+        verse_id: The ID of the verse being recited
+        sample_rate: Sample rate of the PCM frames (8000-48000 Hz)
+        reciter: Optional reference reciter to align against
+    """
+    try:
+        user = await get_current_user(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    if not STREAMING_MIN_SAMPLE_RATE <= sample_rate <= STREAMING_MAX_SAMPLE_RATE:
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason=f"sample_rate must be between {STREAMING_MIN_SAMPLE_RATE} and {STREAMING_MAX_SAMPLE_RATE}"
+        )
+        return
+    
+    templates = get_template_index().get(verse_id, reciter)
+    if not templates:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="No reference recitation for verse")
+        return
+    
+    await websocket.accept()
+    
+    try:
+        session = StreamingSession(templates[0], sample_rate)
+        
+        while True:
+            message = await websocket.receive()
+            
+            if message["type"] == "websocket.disconnect":
+                return
+            
+            if message.get("bytes"):
+                for feedback in await run_in_threadpool(session.feed, message["bytes"]):
+                    await websocket.send_json(feedback)
+            elif message.get("text") == "end":
+                await websocket.send_json(await run_in_threadpool(session.finish))
+                logger.info(f"Streaming pronunciation feedback completed for user {user.id}, verse {verse_id}")
+                await websocket.close()
+                return
+                
+    except WebSocketDisconnect:
+        return
+    except StreamingLimitError as e:
+        await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG, reason=str(e))
+    except Exception as e:
+        logger.error(f"Error in streaming pronunciation feedback: {str(e)}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+
+@router.post("/jobs", status_code=202, response_model=dict)
+async def submit_assessment_job(
+    audio_file: UploadFile = File(...),
+    verse_id: str = None,
+    lane: str = "default",
+    user: User = Depends(get_current_user)
+):
+    """
+    Queue a pronunciation assessment and return immediately.
+    
+    The upload is spooled to disk and a job is queued for the worker pool.
+    Poll /jobs/{job_id}, subscribe to /jobs/{job_id}/events, or fetch
+    /feedback/{job_id} once the job completes.
+    
+    Args:
+        audio_file: The audio recording of the user reciting the verse
+        verse_id: The ID of the verse being recited
+        lane: Priority lane ("interactive", "default" or "bulk")
+        user: The authenticated user (from token)
+        
+    Returns:
+        dict: The queued job
+    """
+    if lane not in PRIORITY_LANES:
+        raise HTTPException(status_code=400, detail=f"Unknown priority lane: {lane}")
+    
+    try:
+        # Jobs outlive the request, so the upload is always spooled to disk
+        upload = await ingest_upload(audio_file, spool_threshold=0)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyUploadError:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
+    
+    try:
+        job = await job_queue.submit(ASSESSMENT_JOB, {
+            "path": upload.path,
+            "filename": upload.filename,
+            "sha256": upload.sha256,
+            "verse_id": verse_id,
+            "user_id": user.id
+        }, lane)
+        
+    except Exception as e:
+        await upload.cleanup()
+        logger.error(f"Error queueing pronunciation assessment: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queueing assessment: {str(e)}")
+    
+    logger.info(f"Pronunciation assessment job {job.id} queued for user {user.id}, verse {verse_id}")
+    return job.to_dict()
+
+async def _get_user_job(job_id: str, user: User):
+    """Get a job, raising 404 unless it belongs to the user."""
+    job = await job_queue.get(job_id)
+    
+    if not job or job.payload.get("user_id") != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+        
+    return job
+
+@router.get("/jobs/{job_id}", response_model=dict)
+async def get_assessment_job(
+    job_id: str,
+    user: User = Depends(get_current_user)
+):
+    """
+    Get the status (and, once completed, the result) of an assessment job.
+    
+    Args:
+        job_id: The ID of the job
+        user: The authenticated user (from token)
+        
+    Returns:
+        dict: The job
+    """
+    job = await _get_user_job(job_id, user)
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_assessment_job_events(
+    job_id: str,
+    user: User = Depends(get_current_user)
+):
+    """
+    Push assessment job status changes as server-sent events.
+    
+    Args:
+        job_id: The ID of the job
+        user: The authenticated user (from token)
+        
+    Returns:
+        StreamingResponse: An event stream that ends when the job finishes
+    """
+    await _get_user_job(job_id, user)
+    
+    async def stream_events() -> AsyncIterator[str]:
+        async for job in job_queue.watch(job_id):
+            event = "result" if job.status in TERMINAL_STATUSES else "status"
+            yield f"event: {event}\ndata: {json.dumps(job.to_dict())}\n\n"
+    
+    return StreamingResponse(stream_events(), media_type="text/event-stream")
 
 @router.get("/feedback/{assessment_id}", response_model=PronunciationFeedback)
 async def get_detailed_feedback(
@@ -98,6 +536,19 @@ async def get_detailed_feedback(
         PronunciationFeedback: Detailed feedback with improvement suggestions
     """
     try:
+        # Assessments submitted as jobs are only available once the job completes
+        job = await job_queue.get(assessment_id)
+        
+        if job and job.payload.get("user_id") == user.id:
+            if job.status == STATUS_FAILED:
+                raise HTTPException(status_code=500, detail=f"Assessment failed: {job.error}")
+            if job.status != STATUS_COMPLETED:
+                return JSONResponse(status_code=202, content=job.to_dict())
+            
+            # The assessment stored by the worker has its own ID
+            if isinstance(job.result, dict):
+                assessment_id = job.result.get("id", assessment_id)
+        
         # Get detailed feedback
         feedback = await pronunciation_service.get_detailed_feedback(assessment_id, user.id)
         
@@ -166,3 +617,30 @@ async def get_pronunciation_progress(
     except Exception as e:
         logger.error(f"Error retrieving pronunciation progress: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving progress: {str(e)}")
+
+@router.get("/stats", response_model=dict)
+async def get_pipeline_stats(
+    user: User = Depends(get_current_user)
+):
+    """
+    Get performance statistics for the audio pipeline.
+    
+    Args:
+        user: The authenticated user (from token)
+        
+    Returns:
+        dict: Execution mode, pool size, per-stage timings, per-codec decode costs, cache, job and inference counters
+    """
+    scheduler = get_inference_scheduler()
+    return {
+        "execution_mode": audio_service.executor.mode,
+        "pool_workers": audio_service.executor.max_workers,
+        "stage_timings": audio_service.get_stage_timings(),
+        "decode": audio_service.get_decode_stats(),
+        "caches": {
+            "features": feature_cache.get_stats(),
+            "assessments": assessment_cache.get_stats()
+        },
+        "jobs": await job_queue.stats(),
+        "inference": scheduler.get_stats() if scheduler else None
+    }
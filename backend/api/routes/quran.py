@@ -0,0 +1,53 @@
+"""
+Quran text API routes for the Quranic Quest application.
+This module handles endpoints for looking up and searching verses.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+import logging
+
+# Import services and models
+from services.quran.search import SEARCH_FIELDS, search_verses
+from models.user import User
+from api.dependencies import get_current_user
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter()
+
+@router.get("/search", response_model=dict)
+async def search(
+    q: str = Query(..., min_length=1, description="Arabic, transliterated or English text to search for"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to search (arabic, transliteration, translation)"),
+    fuzzy: bool = Query(True, description="Match misspelled words to similar indexed words"),
+    user: User = Depends(get_current_user)
+):
+    """
+    Search verses by their Arabic text, transliteration or translation.
+    
+    Args:
+        q: The search query
+        limit: Maximum number of results
+        fields: Fields to search (defaults to all of them)
+        fuzzy: Whether to tolerate typos
+        user: The authenticated user (from token)
+        
+    Returns:
+        dict: The matching verses with their scores, best first
+    """
+    search_fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    unknown_fields = set(search_fields or []) - set(SEARCH_FIELDS)
+    if unknown_fields:
+        raise HTTPException(status_code=400, detail=f"Unknown search fields: {', '.join(sorted(unknown_fields))}")
+    
+    try:
+        results = search_verses(q, limit=limit, fields=search_fields, fuzzy=fuzzy)
+        return {"query": q, "count": len(results), "results": results}
+        
+    except Exception as e:
+        logger.error(f"Error searching verses: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching verses: {str(e)}")
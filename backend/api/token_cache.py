@@ -0,0 +1,165 @@
+"""
+Verified-token cache for the Quranic Quest API.
+Authenticated requests present the same bearer token many times over its
+lifetime. The first request verifies the JWT and loads the user; later ones
+find the verified claims and an immutable User snapshot here, keyed by the
+token. Entries expire with the token (or after AUTH_CACHE_TTL_SECONDS,
+whichever comes first) and are dropped when the user or their subscription
+changes.
+
+The cache is per process. With several uvicorn workers, an invalidation only
+reaches the worker that made the change; the others pick it up when their
+entries expire, so AUTH_CACHE_TTL_SECONDS bounds how stale they can be.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from models.user import TokenData, UserSnapshot
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Cache settings (0 entries disables the cache)
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+
+@dataclass(frozen=True)
+class CachedAuth:
+    """The verified claims and user snapshot for one token."""
+
+    token_data: TokenData
+    user: UserSnapshot
+    expires_at: float
+
+class TokenCache:
+    """Expiry-aware LRU cache of verified tokens."""
+
+    def __init__(self, max_entries: int = AUTH_CACHE_MAX_ENTRIES, ttl_seconds: float = AUTH_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached tokens
+            ttl_seconds: Longest time an entry is trusted, even if its token lives longer
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedAuth]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0, "invalidations": 0}
+
+    def _remove(self, token: str) -> Optional[CachedAuth]:
+        """Remove an entry (the lock must be held)."""
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens_by_user.get(entry.user.id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_user[entry.user.id]
+        return entry
+
+    def get(self, token: str) -> Optional[CachedAuth]:
+        """
+        Look up a verified token.
+
+        Args:
+            token: The bearer token
+
+        Returns:
+            Optional[CachedAuth]: The cached claims and user, or None on a miss or if the entry expired
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            if entry.expires_at <= time.time():
+                self._remove(token)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self._stats["hits"] += 1
+            return entry
+
+    def set(self, token: str, token_data: TokenData, user: UserSnapshot) -> None:
+        """
+        Cache a verified token.
+
+        Args:
+            token: The bearer token
+            token_data: The token's verified claims
+            user: Snapshot of the token's user
+        """
+        if self.max_entries <= 0:
+            return
+
+        expires_at = min(token_data.exp.timestamp(), time.time() + self.ttl_seconds)
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = CachedAuth(token_data=token_data, user=user, expires_at=expires_at)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate_token(self, token: str) -> None:
+        """
+        Drop one token (e.g. on logout).
+
+        Args:
+            token: The bearer token
+        """
+        with self._lock:
+            if self._remove(token) is not None:
+                self._stats["invalidations"] += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drop every token of a user, after their account or subscription changes.
+
+        Args:
+            user_id: ID of the user
+        """
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and occupancy for the cache.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "users": len(self._tokens_by_user),
+                "max_entries": self.max_entries,
+            }
+
+# Shared token cache for this process
+token_cache = TokenCache()
@@ -5,7 +5,9 @@ and configures middleware, exception handlers, and startup/shutdown events.
 """
 
 import os
+import asyncio
 from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -17,7 +19,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import routers
-from api.routes import users, auth, lessons, pronunciation, learning_paths
+from api.routes import users, auth, lessons, pronunciation, learning_paths, quran
+from services.audio import audio_executor
+from services.audio.fingerprint import get_fingerprint_index
+from services.inference import get_inference_scheduler
+from services.db import get_database
+from services.auth import get_password_hasher
+from services.quran import get_corpus
+from services.quran.search import get_search_index
+from services.learning_paths import get_adjustment_scheduler, get_catalog_store
+from utils.tajweed_rules import get_tajweed_index
+from services.jobs.worker import WorkerPool
+from api.dependencies import invalidate_user
 
 # Set up logging
 logging.basicConfig(
@@ -42,12 +55,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Local job queue workers (JOB_WORKERS=0 means they run as a separate service)
+job_workers = WorkerPool()
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(lessons.router, prefix="/api/lessons", tags=["Lessons"])
 app.include_router(pronunciation.router, prefix="/api/pronunciation", tags=["Pronunciation"])
 app.include_router(learning_paths.router, prefix="/api/learning-paths", tags=["Learning Paths"])
+app.include_router(quran.router, prefix="/api/quran", tags=["Quran"])
 
 # Serve static files (if needed)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -78,7 +95,36 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 async def startup_event():
     """Run tasks when the application starts."""
     logger.info("Starting up Quranic Quest API")
-    # Add any startup tasks here (e.g., database connection)
+    
+    # Open the database pool, create missing tables, and drop cached logins when a user changes
+    database = get_database()
+    await database.start()
+    database.users.add_change_listener(invalidate_user)
+    
+    # Compile the Quran corpus if its text changed, then map it with its tajweed and search indexes
+    get_corpus()
+    get_tajweed_index()
+    get_search_index()
+    
+    # Build the recitation fingerprint index if the reference templates changed, so workers only load it
+    get_fingerprint_index()
+    
+    # Compile the learning unit catalog (it reloads itself when its files change)
+    await get_catalog_store().reload(force=True)
+    
+    # Spawn and warm up the audio worker pool before accepting uploads
+    await audio_executor.start()
+    
+    # Load the pronunciation model once (or connect to the inference sidecar)
+    inference_scheduler = get_inference_scheduler()
+    if inference_scheduler:
+        await inference_scheduler.start()
+    
+    # Start local workers for queued pronunciation assessments
+    job_workers.start()
+    
+    # Start re-planning learning paths in the background as progress comes in
+    await get_adjustment_scheduler().start()
 
 # Shutdown event
 @app.on_event("shutdown")
@@ -86,6 +132,22 @@ async def shutdown_event():
     """Run tasks when the application shuts down."""
     logger.info("Shutting down Quranic Quest API")
     # Add any cleanup tasks here
+    # Both pools wait for in-flight work (job workers for up to 30 seconds), so
+    # they shut down together on the threadpool rather than blocking the loop
+    await asyncio.gather(
+        run_in_threadpool(audio_executor.shutdown),
+        run_in_threadpool(job_workers.stop)
+    )
+    
+    inference_scheduler = get_inference_scheduler()
+    if inference_scheduler:
+        await inference_scheduler.stop()
+    
+    # Run adjustments still waiting out their debounce before the database closes
+    await get_adjustment_scheduler().stop()
+    
+    get_password_hasher().shutdown()
+    await get_database().close()
 
 if __name__ == "__main__":
     # Run the application with uvicorn when executed directly
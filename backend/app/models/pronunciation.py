@@ -0,0 +1,47 @@
+"""
+Models for pronunciation assessment in the Quranic Quest application.
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+class WordAssessment(BaseModel):
+    """Model for the assessment of one word of a verse."""
+
+    index: int = Field(..., description="Position of the word in the verse")
+    text: str = Field(..., description="The word as written in the reference recitation")
+    start_seconds: float = Field(..., description="Where the word starts in the recording")
+    end_seconds: float = Field(..., description="Where the word ends in the recording")
+    score: float = Field(..., description="Pronunciation score for the word (0-100)")
+    needs_practice: bool = Field(False, description="Whether the word scored below the practice threshold")
+
+class PronunciationAssessment(BaseModel):
+    """Model for the assessment of one recitation."""
+
+    id: str = Field(..., description="Unique identifier for the assessment")
+    user_id: str = Field(..., description="ID of the assessed user")
+    verse_id: Optional[str] = Field(None, description="ID of the recited verse (format: surah:ayah)")
+    timestamp: datetime = Field(..., description="When the assessment was made")
+
+    overall_score: Optional[float] = Field(None, description="Overall score (0-100), if the recitation could be scored")
+    accuracy_score: Optional[float] = Field(None, description="Score from the alignment against the reference recitations (0-100)")
+    model_score: Optional[float] = Field(None, description="Score from the pronunciation model (0-100)")
+
+    duration_seconds: float = Field(..., description="Duration of the processed recording in seconds")
+    reciter: Optional[str] = Field(None, description="Reference reciter the recording matched best")
+    words: List[WordAssessment] = Field([], description="Per-word scores, in verse order")
+    features: Dict[str, Any] = Field({}, description="Summary audio features of the recording")
+    feedback: List[str] = Field([], description="Short feedback messages for the user")
+
+class PronunciationFeedback(BaseModel):
+    """Model for detailed feedback on a previous assessment."""
+
+    assessment_id: str = Field(..., description="ID of the assessment")
+    verse_id: Optional[str] = Field(None, description="ID of the recited verse")
+    overall_score: Optional[float] = Field(None, description="Overall score of the assessment (0-100)")
+
+    strengths: List[WordAssessment] = Field([], description="Words recited well")
+    words_to_practice: List[WordAssessment] = Field([], description="Words to practice, weakest first")
+    tajweed_rules: List[Dict[str, Any]] = Field([], description="Tajweed rules that apply in the verse")
+    suggestions: List[str] = Field([], description="Suggestions for improvement")
@@ -2,7 +2,7 @@
 Models for user data in the Quranic Quest application.
 """
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -51,6 +51,11 @@ class User(UserBase):
     class Config:
         orm_mode = True
 
+class UserSnapshot(User):
+    """Immutable copy of a user, safe to share between requests."""
+    
+    model_config = ConfigDict(frozen=True)
+
 class UserProfile(BaseModel):
     """Model for user profile data."""
     
@@ -0,0 +1,6 @@
+"""
+Audio services for the Quranic Quest application.
+"""
+
+from services.audio.audio import AudioProcessingService
+from services.audio.executor import AudioExecutor, audio_executor
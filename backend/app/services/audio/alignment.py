@@ -0,0 +1,502 @@
+"""
+Attempt-vs-reference alignment for the Quranic Quest application.
+This module aligns a user's recording to reference recitations with banded
+dynamic time warping (DTW) and reports per-word timings and distances.
+
+The DTW is constrained to a Sakoe-Chiba band around the diagonal, so cost is
+O(N·W) instead of O(N·M). Each row of the accumulated-cost matrix is solved
+with NumPy: the within-row recurrence D[j] = min(t[j], c[j] + D[j-1]) is a
+min-plus scan, which equals P[j] + cummin(t - P)[j] where P is the prefix
+sum of c. Several references are aligned together as one batch.
+"""
+
+import os
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from services.audio.buffer import AudioBuffer
+from services.audio.decode import resample
+from services.audio.features import FeatureExtractor
+from services.audio.metrics import StageTimer
+from services.audio.templates import VerseTemplate, get_template_index
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Alignment settings
+ALIGNMENT_BAND_RATIO = float(os.getenv("ALIGNMENT_BAND_RATIO", "0.15"))
+ALIGNMENT_MIN_BAND = int(os.getenv("ALIGNMENT_MIN_BAND", "16"))
+ALIGNMENT_ABANDON_DISTANCE = float(os.getenv("ALIGNMENT_ABANDON_DISTANCE", "0"))  # 0 disables early abandoning
+ALIGNMENT_ROW_BLOCK = 256
+ONLINE_WORD_MARGIN_FRAMES = 8
+ONLINE_MAX_SPEED = 1.5
+
+# Backtracking steps
+STEP_DIAGONAL = 0
+STEP_VERTICAL = 1
+STEP_HORIZONTAL = 2
+
+@dataclass
+class WordAlignment:
+    """Where one reference word was found in the attempt."""
+
+    index: int
+    text: str
+    start_seconds: float
+    end_seconds: float
+    distance: float
+
+@dataclass
+class AlignmentResult:
+    """The alignment of an attempt against one reference recitation."""
+
+    verse_id: str
+    reciter: str
+    distance: float
+    abandoned: bool = False
+    words: List[WordAlignment] = field(default_factory=list)
+    path: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        """Convert the result to a JSON-serializable dictionary (without the path)."""
+        result = asdict(self)
+        result.pop("path")
+        return result
+
+def normalize_frames(frames: np.ndarray) -> np.ndarray:
+    """
+    Apply per-utterance mean and variance normalization to feature frames.
+
+    This removes speaker and channel offsets so a child's voice can be
+    compared against an adult reciter.
+
+    Args:
+        frames: Feature frames, shape (frames, dims)
+
+    Returns:
+        np.ndarray: Normalized float32 frames
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    return (frames - frames.mean(axis=0)) / (frames.std(axis=0) + 1e-5)
+
+def band_limits(n: int, m: int, band_ratio: float = ALIGNMENT_BAND_RATIO) -> Tuple[np.ndarray, int]:
+    """
+    Compute the Sakoe-Chiba band for an n x m alignment.
+
+    The band follows the line from (0, 0) to (n-1, m-1), so references
+    recited at a different pace than the attempt are still covered.
+
+    Args:
+        n: Number of attempt frames
+        m: Number of reference frames
+        band_ratio: Band half-width as a fraction of the reference length
+
+    Returns:
+        Tuple[np.ndarray, int]: First reference column of each row, and the band width
+    """
+    half_width = max(ALIGNMENT_MIN_BAND, int(np.ceil(band_ratio * m)))
+    centers = np.arange(n) * ((m - 1) / max(n - 1, 1))
+    lows = np.clip(np.ceil(centers - half_width), 0, max(m - 1, 0)).astype(np.int64)
+    return lows, 2 * half_width + 1
+
+def dtw_row(cost: np.ndarray, up: np.ndarray, diagonal: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute one row of the accumulated-cost matrix.
+
+    Args:
+        cost: Local costs for the row's cells, shape (..., W)
+        up: Accumulated cost of the cell above each cell
+        diagonal: Accumulated cost of the cell above and to the left
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Accumulated costs and the backtracking step of each cell
+    """
+    t = cost + np.minimum(diagonal, up)
+
+    # Within-row recurrence D[j] = min(t[j], c[j] + D[j-1]) as a min-plus scan
+    infinite = np.isinf(cost)
+    prefix = np.cumsum(np.where(infinite, 1e30, cost), axis=-1)
+    running = np.minimum.accumulate(t - prefix, axis=-1)
+    current = prefix + running
+    current[infinite] = np.inf
+
+    steps = np.where(
+        (t - prefix) > running,
+        STEP_HORIZONTAL,
+        np.where(up < diagonal, STEP_VERTICAL, STEP_DIAGONAL),
+    ).astype(np.int8)
+
+    return current, steps
+
+def batch_banded_dtw(
+    attempt: np.ndarray,
+    references: Sequence[np.ndarray],
+    band_ratio: float = ALIGNMENT_BAND_RATIO,
+    abandon_distance: float = ALIGNMENT_ABANDON_DISTANCE
+) -> List[Tuple[float, Optional[np.ndarray]]]:
+    """
+    Align one attempt against several references with banded DTW.
+
+    Args:
+        attempt: Normalized attempt frames, shape (n, dims)
+        references: Normalized reference frames, each shaped (m_b, dims)
+        band_ratio: Band half-width as a fraction of each reference's length
+        abandon_distance: Abandon a reference once its best per-frame distance
+            exceeds this value (0 disables early abandoning)
+
+    Returns:
+        List[Tuple[float, Optional[np.ndarray]]]: For each reference, the mean
+        per-step distance along the optimal path and the path as (k, 2) array of
+        (attempt frame, reference frame) pairs. Abandoned references give (inf, None).
+    """
+    n = attempt.shape[0]
+    batch = len(references)
+    if n == 0 or batch == 0:
+        return [(float("inf"), None) for _ in references]
+
+    lengths = np.array([reference.shape[0] for reference in references], dtype=np.int64)
+    limits = [band_limits(n, int(m), band_ratio) for m in lengths]
+    width = max(band_width for _, band_width in limits)
+    lows = np.stack([band_lows for band_lows, _ in limits])  # (B, n)
+
+    # Pad references so every band column indexes a valid row; padded cells get infinite cost
+    dims = attempt.shape[1]
+    padded = np.zeros((batch, int(lengths.max()) + width, dims), dtype=np.float32)
+    for b, reference in enumerate(references):
+        padded[b, :reference.shape[0]] = reference
+
+    columns = np.arange(width)
+    batch_index = np.arange(batch)[:, None]
+    previous = np.full((batch, width), np.inf)
+    steps = np.zeros((batch, n, width), dtype=np.int8)
+    abandoned = np.zeros(batch, dtype=bool)
+
+    for block_start in range(0, n, ALIGNMENT_ROW_BLOCK):
+        block_end = min(n, block_start + ALIGNMENT_ROW_BLOCK)
+
+        # Banded local costs for a block of rows, computed in one shot: (B, rows, W)
+        block_columns = lows[:, block_start:block_end, None] + columns  # (B, rows, W)
+        reference_frames = padded[batch_index[:, :, None], block_columns]  # (B, rows, W, dims)
+        cost = np.sqrt(np.sum((reference_frames - attempt[None, block_start:block_end, None, :]) ** 2, axis=-1))
+        cost = cost.astype(np.float64)
+        cost[block_columns >= lengths[:, None, None]] = np.inf
+
+        for row in range(block_start, block_end):
+            c = cost[:, row - block_start]  # (B, W)
+
+            if row == 0:
+                # The band starts at column 0 and only horizontal moves are possible
+                current = np.cumsum(c, axis=1)
+                steps[:, 0, 1:] = STEP_HORIZONTAL
+            else:
+                # Align the previous row to this row's columns
+                shift = (lows[:, row] - lows[:, row - 1])[:, None]
+                up_index = columns + shift
+                diagonal_index = up_index - 1
+
+                up = np.where(
+                    up_index < width,
+                    np.take_along_axis(previous, np.minimum(up_index, width - 1), axis=1),
+                    np.inf,
+                )
+                diagonal = np.where(
+                    (diagonal_index >= 0) & (diagonal_index < width),
+                    np.take_along_axis(previous, np.clip(diagonal_index, 0, width - 1), axis=1),
+                    np.inf,
+                )
+
+                current, steps[:, row] = dtw_row(c, up, diagonal)
+
+            if abandon_distance > 0:
+                best = current.min(axis=1) / (row + 1)
+                abandoned |= best > abandon_distance
+                current[abandoned] = np.inf
+                if abandoned.all():
+                    logger.info(f"DTW abandoned all {batch} references at frame {row}")
+                    return [(float("inf"), None) for _ in references]
+
+            previous = current
+
+    results = []
+    for b in range(batch):
+        m = int(lengths[b])
+        end_column = m - 1 - lows[b, n - 1]
+        if abandoned[b] or m == 0 or end_column >= width or np.isinf(previous[b, end_column]):
+            results.append((float("inf"), None))
+            continue
+
+        path = _backtrack(steps[b], lows[b], n - 1, m - 1)
+        results.append((float(previous[b, end_column] / len(path)), path))
+
+    return results
+
+def _backtrack(steps: np.ndarray, lows: np.ndarray, i: int, j: int) -> np.ndarray:
+    """Follow the stored steps back from (i, j) to (0, 0)."""
+    path = [(i, j)]
+    while i > 0 or j > 0:
+        step = steps[i, j - lows[i]]
+        if step == STEP_DIAGONAL:
+            i, j = i - 1, j - 1
+        elif step == STEP_VERTICAL:
+            i -= 1
+        else:
+            j -= 1
+        path.append((i, j))
+    return np.array(path[::-1], dtype=np.int64)
+
+def banded_dtw(
+    attempt: np.ndarray,
+    reference: np.ndarray,
+    band_ratio: float = ALIGNMENT_BAND_RATIO,
+    abandon_distance: float = ALIGNMENT_ABANDON_DISTANCE
+) -> Tuple[float, Optional[np.ndarray]]:
+    """
+    Align an attempt against a single reference with banded DTW.
+
+    Args:
+        attempt: Normalized attempt frames, shape (n, dims)
+        reference: Normalized reference frames, shape (m, dims)
+        band_ratio: Band half-width as a fraction of the reference length
+        abandon_distance: Early-abandon threshold (0 disables it)
+
+    Returns:
+        Tuple[float, Optional[np.ndarray]]: Mean per-step distance and the warping path
+    """
+    return batch_banded_dtw(attempt, [reference], band_ratio, abandon_distance)[0]
+
+def word_alignments(
+    attempt: np.ndarray,
+    reference: np.ndarray,
+    path: np.ndarray,
+    template: VerseTemplate,
+    first: int = 0,
+    last: Optional[int] = None
+) -> List[WordAlignment]:
+    """
+    Map the reference word boundaries onto the attempt through a warping path.
+
+    Args:
+        attempt: Normalized attempt frames
+        reference: Normalized reference frames
+        path: Warping path of (attempt frame, reference frame) pairs
+        template: The reference template, with word boundaries in frames
+        first: Index of the first word to map
+        last: Index after the last word to map (defaults to all remaining words)
+
+    Returns:
+        List[WordAlignment]: Timing and mean distance of each word in the attempt
+    """
+    seconds_per_frame = template.hop_length / template.sample_rate
+    attempt_frames, reference_frames = path[:, 0], path[:, 1]
+    step_costs = np.linalg.norm(attempt[attempt_frames] - reference[reference_frames], axis=1)
+
+    words = []
+    last = len(template.word_boundaries) if last is None else last
+    for index in range(first, last):
+        start, end = template.word_boundaries[index]
+        mask = (reference_frames >= start) & (reference_frames < end)
+        if not mask.any():
+            continue
+
+        words.append(WordAlignment(
+            index=index,
+            text=template.words[index] if index < len(template.words) else "",
+            start_seconds=float(attempt_frames[mask].min() * seconds_per_frame),
+            end_seconds=float((attempt_frames[mask].max() + 1) * seconds_per_frame),
+            distance=float(step_costs[mask].mean()),
+        ))
+
+    return words
+
+def attempt_frames(buffer: AudioBuffer, sample_rate: int) -> np.ndarray:
+    """
+    Compute MFCC frames for an attempt at the templates' sample rate.
+
+    Args:
+        buffer: The processed attempt audio
+        sample_rate: Sample rate the templates were built at
+
+    Returns:
+        np.ndarray: MFCC frames, shape (frames, dims)
+    """
+    if buffer.sample_rate != sample_rate:
+        buffer = AudioBuffer(
+            samples=resample(buffer.samples, buffer.sample_rate, sample_rate),
+            sample_rate=sample_rate,
+            metadata=buffer.metadata,
+        )
+    return FeatureExtractor(buffer).mfcc.T
+
+def align_to_templates(
+    attempt: np.ndarray,
+    templates: Sequence[VerseTemplate],
+    band_ratio: float = ALIGNMENT_BAND_RATIO,
+    abandon_distance: float = ALIGNMENT_ABANDON_DISTANCE
+) -> List[AlignmentResult]:
+    """
+    Align attempt MFCC frames against every template for a verse in one batch.
+
+    Args:
+        attempt: Attempt MFCC frames, shape (frames, dims)
+        templates: Reference templates for the verse
+        band_ratio: Band half-width as a fraction of each reference's length
+        abandon_distance: Early-abandon threshold (0 disables it)
+
+    Returns:
+        List[AlignmentResult]: One result per template, best match first
+    """
+    normalized_attempt = normalize_frames(attempt)
+    normalized_references = [normalize_frames(template.mfcc) for template in templates]
+
+    results = []
+    alignments = batch_banded_dtw(normalized_attempt, normalized_references, band_ratio, abandon_distance)
+    for template, reference, (distance, path) in zip(templates, normalized_references, alignments):
+        result = AlignmentResult(
+            verse_id=template.verse_id,
+            reciter=template.reciter,
+            distance=distance,
+            abandoned=path is None,
+            path=path,
+        )
+        if path is not None:
+            result.words = word_alignments(normalized_attempt, reference, path, template)
+        results.append(result)
+
+    return sorted(results, key=lambda result: result.distance)
+
+class OnlineAligner:
+    """Open-end DTW against one reference that consumes attempt frames as they arrive."""
+
+    def __init__(self, template: VerseTemplate, word_margin_frames: int = ONLINE_WORD_MARGIN_FRAMES):
+        """
+        Initialize the aligner.
+
+        Args:
+            template: The reference template to align against
+            word_margin_frames: How far past a word's end the alignment must be
+                before the word is reported
+        """
+        self.template = template
+        self.reference = normalize_frames(template.mfcc)
+        self.word_margin_frames = word_margin_frames
+        self.position = 0
+        self._previous: Optional[np.ndarray] = None
+        self._steps: List[np.ndarray] = []
+        self._frames: List[np.ndarray] = []
+        self._next_word = 0
+
+        # Running mean and variance of the attempt frames (Welford's algorithm)
+        dims = self.reference.shape[1]
+        self._count = 0
+        self._mean = np.zeros(dims, dtype=np.float64)
+        self._m2 = np.zeros(dims, dtype=np.float64)
+
+    def _normalize(self, frame: np.ndarray) -> np.ndarray:
+        """Normalize a frame with the attempt's running statistics."""
+        self._count += 1
+        delta = frame - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (frame - self._mean)
+        std = np.sqrt(self._m2 / self._count) if self._count > 1 else np.ones_like(self._mean)
+        return ((frame - self._mean) / (std + 1e-5)).astype(np.float32)
+
+    def _path_to(self, column: int) -> np.ndarray:
+        """Backtrack from the latest attempt frame at the given reference column."""
+        rows = len(self._steps)
+        return _backtrack(np.stack(self._steps), np.zeros(rows, dtype=np.int64), rows - 1, column)
+
+    def push(self, frames: np.ndarray) -> List[WordAlignment]:
+        """
+        Consume new attempt frames.
+
+        Args:
+            frames: New MFCC frames, shape (frames, dims)
+
+        Returns:
+            List[WordAlignment]: Words the alignment has moved past since the last call
+        """
+        if len(frames) == 0:
+            return []
+
+        for frame in frames:
+            x = self._normalize(frame.astype(np.float64))
+            cost = np.linalg.norm(self.reference - x, axis=1).astype(np.float64)
+
+            if self._previous is None:
+                current = np.cumsum(cost)
+                steps = np.full(len(cost), STEP_HORIZONTAL, dtype=np.int8)
+            else:
+                diagonal = np.concatenate([[np.inf], self._previous[:-1]])
+                current, steps = dtw_row(cost, self._previous, diagonal)
+
+            self._previous = current
+            self._steps.append(steps)
+            self._frames.append(x)
+
+        # Open end: the best reference position normalizes cost by path length. The
+        # attempt cannot plausibly run more than ONLINE_MAX_SPEED times ahead of
+        # the reference, which keeps early estimates from jumping to the end.
+        rows = len(self._steps)
+        reachable = self._previous[:max(1, int(np.ceil(rows * ONLINE_MAX_SPEED)))]
+        self.position = int(np.argmin(reachable / (rows + np.arange(len(reachable)) + 1)))
+
+        boundaries = self.template.word_boundaries
+        last = self._next_word
+        while last < len(boundaries) and boundaries[last][1] + self.word_margin_frames <= self.position:
+            last += 1
+
+        if last == self._next_word:
+            return []
+
+        words = word_alignments(np.stack(self._frames), self.reference, self._path_to(self.position), self.template, self._next_word, last)
+        self._next_word = last
+        return words
+
+    def finish(self) -> AlignmentResult:
+        """
+        Close the alignment at the end of the reference.
+
+        Returns:
+            AlignmentResult: The full alignment, with every word
+        """
+        result = AlignmentResult(
+            verse_id=self.template.verse_id,
+            reciter=self.template.reciter,
+            distance=float("inf"),
+            abandoned=self._previous is None,
+        )
+        if self._previous is None:
+            return result
+
+        path = self._path_to(len(self.reference) - 1)
+        result.distance = float(self._previous[-1] / len(path))
+        result.path = path
+        result.words = word_alignments(np.stack(self._frames), self.reference, path, self.template)
+        return result
+
+def align_buffer(buffer: AudioBuffer, verse_id: str) -> Tuple[List[dict], Dict[str, float]]:
+    """
+    Align processed audio against every reference template for a verse.
+
+    Args:
+        buffer: The processed attempt audio
+        verse_id: The verse ID ("surah:ayah")
+
+    Returns:
+        Tuple[List[dict], Dict[str, float]]: Alignment results (best match first) and per-stage timings
+    """
+    timer = StageTimer()
+
+    templates = get_template_index().get(verse_id)
+    if not templates:
+        return [], timer.timings
+
+    with timer.stage("alignment_features"):
+        frames = attempt_frames(buffer, templates[0].sample_rate)
+
+    with timer.stage("alignment"):
+        results = align_to_templates(frames, templates)
+
+    return [result.to_dict() for result in results], timer.timings
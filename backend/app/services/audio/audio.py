@@ -4,26 +4,331 @@ This module handles audio file processing for pronunciation assessment.
 """
 
 import os
-import logging
 import uuid
-from typing import List, Optional
+import asyncio
+import hashlib
+import logging
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 import numpy as np
-import soundfile as sf
-from pydub import AudioSegment
-import librosa
+from fastapi.concurrency import run_in_threadpool
+
+from services.audio import alignment, batch, fingerprint, pipeline, segmentation, transcode
+from services.audio.buffer import AudioBuffer, AudioSource
+from services.audio.cache import feature_cache, make_cache_key, transcode_cache
+from services.audio.executor import AudioExecutor, audio_executor
+from services.audio.features import ASSESSMENT_FEATURES, DEFAULT_FEATURES
+from services.audio.metrics import PipelineMetrics, pipeline_metrics
+from services.audio.templates import TEMPLATE_SAMPLE_RATE
+from services.inference import get_inference_scheduler
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+def _read_file(path: str) -> bytes:
+    """Read a whole file."""
+    with open(path, "rb") as file:
+        return file.read()
+
+def _hash_file(path: str) -> str:
+    """Get the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _write_file(path: str, data: bytes) -> None:
+    """Write a file atomically, so concurrent conversions never expose a partial file."""
+    temp_path = f"{path}.{uuid.uuid4().hex}.part"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
 class AudioProcessingService:
     """Service for processing audio files for pronunciation assessment."""
     
-    def __init__(self):
-        """Initialize the audio processing service."""
+    def __init__(
+        self,
+        executor: Optional[AudioExecutor] = None,
+        metrics: Optional[PipelineMetrics] = None
+    ):
+        """
+        Initialize the audio processing service.
+        
+        Args:
+            executor: Executor for CPU-bound pipeline work (defaults to the shared pool)
+            metrics: Aggregator for per-stage timings (defaults to the shared metrics)
+        """
+        self.executor = executor or audio_executor
+        self.metrics = metrics or pipeline_metrics
+        self._transcode_slots = asyncio.Semaphore(
+            transcode.TRANSCODE_MAX_CONCURRENCY or self.executor.max_workers
+        )
+        
         # Ensure necessary directories exist
         os.makedirs("data/audio_uploads", exist_ok=True)
         os.makedirs("data/audio_processed", exist_ok=True)
     
+    async def _get_prepared(self, audio_sha256: Optional[str], features: Iterable[str]) -> Optional[Tuple[AudioBuffer, dict]]:
+        """
+        Look up a clip's processed audio and features in the feature cache.
+        
+        Args:
+            audio_sha256: SHA-256 hex digest of the encoded clip, or None to skip the cache
+            features: Names of the features the caller needs
+            
+        Returns:
+            Optional[Tuple[AudioBuffer, dict]]: The processed audio and its features, or None on a miss
+        """
+        if not audio_sha256:
+            return None
+        
+        cached = await feature_cache.get(make_cache_key(audio_sha256, "features"))
+        if cached is None or not set(features) <= set(cached["names"]):
+            return None
+        return cached["buffer"], cached["features"]
+    
+    async def _set_prepared(
+        self,
+        audio_sha256: Optional[str],
+        processed: AudioBuffer,
+        features: dict,
+        names: Iterable[str]
+    ) -> None:
+        """Store a clip's processed audio and features in the feature cache."""
+        if audio_sha256:
+            await feature_cache.set(
+                make_cache_key(audio_sha256, "features"),
+                {"buffer": processed, "features": features, "names": tuple(names)}
+            )
+    
+    async def prepare_audio(
+        self,
+        source: AudioSource,
+        filename: str = "",
+        audio_sha256: Optional[str] = None
+    ) -> Tuple[AudioBuffer, dict]:
+        """
+        Decode an upload once, process it and extract its features.
+        
+        Clips seen before (e.g. resubmitted for another verse) are answered
+        from the feature cache without decoding them again.
+        
+        Args:
+            source: Encoded audio bytes or a path to a spooled upload
+            filename: Original filename of the upload
+            audio_sha256: SHA-256 hex digest of the encoded upload, to use the feature cache
+            
+        Returns:
+            Tuple[AudioBuffer, dict]: The processed audio and its extracted features
+        """
+        cached = await self._get_prepared(audio_sha256, ASSESSMENT_FEATURES)
+        if cached is not None:
+            return cached
+        
+        processed, features, timings = await self.executor.run(
+            pipeline.prepare_for_assessment,
+            source,
+            filename
+        )
+        self.metrics.record(timings)
+        self.metrics.record_decode(processed.metadata)
+        await self._set_prepared(audio_sha256, processed, features, ASSESSMENT_FEATURES)
+        
+        return processed, features
+    
+    async def prepare_batch(
+        self,
+        sources: List[Tuple[AudioSource, str]],
+        audio_sha256s: Optional[List[str]] = None
+    ) -> List[Tuple[Optional[AudioBuffer], Optional[dict], Optional[str]]]:
+        """
+        Decode, process and extract features for many clips as padded batches.
+        
+        Clips found in the feature cache are skipped. The rest are split
+        evenly across the pool workers, and each worker processes its share
+        as vectorized batches.
+        
+        Args:
+            sources: (encoded audio bytes or spooled path, original filename) per clip
+            audio_sha256s: SHA-256 hex digest of each encoded clip, to use the feature cache
+            
+        Returns:
+            List[Tuple]: Processed audio, features and error message per clip, in input order
+        """
+        hashes = audio_sha256s or [None] * len(sources)
+        cached = await asyncio.gather(*(self._get_prepared(sha256, ASSESSMENT_FEATURES) for sha256 in hashes))
+        results = [(hit[0], hit[1], None) if hit is not None else None for hit in cached]
+        misses = [index for index, hit in enumerate(cached) if hit is None]
+        
+        chunk_size = max(1, -(-len(misses) // max(1, self.executor.max_workers)))
+        chunks = [misses[start:start + chunk_size] for start in range(0, len(misses), chunk_size)]
+        
+        for chunk, (processed, features, errors, timings) in zip(chunks, await asyncio.gather(*(
+            self.executor.run(batch.prepare_batch_for_assessment, [sources[index] for index in chunk]) for chunk in chunks
+        ))):
+            self.metrics.record(timings)
+            for index, clip, clip_features, error in zip(chunk, processed, features, errors):
+                if clip is not None:
+                    self.metrics.record_decode(clip.metadata)
+                    await self._set_prepared(hashes[index], clip, clip_features, ASSESSMENT_FEATURES)
+                results[index] = (clip, clip_features, error)
+        
+        return results
+    
+    async def align_to_references(self, buffer: AudioBuffer, verse_id: str) -> List[dict]:
+        """
+        Align processed audio against the reference recitations for a verse.
+        
+        Args:
+            buffer: The processed attempt audio
+            verse_id: The verse ID ("surah:ayah")
+            
+        Returns:
+            List[dict]: Per-reciter alignments with per-word timings and distances, best match first
+        """
+        try:
+            results, timings = await self.executor.run(alignment.align_buffer, buffer, verse_id)
+            self.metrics.record(timings)
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error aligning audio to references: {str(e)}")
+            return []
+    
+    async def identify_verse(self, buffer: AudioBuffer, limit: int = 3) -> List[dict]:
+        """
+        Identify the verse recited in processed audio with the fingerprint index.
+        
+        Args:
+            buffer: The processed attempt audio
+            limit: Maximum number of candidates to return
+            
+        Returns:
+            List[dict]: Candidate verses with their votes and offsets, best first
+        """
+        try:
+            candidates, timings = await self.executor.run(fingerprint.identify_buffer, buffer, limit)
+            self.metrics.record(timings)
+            
+            return candidates
+            
+        except Exception as e:
+            logger.error(f"Error identifying verse: {str(e)}")
+            return []
+    
+    async def resolve_verse_id(self, buffer: AudioBuffer, verse_id: Optional[str] = None) -> Optional[str]:
+        """
+        Fill in a missing verse ID, or correct a clearly wrong one, from the recitation itself.
+        
+        Args:
+            buffer: The processed attempt audio
+            verse_id: The verse ID the client sent, if any
+            
+        Returns:
+            Optional[str]: The verse ID to assess against
+        """
+        candidates = await self.identify_verse(buffer)
+        resolved = fingerprint.choose_verse(candidates, verse_id)
+        
+        if resolved != verse_id:
+            logger.info(f"Identified recitation as verse {resolved} (client sent {verse_id})")
+        
+        return resolved
+    
+    async def score_with_model(self, buffer: AudioBuffer) -> Optional[List[float]]:
+        """
+        Score processed audio with the pronunciation model, batched with concurrent requests.
+        
+        Args:
+            buffer: The processed attempt audio
+            
+        Returns:
+            Optional[List[float]]: The model's scores, or None if no model is configured
+        """
+        scheduler = get_inference_scheduler()
+        if scheduler is None:
+            return None
+        
+        try:
+            frames = await self.executor.run(alignment.attempt_frames, buffer, TEMPLATE_SAMPLE_RATE)
+            scores = await scheduler.submit(frames)
+            
+            return scores.tolist()
+            
+        except Exception as e:
+            logger.error(f"Error scoring audio with the pronunciation model: {str(e)}")
+            return None
+    
+    async def process_long_recording(
+        self,
+        audio_file_path: str,
+        start_verse_id: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Split a long recitation on pauses and process each segment on the audio pool.
+        
+        Segments are yielded as soon as they finish, not in recording order.
+        At most two segments per pool worker are in flight at once, so memory
+        stays bounded however long the recording is.
+        
+        Args:
+            audio_file_path: Path to the spooled recording
+            start_verse_id: Verse of the first segment ("surah:ayah"); later
+                segments are assumed to be the following ayahs
+            
+        Yields:
+            dict: Segment index, times, expected verse, processed audio, features and alignments
+        """
+        segments, timings = await self.executor.run(segmentation.find_segments, audio_file_path)
+        self.metrics.record(timings)
+        logger.info(f"Found {len(segments)} segments in {audio_file_path}")
+        
+        surah, first_ayah = (int(part) for part in start_verse_id.split(":")) if start_verse_id else (None, None)
+        
+        async def run_segment(index: int, start: int, end: int, sample_rate: int) -> dict:
+            verse_id = f"{surah}:{first_ayah + index}" if surah is not None else None
+            processed, features, alignments, segment_timings = await self.executor.run(
+                segmentation.prepare_segment,
+                audio_file_path,
+                start,
+                end,
+                verse_id
+            )
+            self.metrics.record(segment_timings)
+            return {
+                "index": index,
+                "start_seconds": start / sample_rate,
+                "end_seconds": end / sample_rate,
+                "verse_id": verse_id,
+                "audio": processed,
+                "features": features,
+                "alignments": alignments
+            }
+        
+        window = max(1, self.executor.max_workers * 2)
+        pending = set()
+        queued = iter(segments)
+        
+        try:
+            while True:
+                for segment in queued:
+                    pending.add(asyncio.ensure_future(run_segment(*segment)))
+                    if len(pending) >= window:
+                        break
+                
+                if not pending:
+                    break
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+                    
+        finally:
+            for task in pending:
+                task.cancel()
+    
     async def process_audio(self, audio_file_path: str) -> str:
         """
         Process an audio file for pronunciation assessment.
@@ -40,22 +345,13 @@ class AudioProcessingService:
             unique_filename = f"{uuid.uuid4()}{file_extension}"
             processed_file_path = f"data/audio_processed/{unique_filename}"
             
-            # Load the audio file
-            y, sr = librosa.load(audio_file_path, sr=None)
-            
-            # Apply preprocessing steps
-            
-            # 1. Noise reduction
-            y_denoised = self._reduce_noise(y, sr)
-            
-            # 2. Normalization
-            y_normalized = self._normalize_audio(y_denoised)
-            
-            # 3. Trim silence
-            y_trimmed, _ = librosa.effects.trim(y_normalized, top_db=20)
-            
-            # Save the processed audio
-            sf.write(processed_file_path, y_trimmed, sr)
+            # Decode, denoise, normalize, trim and encode on the audio pool
+            processed_file_path, timings = await self.executor.run(
+                pipeline.process_audio_file,
+                audio_file_path,
+                processed_file_path
+            )
+            self.metrics.record(timings)
             
             logger.info(f"Audio processed successfully: {processed_file_path}")
             return processed_file_path
@@ -76,26 +372,7 @@ class AudioProcessingService:
         Returns:
             np.ndarray: Denoised audio signal
         """
-        try:
-            # In a real implementation, this would use a sophisticated noise reduction algorithm
-            # For the prototype, we'll use a simple approach
-            
-            # Estimate noise from a small segment (assuming the first 0.5 seconds is noise)
-            noise_sample = y[:int(sr * 0.5)] if len(y) > int(sr * 0.5) else y[:len(y)//10]
-            
-            # Calculate noise profile
-            noise_profile = np.mean(np.abs(noise_sample))
-            
-            # Apply simple noise gate
-            y_denoised = y.copy()
-            mask = np.abs(y) < noise_profile * 2
-            y_denoised[mask] = 0
-            
-            return y_denoised
-            
-        except Exception as e:
-            logger.error(f"Error reducing noise: {str(e)}")
-            return y
+        return pipeline.reduce_noise(y, sr)
     
     def _normalize_audio(self, y: np.ndarray) -> np.ndarray:
         """
@@ -107,17 +384,7 @@ class AudioProcessingService:
         Returns:
             np.ndarray: Normalized audio signal
         """
-        try:
-            # Normalize to -3 dB
-            target_dB = -3
-            current_dB = 20 * np.log10(np.max(np.abs(y)) + 1e-8)
-            gain = 10 ** ((target_dB - current_dB) / 20)
-            
-            return y * gain
-            
-        except Exception as e:
-            logger.error(f"Error normalizing audio: {str(e)}")
-            return y
+        return pipeline.normalize_audio(y)
     
     async def cleanup_audio_files(self, file_paths: List[str]) -> None:
         """
@@ -135,6 +402,36 @@ class AudioProcessingService:
         except Exception as e:
             logger.error(f"Error cleaning up audio files: {str(e)}")
     
+    async def transcode(self, data: bytes, filename: str, target_format: str = "wav") -> bytes:
+        """
+        Transcode encoded audio on the audio pool, reusing cached results.
+        
+        Args:
+            data: The encoded source audio
+            filename: Original filename of the source
+            target_format: Target audio format
+            
+        Returns:
+            bytes: The audio encoded in the target format
+        """
+        cache_key = make_cache_key(hashlib.sha256(data).hexdigest(), "transcode", target_format)
+        cached = await transcode_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Cap concurrent transcodes so conversions cannot starve assessments of workers
+        async with self._transcode_slots:
+            encoded, timings = await self.executor.run(
+                transcode.transcode_bytes,
+                data,
+                filename,
+                target_format
+            )
+        self.metrics.record(timings)
+        
+        await transcode_cache.set(cache_key, encoded)
+        return encoded
+    
     async def convert_audio_format(
         self, 
         audio_file_path: str, 
@@ -143,6 +440,9 @@ class AudioProcessingService:
         """
         Convert audio to a different format.
         
+        Converted files are named after the source's content hash, so
+        converting the same audio again reuses the existing file.
+        
         Args:
             audio_file_path: Path to the audio file to convert
             target_format: Target audio format
@@ -151,16 +451,15 @@ class AudioProcessingService:
             Optional[str]: Path to the converted audio file, or None if conversion failed
         """
         try:
-            # Generate a unique filename for the converted audio
-            file_name = os.path.splitext(os.path.basename(audio_file_path))[0]
-            unique_filename = f"{file_name}_{uuid.uuid4()}.{target_format}"
-            converted_file_path = f"data/audio_processed/{unique_filename}"
+            data = await run_in_threadpool(_read_file, audio_file_path)
+            digest = hashlib.sha256(data).hexdigest()
+            converted_file_path = f"data/audio_processed/{digest[:16]}.{target_format}"
             
-            # Load the audio file with pydub
-            audio = AudioSegment.from_file(audio_file_path)
+            if os.path.exists(converted_file_path):
+                return converted_file_path
             
-            # Export to the target format
-            audio.export(converted_file_path, format=target_format)
+            encoded = await self.transcode(data, os.path.basename(audio_file_path), target_format)
+            await run_in_threadpool(_write_file, converted_file_path, encoded)
             
             logger.info(f"Audio converted successfully: {converted_file_path}")
             return converted_file_path
@@ -169,49 +468,61 @@ class AudioProcessingService:
             logger.error(f"Error converting audio: {str(e)}")
             return None
     
-    async def extract_audio_features(self, audio_file_path: str) -> Optional[dict]:
+    async def extract_audio_features(
+        self,
+        audio: Union[str, AudioBuffer],
+        features: Optional[Iterable[str]] = None
+    ) -> Optional[dict]:
         """
         Extract audio features for analysis.
         
+        Features are computed from the file as recorded, without denoising,
+        normalizing or trimming it. Files are cached by content hash, so
+        extracting the same recording again skips decoding.
+        
         Args:
-            audio_file_path: Path to the audio file
+            audio: Path to the audio file, or already decoded audio
+            features: Names of the features to compute (defaults to all of them)
             
         Returns:
             Optional[dict]: Extracted audio features, or None if extraction failed
         """
         try:
-            # Load the audio file
-            y, sr = librosa.load(audio_file_path, sr=None)
-            
-            # Extract features
-            
-            # 1. Mel-frequency cepstral coefficients (MFCCs)
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-            mfcc_mean = np.mean(mfccs, axis=1)
-            
-            # 2. Spectral centroid
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
-            spectral_centroid_mean = np.mean(spectral_centroid)
-            
-            # 3. Zero crossing rate
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(y)
-            zero_crossing_rate_mean = np.mean(zero_crossing_rate)
-            
-            # 4. Tempo
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-            tempo = librosa.beat.tempo(onset_envelope=onset_env, sr=sr)[0]
-            
-            # Return features
-            features = {
-                "mfcc_mean": mfcc_mean.tolist(),
-                "spectral_centroid_mean": float(spectral_centroid_mean),
-                "zero_crossing_rate_mean": float(zero_crossing_rate_mean),
-                "tempo": float(tempo),
-                "duration": float(len(y) / sr)
-            }
+            names = tuple(features) if features is not None else DEFAULT_FEATURES
             
-            return features
+            key = None
+            if not isinstance(audio, AudioBuffer):
+                key = make_cache_key(await run_in_threadpool(_hash_file, audio), "file_features", *sorted(names))
+                cached = await feature_cache.get(key)
+                if cached is not None:
+                    return cached
+            
+            extracted, timings = await self.executor.run(pipeline.extract_features_timed, audio, names)
+            self.metrics.record(timings)
+            
+            if key is not None:
+                await feature_cache.set(key, extracted)
+            
+            return extracted
             
         except Exception as e:
             logger.error(f"Error extracting audio features: {str(e)}")
             return None
+    
+    def get_stage_timings(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get aggregated per-stage timings for the audio pipeline.
+        
+        Returns:
+            Dict[str, Dict[str, float]]: Timing statistics per pipeline stage
+        """
+        return self.metrics.snapshot()
+    
+    def get_decode_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get aggregated decode costs per codec.
+        
+        Returns:
+            Dict[str, Dict[str, float]]: Decode counts, totals and cost per second of audio, per codec
+        """
+        return self.metrics.decode_snapshot()
@@ -0,0 +1,324 @@
+"""
+Batched audio pipeline stages for the Quranic Quest application.
+Many short clips (e.g. a classroom's worth of recitations) are decoded one by
+one, then grouped by sample rate and length, zero-padded into a single 2-D
+array and denoised, normalized, trimmed and analyzed with one vectorized call
+per stage. Every stage masks the padding, so each clip comes out exactly as
+it would from the single-clip pipeline.
+"""
+
+import os
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import librosa
+
+from services.audio.buffer import AudioBuffer, AudioSource
+from services.audio.decode import decode_audio
+from services.audio.denoise import spectral_gate
+from services.audio.features import ASSESSMENT_FEATURES, DEFAULT_FEATURES, FEATURE_NAMES, HOP_LENGTH, N_FFT, N_MELS, N_MFCC
+from services.audio.metrics import StageTimer
+from services.audio.pipeline import AUDIO_DENOISE_METHOD
+from services.inference.scheduler import bucket_by_length, pad_batch
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Batch settings
+AUDIO_BATCH_MAX_PADDING_RATIO = float(os.getenv("AUDIO_BATCH_MAX_PADDING_RATIO", "0.5"))
+AUDIO_BATCH_GROUP_SIZE = int(os.getenv("AUDIO_BATCH_GROUP_SIZE", "16"))  # Larger groups fall out of cache
+TRIM_TOP_DB = 20
+NOISE_SECONDS = 0.5
+
+def _frame_counts(lengths: np.ndarray) -> np.ndarray:
+    """Number of centered analysis frames for each signal length."""
+    return 1 + lengths // HOP_LENGTH
+
+def _frame_mask(lengths: np.ndarray, frames: int) -> np.ndarray:
+    """Boolean mask of the frames that belong to each (unpadded) signal."""
+    return np.arange(frames)[None, :] < _frame_counts(lengths)[:, None]
+
+def _masked_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Mean over the last axis, counting only masked-in frames."""
+    return (values * mask).sum(axis=-1) / mask.sum(axis=-1)
+
+def _groups(buffers: Sequence[AudioBuffer]) -> List[List[int]]:
+    """Group clip indices by sample rate, then into buckets of similar length and bounded size."""
+    by_rate: Dict[int, List[int]] = {}
+    for index, buffer in enumerate(buffers):
+        by_rate.setdefault(buffer.sample_rate, []).append(index)
+
+    groups = []
+    for indices in by_rate.values():
+        for bucket in bucket_by_length([len(buffers[index].samples) for index in indices], AUDIO_BATCH_MAX_PADDING_RATIO):
+            for start in range(0, len(bucket), AUDIO_BATCH_GROUP_SIZE):
+                groups.append([indices[position] for position in bucket[start:start + AUDIO_BATCH_GROUP_SIZE]])
+    return groups
+
+def reduce_noise_batch(batch: np.ndarray, lengths: np.ndarray, sr: int) -> np.ndarray:
+    """
+    Apply the noise gate to a padded batch in place.
+
+    Args:
+        batch: Zero-padded signals, shape (clips, samples)
+        lengths: Unpadded length of each signal
+        sr: Sample rate
+
+    Returns:
+        np.ndarray: The denoised batch
+    """
+    # The first half second is assumed to be noise (or the first tenth of shorter clips)
+    noise_samples = int(sr * NOISE_SECONDS)
+    noise_lengths = np.where(lengths > noise_samples, noise_samples, lengths // 10)
+
+    magnitude = np.abs(batch)
+    head = magnitude[:, :max(1, noise_samples)]
+    head_mask = np.arange(head.shape[1])[None, :] < noise_lengths[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        noise_profile = (head * head_mask).sum(axis=1) / noise_lengths
+
+    # Padding is already zero, so gating it changes nothing
+    batch[magnitude < (noise_profile * 2)[:, None]] = 0
+    return batch
+
+def normalize_batch(batch: np.ndarray) -> np.ndarray:
+    """
+    Scale every signal in a padded batch to a -3 dB peak, in place.
+
+    Args:
+        batch: Zero-padded signals, shape (clips, samples)
+
+    Returns:
+        np.ndarray: The normalized batch
+    """
+    current_db = 20 * np.log10(np.max(np.abs(batch), axis=1) + 1e-8)
+    batch *= (10 ** ((-3 - current_db) / 20)).astype(batch.dtype)[:, None]
+    return batch
+
+def trim_bounds_batch(batch: np.ndarray, lengths: np.ndarray, top_db: float = TRIM_TOP_DB) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the non-silent span of every signal in a padded batch.
+
+    This matches librosa.effects.trim with its default frame and hop lengths.
+
+    Args:
+        batch: Zero-padded signals, shape (clips, samples)
+        lengths: Unpadded length of each signal
+        top_db: Threshold below each signal's loudest frame that counts as silence
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Start and end sample of each signal's non-silent span
+    """
+    rms = librosa.feature.rms(y=batch, frame_length=N_FFT, hop_length=HOP_LENGTH)[:, 0, :]
+    rms = np.where(_frame_mask(lengths, rms.shape[1]), rms, 0)
+
+    amin = 1e-5
+    reference = np.maximum(rms.max(axis=1), amin)
+    non_silent = np.maximum(rms, amin) > reference[:, None] * 10 ** (-top_db / 20)
+
+    starts = np.zeros(len(batch), dtype=np.int64)
+    ends = np.zeros(len(batch), dtype=np.int64)
+    for row in np.flatnonzero(non_silent.any(axis=1)):
+        frames = np.flatnonzero(non_silent[row])
+        starts[row] = frames[0] * HOP_LENGTH
+        ends[row] = min(lengths[row], (frames[-1] + 1) * HOP_LENGTH)
+    return starts, ends
+
+def zero_crossing_rate_batch(batch: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Zero crossing rate per frame for every signal in a padded batch.
+
+    This matches librosa.feature.zero_crossing_rate with its default settings,
+    but counts crossings once per sample with a running sum instead of once
+    per overlapping frame.
+
+    Args:
+        batch: Zero-padded signals, shape (clips, samples)
+        lengths: Unpadded length of each signal
+
+    Returns:
+        np.ndarray: Crossing rate per frame, shape (clips, frames)
+    """
+    # Edge-pad each signal with its own first and last sample, as librosa does when centering
+    positions = np.arange(batch.shape[1])[None, :]
+    last = batch[np.arange(len(batch)), np.maximum(lengths - 1, 0)]
+    edged = np.where(positions < lengths[:, None], batch, last[:, None])
+    edged = np.pad(edged, ((0, 0), (N_FFT // 2, N_FFT // 2)), mode="edge")
+
+    # Values within 1e-10 of zero count as zero, and zero counts as positive
+    negative = np.signbit(np.where(np.abs(edged) <= 1e-10, 0, edged))
+    crossings = np.zeros(edged.shape, dtype=np.int32)
+    np.cumsum(negative[:, 1:] != negative[:, :-1], axis=1, out=crossings[:, 1:])
+
+    frames = 1 + (edged.shape[1] - N_FFT) // HOP_LENGTH
+    starts = np.arange(frames) * HOP_LENGTH
+    return (crossings[:, starts + N_FFT - 1] - crossings[:, starts]) / N_FFT
+
+def process_buffers(
+    buffers: Sequence[AudioBuffer],
+    timer: Optional[StageTimer] = None,
+    denoise_method: str = AUDIO_DENOISE_METHOD
+) -> List[AudioBuffer]:
+    """
+    Denoise, normalize and trim many decoded clips as padded batches.
+
+    Args:
+        buffers: The decoded clips
+        timer: Optional timer to record stage timings into
+        denoise_method: Noise reduction method ("spectral" or "gate")
+
+    Returns:
+        List[AudioBuffer]: The processed clips, in input order
+    """
+    timer = timer or StageTimer()
+    processed: List[Optional[AudioBuffer]] = [None] * len(buffers)
+
+    for group in _groups(buffers):
+        sr = buffers[group[0]].sample_rate
+        batch, lengths = pad_batch([buffers[index].samples for index in group])
+
+        with timer.stage("denoise"):
+            if denoise_method == "spectral":
+                # The spectral gate carries per-clip state, so it runs on each row in place
+                for row, length in enumerate(lengths):
+                    spectral_gate(batch[row, :length], sr)
+            else:
+                reduce_noise_batch(batch, lengths, sr)
+
+        with timer.stage("normalize"):
+            normalize_batch(batch)
+
+        with timer.stage("trim"):
+            starts, ends = trim_bounds_batch(batch, lengths)
+
+        for row, index in enumerate(group):
+            clip = buffers[index].with_samples(batch[row, starts[row]:ends[row]].copy())
+            clip.metadata["trim_start"] = int(starts[row])
+            processed[index] = clip
+
+    return processed
+
+def extract_features_batch(
+    buffers: Sequence[AudioBuffer],
+    timer: Optional[StageTimer] = None,
+    features: Optional[Iterable[str]] = None
+) -> List[dict]:
+    """
+    Extract summary features for many clips from one batched STFT per group.
+
+    Args:
+        buffers: The processed clips
+        timer: Optional timer to record stage timings into
+        features: Names of the features to compute (defaults to all of them)
+
+    Returns:
+        List[dict]: Summary features for each clip, in input order
+    """
+    timer = timer or StageTimer()
+    requested = set(features or DEFAULT_FEATURES)
+    unknown = requested.difference(FEATURE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown audio features: {', '.join(sorted(unknown))}")
+
+    summaries: List[dict] = [{} for _ in buffers]
+
+    for group in _groups(buffers):
+        sr = buffers[group[0]].sample_rate
+        batch, lengths = pad_batch([buffers[index].samples for index in group])
+
+        with timer.stage("stft"):
+            magnitude = np.abs(librosa.stft(batch, n_fft=N_FFT, hop_length=HOP_LENGTH)).astype(np.float32, copy=False)
+        mask = _frame_mask(lengths, magnitude.shape[-1])
+
+        log_mel = None
+        if requested & {"mfcc", "tempo"}:
+            with timer.stage("mel"):
+                mel = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sr, n_mels=N_MELS)
+                log_mel = 10 * np.log10(np.maximum(mel, 1e-10))
+
+                # power_to_db clips at 80 dB below each clip's own peak
+                peak = np.where(mask[:, None, :], log_mel, -np.inf).max(axis=(1, 2))
+                log_mel = np.maximum(log_mel, (peak - 80)[:, None, None]).astype(np.float32, copy=False)
+
+        if "mfcc" in requested:
+            with timer.stage("mfcc"):
+                mfcc = librosa.feature.mfcc(S=log_mel, sr=sr, n_mfcc=N_MFCC)
+                mfcc_means = _masked_mean(mfcc, mask[:, None, :])
+
+        if "spectral_centroid" in requested:
+            with timer.stage("spectral_centroid"):
+                # Frequency-weighted mean of each frame's magnitude (silent frames give 0, as in librosa)
+                frequencies = librosa.fft_frequencies(sr=sr, n_fft=N_FFT).astype(np.float32)
+                totals = magnitude.sum(axis=1)
+                weighted = np.einsum("f,bft->bt", frequencies, magnitude)
+                centroid = weighted / np.where(totals < np.finfo(np.float32).tiny, 1, totals)
+                centroid_means = _masked_mean(centroid, mask)
+
+        if "zero_crossing_rate" in requested:
+            with timer.stage("zero_crossing_rate"):
+                zcr_means = _masked_mean(zero_crossing_rate_batch(batch, lengths), mask)
+
+        for row, index in enumerate(group):
+            summary = summaries[index]
+            frames = _frame_counts(lengths)[row]
+            if "mfcc" in requested:
+                summary["mfcc_mean"] = mfcc_means[row].tolist()
+            if "spectral_centroid" in requested:
+                summary["spectral_centroid_mean"] = float(centroid_means[row])
+            if "zero_crossing_rate" in requested:
+                summary["zero_crossing_rate_mean"] = float(zcr_means[row])
+            if "tempo" in requested:
+                with timer.stage("tempo"):
+                    onset = librosa.onset.onset_strength(S=log_mel[row, :, :frames], sr=sr, hop_length=HOP_LENGTH)
+                    summary["tempo"] = float(librosa.beat.tempo(onset_envelope=onset, sr=sr, hop_length=HOP_LENGTH)[0])
+            summary["duration"] = buffers[index].duration
+
+    return summaries
+
+def prepare_batch_for_assessment(
+    sources: Sequence[Tuple[AudioSource, str]],
+    features: Iterable[str] = ASSESSMENT_FEATURES
+) -> Tuple[List[Optional[AudioBuffer]], List[Optional[dict]], List[Optional[str]], Dict[str, float]]:
+    """
+    Decode many clips, then process them and extract their features in batches.
+
+    A clip that fails to decode is reported in the errors list and does not
+    affect the others.
+
+    Args:
+        sources: (encoded audio bytes or spooled path, original filename) per clip
+        features: Names of the features to compute
+
+    Returns:
+        Tuple: Processed audio, features and error message per clip (None where
+            not applicable), and per-stage timings
+    """
+    timer = StageTimer()
+    decoded: List[Optional[AudioBuffer]] = []
+    errors: List[Optional[str]] = []
+
+    with timer.stage("decode"):
+        for source, filename in sources:
+            try:
+                decoded.append(decode_audio(source, filename))
+                errors.append(None)
+            except Exception as e:
+                logger.error(f"Error decoding batch clip {filename}: {str(e)}")
+                decoded.append(None)
+                errors.append(f"Could not decode audio: {str(e)}")
+
+    valid = [index for index, buffer in enumerate(decoded) if buffer is not None and len(buffer.samples)]
+    for index, buffer in enumerate(decoded):
+        if buffer is not None and not len(buffer.samples):
+            errors[index] = "Empty audio"
+
+    processed: List[Optional[AudioBuffer]] = [None] * len(sources)
+    summaries: List[Optional[dict]] = [None] * len(sources)
+
+    if valid:
+        clips = process_buffers([decoded[index] for index in valid], timer)
+        for index, clip, summary in zip(valid, clips, extract_features_batch(clips, timer, features)):
+            processed[index] = clip
+            summaries[index] = summary
+
+    return processed, summaries, errors, timer.timings
@@ -0,0 +1,53 @@
+"""
+In-memory audio buffers for the Quranic Quest audio pipeline.
+An AudioBuffer is decoded once and then passed through every pipeline stage,
+so recordings never round-trip through the filesystem between stages.
+"""
+
+import io
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Union
+import numpy as np
+import soundfile as sf
+
+# Uploads larger than this are spooled to disk instead of held in memory
+AUDIO_SPOOL_THRESHOLD_BYTES = int(os.getenv("AUDIO_SPOOL_THRESHOLD_BYTES", str(8 * 1024 * 1024)))
+
+AudioSource = Union[bytes, str]
+
+@dataclass
+class AudioBuffer:
+    """Decoded mono audio plus its sample rate and metadata."""
+
+    samples: np.ndarray
+    sample_rate: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """Duration of the audio in seconds."""
+        return float(len(self.samples) / self.sample_rate) if self.sample_rate else 0.0
+
+    def with_samples(self, samples: np.ndarray) -> "AudioBuffer":
+        """
+        Create a buffer with new samples but the same rate and metadata.
+
+        Args:
+            samples: The replacement samples
+
+        Returns:
+            AudioBuffer: The new buffer
+        """
+        return AudioBuffer(samples=samples, sample_rate=self.sample_rate, metadata=dict(self.metadata))
+
+    def to_wav_bytes(self) -> bytes:
+        """
+        Encode the buffer as 16-bit PCM WAV.
+
+        Returns:
+            bytes: The encoded audio
+        """
+        output = io.BytesIO()
+        sf.write(output, self.samples, self.sample_rate, format="WAV", subtype="PCM_16")
+        return output.getvalue()
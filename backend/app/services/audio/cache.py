@@ -0,0 +1,206 @@
+"""
+Content-addressed result cache for the Quranic Quest audio pipeline.
+Results are keyed by a hash of the uploaded audio bytes, so resubmitting the
+same clip (network retries, offline queue replays) skips the whole pipeline.
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+
+from services.audio.pipeline import PIPELINE_VERSION
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Cache settings
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+AUDIO_CACHE_DIRECTORY = os.getenv("AUDIO_CACHE_DIRECTORY", "")  # Empty disables the disk tier
+
+def make_cache_key(audio_sha256: str, kind: str, *parts: Optional[str]) -> str:
+    """
+    Build a cache key for a pipeline result.
+
+    Args:
+        audio_sha256: SHA-256 hex digest of the uploaded audio bytes
+        kind: Kind of result (e.g. "features", "assessment")
+        *parts: Further key parts, such as the verse ID
+
+    Returns:
+        str: The cache key
+    """
+    raw = ":".join([PIPELINE_VERSION, kind, audio_sha256, *[part or "" for part in parts]])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Size-bounded LRU cache with an optional on-disk tier."""
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+        directory: str = AUDIO_CACHE_DIRECTORY
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Name of the cache, used for its disk subdirectory
+            max_bytes: Maximum total size of the in-memory entries
+            directory: Root directory for the disk tier, or empty to disable it
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.directory = os.path.join(directory, name) if directory else ""
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        """Get the disk tier path for a key."""
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        """Read an entry from the disk tier."""
+        try:
+            with open(self._disk_path(key), "rb") as cache_file:
+                return cache_file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        """Write an entry to the disk tier atomically."""
+        # A unique temporary file, so concurrent writes of one key (from any thread or process) never interleave
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as cache_file:
+                cache_file.write(payload)
+            os.replace(temp_path, self._disk_path(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def _load(self, key: str, payload: Optional[bytes]) -> Tuple[Optional[bytes], Any]:
+        """Read an entry from the disk tier unless it was found in memory, and unpickle it."""
+        if payload is None and self.directory:
+            try:
+                payload = self._read_disk(key)
+            except Exception as e:
+                logger.error(f"Error reading {self.name} cache entry: {str(e)}")
+                payload = None
+        return payload, pickle.loads(payload) if payload is not None else None
+
+    def _dump(self, key: str, value: Any) -> bytes:
+        """Pickle a value and write it to the disk tier, if there is one."""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.directory:
+            try:
+                self._write_disk(key, payload)
+            except Exception as e:
+                logger.error(f"Error writing {self.name} cache entry: {str(e)}")
+        return payload
+
+    def _store_in_memory(self, key: str, payload: bytes) -> None:
+        """Insert an entry into the memory tier, evicting the least recently used entries."""
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = payload
+            self._size += len(payload)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Optional[Any]: The cached result, or None on a miss
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+
+        in_memory = payload is not None
+        value = None
+        if in_memory or self.directory:
+            # Disk reads and unpickling (cached AudioBuffers can be megabytes) stay off the event loop
+            payload, value = await run_in_threadpool(self._load, key, payload)
+
+        if payload is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        if not in_memory:
+            self._store_in_memory(key, payload)
+            with self._lock:
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a result in the cache.
+
+        Args:
+            key: The cache key
+            value: The result to store (must be picklable)
+        """
+        # Pickled and written to disk in one threadpool call, off the event loop
+        payload = await run_in_threadpool(self._dump, key, value)
+        self._store_in_memory(key, payload)
+
+    def clear(self) -> None:
+        """Clear the memory tier."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and occupancy for the cache.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk_tier": bool(self.directory),
+            }
+
+# Shared caches for pipeline results in this process
+feature_cache = ResultCache("features")
+assessment_cache = ResultCache("assessments")
+transcode_cache = ResultCache("transcodes")
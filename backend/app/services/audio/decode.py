@@ -0,0 +1,188 @@
+"""
+Unified decode stage for the Quranic Quest audio pipeline.
+Every entry point decodes through decode_audio, which produces mono float32
+at one configurable target rate (16 kHz by default, plenty for speech), so
+downstream stages never process 44.1/48 kHz phone recordings at full rate.
+Compressed formats from phones (m4a/aac from iOS, ogg/webm/opus from Android)
+are decoded in memory with PyAV when it is installed, with no pydub/ffmpeg
+subprocess round trip. Each decode records its codec and cost.
+"""
+
+import io
+import os
+import time
+import logging
+import tempfile
+from typing import Optional
+import numpy as np
+import soundfile as sf
+import librosa
+
+from services.audio.buffer import AudioBuffer, AudioSource
+
+# PyAV is optional: without it, formats libsndfile cannot read fall back to audioread
+try:
+    import av
+except ImportError:  # pragma: no cover - depends on the deployment
+    av = None
+
+# soxr ships with librosa; fall back to polyphase filtering without it
+try:
+    import soxr
+except ImportError:  # pragma: no cover - depends on the deployment
+    soxr = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Decode settings (0 keeps each recording's native rate)
+AUDIO_TARGET_SAMPLE_RATE = int(os.getenv("AUDIO_TARGET_SAMPLE_RATE", "16000"))
+AUDIO_RESAMPLE_QUALITY = os.getenv("AUDIO_RESAMPLE_QUALITY", "HQ")  # soxr quality: QQ, LQ, MQ, HQ or VHQ
+
+def _to_mono_float32(samples: np.ndarray) -> np.ndarray:
+    """Downmix decoded samples to a contiguous float32 mono signal."""
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+def resample(samples: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resample a mono float32 signal.
+
+    Args:
+        samples: The signal
+        orig_sr: Its sample rate
+        target_sr: The rate to resample to
+
+    Returns:
+        np.ndarray: The resampled float32 signal (the input itself if the rates match)
+    """
+    if not target_sr or orig_sr == target_sr:
+        return samples
+    if soxr is not None:
+        return soxr.resample(samples, orig_sr, target_sr, quality=AUDIO_RESAMPLE_QUALITY).astype(np.float32, copy=False)
+    return librosa.resample(samples, orig_sr=orig_sr, target_sr=target_sr, res_type="polyphase").astype(np.float32, copy=False)
+
+class StreamResampler:
+    """Resamples a stream chunk by chunk without edge artifacts between chunks."""
+
+    def __init__(self, orig_sr: int, target_sr: int):
+        """
+        Initialize the resampler.
+
+        Args:
+            orig_sr: Sample rate of the incoming chunks
+            target_sr: The rate to resample to
+        """
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self._stream = (
+            soxr.ResampleStream(orig_sr, target_sr, 1, dtype="float32", quality=AUDIO_RESAMPLE_QUALITY)
+            if soxr is not None and orig_sr != target_sr else None
+        )
+
+    def process(self, samples: np.ndarray, last: bool = False) -> np.ndarray:
+        """
+        Resample the next chunk.
+
+        Args:
+            samples: The next mono float32 samples
+            last: Whether this is the final chunk (flushes the filter)
+
+        Returns:
+            np.ndarray: Resampled samples
+        """
+        if self.orig_sr == self.target_sr:
+            return samples
+        if self._stream is not None:
+            return self._stream.resample_chunk(samples, last=last)
+        return resample(samples, self.orig_sr, self.target_sr)
+
+def _decode_with_soundfile(source: AudioSource) -> Optional[tuple]:
+    """Decode with libsndfile (wav, flac, ogg/vorbis/opus, mp3), or None if it cannot."""
+    try:
+        with sf.SoundFile(io.BytesIO(source) if isinstance(source, bytes) else source) as sound_file:
+            codec = f"{sound_file.format}/{sound_file.subtype}".lower()
+            return sound_file.read(dtype="float32"), sound_file.samplerate, codec, sound_file.samplerate
+    except RuntimeError:
+        return None
+
+def _decode_with_av(source: AudioSource, target_sr: int) -> Optional[tuple]:
+    """Decode with PyAV (aac/m4a, webm, opus and anything else ffmpeg reads), resampling as it goes."""
+    if av is None:
+        return None
+
+    try:
+        with av.open(io.BytesIO(source) if isinstance(source, bytes) else source) as container:
+            if not container.streams.audio:
+                logger.info("PyAV found no audio stream")
+                return None
+            stream = container.streams.audio[0]
+            rate = target_sr or stream.codec_context.sample_rate
+            resampler = av.AudioResampler(format="flt", layout="mono", rate=rate)
+
+            chunks = []
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+
+            samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+            return samples, rate, stream.codec_context.name, stream.codec_context.sample_rate
+    except av.AVError as e:
+        logger.info(f"PyAV could not decode audio: {str(e)}")
+        return None
+
+def _decode_with_audioread(source: AudioSource, extension: str) -> tuple:
+    """Decode through librosa's audioread backend, which needs a file on disk."""
+    if isinstance(source, str):
+        samples, sr = librosa.load(source, sr=None, mono=True)
+        return samples, sr, f"audioread/{extension.lstrip('.') or 'unknown'}", sr
+
+    with tempfile.NamedTemporaryFile(suffix=extension) as temp_file:
+        temp_file.write(source)
+        temp_file.flush()
+        samples, sr = librosa.load(temp_file.name, sr=None, mono=True)
+    return samples, sr, f"audioread/{extension.lstrip('.') or 'unknown'}", sr
+
+def decode_audio(
+    source: AudioSource,
+    filename: str = "",
+    target_sr: int = AUDIO_TARGET_SAMPLE_RATE
+) -> AudioBuffer:
+    """
+    Decode audio from in-memory bytes or a file path to mono float32 at the target rate.
+
+    libsndfile is tried first since it decodes PCM and FLAC fastest, then
+    PyAV for compressed phone formats, then audioread as a last resort.
+    The buffer's metadata records the codec, native rate and decode cost.
+
+    Args:
+        source: Encoded audio bytes or a path to an audio file
+        filename: Original filename, used for its extension
+        target_sr: Sample rate to decode to (0 keeps the native rate)
+
+    Returns:
+        AudioBuffer: The decoded audio
+    """
+    extension = os.path.splitext(filename or (source if isinstance(source, str) else ""))[1].lower()
+    start = time.perf_counter()
+
+    decoded = _decode_with_soundfile(source) or _decode_with_av(source, target_sr)
+    if decoded is None:
+        decoded = _decode_with_audioread(source, extension)
+    samples, decoded_sr, codec, native_sr = decoded
+
+    samples = resample(_to_mono_float32(samples), decoded_sr, target_sr)
+    sample_rate = target_sr or decoded_sr
+
+    return AudioBuffer(samples=samples, sample_rate=sample_rate, metadata={
+        "filename": filename,
+        "format": extension.lstrip("."),
+        "codec": codec,
+        "native_sample_rate": native_sr,
+        "encoded_bytes": len(source) if isinstance(source, bytes) else os.path.getsize(source),
+        "audio_seconds": len(samples) / sample_rate if sample_rate else 0.0,
+        "decode_seconds": time.perf_counter() - start,
+    })
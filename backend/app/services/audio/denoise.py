@@ -0,0 +1,213 @@
+"""
+Spectral-gating noise reduction for the Quranic Quest audio pipeline.
+Audio is analyzed in short overlapping frames. Each frequency bin is compared
+with a per-bin noise profile and bins that do not rise clearly above it are
+attenuated with a smoothed mask, instead of zeroing whole samples. The same
+SpectralGate processes whole recordings (in place, block by block) and live
+streams (carrying the noise profile and overlap state between chunks).
+"""
+
+import os
+import logging
+from typing import Optional
+import numpy as np
+from scipy.fft import irfft, rfft
+from scipy.signal import get_window
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Denoiser settings
+DENOISE_FRAME_SECONDS = 0.032
+DENOISE_OVERLAP = 4  # Frames overlapping each sample (hop = frame / 4)
+DENOISE_NOISE_SECONDS = 0.5
+DENOISE_THRESHOLD_STD = float(os.getenv("DENOISE_THRESHOLD_STD", "1.5"))
+DENOISE_FLOOR_DB = float(os.getenv("DENOISE_FLOOR_DB", "-30"))
+DENOISE_NOISE_ADAPTATION = float(os.getenv("DENOISE_NOISE_ADAPTATION", "0.02"))
+DENOISE_BLOCK_FRAMES = 256
+
+class SpectralGate:
+    """Frame-based spectral gate with carried-over noise and overlap-add state."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        noise_seconds: float = DENOISE_NOISE_SECONDS,
+        threshold_std: float = DENOISE_THRESHOLD_STD,
+        floor_db: float = DENOISE_FLOOR_DB,
+        adaptation: float = DENOISE_NOISE_ADAPTATION
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            sample_rate: Sample rate of the audio
+            noise_seconds: Length of the opening stretch assumed to be noise
+            threshold_std: Standard deviations above the noise mean a bin must reach to pass
+            floor_db: Gain applied to gated bins
+            adaptation: Rate at which the noise profile follows later noise-only frames
+        """
+        self.sample_rate = sample_rate
+        self.n_fft = 1 << max(6, int(np.ceil(np.log2(sample_rate * DENOISE_FRAME_SECONDS))))
+        self.hop = self.n_fft // DENOISE_OVERLAP
+        self.latency = self.n_fft - self.hop
+        self.threshold_std = threshold_std
+        self.floor = np.float32(10 ** (floor_db / 20))
+        self.adaptation = adaptation
+
+        # sqrt-Hann analysis and synthesis windows; their product overlap-adds to DENOISE_OVERLAP / 2
+        window = np.sqrt(get_window("hann", self.n_fft, fftbins=True)).astype(np.float32)
+        self._analysis = window
+        self._synthesis = window * np.float32(2 / DENOISE_OVERLAP)
+
+        bins = self.n_fft // 2 + 1
+        self._input_tail = np.zeros(self.latency, dtype=np.float32)
+        self._output_tail = np.zeros((DENOISE_OVERLAP - 1, self.hop), dtype=np.float32)
+        self._previous_masks = np.ones((2, bins), dtype=np.float32)
+
+        self._noise_frames_needed = max(1, int(noise_seconds * sample_rate) // self.hop)
+        self._noise_db: list = []
+        self.noise_mean: Optional[np.ndarray] = None
+        self.noise_std: Optional[np.ndarray] = None
+
+    def estimate_noise(self, samples: np.ndarray) -> None:
+        """
+        Set the noise profile from a stretch of audio known to be noise.
+
+        Args:
+            samples: Noise-only audio
+        """
+        if len(samples) < self.n_fft:
+            samples = np.pad(samples, (0, self.n_fft - len(samples)))
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.n_fft)[::self.hop]
+        self._set_noise(self._spectrum_db(rfft(frames * self._analysis, axis=1)))
+
+    def _set_noise(self, spectrum_db: np.ndarray) -> None:
+        """Set the noise profile from the dB spectra of noise frames."""
+        self.noise_mean = spectrum_db.mean(axis=0)
+        self.noise_std = spectrum_db.std(axis=0)
+        self._noise_db = []
+
+    @staticmethod
+    def _spectrum_db(spectrum: np.ndarray) -> np.ndarray:
+        """Magnitude of complex spectra in dB (floored at -120 dB so digital silence stays finite)."""
+        return 20 * np.log10(np.abs(spectrum) + 1e-6, dtype=np.float32)
+
+    def _masks(self, spectrum_db: np.ndarray) -> np.ndarray:
+        """Smoothed gain masks for a block of frames, adapting the noise profile as it goes."""
+        if self.noise_mean is None:
+            # The opening frames are the noise estimate, so they are gated completely.
+            # A block running past the estimate is split, so the frames after it are
+            # gated against the new profile whatever the chunk size.
+            needed = self._noise_frames_needed - sum(len(block) for block in self._noise_db)
+            self._noise_db.append(spectrum_db[:needed])
+            gated = np.full(spectrum_db[:needed].shape, self.floor, dtype=np.float32)
+            if len(spectrum_db) < needed:
+                return gated
+            self._set_noise(np.concatenate(self._noise_db))
+            if len(spectrum_db) == needed:
+                return gated
+            return np.concatenate([gated, self._masks(spectrum_db[needed:])])
+
+        active = spectrum_db > self.noise_mean + self.threshold_std * self.noise_std
+        masks = np.where(active, np.float32(1), self.floor)
+
+        # Follow slowly changing noise in each bin using the frames where that bin was gated
+        if self.adaptation > 0:
+            inactive = ~active
+            counts = inactive.sum(axis=0)
+            observed = np.where(inactive, spectrum_db, 0).sum(axis=0) / np.maximum(counts, 1)
+            rate = 1 - (1 - self.adaptation) ** counts
+            self.noise_mean += rate * (observed - self.noise_mean)
+
+        # Smooth across neighbouring bins and the two previous frames to avoid musical noise
+        masks[:, 1:-1] = (masks[:, :-2] + masks[:, 1:-1] + masks[:, 2:]) / 3
+        history = np.concatenate([self._previous_masks, masks])
+        smoothed = (history[:-2] + history[1:-1] + history[2:]) / 3
+        self._previous_masks = masks[-2:] if len(masks) >= 2 else history[-2:]
+        return smoothed
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Denoise the next chunk of a stream.
+
+        Output lags input by `latency` samples; call flush() at the end of the
+        stream to get the rest.
+
+        Args:
+            samples: The next mono float32 samples
+
+        Returns:
+            np.ndarray: Denoised samples, as many as are complete
+        """
+        pending = np.concatenate([self._input_tail, samples])
+        frame_count = (len(pending) - self.n_fft) // self.hop + 1 if len(pending) >= self.n_fft else 0
+        if frame_count == 0:
+            self._input_tail = pending
+            return np.zeros(0, dtype=np.float32)
+
+        frames = np.lib.stride_tricks.sliding_window_view(pending, self.n_fft)[::self.hop][:frame_count]
+        self._input_tail = pending[frame_count * self.hop:].copy()
+
+        spectrum = rfft(frames * self._analysis, axis=1)
+        spectrum *= self._masks(self._spectrum_db(spectrum))
+        output_frames = irfft(spectrum, n=self.n_fft, axis=1).astype(np.float32, copy=False)
+        output_frames *= self._synthesis
+
+        # Overlap-add: each frame contributes one hop to DENOISE_OVERLAP consecutive output hops
+        blocks = np.zeros((frame_count + DENOISE_OVERLAP - 1, self.hop), dtype=np.float32)
+        blocks[:DENOISE_OVERLAP - 1] = self._output_tail
+        output_frames = output_frames.reshape(frame_count, DENOISE_OVERLAP, self.hop)
+        for offset in range(DENOISE_OVERLAP):
+            blocks[offset:offset + frame_count] += output_frames[:, offset]
+
+        self._output_tail = blocks[frame_count:].copy()
+        return blocks[:frame_count].reshape(-1)
+
+    def flush(self) -> np.ndarray:
+        """
+        Finish the stream.
+
+        Returns:
+            np.ndarray: The last `latency` denoised samples
+        """
+        return self.process(np.zeros(self.latency, dtype=np.float32))[:self.latency]
+
+def spectral_gate(y: np.ndarray, sr: int) -> np.ndarray:
+    """
+    Denoise a whole recording in place.
+
+    The noise profile comes from the first half second (or the first tenth
+    of shorter clips), matching the assumption of the original noise gate.
+    The recording is processed in blocks and each denoised block is written
+    back over input that has already been consumed, so no full-size copy or
+    mask is allocated.
+
+    Args:
+        y: Mono float32 audio signal (modified in place)
+        sr: Sample rate
+
+    Returns:
+        np.ndarray: The denoised signal (the same array as y)
+    """
+    gate = SpectralGate(sr)
+    noise_samples = int(sr * DENOISE_NOISE_SECONDS)
+    gate.estimate_noise(y[:noise_samples] if len(y) > noise_samples else y[:max(1, len(y) // 10)])
+
+    block_size = DENOISE_BLOCK_FRAMES * gate.hop
+    written = -gate.latency  # The first `latency` output samples are the warm-up of the zero-filled history
+
+    for start in range(0, len(y), block_size):
+        output = gate.process(y[start:start + block_size])
+        written = _write_output(y, output, written)
+    _write_output(y, gate.flush(), written)
+
+    return y
+
+def _write_output(y: np.ndarray, output: np.ndarray, written: int) -> int:
+    """Write a chunk of delayed output into y, skipping the warm-up samples."""
+    skip = max(0, -written)
+    chunk = output[skip:]
+    position = max(0, written)
+    y[position:position + len(chunk)] = chunk[:len(y) - position]
+    return written + len(output)
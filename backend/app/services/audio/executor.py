@@ -0,0 +1,135 @@
+"""
+Execution backends for the Quranic Quest audio pipeline.
+This module runs CPU-bound audio work off the event loop, either on a
+bounded process pool (the default), a thread pool, or inline.
+"""
+
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from services.audio import pipeline
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Executor settings
+AUDIO_EXECUTION_MODE = os.getenv("AUDIO_EXECUTION_MODE", "process")  # process, thread or inline
+AUDIO_POOL_WORKERS = int(os.getenv("AUDIO_POOL_WORKERS", "0")) or max(1, (os.cpu_count() or 2) - 1)
+AUDIO_POOL_START_METHOD = os.getenv("AUDIO_POOL_START_METHOD", "spawn")
+AUDIO_POOL_WARM_UP = os.getenv("AUDIO_POOL_WARM_UP", "true").lower() == "true"
+
+def _initialize_worker(warm_up: bool) -> None:
+    """
+    Initialize an audio worker process.
+
+    Args:
+        warm_up: Whether to run the pipeline once on synthetic audio
+    """
+    if warm_up:
+        try:
+            pipeline.warm_up()
+        except Exception as e:
+            logger.error(f"Error warming up audio worker: {str(e)}")
+
+def _ping() -> int:
+    """Return the worker's process id (used to force pool start-up)."""
+    return os.getpid()
+
+class AudioExecutor:
+    """Runs audio pipeline functions on a bounded pool of workers."""
+
+    def __init__(
+        self,
+        mode: str = AUDIO_EXECUTION_MODE,
+        max_workers: int = AUDIO_POOL_WORKERS,
+        warm_up: bool = AUDIO_POOL_WARM_UP,
+        start_method: str = AUDIO_POOL_START_METHOD
+    ):
+        """
+        Initialize the audio executor.
+
+        Args:
+            mode: Execution mode ("process", "thread" or "inline")
+            max_workers: Maximum number of pool workers
+            warm_up: Whether to warm up workers when the pool starts
+            start_method: Multiprocessing start method for process mode
+        """
+        if mode not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown audio execution mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.warm_up = warm_up
+        self.start_method = start_method
+        self._executor: Optional[Executor] = None
+
+    def _create_executor(self) -> Optional[Executor]:
+        """Create the underlying executor for the configured mode."""
+        if self.mode == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_initialize_worker,
+                initargs=(self.warm_up,),
+            )
+        if self.mode == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="audio",
+            )
+        return None
+
+    async def start(self) -> None:
+        """Start the pool and, if enabled, wait for every worker to warm up."""
+        if self._executor is not None or self.mode == "inline":
+            return
+
+        self._executor = self._create_executor()
+        logger.info(f"Starting audio executor in {self.mode} mode with {self.max_workers} workers")
+
+        if self.mode == "process":
+            # Submitting one task per worker spawns the whole pool up front,
+            # so the worker initializer runs before the first request.
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[
+                loop.run_in_executor(self._executor, _ping)
+                for _ in range(self.max_workers)
+            ])
+        elif self.warm_up:
+            await self.run(pipeline.warm_up)
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a function on the audio pool without blocking the event loop.
+
+        Args:
+            func: Module-level function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            Any: The function's return value
+        """
+        if self.mode == "inline":
+            return func(*args, **kwargs)
+
+        if self._executor is None:
+            await self.start()
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """Shut down the pool, cancelling queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("Audio executor shut down")
+
+# Shared executor for the audio services in this process
+audio_executor = AudioExecutor()
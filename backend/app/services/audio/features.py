@@ -0,0 +1,135 @@
+"""
+Feature extraction engine for the Quranic Quest audio pipeline.
+The STFT and mel spectrogram are computed once per signal and every spectral
+feature is derived from them. Features are computed lazily, so callers only
+pay for the ones they ask for.
+"""
+
+import os
+from typing import Dict, Iterable, Optional
+import numpy as np
+import librosa
+
+from services.audio.buffer import AudioBuffer
+from services.audio.metrics import StageTimer
+
+# Analysis settings (these match librosa's defaults, so values are unchanged)
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+N_MFCC = 13
+
+# Every feature the engine can produce
+FEATURE_NAMES = ("mfcc", "spectral_centroid", "zero_crossing_rate", "tempo")
+
+# Features computed when the caller does not ask for a specific set
+DEFAULT_FEATURES = FEATURE_NAMES
+
+# Features used for pronunciation assessment (tempo is rarely useful for short ayahs)
+ASSESSMENT_FEATURES = tuple(
+    name.strip()
+    for name in os.getenv("AUDIO_ASSESSMENT_FEATURES", "mfcc,spectral_centroid,zero_crossing_rate").split(",")
+    if name.strip()
+)
+
+class FeatureExtractor:
+    """Lazily computes spectral features from one shared STFT."""
+
+    def __init__(self, buffer: AudioBuffer, timer: Optional[StageTimer] = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            buffer: The decoded audio
+            timer: Optional timer to record per-feature timings into
+        """
+        self.y = np.ascontiguousarray(buffer.samples, dtype=np.float32)
+        self.sr = buffer.sample_rate
+        self.duration = buffer.duration
+        self.timer = timer or StageTimer()
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def _get(self, name: str, compute) -> np.ndarray:
+        """Return a cached intermediate, computing and timing it on first use."""
+        if name not in self._cache:
+            with self.timer.stage(name):
+                self._cache[name] = compute()
+        return self._cache[name]
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        """Magnitude spectrogram (float32)."""
+        return self._get("stft", lambda: np.abs(
+            librosa.stft(self.y, n_fft=N_FFT, hop_length=HOP_LENGTH)
+        ).astype(np.float32, copy=False))
+
+    @property
+    def log_mel(self) -> np.ndarray:
+        """Log-power mel spectrogram (float32)."""
+        return self._get("mel", lambda: librosa.power_to_db(
+            librosa.feature.melspectrogram(S=self.magnitude ** 2, sr=self.sr, n_mels=N_MELS)
+        ).astype(np.float32, copy=False))
+
+    @property
+    def mfcc(self) -> np.ndarray:
+        """MFCC frames, shape (N_MFCC, frames)."""
+        return self._get("mfcc", lambda: librosa.feature.mfcc(
+            S=self.log_mel, sr=self.sr, n_mfcc=N_MFCC
+        ).astype(np.float32, copy=False))
+
+    @property
+    def spectral_centroid(self) -> np.ndarray:
+        """Spectral centroid per frame."""
+        return self._get("spectral_centroid", lambda: librosa.feature.spectral_centroid(
+            S=self.magnitude, sr=self.sr, n_fft=N_FFT, hop_length=HOP_LENGTH
+        ))
+
+    @property
+    def zero_crossing_rate(self) -> np.ndarray:
+        """Zero crossing rate per frame (computed in the time domain, which is cheap)."""
+        return self._get("zero_crossing_rate", lambda: librosa.feature.zero_crossing_rate(
+            self.y, frame_length=N_FFT, hop_length=HOP_LENGTH
+        ))
+
+    @property
+    def onset_envelope(self) -> np.ndarray:
+        """Onset strength envelope derived from the shared mel spectrogram."""
+        return self._get("onset_envelope", lambda: librosa.onset.onset_strength(
+            S=self.log_mel, sr=self.sr, hop_length=HOP_LENGTH
+        ))
+
+    @property
+    def tempo(self) -> float:
+        """Estimated tempo in beats per minute (the most expensive feature)."""
+        return float(self._get("tempo", lambda: librosa.beat.tempo(
+            onset_envelope=self.onset_envelope, sr=self.sr, hop_length=HOP_LENGTH
+        ))[0])
+
+    def summarize(self, features: Optional[Iterable[str]] = None) -> dict:
+        """
+        Compute summary values for the requested features.
+
+        Args:
+            features: Names of the features to compute (defaults to DEFAULT_FEATURES)
+
+        Returns:
+            dict: Summary feature values, plus the duration
+        """
+        requested = set(features or DEFAULT_FEATURES)
+        unknown = requested.difference(FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown audio features: {', '.join(sorted(unknown))}")
+
+        summary = {}
+
+        if "mfcc" in requested:
+            summary["mfcc_mean"] = np.mean(self.mfcc, axis=1).tolist()
+        if "spectral_centroid" in requested:
+            summary["spectral_centroid_mean"] = float(np.mean(self.spectral_centroid))
+        if "zero_crossing_rate" in requested:
+            summary["zero_crossing_rate_mean"] = float(np.mean(self.zero_crossing_rate))
+        if "tempo" in requested:
+            summary["tempo"] = self.tempo
+
+        summary["duration"] = self.duration
+        return summary
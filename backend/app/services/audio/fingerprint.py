@@ -0,0 +1,457 @@
+"""
+Recitation fingerprinting for the Quranic Quest application.
+Reference templates are turned into an inverted index of quantized MFCC
+n-grams. Each template frame is normalized, mapped to the nearest codeword of
+a small codebook, runs of repeated codes are collapsed (so recitation pace
+matters less), and every n consecutive codes are hashed. The index maps each
+hash to the (template, frame offset) pairs it occurs at.
+
+A clip is identified by hashing it the same way, looking its hashes up with
+binary search and voting for templates whose offsets line up. Hashes that
+occur more than FINGERPRINT_MAX_POSTINGS times are dropped when the index is
+built, so a query touches a bounded number of postings however many
+reciters the index covers.
+
+Build the index (from the backend/app directory):
+    python -m services.audio.fingerprint build
+"""
+
+import os
+import json
+import hashlib
+import logging
+import argparse
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy.cluster.vq import kmeans2
+
+from services.audio.alignment import attempt_frames, normalize_frames
+from services.audio.buffer import AudioBuffer
+from services.audio.features import HOP_LENGTH
+from services.audio.metrics import StageTimer
+from services.audio.templates import (
+    REFERENCE_TEMPLATE_DIRECTORY,
+    TEMPLATE_EXTENSION,
+    TEMPLATE_SAMPLE_RATE,
+    TemplateIndex,
+    get_template_index,
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Fingerprint settings
+FINGERPRINT_INDEX_PATH = os.getenv(
+    "FINGERPRINT_INDEX_PATH", os.path.join(REFERENCE_TEMPLATE_DIRECTORY, "fingerprints.npz")
+)
+FINGERPRINT_CODEBOOK_SIZE = int(os.getenv("FINGERPRINT_CODEBOOK_SIZE", "64"))
+FINGERPRINT_NGRAM = int(os.getenv("FINGERPRINT_NGRAM", "4"))
+FINGERPRINT_MAX_POSTINGS = int(os.getenv("FINGERPRINT_MAX_POSTINGS", "512"))
+FINGERPRINT_TRAINING_FRAMES = int(os.getenv("FINGERPRINT_TRAINING_FRAMES", "200000"))
+FINGERPRINT_OFFSET_BIN = int(os.getenv("FINGERPRINT_OFFSET_BIN", "32"))  # Frames per offset histogram bin (~1 s)
+FINGERPRINT_MIN_VOTES = int(os.getenv("FINGERPRINT_MIN_VOTES", "6"))
+FINGERPRINT_CORRECT_VERSE_ID = os.getenv("FINGERPRINT_CORRECT_VERSE_ID", "true").lower() == "true"
+FINGERPRINT_OVERRIDE_RATIO = float(os.getenv("FINGERPRINT_OVERRIDE_RATIO", "2.0"))
+
+# Offsets are shifted by this many bins so histogram keys stay non-negative
+OFFSET_BIN_SHIFT = 1 << 19
+OFFSET_KEY_SPAN = 1 << 20
+
+def quantize(frames: np.ndarray, codebook: np.ndarray) -> np.ndarray:
+    """
+    Map MFCC frames to their nearest codewords.
+
+    Frames are normalized per utterance and the energy coefficient is
+    dropped, as the codebook was trained on frames prepared the same way.
+
+    Args:
+        frames: MFCC frames, shape (frames, n_mfcc)
+        codebook: Codewords, shape (codebook size, n_mfcc - 1)
+
+    Returns:
+        np.ndarray: The code of each frame (int64)
+    """
+    if len(frames) == 0:
+        return np.zeros(0, dtype=np.int64)
+    normalized = normalize_frames(frames)[:, 1:]
+    distances = (codebook ** 2).sum(axis=1) - 2.0 * normalized @ codebook.T
+    return distances.argmin(axis=1).astype(np.int64)
+
+def code_ngrams(codes: np.ndarray, codebook_size: int, n: int = FINGERPRINT_NGRAM) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash every n consecutive distinct codes.
+
+    Args:
+        codes: Frame codes
+        codebook_size: Number of codewords
+        n: Number of codes per n-gram
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: N-gram hashes (int64) and the frame each n-gram starts at (int32)
+    """
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+
+    keep = np.empty(len(codes), dtype=bool)
+    keep[0] = True
+    np.not_equal(codes[1:], codes[:-1], out=keep[1:])
+    collapsed = codes[keep]
+    starts = np.flatnonzero(keep).astype(np.int32)
+
+    count = len(collapsed) - n + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+
+    hashes = np.zeros(count, dtype=np.int64)
+    for i in range(n):
+        hashes = hashes * codebook_size + collapsed[i:i + count]
+    return hashes, starts[:count]
+
+class FingerprintIndex:
+    """Inverted index from MFCC n-gram hashes to reference template offsets."""
+
+    def __init__(
+        self,
+        codebook: np.ndarray,
+        keys: np.ndarray,
+        starts: np.ndarray,
+        template_ids: np.ndarray,
+        positions: np.ndarray,
+        templates: List[Tuple[str, str]],
+        hop_length: int,
+        sample_rate: int,
+        fingerprint: str
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            codebook: Codewords, shape (codebook size, n_mfcc - 1)
+            keys: Sorted, unique n-gram hashes
+            starts: Start of each hash's postings (one more entry than keys)
+            template_ids: Template of each posting
+            positions: Reference frame of each posting
+            templates: (verse id, reciter) of each template
+            hop_length: Hop length the templates were built with
+            sample_rate: Sample rate the templates were built at
+            fingerprint: Identifies the template files the index was built from
+        """
+        self.codebook = codebook
+        self.keys = keys
+        self.starts = starts
+        self.template_ids = template_ids
+        self.positions = positions
+        self.templates = templates
+        self.hop_length = hop_length
+        self.sample_rate = sample_rate
+        self.fingerprint = fingerprint
+
+    def __len__(self) -> int:
+        return len(self.template_ids)
+
+    @staticmethod
+    def fingerprint_for(directory: str = REFERENCE_TEMPLATE_DIRECTORY) -> str:
+        """
+        Fingerprint the template files and index settings, so stale indexes are rebuilt.
+
+        Args:
+            directory: Directory containing template files
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        digest = hashlib.sha256(
+            f"{FINGERPRINT_CODEBOOK_SIZE}:{FINGERPRINT_NGRAM}:{FINGERPRINT_MAX_POSTINGS}".encode("utf-8")
+        )
+        if os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith(TEMPLATE_EXTENSION):
+                    stat = os.stat(os.path.join(directory, filename))
+                    digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, template_index: TemplateIndex, fingerprint: str, seed: int = 0) -> "FingerprintIndex":
+        """
+        Build the index from every reference template.
+
+        Args:
+            template_index: The reference templates
+            fingerprint: Fingerprint of the template files
+            seed: Seed for sampling training frames and initializing the codebook
+
+        Returns:
+            FingerprintIndex: The index
+        """
+        templates = []
+        frames = []
+        hop_length, sample_rate = HOP_LENGTH, TEMPLATE_SAMPLE_RATE
+        for store in template_index.stores.values():
+            hop_length, sample_rate = store.hop_length, store.sample_rate
+            for verse_id in store.verse_ids():
+                template = store.get(verse_id)
+                if template is not None and len(template.mfcc):
+                    templates.append((verse_id, store.reciter))
+                    frames.append(template.mfcc)
+
+        rng = np.random.default_rng(seed)
+        n_mfcc = frames[0].shape[1] if frames else 0
+        codebook = np.zeros((FINGERPRINT_CODEBOOK_SIZE, max(n_mfcc - 1, 0)), dtype=np.float32)
+
+        # Train the codebook on a sample of normalized frames from every template
+        normalized = [normalize_frames(template_frames)[:, 1:] for template_frames in frames]
+        if normalized:
+            training = np.concatenate(normalized)
+            if len(training) > FINGERPRINT_TRAINING_FRAMES:
+                training = training[rng.choice(len(training), FINGERPRINT_TRAINING_FRAMES, replace=False)]
+            if len(training) >= FINGERPRINT_CODEBOOK_SIZE:
+                codebook, _ = kmeans2(training.astype(np.float64), FINGERPRINT_CODEBOOK_SIZE, minit="++", seed=seed)
+                codebook = codebook.astype(np.float32)
+
+        hashes, template_ids, positions = [], [], []
+        for template_id, template_frames in enumerate(frames):
+            template_hashes, template_positions = code_ngrams(quantize(template_frames, codebook), len(codebook))
+            hashes.append(template_hashes)
+            positions.append(template_positions)
+            template_ids.append(np.full(len(template_hashes), template_id, dtype=np.int32))
+
+        hashes = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.int64)
+        template_ids = np.concatenate(template_ids) if template_ids else np.zeros(0, dtype=np.int32)
+        positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int32)
+
+        # Group postings by hash, dropping hashes too common to tell verses apart
+        order = np.argsort(hashes, kind="stable")
+        hashes, template_ids, positions = hashes[order], template_ids[order], positions[order]
+        keys, counts = np.unique(hashes, return_counts=True)
+        kept = counts <= FINGERPRINT_MAX_POSTINGS
+        posting_mask = np.repeat(kept, counts)
+
+        keys, counts = keys[kept], counts[kept]
+        starts = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=starts[1:])
+
+        return cls(
+            codebook=codebook,
+            keys=keys,
+            starts=starts,
+            template_ids=template_ids[posting_mask],
+            positions=positions[posting_mask],
+            templates=templates,
+            hop_length=hop_length,
+            sample_rate=sample_rate,
+            fingerprint=fingerprint,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["FingerprintIndex"]:
+        """
+        Load a saved index.
+
+        Args:
+            path: Path of the saved index
+
+        Returns:
+            Optional[FingerprintIndex]: The index, or None if it is missing or unreadable
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                return cls(
+                    codebook=data["codebook"],
+                    keys=data["keys"],
+                    starts=data["starts"],
+                    template_ids=data["template_ids"],
+                    positions=data["positions"],
+                    templates=[tuple(template) for template in meta["templates"]],
+                    hop_length=meta["hop_length"],
+                    sample_rate=meta["sample_rate"],
+                    fingerprint=meta["fingerprint"],
+                )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path: str) -> None:
+        """
+        Save the index, replacing any previous one atomically.
+
+        Args:
+            path: Path to save the index to
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        meta = {
+            "fingerprint": self.fingerprint,
+            "hop_length": self.hop_length,
+            "sample_rate": self.sample_rate,
+            "templates": self.templates,
+        }
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as index_file:
+            np.savez(
+                index_file,
+                meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                codebook=self.codebook,
+                keys=self.keys,
+                starts=self.starts,
+                template_ids=self.template_ids,
+                positions=self.positions,
+            )
+        os.replace(temp_path, path)
+
+    def identify(self, frames: np.ndarray, limit: int = 3) -> List[dict]:
+        """
+        Identify the verses a clip most likely recites.
+
+        Each matching hash votes for its template and the offset between
+        the reference and the clip. Votes in neighbouring offset bins are
+        pooled, so a clip recited faster or slower than the reference
+        still lines up.
+
+        Args:
+            frames: MFCC frames of the clip, shape (frames, n_mfcc)
+            limit: Maximum number of candidates to return
+
+        Returns:
+            List[dict]: Candidates, best first, with "verse_id", "reciter", "votes",
+                "confidence" (share of the clip's n-grams that voted) and "offset_seconds"
+        """
+        if not len(self.keys) or len(frames) == 0:
+            return []
+
+        hashes, query_positions = code_ngrams(quantize(frames, self.codebook), len(self.codebook))
+        if not len(hashes):
+            return []
+
+        # Binary search every hash at once; each lookup costs O(log keys)
+        slots = np.searchsorted(self.keys, hashes)
+        slots[slots == len(self.keys)] = 0
+        found = self.keys[slots] == hashes
+        slots, query_positions = slots[found], query_positions[found]
+        if not len(slots):
+            return []
+
+        # Gather the postings of every found hash
+        lengths = self.starts[slots + 1] - self.starts[slots]
+        total = int(lengths.sum())
+        run_starts = np.repeat(self.starts[slots] - np.cumsum(lengths) + lengths, lengths)
+        postings = run_starts + np.arange(total)
+        template_ids = self.template_ids[postings].astype(np.int64)
+        offsets = self.positions[postings].astype(np.int64) - np.repeat(query_positions, lengths)
+
+        # Histogram of (template, offset bin) votes, pooled with the next bin
+        vote_keys = template_ids * OFFSET_KEY_SPAN + offsets // FINGERPRINT_OFFSET_BIN + OFFSET_BIN_SHIFT
+        bins, counts = np.unique(vote_keys, return_counts=True)
+        pooled = counts.copy()
+        adjacent = bins[1:] == bins[:-1] + 1
+        pooled[:-1][adjacent] += counts[1:][adjacent]
+
+        best_by_verse: Dict[str, dict] = {}
+        for position in np.argsort(-pooled, kind="stable"):
+            template_id, offset_bin = divmod(int(bins[position]), OFFSET_KEY_SPAN)
+            verse_id, reciter = self.templates[template_id]
+            if verse_id in best_by_verse:
+                continue
+
+            offset_frames = max(0, (offset_bin - OFFSET_BIN_SHIFT) * FINGERPRINT_OFFSET_BIN)
+            best_by_verse[verse_id] = {
+                "verse_id": verse_id,
+                "reciter": reciter,
+                "votes": int(pooled[position]),
+                "confidence": float(pooled[position] / len(hashes)),
+                "offset_seconds": float(offset_frames * self.hop_length / self.sample_rate),
+            }
+            if len(best_by_verse) >= limit:
+                break
+
+        return list(best_by_verse.values())
+
+_fingerprint_index: Optional[FingerprintIndex] = None
+
+def get_fingerprint_index() -> FingerprintIndex:
+    """
+    Get the process-wide fingerprint index, loading or rebuilding the saved index.
+
+    Returns:
+        FingerprintIndex: The shared fingerprint index
+    """
+    global _fingerprint_index
+    if _fingerprint_index is None:
+        fingerprint = FingerprintIndex.fingerprint_for()
+
+        index = FingerprintIndex.load(FINGERPRINT_INDEX_PATH)
+        if index is None or index.fingerprint != fingerprint:
+            index = FingerprintIndex.build(get_template_index(), fingerprint)
+            index.save(FINGERPRINT_INDEX_PATH)
+            logger.info(f"Built fingerprint index with {len(index)} postings for {len(index.templates)} templates")
+        _fingerprint_index = index
+    return _fingerprint_index
+
+def identify_buffer(buffer: AudioBuffer, limit: int = 3) -> Tuple[List[dict], Dict[str, float]]:
+    """
+    Identify the verse recited in processed audio.
+
+    Args:
+        buffer: The processed attempt audio
+        limit: Maximum number of candidates to return
+
+    Returns:
+        Tuple[List[dict], Dict[str, float]]: Candidates (best first) and per-stage timings
+    """
+    timer = StageTimer()
+    index = get_fingerprint_index()
+
+    with timer.stage("identify_features"):
+        frames = attempt_frames(buffer, index.sample_rate)
+
+    with timer.stage("identify"):
+        candidates = index.identify(frames, limit)
+
+    return candidates, timer.timings
+
+def choose_verse(candidates: List[dict], verse_id: Optional[str] = None) -> Optional[str]:
+    """
+    Decide which verse an attempt should be assessed against.
+
+    A missing verse id is filled in from the best candidate. A supplied one
+    is replaced only when FINGERPRINT_CORRECT_VERSE_ID is enabled and the
+    best candidate has at least FINGERPRINT_OVERRIDE_RATIO times its votes.
+    Weak identifications (fewer than FINGERPRINT_MIN_VOTES) never change
+    anything.
+
+    Args:
+        candidates: Identification candidates, best first
+        verse_id: The verse id the client sent, if any
+
+    Returns:
+        Optional[str]: The verse id to assess against
+    """
+    if not candidates or candidates[0]["votes"] < FINGERPRINT_MIN_VOTES:
+        return verse_id
+
+    best = candidates[0]
+    if verse_id is None:
+        return best["verse_id"]
+    if best["verse_id"] == verse_id or not FINGERPRINT_CORRECT_VERSE_ID:
+        return verse_id
+
+    supplied_votes = next((candidate["votes"] for candidate in candidates if candidate["verse_id"] == verse_id), 0)
+    if best["votes"] >= FINGERPRINT_OVERRIDE_RATIO * max(supplied_votes, 1):
+        return best["verse_id"]
+    return verse_id
+
+def main() -> None:
+    """Command-line entry point for building the fingerprint index."""
+    parser = argparse.ArgumentParser(description="Build the reference-recitation fingerprint index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Build the index from the reference templates")
+    build_parser.add_argument("--templates-dir", default=REFERENCE_TEMPLATE_DIRECTORY)
+    build_parser.add_argument("--output", default=FINGERPRINT_INDEX_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    index = FingerprintIndex.build(TemplateIndex(args.templates_dir), FingerprintIndex.fingerprint_for(args.templates_dir))
+    index.save(args.output)
+    logger.info(f"Wrote {len(index)} postings for {len(index.templates)} templates to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Streaming upload ingestion for the Quranic Quest audio pipeline.
+Uploads are read in fixed-size chunks. Small uploads are kept in memory and
+larger ones are spooled to disk off the event loop, so per-request memory is
+bounded by the spool threshold rather than the recording length.
+"""
+
+import os
+import uuid
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from services.audio.buffer import AUDIO_SPOOL_THRESHOLD_BYTES, AudioSource
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Ingestion settings
+AUDIO_UPLOAD_CHUNK_BYTES = int(os.getenv("AUDIO_UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+AUDIO_MAX_UPLOAD_BYTES = int(os.getenv("AUDIO_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+AUDIO_MAX_LONG_UPLOAD_BYTES = int(os.getenv("AUDIO_MAX_LONG_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+AUDIO_SPOOL_DIRECTORY = "data/audio_uploads"
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the maximum allowed size."""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the error.
+
+        Args:
+            max_bytes: The size limit that was exceeded
+        """
+        super().__init__(f"Audio upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+class EmptyUploadError(Exception):
+    """Raised when an upload has no content."""
+
+@dataclass
+class IngestedUpload:
+    """An upload that has been read in full, either in memory or spooled to disk."""
+
+    filename: str
+    size: int
+    sha256: str
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+
+    @property
+    def source(self) -> AudioSource:
+        """The upload as a pipeline source: its bytes, or the spool file path."""
+        return self.path if self.path else self.data
+
+    async def cleanup(self) -> None:
+        """Remove the spool file, if any."""
+        if self.path:
+            await run_in_threadpool(_remove_file, self.path)
+            self.path = None
+
+def _open_spool_file(file_path: str) -> BinaryIO:
+    """Create a spool file, creating its directory if needed."""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    return open(file_path, "wb")
+
+def _remove_file(file_path: str) -> None:
+    """Remove a file if it still exists."""
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+async def ingest_upload(
+    upload: UploadFile,
+    max_bytes: int = AUDIO_MAX_UPLOAD_BYTES,
+    chunk_size: int = AUDIO_UPLOAD_CHUNK_BYTES,
+    spool_threshold: int = AUDIO_SPOOL_THRESHOLD_BYTES
+) -> IngestedUpload:
+    """
+    Read an upload in fixed-size chunks.
+
+    The upload is hashed as it streams in. Once it grows past the spool
+    threshold, the buffered bytes and every later chunk are written to a
+    spool file on a worker thread.
+
+    Args:
+        upload: The uploaded file
+        max_bytes: Maximum allowed upload size
+        chunk_size: Number of bytes to read per chunk
+        spool_threshold: Size above which the upload is spooled to disk
+
+    Returns:
+        IngestedUpload: The ingested upload
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes
+        EmptyUploadError: If the upload is empty
+    """
+    filename = upload.filename or ""
+    digest = hashlib.sha256()
+    buffered = bytearray()
+    size = 0
+    spool_path = None
+    spool_file = None
+
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+
+            digest.update(chunk)
+
+            if spool_file is None:
+                buffered.extend(chunk)
+                if len(buffered) > spool_threshold:
+                    file_extension = os.path.splitext(filename)[1]
+                    spool_path = f"{AUDIO_SPOOL_DIRECTORY}/{uuid.uuid4()}{file_extension}"
+                    spool_file = await run_in_threadpool(_open_spool_file, spool_path)
+                    await run_in_threadpool(spool_file.write, bytes(buffered))
+                    buffered = bytearray()
+            else:
+                await run_in_threadpool(spool_file.write, chunk)
+
+        if size == 0:
+            raise EmptyUploadError(f"Upload {filename} is empty")
+
+    except BaseException:
+        # Including CancelledError, so a client disconnect mid-upload leaves no spool file behind
+        if spool_file is not None:
+            await run_in_threadpool(spool_file.close)
+            await run_in_threadpool(_remove_file, spool_path)
+        raise
+
+    if spool_file is not None:
+        await run_in_threadpool(spool_file.close)
+        logger.info(f"Spooled {size} byte upload to {spool_path}")
+        return IngestedUpload(filename=filename, size=size, sha256=digest.hexdigest(), path=spool_path)
+
+    return IngestedUpload(filename=filename, size=size, sha256=digest.hexdigest(), data=bytes(buffered))
@@ -0,0 +1,115 @@
+"""
+Pipeline metrics for the Quranic Quest audio services.
+This module collects per-stage timings for the audio processing pipeline,
+and per-codec decode costs.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+class StageTimer:
+    """Records how long each named stage of a single pipeline run takes."""
+
+    def __init__(self):
+        """Initialize an empty set of stage timings."""
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block of work under the given stage name.
+
+        Args:
+            name: Name of the pipeline stage
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+class PipelineMetrics:
+    """Thread-safe aggregate of stage timings across pipeline runs."""
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._codecs: Dict[str, Dict[str, float]] = {}
+
+    def record(self, timings: Dict[str, float]) -> None:
+        """
+        Add the timings from one pipeline run to the aggregates.
+
+        Args:
+            timings: Mapping of stage name to seconds spent
+        """
+        with self._lock:
+            for name, seconds in timings.items():
+                stage = self._stages.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                stage["count"] += 1
+                stage["total_seconds"] += seconds
+                stage["max_seconds"] = max(stage["max_seconds"], seconds)
+
+    def record_decode(self, metadata: Dict[str, Any]) -> None:
+        """
+        Add one decode to the per-codec aggregates.
+
+        Args:
+            metadata: Metadata of a decoded AudioBuffer (codec, decode_seconds, audio_seconds, encoded_bytes)
+        """
+        codec = metadata.get("codec")
+        if not codec:
+            return
+
+        with self._lock:
+            entry = self._codecs.setdefault(codec, {
+                "count": 0, "decode_seconds": 0.0, "audio_seconds": 0.0, "encoded_bytes": 0
+            })
+            entry["count"] += 1
+            entry["decode_seconds"] += metadata.get("decode_seconds", 0.0)
+            entry["audio_seconds"] += metadata.get("audio_seconds", 0.0)
+            entry["encoded_bytes"] += metadata.get("encoded_bytes", 0)
+
+    def decode_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get a copy of the per-codec decode aggregates.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Totals per codec, plus milliseconds of decode per second of audio
+        """
+        with self._lock:
+            return {
+                codec: {
+                    **entry,
+                    "ms_per_audio_second": 1000 * entry["decode_seconds"] / entry["audio_seconds"] if entry["audio_seconds"] else 0.0,
+                }
+                for codec, entry in self._codecs.items()
+            }
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get a copy of the aggregated stage timings.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Count, total, mean and max seconds per stage
+        """
+        with self._lock:
+            return {
+                name: {
+                    **stage,
+                    "mean_seconds": stage["total_seconds"] / stage["count"] if stage["count"] else 0.0,
+                }
+                for name, stage in self._stages.items()
+            }
+
+    def reset(self) -> None:
+        """Clear all aggregated timings."""
+        with self._lock:
+            self._stages.clear()
+            self._codecs.clear()
+
+# Shared metrics for the audio pipeline in this process
+pipeline_metrics = PipelineMetrics()
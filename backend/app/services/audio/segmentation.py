@@ -0,0 +1,281 @@
+"""
+Long-recording segmentation for the Quranic Quest audio pipeline.
+Full-surah recitations are read in fixed-size blocks and split on pauses by a
+streaming voice-activity detector. Only the segment boundaries are kept while
+scanning, and each segment is later read back on its own, so memory stays
+bounded regardless of recording length.
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import soundfile as sf
+
+from services.audio.alignment import align_buffer
+from services.audio.buffer import AudioBuffer
+from services.audio.decode import AUDIO_TARGET_SAMPLE_RATE, decode_audio, resample
+from services.audio.features import ASSESSMENT_FEATURES
+from services.audio.metrics import StageTimer
+from services.audio.pipeline import extract_features, process_buffer
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Segmentation settings
+VAD_FRAME_SECONDS = 0.03
+VAD_BLOCK_SECONDS = float(os.getenv("VAD_BLOCK_SECONDS", "5"))
+VAD_MIN_PAUSE_SECONDS = float(os.getenv("VAD_MIN_PAUSE_SECONDS", "0.6"))
+VAD_MIN_SEGMENT_SECONDS = float(os.getenv("VAD_MIN_SEGMENT_SECONDS", "0.8"))
+VAD_MAX_SEGMENT_SECONDS = float(os.getenv("VAD_MAX_SEGMENT_SECONDS", "60"))
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "12"))
+VAD_PADDING_SECONDS = 0.15
+
+@dataclass
+class Segment:
+    """A span of speech within a longer recording."""
+
+    index: int
+    start_sample: int
+    end_sample: int
+    sample_rate: int
+
+    @property
+    def start_seconds(self) -> float:
+        """Start time of the segment in seconds."""
+        return self.start_sample / self.sample_rate
+
+    @property
+    def end_seconds(self) -> float:
+        """End time of the segment in seconds."""
+        return self.end_sample / self.sample_rate
+
+class StreamingVAD:
+    """Energy-based voice-activity detector that consumes audio block by block."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_pause_seconds: float = VAD_MIN_PAUSE_SECONDS,
+        min_segment_seconds: float = VAD_MIN_SEGMENT_SECONDS,
+        max_segment_seconds: float = VAD_MAX_SEGMENT_SECONDS,
+        threshold_db: float = VAD_THRESHOLD_DB
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            sample_rate: Sample rate of the audio
+            min_pause_seconds: Silence needed to end a segment
+            min_segment_seconds: Segments shorter than this are dropped
+            max_segment_seconds: Segments longer than this are split
+            threshold_db: How far above the noise floor a frame must be to count as speech
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(sample_rate * VAD_FRAME_SECONDS))
+        self.min_pause_frames = int(min_pause_seconds / VAD_FRAME_SECONDS)
+        self.min_segment_samples = int(min_segment_seconds * sample_rate)
+        self.max_segment_samples = int(max_segment_seconds * sample_rate)
+        self.padding_samples = int(VAD_PADDING_SECONDS * sample_rate)
+        self.threshold_db = threshold_db
+
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._position = 0  # Sample index of the start of _remainder
+        self._noise_floor_db: Optional[float] = None
+        self._speech_start: Optional[int] = None
+        self._last_speech_end = 0
+        self._silent_frames = 0
+        self._index = 0
+
+    def _emit(self, start: int, end: int) -> Optional[Segment]:
+        """Create a padded segment if it is long enough."""
+        if end - start < self.min_segment_samples:
+            return None
+        segment = Segment(
+            index=self._index,
+            start_sample=max(0, start - self.padding_samples),
+            end_sample=end + self.padding_samples,
+            sample_rate=self.sample_rate,
+        )
+        self._index += 1
+        return segment
+
+    def feed(self, block: np.ndarray) -> List[Segment]:
+        """
+        Consume a block of mono samples.
+
+        Args:
+            block: The next block of audio
+
+        Returns:
+            List[Segment]: Segments that were closed by this block
+        """
+        samples = np.concatenate([self._remainder, block]) if len(self._remainder) else block
+        frame_count = len(samples) // self.frame_length
+        frames = samples[:frame_count * self.frame_length].reshape(frame_count, self.frame_length)
+        energy_db = 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-10)
+
+        segments = []
+        for frame_index, frame_db in enumerate(energy_db):
+            frame_start = self._position + frame_index * self.frame_length
+
+            # Track the noise floor: fall quickly, rise slowly
+            if self._noise_floor_db is None:
+                self._noise_floor_db = frame_db
+            elif frame_db < self._noise_floor_db:
+                self._noise_floor_db = frame_db
+            else:
+                self._noise_floor_db += 0.002 * (frame_db - self._noise_floor_db)
+
+            if frame_db > self._noise_floor_db + self.threshold_db:
+                if self._speech_start is None:
+                    self._speech_start = frame_start
+                self._last_speech_end = frame_start + self.frame_length
+                self._silent_frames = 0
+            elif self._speech_start is not None:
+                self._silent_frames += 1
+                if self._silent_frames >= self.min_pause_frames:
+                    segment = self._emit(self._speech_start, self._last_speech_end)
+                    if segment:
+                        segments.append(segment)
+                    self._speech_start = None
+
+            if self._speech_start is not None and frame_start + self.frame_length - self._speech_start >= self.max_segment_samples:
+                segment = self._emit(self._speech_start, frame_start + self.frame_length)
+                if segment:
+                    segments.append(segment)
+                self._speech_start = frame_start + self.frame_length
+
+        consumed = frame_count * self.frame_length
+        self._remainder = samples[consumed:].copy()
+        self._position += consumed
+        return segments
+
+    def flush(self) -> List[Segment]:
+        """
+        Close any open segment at the end of the recording.
+
+        Returns:
+            List[Segment]: The final segment, if any
+        """
+        if self._speech_start is None:
+            return []
+        segment = self._emit(self._speech_start, self._last_speech_end)
+        self._speech_start = None
+        return [segment] if segment else []
+
+def _to_mono(block: np.ndarray) -> np.ndarray:
+    """Downmix a block of samples to mono float32."""
+    return (block.mean(axis=1) if block.ndim > 1 else block).astype(np.float32, copy=False)
+
+def iter_segments(audio_file_path: str, block_seconds: float = VAD_BLOCK_SECONDS) -> Iterator[Segment]:
+    """
+    Scan a recording in blocks and yield speech segments as they close.
+
+    Args:
+        audio_file_path: Path to the recording
+        block_seconds: Length of each block read from disk
+
+    Yields:
+        Segment: The next speech segment
+    """
+    try:
+        info = sf.info(audio_file_path)
+    except RuntimeError:
+        # Formats libsndfile cannot stream are decoded in full, then scanned in blocks
+        logger.info(f"Block reads unsupported for {audio_file_path}, decoding in full")
+        buffer = decode_audio(audio_file_path)
+        vad = StreamingVAD(buffer.sample_rate)
+        block_size = int(block_seconds * buffer.sample_rate)
+        for start in range(0, len(buffer.samples), block_size):
+            yield from vad.feed(buffer.samples[start:start + block_size])
+        yield from vad.flush()
+        return
+
+    vad = StreamingVAD(info.samplerate)
+    block_size = int(block_seconds * info.samplerate)
+    for block in sf.blocks(audio_file_path, blocksize=block_size, dtype="float32"):
+        yield from vad.feed(_to_mono(block))
+    yield from vad.flush()
+
+def find_segments(audio_file_path: str) -> Tuple[List[Tuple[int, int, int, int]], Dict[str, float]]:
+    """
+    Find the speech segments in a recording.
+
+    Args:
+        audio_file_path: Path to the recording
+
+    Returns:
+        Tuple: (index, start sample, end sample, sample rate) per segment, and per-stage timings
+    """
+    timer = StageTimer()
+
+    with timer.stage("segmentation"):
+        segments = [
+            (segment.index, segment.start_sample, segment.end_sample, segment.sample_rate)
+            for segment in iter_segments(audio_file_path)
+        ]
+
+    return segments, timer.timings
+
+def read_segment(audio_file_path: str, start_sample: int, end_sample: int) -> AudioBuffer:
+    """
+    Read one segment of a recording, resampled to the pipeline's target rate.
+
+    Segment boundaries are in the recording's own sample rate (the rate the
+    detector scanned it at).
+
+    Args:
+        audio_file_path: Path to the recording
+        start_sample: First sample of the segment
+        end_sample: Sample after the last one in the segment
+
+    Returns:
+        AudioBuffer: The decoded segment
+    """
+    try:
+        samples, sr = sf.read(audio_file_path, start=start_sample, stop=end_sample, dtype="float32")
+    except RuntimeError:
+        buffer = decode_audio(audio_file_path)
+        samples, sr = buffer.samples[start_sample:end_sample], buffer.sample_rate
+
+    target_sr = AUDIO_TARGET_SAMPLE_RATE or sr
+    return AudioBuffer(
+        samples=resample(np.ascontiguousarray(_to_mono(samples)), sr, target_sr),
+        sample_rate=target_sr,
+        metadata={"start_seconds": start_sample / sr, "end_seconds": end_sample / sr},
+    )
+
+def prepare_segment(
+    audio_file_path: str,
+    start_sample: int,
+    end_sample: int,
+    verse_id: Optional[str] = None
+) -> Tuple[AudioBuffer, dict, List[dict], Dict[str, float]]:
+    """
+    Read, process, extract features from and align one segment.
+
+    Args:
+        audio_file_path: Path to the recording
+        start_sample: First sample of the segment
+        end_sample: Sample after the last one in the segment
+        verse_id: Verse the segment is expected to contain, if known
+
+    Returns:
+        Tuple: Processed audio, features, alignments and per-stage timings
+    """
+    timer = StageTimer()
+
+    with timer.stage("decode"):
+        buffer = read_segment(audio_file_path, start_sample, end_sample)
+
+    processed = process_buffer(buffer, timer)
+    features = extract_features(processed, timer, ASSESSMENT_FEATURES)
+
+    alignments: List[dict] = []
+    if verse_id:
+        alignments, alignment_timings = align_buffer(processed, verse_id)
+        timer.timings.update(alignment_timings)
+
+    return processed, features, alignments, timer.timings
@@ -0,0 +1,173 @@
+"""
+Real-time streaming pronunciation feedback for the Quranic Quest application.
+A StreamingSession consumes PCM frames while the child is still reciting.
+It keeps incremental denoise and normalization state, computes MFCC frames
+as soon as enough samples arrive, and aligns them online against the
+reference recitation so per-word feedback can be pushed immediately.
+"""
+
+import os
+import logging
+from dataclasses import asdict
+from typing import List, Optional
+import numpy as np
+import librosa
+from scipy.fft import dct, rfft
+from scipy.signal import get_window
+
+from services.audio.alignment import OnlineAligner
+from services.audio.decode import StreamResampler
+from services.audio.denoise import SpectralGate
+from services.audio.features import HOP_LENGTH, N_FFT, N_MELS, N_MFCC
+from services.audio.pipeline import AUDIO_DENOISE_METHOD
+from services.audio.templates import VerseTemplate
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Streaming settings
+STREAMING_NOISE_SECONDS = 0.5
+STREAMING_MAX_SECONDS = float(os.getenv("STREAMING_MAX_SECONDS", "180"))
+STREAMING_MIN_SAMPLE_RATE = 8000
+STREAMING_MAX_SAMPLE_RATE = 48000
+STREAMING_VOICE_POWER = 1e-6
+TARGET_PEAK = 10 ** (-3 / 20)
+
+class StreamingLimitError(Exception):
+    """Raised when a stream runs longer than the allowed maximum."""
+
+class StreamingSession:
+    """Incremental pipeline state for one streamed recitation."""
+
+    def __init__(self, template: VerseTemplate, sample_rate: int):
+        """
+        Initialize the session.
+
+        Args:
+            template: Reference template for the verse being recited
+            sample_rate: Sample rate of the incoming 16-bit PCM frames
+        """
+        self.template = template
+        self.input_rate = sample_rate
+        self.sample_rate = template.sample_rate
+        self.aligner = OnlineAligner(template)
+
+        self._resampler = StreamResampler(self.input_rate, self.sample_rate)
+
+        self._gate = SpectralGate(self.sample_rate) if AUDIO_DENOISE_METHOD == "spectral" else None
+        self._noise_samples: List[np.ndarray] = []
+        self._noise_count = 0
+        self._noise_profile: Optional[float] = None
+        self._peak = 0.0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._voice_started = False
+        self._received_samples = 0
+        self._frame_count = 0
+
+        self._window = get_window("hann", N_FFT, fftbins=True).astype(np.float32)
+        self._mel_basis = librosa.filters.mel(sr=self.sample_rate, n_fft=N_FFT, n_mels=N_MELS)
+
+    def _denoise(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Denoise the next samples, estimating the noise from the first half second.
+
+        Like the offline pipeline, the opening half second is assumed to be
+        background noise; it is used for the estimate and then dropped. The
+        spectral gate carries its noise profile and overlap state across
+        chunks, and adapts the profile as the recitation goes on.
+        """
+        if self._gate is not None:
+            samples = self._gate.process(samples)
+            dropped = max(0, int(self.sample_rate * STREAMING_NOISE_SECONDS) - self._noise_count)
+            self._noise_count += min(dropped, len(samples))
+            return samples[dropped:]
+
+        if self._noise_profile is None:
+            needed = int(self.sample_rate * STREAMING_NOISE_SECONDS) - self._noise_count
+            self._noise_samples.append(samples[:needed])
+            self._noise_count += len(samples[:needed])
+            samples = samples[needed:]
+            if self._noise_count < int(self.sample_rate * STREAMING_NOISE_SECONDS):
+                return samples
+
+            self._noise_profile = float(np.mean(np.abs(np.concatenate(self._noise_samples))))
+            self._noise_samples = []
+
+        samples[np.abs(samples) < self._noise_profile * 2] = 0
+        return samples
+
+    def _normalize(self, samples: np.ndarray) -> np.ndarray:
+        """Scale samples in place towards -3 dB using the running peak."""
+        if len(samples):
+            self._peak = max(self._peak, float(np.max(np.abs(samples))))
+        if self._peak > 0:
+            samples *= TARGET_PEAK / self._peak
+        return samples
+
+    def _mfcc_frames(self, samples: np.ndarray) -> np.ndarray:
+        """Frame the pending samples and compute MFCCs for every complete frame."""
+        pending = np.concatenate([self._pending, samples]) if len(self._pending) else samples
+        if len(pending) < N_FFT:
+            self._pending = pending
+            return np.zeros((0, N_MFCC), dtype=np.float32)
+
+        count = (len(pending) - N_FFT) // HOP_LENGTH + 1
+        frames = np.lib.stride_tricks.sliding_window_view(pending, N_FFT)[::HOP_LENGTH][:count]
+        self._pending = pending[count * HOP_LENGTH:].copy()
+
+        power = np.abs(rfft(frames * self._window, axis=1)) ** 2
+        mel = power @ self._mel_basis.T
+        log_mel = 10 * np.log10(np.maximum(mel, 1e-10))
+        mfcc = dct(log_mel, type=2, norm="ortho", axis=1)[:, :N_MFCC]
+
+        # Leading silence is trimmed from the references, so skip it here too
+        if not self._voice_started:
+            voiced = np.flatnonzero(power.mean(axis=1) > STREAMING_VOICE_POWER)
+            if len(voiced) == 0:
+                return np.zeros((0, N_MFCC), dtype=np.float32)
+            self._voice_started = True
+            mfcc = mfcc[voiced[0]:]
+
+        return mfcc.astype(np.float32)
+
+    def feed(self, pcm: bytes) -> List[dict]:
+        """
+        Consume a chunk of 16-bit little-endian mono PCM.
+
+        Args:
+            pcm: The raw audio bytes
+
+        Returns:
+            List[dict]: Feedback messages for words that aligned in this chunk
+
+        Raises:
+            StreamingLimitError: If the stream exceeds STREAMING_MAX_SECONDS
+        """
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype="<i2").astype(np.float32) / 32768.0
+        self._received_samples += len(samples)
+        if self._received_samples > STREAMING_MAX_SECONDS * self.input_rate:
+            raise StreamingLimitError(f"Stream exceeds {STREAMING_MAX_SECONDS:.0f} seconds")
+
+        samples = self._resampler.process(samples)
+
+        samples = self._normalize(self._denoise(samples))
+        frames = self._mfcc_frames(samples)
+        self._frame_count += len(frames)
+
+        messages = [{"type": "word", **asdict(word)} for word in self.aligner.push(frames)]
+        if len(frames):
+            messages.append({
+                "type": "progress",
+                "reference_seconds": self.aligner.position * self.template.hop_length / self.sample_rate,
+                "received_seconds": self._received_samples / self.input_rate,
+            })
+        return messages
+
+    def finish(self) -> dict:
+        """
+        Finish the stream and align it to the end of the reference.
+
+        Returns:
+            dict: The final alignment, with every word
+        """
+        return {"type": "complete", **self.aligner.finish().to_dict()}
@@ -0,0 +1,338 @@
+"""
+Precomputed reference-recitation templates for the Quranic Quest application.
+An offline build step turns a directory of reference recitations into one
+compact template file per reciter set. Each file holds per-verse MFCC and mel
+frames plus word boundaries. At runtime the files are memory-mapped, so a
+lookup is a dictionary hit plus a zero-copy slice, and every uvicorn worker
+shares the same pages through the OS page cache.
+
+Build templates (from the backend/app directory):
+    python -m services.audio.templates build <references_dir> <output_dir>
+
+The references directory holds one subdirectory per reciter set. Each contains
+one audio file per verse named "<surah>_<ayah>.<ext>" or "<SSSAAA>.<ext>"
+(e.g. "001_002.mp3" or "001002.mp3"). An optional "<name>.words.json" sidecar
+lists the word boundaries as [{"text": ..., "start": seconds, "end": seconds}].
+"""
+
+import os
+import re
+import json
+import mmap
+import struct
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from services.audio.buffer import AudioBuffer
+from services.audio.decode import decode_audio, resample
+from services.audio.features import HOP_LENGTH, N_MELS, N_MFCC, FeatureExtractor
+from services.audio.pipeline import process_buffer
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Template settings
+REFERENCE_TEMPLATE_DIRECTORY = os.getenv("REFERENCE_TEMPLATE_DIRECTORY", "data/reference_templates")
+TEMPLATE_SAMPLE_RATE = 16000
+TEMPLATE_EXTENSION = ".qtpl"
+
+# File layout: magic, index offset, index length, padded to DATA_START
+TEMPLATE_MAGIC = b"QQTPL\x00\x01\x00"
+TEMPLATE_PREAMBLE = struct.Struct("<8sQQ")
+DATA_START = 64
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".mp3", ".m4a", ".ogg", ".opus", ".aac", ".webm"}
+VERSE_FILENAME_PATTERNS = (
+    re.compile(r"^(\d{1,3})[_:-](\d{1,3})$"),
+    re.compile(r"^(\d{3})(\d{3})$"),
+)
+
+@dataclass
+class VerseTemplate:
+    """Reference features for one verse by one reciter set."""
+
+    verse_id: str
+    reciter: str
+    sample_rate: int
+    hop_length: int
+    mfcc: np.ndarray
+    mel: np.ndarray
+    word_boundaries: List[Tuple[int, int]]
+    words: List[str]
+
+    @property
+    def duration(self) -> float:
+        """Duration of the reference recitation in seconds."""
+        return self.mfcc.shape[0] * self.hop_length / self.sample_rate
+
+def verse_id_from_filename(filename: str) -> Optional[str]:
+    """
+    Parse a verse ID ("surah:ayah") from a reference recitation filename.
+
+    Args:
+        filename: The audio filename
+
+    Returns:
+        Optional[str]: The verse ID, or None if the name does not match
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    for pattern in VERSE_FILENAME_PATTERNS:
+        match = pattern.match(stem)
+        if match:
+            return f"{int(match.group(1))}:{int(match.group(2))}"
+    return None
+
+def _compute_template_features(audio_path: str) -> Tuple[np.ndarray, np.ndarray, List[Tuple[int, int]], List[str]]:
+    """
+    Compute template features for one reference recitation.
+
+    The recording goes through the same denoise/normalize/trim stages as
+    user attempts, so attempts and references are directly comparable.
+
+    Args:
+        audio_path: Path to the reference audio file
+
+    Returns:
+        Tuple: MFCC frames, mel frames (both frames x dims, float32), word boundaries in frames and word texts
+    """
+    buffer = decode_audio(audio_path)
+    if buffer.sample_rate != TEMPLATE_SAMPLE_RATE:
+        buffer = AudioBuffer(
+            samples=resample(buffer.samples, buffer.sample_rate, TEMPLATE_SAMPLE_RATE),
+            sample_rate=TEMPLATE_SAMPLE_RATE,
+            metadata=buffer.metadata,
+        )
+
+    processed = process_buffer(buffer)
+    extractor = FeatureExtractor(processed)
+    mfcc = np.ascontiguousarray(extractor.mfcc.T, dtype=np.float32)
+    mel = np.ascontiguousarray(extractor.log_mel.T, dtype=np.float32)
+
+    word_boundaries: List[Tuple[int, int]] = []
+    words: List[str] = []
+    sidecar_path = f"{os.path.splitext(audio_path)[0]}.words.json"
+    if os.path.exists(sidecar_path):
+        # Sidecar times refer to the untrimmed recording
+        trim_seconds = processed.metadata.get("trim_start", 0) / TEMPLATE_SAMPLE_RATE
+        with open(sidecar_path, "r", encoding="utf-8") as sidecar_file:
+            for word in json.load(sidecar_file):
+                start = max(0, int(round((word["start"] - trim_seconds) * TEMPLATE_SAMPLE_RATE / HOP_LENGTH)))
+                end = max(0, int(round((word["end"] - trim_seconds) * TEMPLATE_SAMPLE_RATE / HOP_LENGTH)))
+                word_boundaries.append((min(start, len(mfcc)), min(max(end, start + 1), len(mfcc))))
+                words.append(word.get("text", ""))
+
+    return mfcc, mel, word_boundaries, words
+
+def build_template_file(reciter_directory: str, output_path: str, workers: int = 1) -> int:
+    """
+    Build a template file for one reciter set.
+
+    Records are streamed to disk as they are computed and the index is
+    written last, so memory use does not grow with the size of the set.
+
+    Args:
+        reciter_directory: Directory of per-verse reference recitations
+        output_path: Path of the template file to write
+        workers: Number of processes to compute features with
+
+    Returns:
+        int: Number of verses written
+    """
+    reciter = os.path.basename(os.path.normpath(reciter_directory))
+    audio_files = []
+    for filename in sorted(os.listdir(reciter_directory)):
+        verse_id = verse_id_from_filename(filename)
+        if verse_id and os.path.splitext(filename)[1].lower() in AUDIO_EXTENSIONS:
+            audio_files.append((verse_id, os.path.join(reciter_directory, filename)))
+
+    index = {
+        "version": 1,
+        "reciter": reciter,
+        "sample_rate": TEMPLATE_SAMPLE_RATE,
+        "hop_length": HOP_LENGTH,
+        "n_mfcc": N_MFCC,
+        "n_mels": N_MELS,
+        "verses": {},
+    }
+
+    temp_path = f"{output_path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    with open(temp_path, "wb") as template_file, ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        template_file.write(b"\x00" * DATA_START)
+
+        paths = [path for _, path in audio_files]
+        for (verse_id, path), result in zip(audio_files, executor.map(_compute_template_features, paths)):
+            mfcc, mel, word_boundaries, words = result
+
+            mfcc_offset = template_file.tell()
+            template_file.write(mfcc.tobytes())
+            mel_offset = template_file.tell()
+            template_file.write(mel.tobytes())
+
+            index["verses"][verse_id] = {
+                "frames": int(mfcc.shape[0]),
+                "mfcc_offset": mfcc_offset,
+                "mel_offset": mel_offset,
+                "word_boundaries": word_boundaries,
+                "words": words,
+            }
+            logger.info(f"Built template for {reciter} {verse_id} from {path}")
+
+        index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        index_offset = template_file.tell()
+        template_file.write(index_bytes)
+
+        template_file.seek(0)
+        template_file.write(TEMPLATE_PREAMBLE.pack(TEMPLATE_MAGIC, index_offset, len(index_bytes)))
+
+    os.replace(temp_path, output_path)
+    return len(index["verses"])
+
+class TemplateStore:
+    """Memory-mapped reference templates for one reciter set."""
+
+    def __init__(self, path: str):
+        """
+        Open a template file.
+
+        Args:
+            path: Path to the template file
+
+        Raises:
+            ValueError: If the file is not a template file
+        """
+        self.path = path
+        with open(path, "rb") as template_file:
+            self._mmap = mmap.mmap(template_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_offset, index_length = TEMPLATE_PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != TEMPLATE_MAGIC:
+            raise ValueError(f"Not a reference template file: {path}")
+
+        index = json.loads(self._mmap[index_offset:index_offset + index_length])
+        self.reciter: str = index["reciter"]
+        self.sample_rate: int = index["sample_rate"]
+        self.hop_length: int = index["hop_length"]
+        self.n_mfcc: int = index["n_mfcc"]
+        self.n_mels: int = index["n_mels"]
+        self._verses: Dict[str, dict] = index["verses"]
+
+    def __contains__(self, verse_id: str) -> bool:
+        return verse_id in self._verses
+
+    def __len__(self) -> int:
+        return len(self._verses)
+
+    def verse_ids(self) -> List[str]:
+        """Get the IDs of all verses in the store."""
+        return list(self._verses)
+
+    def get(self, verse_id: str) -> Optional[VerseTemplate]:
+        """
+        Get the template for a verse.
+
+        Args:
+            verse_id: The verse ID ("surah:ayah")
+
+        Returns:
+            Optional[VerseTemplate]: Zero-copy views of the verse's features, or None if missing
+        """
+        entry = self._verses.get(verse_id)
+        if entry is None:
+            return None
+
+        frames = entry["frames"]
+        mfcc = np.frombuffer(self._mmap, dtype=np.float32, count=frames * self.n_mfcc, offset=entry["mfcc_offset"])
+        mel = np.frombuffer(self._mmap, dtype=np.float32, count=frames * self.n_mels, offset=entry["mel_offset"])
+
+        return VerseTemplate(
+            verse_id=verse_id,
+            reciter=self.reciter,
+            sample_rate=self.sample_rate,
+            hop_length=self.hop_length,
+            mfcc=mfcc.reshape(frames, self.n_mfcc),
+            mel=mel.reshape(frames, self.n_mels),
+            word_boundaries=[tuple(boundary) for boundary in entry["word_boundaries"]],
+            words=entry["words"],
+        )
+
+class TemplateIndex:
+    """All reference template stores in a directory, indexed by verse."""
+
+    def __init__(self, directory: str = REFERENCE_TEMPLATE_DIRECTORY):
+        """
+        Open every template file in a directory.
+
+        Args:
+            directory: Directory containing template files
+        """
+        self.directory = directory
+        self.stores: Dict[str, TemplateStore] = {}
+
+        if os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith(TEMPLATE_EXTENSION):
+                    store = TemplateStore(os.path.join(directory, filename))
+                    self.stores[store.reciter] = store
+
+        logger.info(f"Loaded {len(self.stores)} reference template stores from {directory}")
+
+    def get(self, verse_id: str, reciter: Optional[str] = None) -> List[VerseTemplate]:
+        """
+        Get the templates for a verse.
+
+        Args:
+            verse_id: The verse ID ("surah:ayah")
+            reciter: Optional reciter set to restrict the lookup to
+
+        Returns:
+            List[VerseTemplate]: Templates for the verse, one per reciter set
+        """
+        if reciter is not None:
+            stores = [self.stores[reciter]] if reciter in self.stores else []
+        else:
+            stores = list(self.stores.values())
+
+        templates = [store.get(verse_id) for store in stores]
+        return [template for template in templates if template is not None]
+
+_template_index: Optional[TemplateIndex] = None
+
+def get_template_index() -> TemplateIndex:
+    """
+    Get the process-wide template index, opening it on first use.
+
+    Returns:
+        TemplateIndex: The shared template index
+    """
+    global _template_index
+    if _template_index is None:
+        _template_index = TemplateIndex()
+    return _template_index
+
+def main() -> None:
+    """Command-line entry point for building template files."""
+    parser = argparse.ArgumentParser(description="Build reference-recitation template files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Build one template file per reciter set")
+    build_parser.add_argument("references_dir", help="Directory with one subdirectory per reciter set")
+    build_parser.add_argument("output_dir", nargs="?", default=REFERENCE_TEMPLATE_DIRECTORY)
+    build_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    for name in sorted(os.listdir(args.references_dir)):
+        reciter_directory = os.path.join(args.references_dir, name)
+        if os.path.isdir(reciter_directory):
+            output_path = os.path.join(args.output_dir, f"{name}{TEMPLATE_EXTENSION}")
+            count = build_template_file(reciter_directory, output_path, args.workers)
+            logger.info(f"Wrote {count} verse templates to {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Audio transcoding for the Quranic Quest audio pipeline.
+Transcodes run on the long-lived audio worker pool instead of spawning
+ffmpeg for every decode and encode. Audio travels to and from the workers as
+bytes over the pool's pipes, so nothing is written to temporary files.
+Encoded formats libsndfile supports are written with it; AAC/M4A and WebM
+use PyAV in memory, falling back to a single piped ffmpeg call.
+"""
+
+import io
+import os
+import shutil
+import logging
+import subprocess
+from typing import Dict, Tuple
+import soundfile as sf
+
+from services.audio.buffer import AudioBuffer
+from services.audio.decode import av, decode_audio
+from services.audio.metrics import StageTimer
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Transcoding settings (0 allows one transcode per audio worker)
+TRANSCODE_MAX_CONCURRENCY = int(os.getenv("TRANSCODE_MAX_CONCURRENCY", "0"))
+
+# libsndfile encodings: format -> (container, subtype)
+SOUNDFILE_FORMATS = {
+    "wav": ("WAV", "PCM_16"),
+    "flac": ("FLAC", "PCM_16"),
+    "ogg": ("OGG", "VORBIS"),
+    "opus": ("OGG", "OPUS"),
+    "mp3": ("MP3", "MPEG_LAYER_III"),
+}
+
+# PyAV/ffmpeg encodings: format -> (container, codec, extra ffmpeg output options)
+FFMPEG_FORMATS = {
+    "m4a": ("ipod", "aac", ["-movflags", "frag_keyframe+empty_moov"]),
+    "aac": ("adts", "aac", []),
+    "webm": ("webm", "libopus", []),
+}
+
+TRANSCODE_FORMATS = tuple(SOUNDFILE_FORMATS) + tuple(FFMPEG_FORMATS)
+
+def _encode_with_soundfile(buffer: AudioBuffer, target_format: str) -> bytes:
+    """Encode with libsndfile, entirely in memory."""
+    container, subtype = SOUNDFILE_FORMATS[target_format]
+    output = io.BytesIO()
+    sf.write(output, buffer.samples, buffer.sample_rate, format=container, subtype=subtype)
+    return output.getvalue()
+
+def _encode_with_av(buffer: AudioBuffer, target_format: str) -> bytes:
+    """Encode with PyAV, entirely in memory."""
+    container_format, codec, _ = FFMPEG_FORMATS[target_format]
+    output = io.BytesIO()
+
+    with av.open(output, mode="w", format=container_format) as container:
+        stream = container.add_stream(codec, rate=buffer.sample_rate)
+        stream.layout = "mono"
+
+        frame = av.AudioFrame.from_ndarray(buffer.samples.reshape(1, -1), format="flt", layout="mono")
+        frame.sample_rate = buffer.sample_rate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+    return output.getvalue()
+
+def _encode_with_ffmpeg(buffer: AudioBuffer, target_format: str) -> bytes:
+    """Encode with one ffmpeg process, piping WAV in and the result out."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError(f"Encoding {target_format} needs PyAV or ffmpeg")
+
+    container_format, codec, options = FFMPEG_FORMATS[target_format]
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+         "-c:a", codec, *options, "-f", container_format, "pipe:1"],
+        input=buffer.to_wav_bytes(),
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+def transcode_bytes(
+    data: bytes,
+    filename: str,
+    target_format: str,
+    sample_rate: int = 0
+) -> Tuple[bytes, Dict[str, float]]:
+    """
+    Decode audio bytes and re-encode them in another format.
+
+    Args:
+        data: The encoded source audio
+        filename: Original filename of the source, used for its extension
+        target_format: Format to encode to (one of TRANSCODE_FORMATS)
+        sample_rate: Sample rate to encode at (0 keeps the source's native rate)
+
+    Returns:
+        Tuple[bytes, Dict[str, float]]: The encoded audio and per-stage timings
+    """
+    if target_format not in TRANSCODE_FORMATS:
+        raise ValueError(f"Unsupported target format: {target_format}")
+
+    timer = StageTimer()
+
+    with timer.stage("transcode_decode"):
+        buffer = decode_audio(data, filename, target_sr=sample_rate)
+
+    with timer.stage("transcode_encode"):
+        if target_format in SOUNDFILE_FORMATS:
+            encoded = _encode_with_soundfile(buffer, target_format)
+        elif av is not None:
+            encoded = _encode_with_av(buffer, target_format)
+        else:
+            encoded = _encode_with_ffmpeg(buffer, target_format)
+
+    return encoded, timer.timings
@@ -0,0 +1,5 @@
+"""
+Authentication services for the Quranic Quest application.
+"""
+
+from services.auth.passwords import BCRYPT_ROUNDS, PasswordHasher, PasswordHasherBusy, get_password_hasher
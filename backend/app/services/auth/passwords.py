@@ -0,0 +1,160 @@
+"""
+Password hashing for the Quranic Quest application.
+bcrypt is deliberately slow (about 250 ms of CPU at cost 12), so hashing and
+verification run on a dedicated, bounded thread pool instead of the event
+loop; bcrypt releases the GIL, so the threads hash in parallel. When the
+pool and its queue are full, new requests are refused straight away rather
+than queued behind a burst of logins. Hashes made with an older cost are
+upgraded transparently when their owner next logs in.
+"""
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from passlib.context import CryptContext
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Hashing settings
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or (os.cpu_count() or 1)
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))  # Waiting operations beyond the busy workers
+PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "2"))
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already queued."""
+
+    def __init__(self, retry_after: int = PASSWORD_HASH_RETRY_AFTER_SECONDS):
+        super().__init__("Too many login attempts in progress, please retry shortly")
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool."""
+
+    def __init__(
+        self,
+        rounds: int = BCRYPT_ROUNDS,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE
+    ):
+        """
+        Initialize the hasher.
+
+        Args:
+            rounds: bcrypt cost for new hashes; hashes with another cost are flagged for rehashing
+            max_workers: Number of hashing threads
+            max_queue: Maximum number of operations waiting for a thread
+        """
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        # Pinning the accepted cost range to one value makes verify_and_update
+        # return a new hash for anything hashed with another cost
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._stats = {"hashes": 0, "verifications": 0, "rehashes": 0, "rejected": 0}
+
+        # An unusable hash to verify against when a user does not exist, so
+        # unknown accounts take as long to reject as wrong passwords (made on first use)
+        self._dummy_hash: Optional[str] = None
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a hashing function on the pool, refusing it if the queue is full."""
+        if self._pending >= self.max_workers + self.max_queue:
+            self._stats["rejected"] += 1
+            raise PasswordHasherBusy()
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password with the current cost.
+
+        Args:
+            password: The plain-text password
+
+        Returns:
+            str: The bcrypt hash
+
+        Raises:
+            PasswordHasherBusy: If too many operations are already queued
+        """
+        hashed = await self._run(self.context.hash, password)
+        self._stats["hashes"] += 1
+        return hashed
+
+    async def verify(self, password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password, rehashing it if its hash uses an outdated cost.
+
+        Args:
+            password: The plain-text password
+            hashed_password: The stored hash (None for an unknown user, which always fails)
+
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the password matches, and a replacement
+                hash to store if the stored one needs upgrading
+
+        Raises:
+            PasswordHasherBusy: If too many operations are already queued
+        """
+        if hashed_password is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = await self._run(self.context.hash, os.urandom(16).hex())
+            else:
+                await self._run(self.context.verify, password, self._dummy_hash)
+            self._stats["verifications"] += 1
+            return False, None
+
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        self._stats["verifications"] += 1
+        if valid and new_hash:
+            self._stats["rehashes"] += 1
+        return valid, new_hash if valid else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get operation counters and the current queue depth.
+
+        Returns:
+            Dict[str, Any]: Hasher statistics
+        """
+        return {
+            **self._stats,
+            "pending": self._pending,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "rounds": self.rounds,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the hashing threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_hasher: Optional[PasswordHasher] = None
+
+def get_password_hasher() -> PasswordHasher:
+    """
+    Get the shared password hasher for this process.
+
+    Returns:
+        PasswordHasher: The shared hasher
+    """
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher()
+    return _hasher
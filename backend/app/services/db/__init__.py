@@ -0,0 +1,13 @@
+"""
+Persistence services for the Quranic Quest application.
+"""
+
+from services.db.database import Database, demo_users, get_database
+from services.db.engine import DATABASE_URL, create_engine
+from services.db.repositories import (
+    AssessmentRepository,
+    ChildProfileRepository,
+    LearningPathRepository,
+    ProgressRepository,
+    UserRepository,
+)
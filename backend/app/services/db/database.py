@@ -0,0 +1,133 @@
+"""
+Database access for the Quranic Quest application.
+A Database owns the pooled async engine and one repository per table. The
+API shares one instance per process (see get_database), opened at startup
+and disposed at shutdown.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from services.db.engine import DATABASE_URL, create_engine
+from services.db.repositories import (
+    AssessmentRepository,
+    ChildProfileRepository,
+    LearningPathRepository,
+    ProgressRepository,
+    UserRepository,
+)
+from services.db.tables import metadata
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Schema settings (demo users are seeded by default only into SQLite databases)
+DATABASE_CREATE_TABLES = os.getenv("DATABASE_CREATE_TABLES", "true").lower() == "true"
+DATABASE_SEED_DEMO_USERS = os.getenv("DATABASE_SEED_DEMO_USERS", "").lower()
+
+def demo_users() -> list:
+    """
+    Get the prototype's demo accounts (both with the password "secret").
+
+    Returns:
+        list: User records for a parent and their child
+    """
+    now = datetime.now()
+    return [
+        {
+            "id": "user1",
+            "email": "parent@example.com",
+            "name": "Parent User",
+            "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",
+            "is_active": True,
+            "is_verified": True,
+            "role": "user",
+            "created_at": now - timedelta(days=30),
+            "updated_at": now,
+            "is_parent": True,
+            "children": ["child1"],
+            "subscription_status": "active",
+            "subscription_plan": "premium",
+            "subscription_expiry": now + timedelta(days=30),
+        },
+        {
+            "id": "child1",
+            "email": "child@example.com",
+            "name": "Child User",
+            "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",
+            "is_active": True,
+            "is_verified": True,
+            "role": "child",
+            "created_at": now - timedelta(days=30),
+            "updated_at": now,
+            "is_parent": False,
+            "parent_id": "user1",
+            "age": 10,
+        },
+    ]
+
+class Database:
+    """The connection pool and repositories for one database."""
+
+    def __init__(self, url: str = DATABASE_URL):
+        """
+        Create the engine (connections are opened lazily).
+
+        Args:
+            url: Database URL (PostgreSQL or SQLite)
+        """
+        self.engine = create_engine(url)
+        self.users = UserRepository(self.engine)
+        self.child_profiles = ChildProfileRepository(self.engine)
+        self.learning_paths = LearningPathRepository(self.engine)
+        self.progress = ProgressRepository(self.engine)
+        self.assessments = AssessmentRepository(self.engine)
+
+    @property
+    def is_sqlite(self) -> bool:
+        """Whether this is the local SQLite backend."""
+        return self.engine.dialect.name == "sqlite"
+
+    async def start(
+        self,
+        create_tables: bool = DATABASE_CREATE_TABLES,
+        seed_demo_users: Optional[bool] = None
+    ) -> None:
+        """
+        Create missing tables and seed the demo accounts.
+
+        Args:
+            create_tables: Whether to create tables that do not exist yet
+            seed_demo_users: Whether to add the demo accounts if missing
+                (defaults to DATABASE_SEED_DEMO_USERS, or to SQLite only if that is unset)
+        """
+        if create_tables:
+            async with self.engine.begin() as connection:
+                await connection.run_sync(metadata.create_all)
+
+        if seed_demo_users is None:
+            seed_demo_users = DATABASE_SEED_DEMO_USERS == "true" if DATABASE_SEED_DEMO_USERS else self.is_sqlite
+        if seed_demo_users:
+            await self.users.insert_missing(demo_users())
+
+        logger.info(f"Database ready ({self.engine.dialect.name})")
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        await self.engine.dispose()
+
+_database: Optional[Database] = None
+
+def get_database() -> Database:
+    """
+    Get the shared database for this process.
+
+    Returns:
+        Database: The shared database
+    """
+    global _database
+    if _database is None:
+        _database = Database()
+    return _database
@@ -0,0 +1,101 @@
+"""
+Database engine setup for the Quranic Quest application.
+PostgreSQL is reached through asyncpg with a bounded connection pool and a
+per-connection prepared statement cache. Without DATABASE_URL the API uses a
+local SQLite file through aiosqlite in WAL mode, so it runs without any
+external database.
+"""
+
+import os
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Database settings
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///data/quranic_quest.sqlite3")
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+DATABASE_POOL_TIMEOUT_SECONDS = float(os.getenv("DATABASE_POOL_TIMEOUT_SECONDS", "10"))
+DATABASE_POOL_RECYCLE_SECONDS = int(os.getenv("DATABASE_POOL_RECYCLE_SECONDS", "1800"))
+DATABASE_STATEMENT_CACHE_SIZE = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "256"))
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+
+# Async drivers for URLs given without one (e.g. "postgresql://...")
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "postgres": "asyncpg", "sqlite": "aiosqlite"}
+
+def normalize_database_url(url: str) -> str:
+    """
+    Make sure a database URL names an async driver.
+
+    Args:
+        url: Database URL, with or without a driver (e.g. "postgresql://...")
+
+    Returns:
+        str: The URL with its async driver
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if "+" not in parsed.drivername and backend in ASYNC_DRIVERS:
+        backend = "postgresql" if backend == "postgres" else backend
+        parsed = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return parsed.render_as_string(hide_password=False)
+
+def _configure_sqlite(dbapi_connection, connection_record) -> None:
+    """Put every new SQLite connection into WAL mode with sane concurrency settings."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
+
+def create_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    """
+    Create the async engine for a database URL.
+
+    Args:
+        url: Database URL (PostgreSQL or SQLite)
+
+    Returns:
+        AsyncEngine: The engine
+    """
+    url = normalize_database_url(url)
+    parsed = make_url(url)
+
+    if parsed.get_backend_name() == "sqlite":
+        database = parsed.database or ""
+        if not database or database == ":memory:":
+            # An in-memory database lives in one connection, so it cannot be pooled
+            engine = create_async_engine(url, echo=DATABASE_ECHO, poolclass=StaticPool)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+            engine = create_async_engine(
+                url,
+                echo=DATABASE_ECHO,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=DATABASE_POOL_SIZE,
+                max_overflow=DATABASE_MAX_OVERFLOW,
+                pool_timeout=DATABASE_POOL_TIMEOUT_SECONDS,
+                connect_args={"timeout": 30},
+            )
+        event.listen(engine.sync_engine, "connect", _configure_sqlite)
+        return engine
+
+    # asyncpg prepares every statement; keep the prepared statements of each pooled connection
+    if "prepared_statement_cache_size" not in parsed.query:
+        parsed = parsed.update_query_dict({"prepared_statement_cache_size": str(DATABASE_STATEMENT_CACHE_SIZE)})
+
+    return create_async_engine(
+        parsed,
+        echo=DATABASE_ECHO,
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_MAX_OVERFLOW,
+        pool_timeout=DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+    )
@@ -0,0 +1,571 @@
+"""
+Async repositories for the Quranic Quest application.
+Each repository wraps one table. Statements are built once at import, so
+SQLAlchemy's compiled cache and asyncpg's prepared statements are reused
+across requests. Bulk methods write many rows with one executemany; upserts
+use INSERT ... ON CONFLICT on both PostgreSQL and SQLite.
+"""
+
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import Table, bindparam, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from models.learning_path import LearningPath, LearningProgress
+from models.user import ChildProfile
+from services.db.tables import assessments, child_profiles, learning_paths, learning_progress, users
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+@lru_cache(maxsize=None)
+def upsert_statement(dialect: str, table: Table, update_columns: Optional[Sequence[str]] = None):
+    """
+    Build (once) an INSERT ... ON CONFLICT statement for a table.
+
+    Args:
+        dialect: Dialect name ("postgresql" or "sqlite")
+        table: The table
+        update_columns: Columns to overwrite on conflict (defaults to every non-key column);
+            an empty tuple inserts new rows only
+
+    Returns:
+        The insert statement
+    """
+    statement = DIALECT_INSERTS[dialect](table)
+    keys = [column.name for column in table.primary_key.columns]
+    if update_columns is None:
+        update_columns = tuple(column.name for column in table.columns if column.name not in keys)
+    if not update_columns:
+        return statement.on_conflict_do_nothing(index_elements=keys)
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: statement.excluded[name] for name in update_columns},
+    )
+
+class Repository:
+    """Shared query helpers for one table."""
+
+    table: Table
+
+    def __init__(self, engine: AsyncEngine):
+        """
+        Initialize the repository.
+
+        Args:
+            engine: The database engine
+        """
+        self.engine = engine
+
+    async def _fetch_one(self, statement, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run a query and return its first row as a dictionary."""
+        async with self.engine.connect() as connection:
+            result = await connection.execute(statement, params)
+            row = result.mappings().first()
+        return dict(row) if row is not None else None
+
+    async def _fetch_all(self, statement, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run a query and return every row as a dictionary."""
+        async with self.engine.connect() as connection:
+            result = await connection.execute(statement, params)
+            return [dict(row) for row in result.mappings()]
+
+    async def _upsert_many(
+        self,
+        rows: List[Dict[str, Any]],
+        update_columns: Optional[Sequence[str]] = None,
+        connection: Optional[AsyncConnection] = None
+    ) -> None:
+        """Insert or update many rows with one executemany."""
+        if not rows:
+            return
+        statement = upsert_statement(self.engine.dialect.name, self.table, update_columns)
+        if connection is not None:
+            await connection.execute(statement, rows)
+            return
+        async with self.engine.begin() as connection:
+            await connection.execute(statement, rows)
+
+class UserRepository(Repository):
+    """User accounts, as plain records (including the password hash)."""
+
+    table = users
+
+    _get = select(users).where(users.c.id == bindparam("user_id"))
+    _get_by_email = select(users).where(func.lower(users.c.email) == func.lower(bindparam("email")))
+    _delete = delete(users).where(users.c.id == bindparam("user_id"))
+
+    # Values for fields a record may leave out (bulk writes need every column in every row)
+    DEFAULTS = {
+        "is_active": True,
+        "is_verified": False,
+        "role": "user",
+        "learning_goals": [],
+        "is_parent": False,
+        "children": [],
+    }
+
+    def __init__(self, engine: AsyncEngine):
+        """
+        Initialize the repository.
+
+        Args:
+            engine: The database engine
+        """
+        super().__init__(engine)
+        self._change_listeners: List[Callable[[str], None]] = []
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a callback run with the user id after a user is changed or deleted.
+
+        Args:
+            listener: The callback (e.g. to drop cached authentication)
+        """
+        self._change_listeners.append(listener)
+
+    def _complete(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in every column a user record leaves out."""
+        now = datetime.now()
+        defaults = {"created_at": now, "updated_at": now, **self.DEFAULTS}
+        return {column.name: record.get(column.name, defaults.get(column.name)) for column in users.columns}
+
+    def _notify(self, user_ids: Iterable[str]) -> None:
+        """Run the change listeners for some users."""
+        for user_id in user_ids:
+            for listener in self._change_listeners:
+                try:
+                    listener(user_id)
+                except Exception as e:
+                    logger.error(f"Error in user change listener: {str(e)}")
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a user by id.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            Optional[Dict[str, Any]]: The user record, or None if there is no such user
+        """
+        return await self._fetch_one(self._get, {"user_id": user_id})
+
+    async def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a user by email address (case-insensitively).
+
+        Args:
+            email: The email address
+
+        Returns:
+            Optional[Dict[str, Any]]: The user record, or None if there is no such user
+        """
+        return await self._fetch_one(self._get_by_email, {"email": email})
+
+    async def create(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a user.
+
+        Args:
+            record: The user record (created_at and updated_at default to now)
+
+        Returns:
+            Dict[str, Any]: The stored record
+        """
+        record = self._complete(record)
+        async with self.engine.begin() as connection:
+            await connection.execute(users.insert(), record)
+        return record
+
+    async def update(self, user_id: str, **changes: Any) -> Optional[Dict[str, Any]]:
+        """
+        Update fields of a user, e.g. their role or subscription.
+
+        Args:
+            user_id: ID of the user
+            **changes: Columns to change
+
+        Returns:
+            Optional[Dict[str, Any]]: The updated record, or None if there is no such user
+        """
+        changes.setdefault("updated_at", datetime.now())
+        async with self.engine.begin() as connection:
+            await connection.execute(update(users).where(users.c.id == user_id).values(**changes))
+            result = await connection.execute(self._get, {"user_id": user_id})
+            row = result.mappings().first()
+        self._notify([user_id])
+        return dict(row) if row is not None else None
+
+    async def upsert_many(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Insert or replace many users at once.
+
+        Args:
+            records: The user records
+        """
+        records = [self._complete(record) for record in records]
+        await self._upsert_many(records)
+        self._notify(record["id"] for record in records)
+
+    async def insert_missing(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Insert users that do not exist yet, leaving existing ones untouched.
+
+        Args:
+            records: The user records
+        """
+        await self._upsert_many([self._complete(record) for record in records], update_columns=())
+
+    async def delete(self, user_id: str) -> None:
+        """
+        Delete a user.
+
+        Args:
+            user_id: ID of the user
+        """
+        async with self.engine.begin() as connection:
+            await connection.execute(self._delete, {"user_id": user_id})
+        self._notify([user_id])
+
+class ChildProfileRepository(Repository):
+    """Child profiles managed by parent accounts."""
+
+    table = child_profiles
+
+    _get = select(child_profiles).where(child_profiles.c.id == bindparam("profile_id"))
+    _list_for_parent = (
+        select(child_profiles)
+        .where(child_profiles.c.parent_id == bindparam("parent_id"))
+        .order_by(child_profiles.c.created_at)
+    )
+
+    async def get(self, profile_id: str) -> Optional[ChildProfile]:
+        """
+        Get a child profile.
+
+        Args:
+            profile_id: ID of the profile
+
+        Returns:
+            Optional[ChildProfile]: The profile, or None if there is no such profile
+        """
+        row = await self._fetch_one(self._get, {"profile_id": profile_id})
+        return ChildProfile.model_validate(row) if row is not None else None
+
+    async def list_for_parent(self, parent_id: str) -> List[ChildProfile]:
+        """
+        Get every child profile of a parent, oldest first.
+
+        Args:
+            parent_id: ID of the parent user
+
+        Returns:
+            List[ChildProfile]: The profiles
+        """
+        rows = await self._fetch_all(self._list_for_parent, {"parent_id": parent_id})
+        return [ChildProfile.model_validate(row) for row in rows]
+
+    async def save(self, profile: ChildProfile) -> ChildProfile:
+        """
+        Create or replace a child profile.
+
+        Args:
+            profile: The profile
+
+        Returns:
+            ChildProfile: The saved profile
+        """
+        await self._upsert_many([profile.model_dump()])
+        return profile
+
+    async def save_many(self, profiles: List[ChildProfile]) -> None:
+        """
+        Create or replace many child profiles at once.
+
+        Args:
+            profiles: The profiles
+        """
+        await self._upsert_many([profile.model_dump() for profile in profiles])
+
+class LearningPathRepository(Repository):
+    """Learning paths; at most one per user is active."""
+
+    table = learning_paths
+
+    _get = select(learning_paths).where(learning_paths.c.id == bindparam("path_id"))
+    _get_active = (
+        select(learning_paths)
+        .where(learning_paths.c.user_id == bindparam("user_id"), learning_paths.c.active.is_(True))
+        .order_by(learning_paths.c.created_at.desc())
+        .limit(1)
+    )
+    _list_for_user = (
+        select(learning_paths)
+        .where(learning_paths.c.user_id == bindparam("user_id"))
+        .order_by(learning_paths.c.created_at.desc())
+        .limit(bindparam("limit"))
+        .offset(bindparam("offset"))
+    )
+    _deactivate_others = (
+        update(learning_paths)
+        .where(
+            learning_paths.c.user_id == bindparam("owner_id"),
+            learning_paths.c.id != bindparam("path_id"),
+            learning_paths.c.active.is_(True),
+        )
+        .values(active=False)
+    )
+
+    async def get(self, path_id: str) -> Optional[LearningPath]:
+        """
+        Get a learning path.
+
+        Args:
+            path_id: ID of the learning path
+
+        Returns:
+            Optional[LearningPath]: The path, or None if there is no such path
+        """
+        row = await self._fetch_one(self._get, {"path_id": path_id})
+        return LearningPath.model_validate(row) if row is not None else None
+
+    async def get_active(self, user_id: str) -> Optional[LearningPath]:
+        """
+        Get a user's active learning path.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            Optional[LearningPath]: The active path, or None if the user has none
+        """
+        row = await self._fetch_one(self._get_active, {"user_id": user_id})
+        return LearningPath.model_validate(row) if row is not None else None
+
+    async def list_for_user(self, user_id: str, limit: int = 10, offset: int = 0) -> List[LearningPath]:
+        """
+        Get a user's learning paths, newest first.
+
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of paths to return
+            offset: Number of paths to skip
+
+        Returns:
+            List[LearningPath]: The paths
+        """
+        rows = await self._fetch_all(self._list_for_user, {"user_id": user_id, "limit": limit, "offset": offset})
+        return [LearningPath.model_validate(row) for row in rows]
+
+    async def save(self, path: LearningPath) -> LearningPath:
+        """
+        Create or replace a learning path, deactivating the user's other paths if it is active.
+
+        Args:
+            path: The learning path
+
+        Returns:
+            LearningPath: The saved path
+        """
+        async with self.engine.begin() as connection:
+            if path.active:
+                await connection.execute(self._deactivate_others, {"owner_id": path.user_id, "path_id": path.id})
+            await self._upsert_many([path.model_dump()], connection=connection)
+        return path
+
+class ProgressRepository(Repository):
+    """Learning progress records, appended as units are worked on."""
+
+    table = learning_progress
+
+    _list_for_user = (
+        select(learning_progress)
+        .where(learning_progress.c.user_id == bindparam("user_id"))
+        .order_by(learning_progress.c.timestamp.desc())
+        .limit(bindparam("limit"))
+    )
+    _list_for_unit = (
+        select(learning_progress)
+        .where(learning_progress.c.user_id == bindparam("user_id"), learning_progress.c.unit_id == bindparam("unit_id"))
+        .order_by(learning_progress.c.timestamp.desc())
+    )
+
+    async def add(self, progress: LearningProgress) -> LearningProgress:
+        """
+        Record progress (replacing a record with the same id, so retries are harmless).
+
+        Args:
+            progress: The progress record
+
+        Returns:
+            LearningProgress: The saved record
+        """
+        await self._upsert_many([progress.model_dump()])
+        return progress
+
+    async def add_many(self, records: List[LearningProgress]) -> None:
+        """
+        Record many progress entries at once (e.g. an offline session being synced).
+
+        Args:
+            records: The progress records
+        """
+        await self._upsert_many([record.model_dump() for record in records])
+
+    async def list_for_user(self, user_id: str, limit: int = 100) -> List[LearningProgress]:
+        """
+        Get a user's most recent progress records, newest first.
+
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of records to return
+
+        Returns:
+            List[LearningProgress]: The records
+        """
+        rows = await self._fetch_all(self._list_for_user, {"user_id": user_id, "limit": limit})
+        return [LearningProgress.model_validate(row) for row in rows]
+
+    async def list_for_unit(self, user_id: str, unit_id: str) -> List[LearningProgress]:
+        """
+        Get a user's progress records for one unit, newest first.
+
+        Args:
+            user_id: ID of the user
+            unit_id: ID of the learning unit
+
+        Returns:
+            List[LearningProgress]: The records
+        """
+        rows = await self._fetch_all(self._list_for_unit, {"user_id": user_id, "unit_id": unit_id})
+        return [LearningProgress.model_validate(row) for row in rows]
+
+class AssessmentRepository(Repository):
+    """Pronunciation assessments, stored as JSON documents with indexed summary columns."""
+
+    table = assessments
+
+    _get = select(assessments.c.data).where(assessments.c.id == bindparam("assessment_id"))
+    _list_for_user = (
+        select(assessments.c.data)
+        .where(assessments.c.user_id == bindparam("user_id"))
+        .order_by(assessments.c.created_at.desc())
+        .limit(bindparam("limit"))
+        .offset(bindparam("offset"))
+    )
+    _scores_for_user = (
+        select(assessments.c.id, assessments.c.verse_id, assessments.c.created_at, assessments.c.overall_score)
+        .where(
+            assessments.c.user_id == bindparam("user_id"),
+            assessments.c.created_at >= bindparam("start"),
+            assessments.c.created_at <= bindparam("end"),
+        )
+        .order_by(assessments.c.created_at)
+    )
+
+    @staticmethod
+    def _row(
+        assessment_id: str,
+        user_id: str,
+        data: Dict[str, Any],
+        verse_id: Optional[str] = None,
+        overall_score: Optional[float] = None,
+        created_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Build an assessments row."""
+        return {
+            "id": assessment_id,
+            "user_id": user_id,
+            "verse_id": verse_id,
+            "created_at": created_at or datetime.now(),
+            "overall_score": overall_score,
+            "data": data,
+        }
+
+    async def add(
+        self,
+        assessment_id: str,
+        user_id: str,
+        data: Dict[str, Any],
+        verse_id: Optional[str] = None,
+        overall_score: Optional[float] = None,
+        created_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Store an assessment.
+
+        Args:
+            assessment_id: ID of the assessment
+            user_id: ID of the assessed user
+            data: The assessment, JSON-encodable (e.g. from jsonable_encoder)
+            verse_id: The assessed verse
+            overall_score: The overall score, for querying without decoding data
+            created_at: When the assessment was made (defaults to now)
+        """
+        await self._upsert_many([self._row(assessment_id, user_id, data, verse_id, overall_score, created_at)])
+
+    async def add_many(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Store many assessments at once (e.g. the results of a batch upload).
+
+        Args:
+            rows: Keyword arguments of add() for each assessment
+        """
+        await self._upsert_many([self._row(**row) for row in rows])
+
+    async def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an assessment.
+
+        Args:
+            assessment_id: ID of the assessment
+
+        Returns:
+            Optional[Dict[str, Any]]: The assessment data, or None if there is no such assessment
+        """
+        row = await self._fetch_one(self._get, {"assessment_id": assessment_id})
+        return row["data"] if row is not None else None
+
+    async def list_for_user(self, user_id: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get a user's assessments, newest first.
+
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of assessments to return
+            offset: Number of assessments to skip
+
+        Returns:
+            List[Dict[str, Any]]: The assessment data
+        """
+        rows = await self._fetch_all(self._list_for_user, {"user_id": user_id, "limit": limit, "offset": offset})
+        return [row["data"] for row in rows]
+
+    async def scores_for_user(
+        self,
+        user_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the summary columns of a user's assessments, oldest first, without decoding their data.
+
+        Args:
+            user_id: ID of the user
+            start: Earliest assessment time to include
+            end: Latest assessment time to include
+
+        Returns:
+            List[Dict[str, Any]]: id, verse_id, created_at and overall_score of each assessment
+        """
+        return await self._fetch_all(self._scores_for_user, {
+            "user_id": user_id,
+            "start": start or datetime.min,
+            "end": end or datetime.max,
+        })
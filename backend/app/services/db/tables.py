@@ -0,0 +1,95 @@
+"""
+Database tables for the Quranic Quest application.
+Tables are declared with SQLAlchemy Core. List and nested fields of the API
+models (children, learning goals, learning units) are stored as JSON, so a
+row maps directly onto its pydantic model.
+"""
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text
+
+metadata = MetaData()
+
+users = Table(
+    "users",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("email", String(320), nullable=False, unique=True),
+    Column("name", String(200), nullable=False),
+    Column("hashed_password", String(200), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("is_active", Boolean, nullable=False, default=True),
+    Column("is_verified", Boolean, nullable=False, default=False),
+    Column("role", String(32), nullable=False, default="user"),
+    Column("age", Integer),
+    Column("gender", String(32)),
+    Column("language", String(32)),
+    Column("proficiency_level", String(32)),
+    Column("learning_goals", JSON, nullable=False, default=list),
+    Column("subscription_status", String(32)),
+    Column("subscription_plan", String(32)),
+    Column("subscription_expiry", DateTime),
+    Column("is_parent", Boolean, nullable=False, default=False),
+    Column("children", JSON, nullable=False, default=list),
+    Column("parent_id", String(64)),
+)
+
+child_profiles = Table(
+    "child_profiles",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("parent_id", String(64), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("name", String(200), nullable=False),
+    Column("age", Integer, nullable=False),
+    Column("gender", String(32)),
+    Column("proficiency_level", String(32), nullable=False),
+    Column("learning_goals", JSON, nullable=False, default=list),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("active_learning_path_id", String(64)),
+    Index("child_profiles_parent", "parent_id"),
+)
+
+learning_paths = Table(
+    "learning_paths",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("user_id", String(64), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("level", String(32), nullable=False),
+    Column("estimated_completion_date", DateTime, nullable=False),
+    Column("learning_units", JSON, nullable=False),
+    Column("current_unit_index", Integer, nullable=False, default=0),
+    Column("completed_unit_ids", JSON, nullable=False, default=list),
+    Column("active", Boolean, nullable=False, default=True),
+    Index("learning_paths_user", "user_id", "active", "created_at"),
+)
+
+learning_progress = Table(
+    "learning_progress",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("user_id", String(64), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("unit_id", String(64), nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Column("completed", Boolean, nullable=False, default=False),
+    Column("time_spent_minutes", Integer, nullable=False),
+    Column("score", Integer),
+    Column("accuracy_score", Integer),
+    Column("memorization_score", Integer),
+    Column("notes", Text),
+    Index("learning_progress_user", "user_id", "timestamp"),
+)
+
+assessments = Table(
+    "assessments",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("user_id", String(64), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("verse_id", String(16)),
+    Column("created_at", DateTime, nullable=False),
+    Column("overall_score", Float),
+    Column("data", JSON, nullable=False),
+    Index("assessments_user", "user_id", "created_at"),
+)
@@ -0,0 +1,31 @@
+"""
+Model inference services for the Quranic Quest application.
+"""
+
+from typing import Optional, Union
+
+from services.inference.model import PRONUNCIATION_MODEL_PATH, ScoringModel, load_scoring_model
+from services.inference.scheduler import BatchScheduler, bucket_by_length, pad_batch
+from services.inference.server import INFERENCE_SOCKET_PATH, RemoteScheduler
+
+InferenceScheduler = Union[BatchScheduler, RemoteScheduler]
+
+_scheduler: Optional[InferenceScheduler] = None
+
+def get_inference_scheduler() -> Optional[InferenceScheduler]:
+    """
+    Get the shared inference scheduler for this process.
+
+    The sidecar is used when INFERENCE_SOCKET_PATH is set, otherwise the
+    model is loaded in-process when PRONUNCIATION_MODEL_PATH is set.
+
+    Returns:
+        Optional[InferenceScheduler]: The scheduler, or None if no model is configured
+    """
+    global _scheduler
+    if _scheduler is None:
+        if INFERENCE_SOCKET_PATH:
+            _scheduler = RemoteScheduler(INFERENCE_SOCKET_PATH)
+        elif PRONUNCIATION_MODEL_PATH:
+            _scheduler = BatchScheduler()
+    return _scheduler
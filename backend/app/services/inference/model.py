@@ -0,0 +1,79 @@
+"""
+Pronunciation scoring model for the Quranic Quest application.
+The model scores a padded batch of attempt MFCC frames in one call. It is
+loaded once per scheduler (and so once per host when the inference sidecar
+is used) rather than once per request or per API worker.
+"""
+
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Model settings
+PRONUNCIATION_MODEL_PATH = os.getenv("PRONUNCIATION_MODEL_PATH", "")
+
+class ScoringModel(ABC):
+    """A model that scores a padded batch of attempts."""
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Score a batch of attempts.
+
+        Args:
+            batch: Zero-padded MFCC frames, shape (attempts, frames, dims)
+            lengths: Number of real (unpadded) frames per attempt
+
+        Returns:
+            np.ndarray: Scores, shape (attempts, outputs)
+        """
+
+    def warm_up(self, dims: int = 13) -> None:
+        """
+        Run one small batch so graph tracing and allocation happen before the first request.
+
+        Args:
+            dims: Number of feature dimensions per frame
+        """
+        self.predict(np.zeros((1, 32, dims), dtype=np.float32), np.array([32]))
+
+class KerasScoringModel(ScoringModel):
+    """Scoring model saved with TensorFlow/Keras."""
+
+    def __init__(self, path: str):
+        """
+        Load the model.
+
+        Args:
+            path: Path to a saved Keras model (.keras, .h5 or a SavedModel directory)
+        """
+        import tensorflow as tf
+
+        self.path = path
+        self.model = tf.keras.models.load_model(path, compile=False)
+
+    def predict(self, batch: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        # Padding frames are zero, which a Masking layer in the model skips
+        return np.asarray(self.model(batch, training=False), dtype=np.float32)
+
+def load_scoring_model(path: str = PRONUNCIATION_MODEL_PATH) -> Optional[ScoringModel]:
+    """
+    Load the pronunciation scoring model, if one is configured.
+
+    Args:
+        path: Path to the saved model
+
+    Returns:
+        Optional[ScoringModel]: The model, or None if no model is configured
+    """
+    if not path:
+        return None
+
+    model = KerasScoringModel(path)
+    logger.info(f"Loaded pronunciation scoring model from {path}")
+    return model
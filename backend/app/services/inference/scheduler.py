@@ -0,0 +1,246 @@
+"""
+Micro-batching inference scheduler for the Quranic Quest application.
+Concurrent scoring requests are queued and collected into micro-batches,
+bounded by a maximum batch size and a maximum wait. Each batch is sorted
+by length and split into buckets of similar length, so padding stays small,
+before the model scores every bucket in a single call.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from services.inference.model import ScoringModel, load_scoring_model
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Scheduler settings
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+INFERENCE_MAX_PADDING_RATIO = float(os.getenv("INFERENCE_MAX_PADDING_RATIO", "0.25"))
+INFERENCE_LATENCY_WINDOW = 1000
+
+@dataclass
+class _Request:
+    """A queued scoring request."""
+
+    frames: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float
+
+def pad_batch(arrays: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack arrays of different lengths into one zero-padded float32 batch.
+
+    Args:
+        arrays: Arrays padded along their first axis; any other axes must match
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The batch, shape (len(arrays), longest, ...),
+            and the original length of each array
+    """
+    lengths = np.array([len(array) for array in arrays], dtype=np.int64)
+    batch = np.zeros((len(arrays), int(lengths.max(initial=0))) + arrays[0].shape[1:], dtype=np.float32)
+    for row, array in enumerate(arrays):
+        batch[row, :len(array)] = array
+    return batch, lengths
+
+def bucket_by_length(lengths: Sequence[int], max_padding_ratio: float = INFERENCE_MAX_PADDING_RATIO) -> List[List[int]]:
+    """
+    Group items of similar length so each group can be padded cheaply.
+
+    Items are sorted by length and a new group starts whenever the next item
+    is more than max_padding_ratio longer than the shortest one in the group.
+
+    Args:
+        lengths: Length of each item
+        max_padding_ratio: Largest allowed padding, relative to the shortest item in a group
+
+    Returns:
+        List[List[int]]: Item indices per group, shortest group first
+    """
+    groups: List[List[int]] = []
+    shortest = 0
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        if not groups or lengths[index] > shortest * (1 + max_padding_ratio):
+            groups.append([])
+            shortest = lengths[index]
+        groups[-1].append(index)
+    return groups
+
+class BatchScheduler:
+    """Collects concurrent scoring requests into micro-batches for an in-process model."""
+
+    def __init__(
+        self,
+        model: Optional[ScoringModel] = None,
+        max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+        max_padding_ratio: float = INFERENCE_MAX_PADDING_RATIO
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            model: Model to score batches with (defaults to the configured model, loaded on start)
+            max_batch_size: Maximum number of requests per micro-batch
+            max_wait_ms: Longest a request waits for the batch to fill
+            max_padding_ratio: Largest allowed padding within a length bucket
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_padding_ratio = max_padding_ratio
+
+        # One model thread: the model parallelizes internally and batches need no locking
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        # The batch being collected or scored, failed by stop() if it is cancelled mid-way
+        self._batch: List[_Request] = []
+
+        self._batches = 0
+        self._requests = 0
+        self._padded_frames = 0
+        self._real_frames = 0
+        self._latencies: Deque[float] = deque(maxlen=INFERENCE_LATENCY_WINDOW)
+
+    async def start(self) -> None:
+        """Load and warm up the model, and start collecting batches."""
+        # Concurrent first submits all wait here, so the model is loaded and the task started once
+        async with self._start_lock:
+            if self._task is not None:
+                return
+
+            loop = asyncio.get_running_loop()
+            if self.model is None:
+                self.model = await loop.run_in_executor(self._executor, load_scoring_model)
+            if self.model is None:
+                raise RuntimeError("No pronunciation scoring model is configured")
+            await loop.run_in_executor(self._executor, self.model.warm_up)
+
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop collecting batches and fail the in-flight batch and any queued requests."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending = self._batch
+        self._batch = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for request in pending:
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("Inference scheduler stopped"))
+
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Score one attempt, batched with any other requests that arrive in time.
+
+        Args:
+            frames: Attempt MFCC frames, shape (frames, dims)
+
+        Returns:
+            np.ndarray: The model's scores for the attempt
+        """
+        if self._task is None:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Request(np.asarray(frames, dtype=np.float32), future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List[_Request]:
+        """Wait for a request, then gather more until the batch is full or the wait expires."""
+        self._batch = batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return [request for request in batch if not request.future.done()]
+
+    def _predict(self, frames: List[np.ndarray]) -> np.ndarray:
+        """Pad one length bucket and score it (runs on the model thread)."""
+        batch, lengths = pad_batch(frames)
+        self._padded_frames += batch.shape[0] * batch.shape[1]
+        self._real_frames += int(lengths.sum())
+        return self.model.predict(batch, lengths)
+
+    async def _run(self) -> None:
+        """Score micro-batches until cancelled."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+
+            self._batches += 1
+            self._requests += len(batch)
+
+            # Requests that arrive while this batch runs are collected into the next one
+            for group in bucket_by_length([len(request.frames) for request in batch], self.max_padding_ratio):
+                requests = [batch[index] for index in group]
+                try:
+                    scores = await loop.run_in_executor(self._executor, self._predict, [request.frames for request in requests])
+                except Exception as e:
+                    logger.error(f"Error scoring a batch of {len(requests)} attempts: {str(e)}")
+                    for request in requests:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                    continue
+
+                finished = time.perf_counter()
+                for request, score in zip(requests, scores):
+                    self._latencies.append(finished - request.enqueued_at)
+                    if not request.future.done():
+                        request.future.set_result(score)
+
+            self._batch = []
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get batching and latency statistics.
+
+        Returns:
+            Dict[str, float]: Batch counts, mean batch size, padding overhead and
+                latency percentiles (in seconds) over recent requests
+        """
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        return {
+            "batches": self._batches,
+            "requests": self._requests,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+            "padding_overhead": self._padded_frames / self._real_frames - 1 if self._real_frames else 0.0,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p99": float(np.percentile(latencies, 99)),
+        }
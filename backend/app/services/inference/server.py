@@ -0,0 +1,157 @@
+"""
+Inference sidecar for the Quranic Quest application.
+Each API worker process would otherwise load its own copy of the scoring
+model. The sidecar loads it once per host and serves every worker over a
+Unix socket, so requests from all workers are batched together.
+
+Run the sidecar (from the backend/app directory) and point the API at it:
+    python -m services.inference.server --socket /tmp/quran-quest-inference.sock
+    INFERENCE_SOCKET_PATH=/tmp/quran-quest-inference.sock uvicorn main:app --workers 4
+"""
+
+import os
+import struct
+import asyncio
+import logging
+import argparse
+from typing import Dict, Optional
+import numpy as np
+
+from services.inference.scheduler import BatchScheduler
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Sidecar settings
+INFERENCE_SOCKET_PATH = os.getenv("INFERENCE_SOCKET_PATH", "")
+
+# Wire format: a request is a (frames, dims) header followed by float32 frames;
+# a response is a (status, length) header followed by float32 scores or a UTF-8 error
+REQUEST_HEADER = struct.Struct("<II")
+RESPONSE_HEADER = struct.Struct("<BI")
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+class InferenceServer:
+    """Serves a BatchScheduler to other processes over a Unix socket."""
+
+    def __init__(self, scheduler: BatchScheduler, socket_path: str):
+        """
+        Initialize the server.
+
+        Args:
+            scheduler: Scheduler that owns the model
+            socket_path: Path of the Unix socket to listen on
+        """
+        self.scheduler = scheduler
+        self.socket_path = socket_path
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer scoring requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    frames, dims = REQUEST_HEADER.unpack(await reader.readexactly(REQUEST_HEADER.size))
+                    body = await reader.readexactly(frames * dims * 4)
+                except asyncio.IncompleteReadError:
+                    return
+
+                attempt = np.frombuffer(body, dtype="<f4").reshape(frames, dims)
+                try:
+                    scores = np.asarray(await self.scheduler.submit(attempt), dtype="<f4").tobytes()
+                    writer.write(RESPONSE_HEADER.pack(STATUS_OK, len(scores)) + scores)
+                except Exception as e:
+                    message = str(e).encode("utf-8")
+                    writer.write(RESPONSE_HEADER.pack(STATUS_ERROR, len(message)) + message)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Load the model and serve requests until cancelled."""
+        await self.scheduler.start()
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        logger.info(f"Inference sidecar listening on {self.socket_path}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.scheduler.stop()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+class RemoteScheduler:
+    """Client for an inference sidecar, with the same interface as BatchScheduler."""
+
+    def __init__(self, socket_path: str = INFERENCE_SOCKET_PATH):
+        """
+        Initialize the client.
+
+        Args:
+            socket_path: Path of the sidecar's Unix socket
+        """
+        self.socket_path = socket_path
+        self._requests = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        """Nothing to start; the sidecar owns the model."""
+
+    async def stop(self) -> None:
+        """Nothing to stop; connections are per request."""
+
+    async def submit(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Score one attempt on the sidecar.
+
+        Args:
+            frames: Attempt MFCC frames, shape (frames, dims)
+
+        Returns:
+            np.ndarray: The model's scores for the attempt
+        """
+        frames = np.ascontiguousarray(frames, dtype="<f4")
+        self._requests += 1
+
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            writer.write(REQUEST_HEADER.pack(*frames.shape) + frames.tobytes())
+            await writer.drain()
+
+            status, length = RESPONSE_HEADER.unpack(await reader.readexactly(RESPONSE_HEADER.size))
+            body = await reader.readexactly(length)
+        finally:
+            writer.close()
+
+        if status != STATUS_OK:
+            self._errors += 1
+            raise RuntimeError(f"Inference sidecar error: {body.decode('utf-8')}")
+        return np.frombuffer(body, dtype="<f4").copy()
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get request counters for this client.
+
+        Returns:
+            Dict[str, float]: Requests sent and errors returned
+        """
+        return {"requests": self._requests, "errors": self._errors}
+
+def main(socket_path: Optional[str] = None) -> None:
+    """Command-line entry point for the inference sidecar."""
+    parser = argparse.ArgumentParser(description="Run the pronunciation model inference sidecar")
+    parser.add_argument("--socket", default=socket_path or INFERENCE_SOCKET_PATH or "/tmp/quran-quest-inference.sock")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(InferenceServer(BatchScheduler(), args.socket).serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
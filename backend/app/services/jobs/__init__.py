@@ -0,0 +1,5 @@
+"""
+Background job services for the Quranic Quest application.
+"""
+
+from services.jobs.queue import Broker, Job, JobQueue, SQLiteBroker, job_queue
@@ -0,0 +1,317 @@
+"""
+Durable job queue for the Quranic Quest application.
+Long-running work such as pronunciation assessment is submitted as a job and
+drained by a pool of local worker processes. The queue sits behind a small
+Broker interface; the default SQLiteBroker needs no external services.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Queue settings
+JOB_DATABASE_PATH = os.getenv("JOB_DATABASE_PATH", "data/jobs.sqlite3")
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+JOB_VISIBILITY_TIMEOUT_SECONDS = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "0.5"))
+
+# Priority lanes: higher lanes are always drained first
+PRIORITY_LANES = {"interactive": 20, "default": 10, "bulk": 0}
+
+# Job statuses
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+TERMINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+
+@dataclass
+class Job:
+    """A unit of queued work."""
+
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    priority: int = PRIORITY_LANES["default"]
+    status: str = STATUS_QUEUED
+    attempts: int = 0
+    max_attempts: int = JOB_MAX_ATTEMPTS
+    available_at: float = field(default_factory=time.time)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    claimed_by: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the job to a dictionary for API responses (without its payload)."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+class Broker(ABC):
+    """Storage and claiming interface for queued jobs."""
+
+    @abstractmethod
+    def submit(self, job: Job) -> Job:
+        """Add a job to the queue."""
+
+    @abstractmethod
+    def claim(self, worker_id: str, batch_size: int = 1) -> List[Job]:
+        """Claim up to batch_size available jobs, highest priority first."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        """Mark a job still claimed by the worker as completed; returns whether it was."""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Record a failed attempt of a job still claimed by the worker, retrying with backoff until attempts run out."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Count jobs by status."""
+
+class SQLiteBroker(Broker):
+    """Broker backed by a SQLite database in WAL mode, shared by every local process."""
+
+    def __init__(self, path: str = JOB_DATABASE_PATH):
+        """
+        Open (and if needed create) the job database.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+              id TEXT PRIMARY KEY,
+              kind TEXT NOT NULL,
+              payload TEXT NOT NULL,
+              priority INTEGER NOT NULL,
+              status TEXT NOT NULL,
+              attempts INTEGER NOT NULL DEFAULT 0,
+              max_attempts INTEGER NOT NULL,
+              available_at REAL NOT NULL,
+              created_at REAL NOT NULL,
+              updated_at REAL NOT NULL,
+              claimed_by TEXT,
+              result TEXT,
+              error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, available_at);
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the database."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        """Convert a database row to a Job."""
+        return Job(
+            id=row["id"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]),
+            priority=row["priority"],
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            available_at=row["available_at"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            claimed_by=row["claimed_by"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+        )
+
+    def submit(self, job: Job) -> Job:
+        self._connection().execute(
+            """
+            INSERT INTO jobs (id, kind, payload, priority, status, attempts, max_attempts,
+                              available_at, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job.id, job.kind, json.dumps(job.payload), job.priority, job.status, job.attempts,
+             job.max_attempts, job.available_at, job.created_at, job.updated_at),
+        )
+        return job
+
+    def claim(self, worker_id: str, batch_size: int = 1) -> List[Job]:
+        now = time.time()
+        connection = self._connection()
+
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                """
+                UPDATE jobs
+                SET status = ?, claimed_by = ?, attempts = attempts + 1, updated_at = ?,
+                    available_at = ?
+                WHERE id IN (
+                  SELECT id FROM jobs
+                  WHERE (status = ? AND available_at <= ?) OR (status = ? AND available_at <= ?)
+                  ORDER BY priority DESC, available_at
+                  LIMIT ?
+                )
+                RETURNING *
+                """,
+                (STATUS_RUNNING, worker_id, now, now + JOB_VISIBILITY_TIMEOUT_SECONDS,
+                 STATUS_QUEUED, now, STATUS_RUNNING, now, batch_size),
+            ).fetchall()
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        return sorted((self._to_job(row) for row in rows), key=lambda job: (-job.priority, job.created_at))
+
+    # Outcomes are only recorded while the worker still holds the claim; a job
+    # whose visibility timeout ran out may have been claimed by another worker
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        cursor = self._connection().execute(
+            """
+            UPDATE jobs SET status = ?, result = ?, error = NULL, updated_at = ?
+            WHERE id = ? AND claimed_by = ? AND status = ?
+            """,
+            (STATUS_COMPLETED, json.dumps(result), time.time(), job_id, worker_id, STATUS_RUNNING),
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END,
+                available_at = CASE WHEN attempts >= max_attempts THEN ? ELSE ? + ? * (1 << (attempts - 1)) END,
+                error = ?, updated_at = ?
+            WHERE id = ? AND claimed_by = ? AND status = ?
+            """,
+            (STATUS_FAILED, STATUS_QUEUED, now, now, JOB_RETRY_BASE_SECONDS, error, now,
+             job_id, worker_id, STATUS_RUNNING),
+        )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+class JobQueue:
+    """Async facade over a broker, used by the API routes."""
+
+    def __init__(self, broker: Optional[Broker] = None):
+        """
+        Initialize the job queue.
+
+        Args:
+            broker: Broker to store jobs in (defaults to a SQLiteBroker)
+        """
+        self._broker = broker
+
+    @property
+    def broker(self) -> Broker:
+        """The broker, created on first use."""
+        if self._broker is None:
+            self._broker = SQLiteBroker()
+        return self._broker
+
+    async def submit(self, kind: str, payload: Dict[str, Any], lane: str = "default") -> Job:
+        """
+        Submit a job.
+
+        Args:
+            kind: Kind of job (selects the worker handler)
+            payload: JSON-serializable job input
+            lane: Priority lane ("interactive", "default" or "bulk")
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(id=str(uuid.uuid4()), kind=kind, payload=payload, priority=PRIORITY_LANES.get(lane, PRIORITY_LANES["default"]))
+        return await run_in_threadpool(self.broker.submit, job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            Optional[Job]: The job, or None if it does not exist
+        """
+        return await run_in_threadpool(self.broker.get, job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Job]:
+        """
+        Yield the job each time its status changes, until it finishes.
+
+        Args:
+            job_id: The job ID
+
+        Yields:
+            Job: The job after each status change
+        """
+        last_seen = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+
+            if (job.status, job.attempts) != last_seen:
+                last_seen = (job.status, job.attempts)
+                yield job
+
+            if job.status in TERMINAL_STATUSES:
+                return
+
+            await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+    async def stats(self) -> Dict[str, int]:
+        """Count jobs by status."""
+        return await run_in_threadpool(self.broker.stats)
+
+# Shared job queue for this process
+job_queue = JobQueue()
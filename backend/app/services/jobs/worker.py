@@ -0,0 +1,228 @@
+"""
+Local worker processes for the Quranic Quest job queue.
+Each worker claims batches of jobs from the broker, highest priority lane
+first, runs them and records the result. Failed jobs are retried with
+exponential backoff until they run out of attempts.
+
+Run workers separately (from the backend/app directory):
+    python -m services.jobs.worker --workers 4
+
+or set JOB_WORKERS to have the API start them on startup.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import argparse
+import multiprocessing
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+
+from services.jobs.queue import Broker, Job, SQLiteBroker
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Worker settings
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "0"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "4"))
+JOB_IDLE_SLEEP_SECONDS = float(os.getenv("JOB_IDLE_SLEEP_SECONDS", "0.2"))
+
+# Job kinds
+ASSESSMENT_JOB = "pronunciation_assessment"
+
+JobHandler = Callable[[Job], Awaitable[Any]]
+
+_pronunciation_service = None
+
+def _get_pronunciation_service():
+    """Get this worker process's pronunciation service, running the audio pipeline inline."""
+    global _pronunciation_service
+    if _pronunciation_service is None:
+        from services.audio import AudioExecutor, AudioProcessingService
+        from services.pronunciation import PronunciationService
+
+        # The worker is already its own process, so it does not start an audio pool of its own
+        _pronunciation_service = PronunciationService(AudioProcessingService(AudioExecutor(mode="inline")))
+    return _pronunciation_service
+
+async def handle_assessment(job: Job) -> Any:
+    """
+    Run the audio pipeline and pronunciation scoring for a queued upload.
+
+    This takes the same path as /assess: the assessment and feature caches,
+    verse identification, reference alignment and model scoring.
+
+    Args:
+        job: The assessment job
+
+    Returns:
+        Any: The JSON-encoded assessment
+    """
+    payload = job.payload
+    assessment = await _get_pronunciation_service().assess_upload(
+        payload["path"],
+        payload["filename"],
+        payload["sha256"],
+        payload.get("verse_id"),
+        payload["user_id"]
+    )
+    return jsonable_encoder(assessment)
+
+def _remove_upload(job: Job) -> None:
+    """Delete a job's spooled upload, if it has one."""
+    path = job.payload.get("path")
+    if path and os.path.exists(path):
+        os.remove(path)
+
+class Worker:
+    """Claims and runs jobs from a broker."""
+
+    def __init__(
+        self,
+        worker_id: str,
+        broker: Broker,
+        handlers: Dict[str, JobHandler],
+        batch_size: int = JOB_BATCH_SIZE
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            worker_id: Identifier recorded on claimed jobs
+            broker: Broker to claim jobs from
+            handlers: Handler for each job kind
+            batch_size: Maximum number of jobs claimed at once
+        """
+        self.worker_id = worker_id
+        self.broker = broker
+        self.handlers = handlers
+        self.batch_size = batch_size
+
+    async def run_job(self, job: Job) -> None:
+        """
+        Run one job and record its outcome.
+
+        Args:
+            job: The claimed job
+        """
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind: {job.kind}")
+            if job.attempts > job.max_attempts:
+                raise RuntimeError("Job exceeded its maximum attempts")
+
+            result = await handler(job)
+            if not self.broker.complete(job.id, self.worker_id, result):
+                logger.warning(f"Job {job.id} finished by {self.worker_id} after its claim expired; result discarded")
+                return
+            _remove_upload(job)
+            logger.info(f"Job {job.id} completed by {self.worker_id}")
+
+        except Exception as e:
+            logger.error(f"Job {job.id} failed on attempt {job.attempts}: {str(e)}")
+            if self.broker.fail(job.id, self.worker_id, str(e)) and job.attempts >= job.max_attempts:
+                _remove_upload(job)
+
+    async def run_once(self) -> int:
+        """
+        Claim and run one batch of jobs.
+
+        Returns:
+            int: Number of jobs run
+        """
+        jobs = self.broker.claim(self.worker_id, self.batch_size)
+        for job in jobs:
+            await self.run_job(job)
+        return len(jobs)
+
+    async def run(self, stop_event: Optional[Any] = None) -> None:
+        """
+        Run until the stop event is set.
+
+        Args:
+            stop_event: Event that stops the worker when set
+        """
+        logger.info(f"Job worker {self.worker_id} started")
+        while stop_event is None or not stop_event.is_set():
+            if not await self.run_once():
+                await asyncio.sleep(JOB_IDLE_SLEEP_SECONDS)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+def run_worker(worker_id: str, stop_event: Optional[Any] = None) -> None:
+    """
+    Entry point for a worker process.
+
+    Args:
+        worker_id: Identifier recorded on claimed jobs
+        stop_event: Event that stops the worker when set
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    worker = Worker(worker_id, SQLiteBroker(), {ASSESSMENT_JOB: handle_assessment})
+    asyncio.run(worker.run(stop_event))
+
+class WorkerPool:
+    """A pool of local worker processes."""
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of worker processes
+        """
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._processes: List[multiprocessing.process.BaseProcess] = []
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        for index in range(self.workers):
+            process = self._context.Process(
+                target=run_worker,
+                args=(f"{os.getpid()}-{index}", self._stop_event),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        if self.workers:
+            logger.info(f"Started {self.workers} job workers")
+
+    def join(self) -> None:
+        """Wait for every worker process to exit."""
+        for process in self._processes:
+            process.join()
+
+    def stop(self, timeout: float = 30) -> None:
+        """
+        Ask the workers to stop after their current batch, and wait for them.
+
+        Args:
+            timeout: Seconds to wait for all workers to exit
+        """
+        self._stop_event.set()
+        deadline = time.time() + timeout
+        for process in self._processes:
+            process.join(max(0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+def main() -> None:
+    """Command-line entry point for running job workers."""
+    parser = argparse.ArgumentParser(description="Run job queue workers")
+    parser.add_argument("--workers", type=int, default=max(1, JOB_WORKERS or (os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()
+
+if __name__ == "__main__":
+    main()
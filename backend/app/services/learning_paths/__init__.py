@@ -0,0 +1,8 @@
+"""
+Learning path services for the Quranic Quest application.
+"""
+
+from services.learning_paths.catalog import CatalogStore, UnitCatalog, get_catalog_store, load_catalog
+from services.learning_paths.planner import PlanRequest, knapsack, plan_units
+from services.learning_paths.service import LearningPathService
+from services.learning_paths.scheduler import AdjustmentScheduler, coalesce_progress, get_adjustment_scheduler
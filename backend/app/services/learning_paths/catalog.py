@@ -0,0 +1,337 @@
+"""
+Learning unit catalog for the Quranic Quest application.
+Every unit definition under data/learning_units is compiled into flat arrays
+with an index per attribute: boolean masks by difficulty, content type and
+tag, and sorted orders over duration and verse position. A query is a few
+mask intersections and binary searches, never a scan over unit objects.
+
+The catalog is hot-reloadable: the store re-checks the source files at most
+every UNIT_CATALOG_RELOAD_SECONDS and swaps in a freshly compiled catalog
+when they change, without a restart.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from models.learning_path import LearningUnit
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Catalog settings
+UNIT_CATALOG_DIRECTORY = os.getenv("UNIT_CATALOG_DIRECTORY", "data/learning_units")
+UNIT_CATALOG_RELOAD_SECONDS = float(os.getenv("UNIT_CATALOG_RELOAD_SECONDS", "5"))
+
+DIFFICULTY_LEVELS = (1, 2, 3, 4, 5)
+NO_VERSE = -1
+
+def verse_position(verse_id: str) -> int:
+    """
+    Map a verse id to a sortable position.
+
+    Args:
+        verse_id: Verse id ("surah:ayah")
+
+    Returns:
+        int: surah * 1000 + ayah
+    """
+    surah, ayah = verse_id.split(":")
+    return int(surah) * 1000 + int(ayah)
+
+class UnitCatalog:
+    """All learning units, compiled into indexed arrays."""
+
+    def __init__(self, definitions: List[Dict[str, Any]], fingerprint: str = ""):
+        """
+        Compile unit definitions.
+
+        Args:
+            definitions: LearningUnit fields (without order and completed) plus optional "tags"
+            fingerprint: Identifies the source files the catalog was compiled from
+        """
+        self.fingerprint = fingerprint
+        self.definitions = definitions
+        self.ids = [definition["id"] for definition in definitions]
+        self.positions = {unit_id: index for index, unit_id in enumerate(self.ids)}
+        count = len(definitions)
+
+        self.difficulty = np.fromiter((definition["difficulty"] for definition in definitions), dtype=np.int8, count=count)
+        self.duration = np.fromiter(
+            (definition["estimated_duration_minutes"] for definition in definitions), dtype=np.int32, count=count
+        )
+
+        self.content_types = sorted({definition["content_type"] for definition in definitions})
+        content_codes = {content_type: code for code, content_type in enumerate(self.content_types)}
+        self.content_type = np.fromiter(
+            (content_codes[definition["content_type"]] for definition in definitions), dtype=np.int16, count=count
+        )
+
+        verse_starts, verse_ends = [], []
+        for definition in definitions:
+            verses = [verse_position(verse_id) for verse_id in definition.get("verses", [])]
+            verse_starts.append(min(verses) if verses else NO_VERSE)
+            verse_ends.append(max(verses) if verses else NO_VERSE)
+        self.verse_start = np.array(verse_starts, dtype=np.int32)
+        self.verse_end = np.array(verse_ends, dtype=np.int32)
+
+        # Equality indexes: one mask per value
+        self.by_difficulty = {level: self.difficulty == level for level in DIFFICULTY_LEVELS}
+        self.by_content_type = {content_type: self.content_type == code for content_type, code in content_codes.items()}
+        self.by_tag: Dict[str, np.ndarray] = {}
+        for index, definition in enumerate(definitions):
+            for tag in definition.get("tags", []):
+                self.by_tag.setdefault(tag, np.zeros(count, dtype=bool))[index] = True
+        self.without_verses = self.verse_start == NO_VERSE
+
+        # Range indexes: unit indices sorted by the attribute, plus the sorted values
+        self.duration_order = np.argsort(self.duration, kind="stable")
+        self.sorted_duration = self.duration[self.duration_order]
+        with_verses = np.flatnonzero(~self.without_verses)
+        self.verse_order = with_verses[np.argsort(self.verse_start[with_verses], kind="stable")]
+        self.sorted_verse_start = self.verse_start[self.verse_order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _range_mask(self, order: np.ndarray, sorted_values: np.ndarray, low: int, high: int) -> np.ndarray:
+        """Mask of units whose value (through a sorted order) lies in [low, high]."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[order[np.searchsorted(sorted_values, low, "left"):np.searchsorted(sorted_values, high, "right")]] = True
+        return mask
+
+    def query(
+        self,
+        difficulties: Optional[Iterable[int]] = None,
+        content_types: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[str]] = None,
+        max_duration: Optional[int] = None,
+        verse_range: Optional[Tuple[str, str]] = None,
+        exclude_ids: Iterable[str] = ()
+    ) -> np.ndarray:
+        """
+        Find the units matching every given filter.
+
+        Args:
+            difficulties: Allowed difficulty levels
+            content_types: Allowed content types
+            tags: Tags, of which a unit needs at least one
+            max_duration: Longest allowed estimated duration in minutes
+            verse_range: First and last verse id; units with verses must lie inside it
+                (units without verses, such as lessons, always pass)
+            exclude_ids: Unit ids to leave out
+
+        Returns:
+            np.ndarray: Indices of the matching units
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if difficulties is not None:
+            mask &= np.logical_or.reduce([self.by_difficulty.get(level, False) for level in difficulties] or [False])
+        if content_types is not None:
+            mask &= np.logical_or.reduce([self.by_content_type.get(content_type, False) for content_type in content_types] or [False])
+        if tags is not None:
+            tag_masks = [self.by_tag[tag] for tag in tags if tag in self.by_tag]
+            if tag_masks:
+                mask &= np.logical_or.reduce(tag_masks)
+        if max_duration is not None:
+            mask &= self._range_mask(self.duration_order, self.sorted_duration, 0, max_duration)
+        if verse_range is not None:
+            first, last = verse_position(verse_range[0]), verse_position(verse_range[1])
+            inside = self._range_mask(self.verse_order, self.sorted_verse_start, first, last)
+            inside &= self.verse_end <= last
+            mask &= inside | self.without_verses
+
+        for unit_id in exclude_ids:
+            position = self.positions.get(unit_id)
+            if position is not None:
+                mask[position] = False
+
+        return np.flatnonzero(mask)
+
+    def tag_matches(self, indices: np.ndarray, tags: Iterable[str]) -> np.ndarray:
+        """
+        Count how many of some tags each unit has.
+
+        Args:
+            indices: Unit indices
+            tags: The tags
+
+        Returns:
+            np.ndarray: Number of matching tags per unit
+        """
+        counts = np.zeros(len(indices), dtype=np.int32)
+        for tag in tags:
+            tag_mask = self.by_tag.get(tag)
+            if tag_mask is not None:
+                counts += tag_mask[indices]
+        return counts
+
+    def unit(self, index: int, order: int = 0, completed: bool = False) -> LearningUnit:
+        """
+        Materialize one unit.
+
+        Args:
+            index: Unit index
+            order: Its order in a learning path
+            completed: Whether it has been completed
+
+        Returns:
+            LearningUnit: The unit
+        """
+        definition = self.definitions[index]
+        return LearningUnit(
+            id=definition["id"],
+            title=definition["title"],
+            description=definition["description"],
+            content_type=definition["content_type"],
+            difficulty=definition["difficulty"],
+            estimated_duration_minutes=definition["estimated_duration_minutes"],
+            order=order,
+            completed=completed,
+            verses=definition.get("verses", []),
+        )
+
+def catalog_files(directory: str = UNIT_CATALOG_DIRECTORY) -> List[str]:
+    """
+    List the unit definition files.
+
+    Args:
+        directory: Catalog directory
+
+    Returns:
+        List[str]: Paths of the JSON files, sorted
+    """
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(".json")]
+
+def fingerprint_files(paths: Sequence[str]) -> str:
+    """
+    Fingerprint source files by name, size and modification time.
+
+    Args:
+        paths: The files
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+def load_catalog(directory: str = UNIT_CATALOG_DIRECTORY) -> UnitCatalog:
+    """
+    Load and compile every unit definition in a directory.
+
+    Each file holds a JSON list of units; empty files are skipped, and a unit
+    id defined twice keeps its last definition.
+
+    Args:
+        directory: Catalog directory
+
+    Returns:
+        UnitCatalog: The compiled catalog
+    """
+    paths = catalog_files(directory)
+    definitions: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as catalog_file:
+            content = catalog_file.read()
+        for definition in json.loads(content) if content.strip() else []:
+            definitions[definition["id"]] = definition
+    return UnitCatalog(list(definitions.values()), fingerprint_files(paths))
+
+class CatalogStore:
+    """Holds the current catalog and swaps in a new one when its files change."""
+
+    def __init__(self, directory: str = UNIT_CATALOG_DIRECTORY, reload_seconds: float = UNIT_CATALOG_RELOAD_SECONDS):
+        """
+        Initialize the store (the catalog is loaded on first use).
+
+        Args:
+            directory: Catalog directory
+            reload_seconds: Minimum time between checks of the source files
+        """
+        self.directory = directory
+        self.reload_seconds = reload_seconds
+        self._catalog: Optional[UnitCatalog] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def catalog(self) -> UnitCatalog:
+        """The current catalog, loaded synchronously if there is none yet."""
+        if self._catalog is None:
+            self._catalog = load_catalog(self.directory)
+            self._checked_at = time.monotonic()
+        return self._catalog
+
+    async def get(self) -> UnitCatalog:
+        """
+        Get the current catalog, recompiling it off the event loop if its files changed.
+
+        Returns:
+            UnitCatalog: The catalog
+        """
+        if self._catalog is not None and time.monotonic() - self._checked_at < self.reload_seconds:
+            return self._catalog
+
+        # While one request recompiles, the others keep using the previous catalog
+        if self._catalog is not None and self._lock.locked():
+            return self._catalog
+
+        async with self._lock:
+            if self._catalog is None or time.monotonic() - self._checked_at >= self.reload_seconds:
+                await self.reload(force=self._catalog is None)
+        return self._catalog
+
+    async def reload(self, force: bool = False) -> bool:
+        """
+        Recompile the catalog if its files changed.
+
+        Args:
+            force: Recompile even if the files look unchanged
+
+        Returns:
+            bool: Whether a new catalog was swapped in
+        """
+        self._checked_at = time.monotonic()
+        try:
+            fingerprint = await run_in_threadpool(lambda: fingerprint_files(catalog_files(self.directory)))
+            if not force and self._catalog is not None and fingerprint == self._catalog.fingerprint:
+                return False
+
+            catalog = await run_in_threadpool(load_catalog, self.directory)
+        except Exception as e:
+            # Keep serving the previous catalog if the new files are broken
+            logger.error(f"Error reloading unit catalog: {str(e)}")
+            if self._catalog is None:
+                raise
+            return False
+
+        self._catalog = catalog
+        logger.info(f"Loaded unit catalog with {len(catalog)} units from {self.directory}")
+        return True
+
+_store: Optional[CatalogStore] = None
+
+def get_catalog_store() -> CatalogStore:
+    """
+    Get the shared unit catalog store for this process.
+
+    Returns:
+        CatalogStore: The shared store
+    """
+    global _store
+    if _store is None:
+        _store = CatalogStore()
+    return _store
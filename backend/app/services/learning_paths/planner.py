@@ -0,0 +1,192 @@
+"""
+Learning path planning for the Quranic Quest application.
+A path is planned in two steps: the catalog indexes narrow the units down to
+the ones that suit the learner (difficulty window, content types, verse
+range, at most one session long), then a 0/1 knapsack picks the most
+valuable set of those units that fits the learner's time budget.
+"""
+
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from services.learning_paths.catalog import UnitCatalog
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Planning settings
+PLAN_MAX_CANDIDATES = int(os.getenv("PLAN_MAX_CANDIDATES", "512"))  # Units the knapsack chooses from
+PLAN_MAX_BUDGET_MINUTES = int(os.getenv("PLAN_MAX_BUDGET_MINUTES", "1200"))
+PLAN_DEFAULT_MINUTES_PER_DAY = int(os.getenv("PLAN_DEFAULT_MINUTES_PER_DAY", "15"))
+PLAN_DEFAULT_DAYS_PER_WEEK = int(os.getenv("PLAN_DEFAULT_DAYS_PER_WEEK", "5"))
+PLAN_DEFAULT_WEEKS = int(os.getenv("PLAN_DEFAULT_WEEKS", "4"))
+
+# Target difficulty for each self-reported proficiency level
+PROFICIENCY_DIFFICULTY = {
+    "beginner": 1,
+    "elementary": 2,
+    "intermediate": 3,
+    "advanced": 4,
+    "expert": 5,
+}
+
+@dataclass
+class PlanRequest:
+    """What a learning path is planned for."""
+
+    target_difficulty: int
+    budget_minutes: int
+    session_minutes: int
+    goals: List[str] = field(default_factory=list)
+    content_types: Optional[List[str]] = None
+    verse_range: Optional[Tuple[str, str]] = None
+    exclude_ids: List[str] = field(default_factory=list)
+
+def level_for(target_difficulty: int) -> str:
+    """
+    Name the learning level of a target difficulty.
+
+    Args:
+        target_difficulty: Difficulty (1-5)
+
+    Returns:
+        str: beginner, intermediate or advanced
+    """
+    if target_difficulty <= 2:
+        return "beginner"
+    if target_difficulty == 3:
+        return "intermediate"
+    return "advanced"
+
+def target_difficulty_for(
+    age: int,
+    proficiency_level: str,
+    assessment_results: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Choose the difficulty a learner should mostly work at.
+
+    Args:
+        age: Age of the learner
+        proficiency_level: Self-reported proficiency level
+        assessment_results: Optional assessment results; an "overall_score" (0-100) moves the target
+
+    Returns:
+        int: Difficulty (1-5)
+    """
+    difficulty = PROFICIENCY_DIFFICULTY.get(proficiency_level.lower(), 2)
+
+    # Young children start gently whatever their reported level
+    if age < 8:
+        difficulty = min(difficulty, 2)
+
+    score = (assessment_results or {}).get("overall_score")
+    if score is not None:
+        if score >= 85:
+            difficulty += 1
+        elif score < 50:
+            difficulty -= 1
+
+    return int(np.clip(difficulty, 1, 5))
+
+def budget_for(time_commitment: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Work out the time budget of a path from a learner's time commitment.
+
+    Args:
+        time_commitment: Optional "minutes_per_day", "days_per_week" and "weeks"
+
+    Returns:
+        Tuple[int, int]: Total budget and the length of one session, in minutes
+    """
+    minutes_per_day = int(time_commitment.get("minutes_per_day", PLAN_DEFAULT_MINUTES_PER_DAY))
+    days_per_week = int(time_commitment.get("days_per_week", PLAN_DEFAULT_DAYS_PER_WEEK))
+    weeks = int(time_commitment.get("weeks", PLAN_DEFAULT_WEEKS))
+    budget = min(max(minutes_per_day * days_per_week * weeks, 1), PLAN_MAX_BUDGET_MINUTES)
+    return budget, max(minutes_per_day, 1)
+
+def unit_values(catalog: UnitCatalog, indices: np.ndarray, request: PlanRequest) -> np.ndarray:
+    """
+    Score how useful each candidate unit is to the learner.
+
+    Args:
+        catalog: The unit catalog
+        indices: Candidate unit indices
+        request: The plan request
+
+    Returns:
+        np.ndarray: Value per unit (matching goals and the target difficulty score higher)
+    """
+    closeness = 2.0 - np.abs(catalog.difficulty[indices].astype(np.float64) - request.target_difficulty)
+    return 1.0 + 2.0 * catalog.tag_matches(indices, request.goals) + closeness
+
+def knapsack(weights: np.ndarray, values: np.ndarray, capacity: int) -> np.ndarray:
+    """
+    Solve a 0/1 knapsack exactly.
+
+    The table over capacities is updated one item at a time with whole-array
+    operations, so the cost is O(items * capacity) in numpy rather than Python.
+
+    Args:
+        weights: Integer weight per item
+        values: Value per item
+        capacity: Total weight allowed
+
+    Returns:
+        np.ndarray: Indices of the chosen items
+    """
+    best = np.zeros(capacity + 1, dtype=np.float64)
+    keep = np.zeros((len(weights), capacity + 1), dtype=bool)
+
+    for item, (weight, value) in enumerate(zip(weights, values)):
+        if weight > capacity:
+            continue
+        with_item = best[:capacity + 1 - weight] + value
+        improved = with_item > best[weight:]
+        keep[item, weight:] = improved
+        best[weight:] = np.where(improved, with_item, best[weight:])
+
+    chosen = []
+    remaining = capacity
+    for item in range(len(weights) - 1, -1, -1):
+        if keep[item, remaining]:
+            chosen.append(item)
+            remaining -= weights[item]
+    return np.array(chosen[::-1], dtype=np.int64)
+
+def plan_units(catalog: UnitCatalog, request: PlanRequest) -> np.ndarray:
+    """
+    Choose the units of a learning path.
+
+    Args:
+        catalog: The unit catalog
+        request: The plan request
+
+    Returns:
+        np.ndarray: Chosen unit indices, easiest first and in verse order
+    """
+    difficulties = range(max(1, request.target_difficulty - 1), min(5, request.target_difficulty + 1) + 1)
+    candidates = catalog.query(
+        difficulties=difficulties,
+        content_types=request.content_types,
+        max_duration=request.session_minutes,
+        verse_range=request.verse_range,
+        exclude_ids=request.exclude_ids,
+    )
+    if len(candidates) == 0:
+        return candidates
+
+    values = unit_values(catalog, candidates, request)
+    durations = np.maximum(catalog.duration[candidates], 1)
+
+    # Bound the knapsack by keeping the candidates with the best value per minute
+    if len(candidates) > PLAN_MAX_CANDIDATES:
+        density = values / durations
+        best = np.argpartition(-density, PLAN_MAX_CANDIDATES - 1)[:PLAN_MAX_CANDIDATES]
+        candidates, values, durations = candidates[best], values[best], durations[best]
+
+    chosen = candidates[knapsack(durations, values, request.budget_minutes)]
+    return chosen[np.lexsort((chosen, catalog.verse_start[chosen], catalog.difficulty[chosen]))]
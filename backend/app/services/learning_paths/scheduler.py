@@ -0,0 +1,273 @@
+"""
+Learning path adjustment scheduler for the Quranic Quest application.
+Progress updates are handed to the scheduler instead of re-planning inside
+the request. Updates from one user are coalesced: each new one pushes the
+re-plan back by ADJUSTMENT_DEBOUNCE_MS (but never more than
+ADJUSTMENT_MAX_DELAY_MS after the first), so a child answering a quick run of
+exercises triggers one re-plan over the whole run. Re-plans run on a
+background task, at most ADJUSTMENT_CONCURRENCY at a time and never two for
+the same user at once.
+
+Coalescing is per process; with several API workers a user's updates may
+land on different workers and be re-planned once per worker.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+from models.learning_path import LearningProgress
+from services.learning_paths.service import ADJUST_LOW_SCORE, LearningPathService, progress_score
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Scheduler settings
+ADJUSTMENT_DEBOUNCE_MS = float(os.getenv("ADJUSTMENT_DEBOUNCE_MS", "2000"))
+ADJUSTMENT_MAX_DELAY_MS = float(os.getenv("ADJUSTMENT_MAX_DELAY_MS", "10000"))
+ADJUSTMENT_CONCURRENCY = int(os.getenv("ADJUSTMENT_CONCURRENCY", "4"))
+ADJUSTMENT_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("ADJUSTMENT_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+ADJUSTMENT_LATENCY_WINDOW = 1000
+
+@dataclass
+class _PendingAdjustment:
+    """Progress events of one user waiting to be re-planned together."""
+
+    events: List[LearningProgress]
+    first_at: float
+    due_at: float = field(default=0.0)
+
+def coalesce_progress(events: List[LearningProgress]) -> Dict[str, LearningProgress]:
+    """
+    Pick one representative event per unit from a run of progress events.
+
+    Scores are never averaged, since a 40 and a 95 would average to a score
+    that calls for no adjustment at all. A unit is represented by its
+    lowest-scored event if any fell below ADJUST_LOW_SCORE, and otherwise by
+    its highest-scored one.
+
+    Args:
+        events: The events, oldest first
+
+    Returns:
+        Dict[str, LearningProgress]: The representative event by unit id, in order of first appearance
+    """
+    by_unit: Dict[str, List[LearningProgress]] = {}
+    for event in events:
+        by_unit.setdefault(event.unit_id, []).append(event)
+
+    representatives = {}
+    for unit_id, unit_events in by_unit.items():
+        scored = [event for event in unit_events if progress_score(event) is not None]
+        if not scored:
+            representatives[unit_id] = unit_events[-1]
+            continue
+        lowest = min(scored, key=progress_score)
+        representatives[unit_id] = lowest if progress_score(lowest) < ADJUST_LOW_SCORE else max(scored, key=progress_score)
+    return representatives
+
+class AdjustmentScheduler:
+    """Debounces progress events per user and re-plans their paths in the background."""
+
+    def __init__(
+        self,
+        service: Optional[LearningPathService] = None,
+        debounce_ms: float = ADJUSTMENT_DEBOUNCE_MS,
+        max_delay_ms: float = ADJUSTMENT_MAX_DELAY_MS,
+        concurrency: int = ADJUSTMENT_CONCURRENCY
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            service: Service that checks and adjusts paths (defaults to a new one)
+            debounce_ms: Quiet time after a user's last event before their path is re-planned
+            max_delay_ms: Longest a user's first event waits, however often new ones arrive
+            concurrency: Maximum number of re-plans running at once
+        """
+        self.service = service or LearningPathService()
+        self.debounce = debounce_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.concurrency = concurrency
+
+        self._pending: Dict[str, _PendingAdjustment] = {}
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        # (due time, user id); entries whose due time no longer matches the pending one are stale
+        self._heap: List[Tuple[float, str]] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._stats = {"events": 0, "coalesced": 0, "checks": 0, "adjustments": 0, "errors": 0}
+        self._latencies: Deque[float] = deque(maxlen=ADJUSTMENT_LATENCY_WINDOW)
+
+    async def start(self) -> None:
+        """Start the background task that runs due re-plans."""
+        self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        """Create the background task on the running event loop, if there is none yet."""
+        if self._task is not None:
+            return
+
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = ADJUSTMENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Stop scheduling, running every pending re-plan straight away.
+
+        Args:
+            timeout: Longest to wait for pending and running re-plans to finish
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Users whose re-plan is still running get their follow-up events
+        # dispatched as soon as it finishes, until nothing is left
+        deadline = time.monotonic() + timeout
+        while self._pending or self._tasks:
+            for user_id in list(self._pending):
+                if user_id not in self._running:
+                    self._dispatch(user_id)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.wait(set(self._tasks), timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks or self._pending:
+            logger.warning(
+                f"Abandoned {len(self._tasks)} running and {len(self._pending)} pending learning path adjustments at shutdown"
+            )
+
+    def submit(self, progress: LearningProgress) -> None:
+        """
+        Queue a progress event for its user's next re-plan, without waiting for it.
+
+        Args:
+            progress: The progress record
+        """
+        self._ensure_started()
+
+        now = time.monotonic()
+        self._stats["events"] += 1
+        pending = self._pending.get(progress.user_id)
+        if pending is None:
+            pending = self._pending[progress.user_id] = _PendingAdjustment(events=[], first_at=now)
+        else:
+            self._stats["coalesced"] += 1
+
+        pending.events.append(progress)
+        pending.due_at = min(now + self.debounce, pending.first_at + self.max_delay)
+        heapq.heappush(self._heap, (pending.due_at, progress.user_id))
+        self._wake.set()
+
+    async def _run(self) -> None:
+        """Dispatch re-plans as they fall due, until cancelled."""
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+
+            while self._heap and self._heap[0][0] <= now:
+                due_at, user_id = heapq.heappop(self._heap)
+                pending = self._pending.get(user_id)
+                if pending is None or pending.due_at != due_at:
+                    continue
+                # A user's re-plan already running is followed by this one when it finishes
+                if user_id not in self._running:
+                    self._dispatch(user_id)
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, user_id: str) -> None:
+        """Start the re-plan of a user's pending events."""
+        pending = self._pending.pop(user_id)
+        self._running.add(user_id)
+        task = asyncio.create_task(self._adjust(user_id, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _adjust(self, user_id: str, pending: _PendingAdjustment) -> None:
+        """Check and, if needed, adjust one user's path for a run of events."""
+        try:
+            async with self._slots:
+                triggers = []
+                for progress in coalesce_progress(pending.events).values():
+                    self._stats["checks"] += 1
+                    if await self.service.check_path_adjustment(user_id, progress):
+                        triggers.append(progress)
+
+                # One re-plan for the whole run: a struggle anywhere makes the path easier,
+                # otherwise the strongest result makes it harder
+                if triggers:
+                    lowest = min(triggers, key=progress_score)
+                    progress = lowest if progress_score(lowest) < ADJUST_LOW_SCORE else max(triggers, key=progress_score)
+                    await self.service.adjust_learning_path(user_id, progress)
+                    self._stats["adjustments"] += 1
+                    logger.info(f"Learning path adjusted for user {user_id} after {len(pending.events)} progress updates")
+            self._latencies.append(time.monotonic() - pending.first_at)
+
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Error adjusting learning path for user {user_id}: {str(e)}")
+
+        finally:
+            self._running.discard(user_id)
+            # Events that arrived while this re-plan ran are scheduled again
+            follow_up = self._pending.get(user_id)
+            if follow_up is not None and self._wake is not None:
+                heapq.heappush(self._heap, (follow_up.due_at, user_id))
+                self._wake.set()
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get event, coalescing and latency statistics.
+
+        Returns:
+            Dict[str, float]: Event and re-plan counts, queue sizes, and percentiles (in
+                seconds) of the time from a user's first event to their finished re-plan
+        """
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        return {
+            **self._stats,
+            "pending_users": len(self._pending),
+            "running": len(self._running),
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p99": float(np.percentile(latencies, 99)),
+        }
+
+_scheduler: Optional[AdjustmentScheduler] = None
+
+def get_adjustment_scheduler() -> AdjustmentScheduler:
+    """
+    Get the shared adjustment scheduler for this process.
+
+    Returns:
+        AdjustmentScheduler: The shared scheduler
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AdjustmentScheduler()
+    return _scheduler
@@ -0,0 +1,343 @@
+"""
+Learning path service for the Quranic Quest application.
+Generates personalized learning paths from the unit catalog, records progress
+against them, and re-plans the remaining units when a learner's scores show
+the path is too hard or too easy.
+"""
+
+import os
+import math
+import uuid
+import asyncio
+import logging
+import weakref
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from models.learning_path import LearningPath, LearningProgress, LearningUnit
+from services.db import get_database
+from services.learning_paths.catalog import UnitCatalog, get_catalog_store
+from services.learning_paths.planner import (
+    PLAN_DEFAULT_DAYS_PER_WEEK,
+    PLAN_DEFAULT_MINUTES_PER_DAY,
+    PlanRequest,
+    budget_for,
+    level_for,
+    plan_units,
+    target_difficulty_for,
+    unit_values,
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Adjustment settings
+ADJUST_LOW_SCORE = int(os.getenv("ADJUST_LOW_SCORE", "50"))  # Below this the path gets easier
+ADJUST_HIGH_SCORE = int(os.getenv("ADJUST_HIGH_SCORE", "90"))  # At or above this the path gets harder
+
+def progress_score(progress: LearningProgress) -> Optional[int]:
+    """
+    Get the score that best describes a progress record.
+
+    Args:
+        progress: The progress record
+
+    Returns:
+        Optional[int]: The accuracy, overall or memorization score, whichever is set first
+    """
+    for score in (progress.accuracy_score, progress.score, progress.memorization_score):
+        if score is not None:
+            return score
+    return None
+
+# One lock per user with a path being changed, so a background re-plan and a
+# completion recorded at the same time cannot overwrite each other
+_path_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _path_lock(user_id: str) -> asyncio.Lock:
+    """Get the lock guarding changes to a user's active path."""
+    lock = _path_locks.get(user_id)
+    if lock is None:
+        lock = _path_locks[user_id] = asyncio.Lock()
+    return lock
+
+class LearningPathService:
+    """Service for generating and maintaining personalized learning paths."""
+
+    async def _plan(self, request: PlanRequest, catalog: Optional[UnitCatalog] = None) -> List[LearningUnit]:
+        """
+        Plan units for a request, off the event loop.
+
+        Args:
+            request: The plan request
+            catalog: The catalog to plan from (defaults to the current one)
+
+        Returns:
+            List[LearningUnit]: The planned units, without path order set
+        """
+        catalog = catalog or await get_catalog_store().get()
+        indices = await run_in_threadpool(plan_units, catalog, request)
+        return [catalog.unit(int(index)) for index in indices]
+
+    @staticmethod
+    def _completion_date(units: List[LearningUnit], time_commitment: Dict[str, Any]) -> datetime:
+        """Estimate when a learner working to their time commitment finishes some units."""
+        minutes_per_day = max(int(time_commitment.get("minutes_per_day", PLAN_DEFAULT_MINUTES_PER_DAY)), 1)
+        days_per_week = min(max(int(time_commitment.get("days_per_week", PLAN_DEFAULT_DAYS_PER_WEEK)), 1), 7)
+        minutes = sum(unit.estimated_duration_minutes for unit in units if not unit.completed)
+        study_days = math.ceil(minutes / minutes_per_day)
+        return datetime.now() + timedelta(days=math.ceil(study_days * 7 / days_per_week))
+
+    async def generate_learning_path(
+        self,
+        user_id: str,
+        age: int,
+        proficiency_level: str,
+        learning_goals: List[str],
+        time_commitment: Dict[str, Any],
+        assessment_results: Optional[Dict[str, Any]] = None
+    ) -> LearningPath:
+        """
+        Generate a learning path and make it the user's active path.
+
+        Args:
+            user_id: ID of the user
+            age: Age of the learner
+            proficiency_level: Self-reported proficiency level
+            learning_goals: The learner's goals (matched against unit tags)
+            time_commitment: Optional "minutes_per_day", "days_per_week" and "weeks", plus an
+                optional "verse_range" ([first, last] verse ids) and "content_types"
+            assessment_results: Optional assessment results
+
+        Returns:
+            LearningPath: The new learning path
+        """
+        target_difficulty = target_difficulty_for(age, proficiency_level, assessment_results)
+        budget_minutes, session_minutes = budget_for(time_commitment)
+        verse_range = time_commitment.get("verse_range")
+
+        units = await self._plan(PlanRequest(
+            target_difficulty=target_difficulty,
+            budget_minutes=budget_minutes,
+            session_minutes=session_minutes,
+            goals=learning_goals,
+            content_types=time_commitment.get("content_types"),
+            verse_range=tuple(verse_range) if verse_range else None,
+        ))
+        for order, unit in enumerate(units):
+            unit.order = order
+
+        now = datetime.now()
+        path = LearningPath(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            created_at=now,
+            updated_at=now,
+            level=level_for(target_difficulty),
+            estimated_completion_date=self._completion_date(units, time_commitment),
+            learning_units=units,
+        )
+        async with _path_lock(user_id):
+            return await get_database().learning_paths.save(path)
+
+    async def get_current_learning_path(self, user_id: str) -> Optional[LearningPath]:
+        """
+        Get a user's active learning path.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            Optional[LearningPath]: The active path, or None if the user has none
+        """
+        return await get_database().learning_paths.get_active(user_id)
+
+    async def get_learning_path_history(self, user_id: str, limit: int = 10, offset: int = 0) -> List[LearningPath]:
+        """
+        Get a user's learning paths, newest first.
+
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of paths to return
+            offset: Number of paths to skip
+
+        Returns:
+            List[LearningPath]: The paths
+        """
+        return await get_database().learning_paths.list_for_user(user_id, limit, offset)
+
+    async def get_next_learning_units(self, user_id: str, count: int = 3) -> List[LearningUnit]:
+        """
+        Get the next uncompleted units of a user's active path.
+
+        Args:
+            user_id: ID of the user
+            count: Number of units to return
+
+        Returns:
+            List[LearningUnit]: The next units (empty if the user has no active path)
+        """
+        path = await self.get_current_learning_path(user_id)
+        if path is None:
+            return []
+        remaining = [unit for unit in path.learning_units[path.current_unit_index:] if not unit.completed]
+        return remaining[:count]
+
+    async def _complete_unit(self, progress: LearningProgress) -> None:
+        """Mark a completed unit in the user's active path and move the path on."""
+        database = get_database()
+        path = await database.learning_paths.get_active(progress.user_id)
+        if path is not None and progress.unit_id not in path.completed_unit_ids:
+            for unit in path.learning_units:
+                if unit.id == progress.unit_id:
+                    unit.completed = True
+            path.completed_unit_ids.append(progress.unit_id)
+            path.current_unit_index = next(
+                (index for index, unit in enumerate(path.learning_units) if not unit.completed),
+                len(path.learning_units),
+            )
+            path.updated_at = datetime.now()
+            await database.learning_paths.save(path)
+
+    async def update_learning_progress(self, progress: LearningProgress) -> LearningProgress:
+        """
+        Record progress, marking the unit completed in the active path if it was.
+
+        Args:
+            progress: The progress record
+
+        Returns:
+            LearningProgress: The saved record
+        """
+        await get_database().progress.add(progress)
+
+        if progress.completed:
+            async with _path_lock(progress.user_id):
+                await self._complete_unit(progress)
+
+        return progress
+
+    async def check_path_adjustment(self, user_id: str, progress: LearningProgress) -> bool:
+        """
+        Decide whether a progress record calls for re-planning the user's path.
+
+        Args:
+            user_id: ID of the user
+            progress: The latest progress record
+
+        Returns:
+            bool: Whether the score is low or high enough to adjust the path
+        """
+        score = progress_score(progress)
+        return score is not None and (score < ADJUST_LOW_SCORE or score >= ADJUST_HIGH_SCORE)
+
+    async def adjust_learning_path(self, user_id: str, progress: LearningProgress) -> Optional[LearningPath]:
+        """
+        Re-plan the uncompleted units of a user's active path one difficulty easier or harder.
+
+        Completed units are kept, and the new units fill the same time as the
+        ones they replace.
+
+        Args:
+            user_id: ID of the user
+            progress: The progress record that triggered the adjustment
+
+        Returns:
+            Optional[LearningPath]: The adjusted path, or None if there was nothing to adjust
+        """
+        async with _path_lock(user_id):
+            return await self._replan(user_id, progress)
+
+    async def _replan(self, user_id: str, progress: LearningProgress) -> Optional[LearningPath]:
+        """Re-plan a user's active path (the caller holds the user's path lock)."""
+        score = progress_score(progress)
+        path = await self.get_current_learning_path(user_id)
+        if path is None or score is None:
+            return None
+
+        completed = [unit for unit in path.learning_units if unit.completed]
+        remaining = [unit for unit in path.learning_units if not unit.completed]
+        if not remaining:
+            return path
+
+        current = sorted(unit.difficulty for unit in remaining)[len(remaining) // 2]
+        shift = -1 if score < ADJUST_LOW_SCORE else 1 if score >= ADJUST_HIGH_SCORE else 0
+        target_difficulty = min(max(current + shift, 1), 5)
+
+        user_data = await get_database().users.get(user_id) or {}
+        units = await self._plan(PlanRequest(
+            target_difficulty=target_difficulty,
+            budget_minutes=sum(unit.estimated_duration_minutes for unit in remaining),
+            session_minutes=max(unit.estimated_duration_minutes for unit in remaining),
+            goals=user_data.get("learning_goals") or [],
+            exclude_ids=[unit.id for unit in completed],
+        ))
+
+        path.learning_units = completed + units
+        for order, unit in enumerate(path.learning_units):
+            unit.order = order
+        path.current_unit_index = len(completed)
+        path.level = level_for(target_difficulty)
+        path.updated_at = datetime.now()
+        await get_database().learning_paths.save(path)
+
+        logger.info(f"Learning path {path.id} re-planned at difficulty {target_difficulty} for user {user_id}")
+        return path
+
+    async def get_recommendations(self, user_id: str, count: int = 5) -> List[LearningUnit]:
+        """
+        Recommend units outside the user's path that suit their current level and goals.
+
+        Args:
+            user_id: ID of the user
+            count: Number of units to recommend
+
+        Returns:
+            List[LearningUnit]: The recommended units, most valuable first
+        """
+        user_data = await get_database().users.get(user_id) or {}
+        path = await self.get_current_learning_path(user_id)
+
+        upcoming = [unit for unit in path.learning_units if not unit.completed] if path else []
+        if upcoming:
+            target_difficulty = upcoming[0].difficulty
+        else:
+            target_difficulty = target_difficulty_for(
+                user_data.get("age") or 10, user_data.get("proficiency_level") or "beginner"
+            )
+
+        catalog = await get_catalog_store().get()
+        request = PlanRequest(
+            target_difficulty=target_difficulty,
+            budget_minutes=0,
+            session_minutes=0,
+            goals=user_data.get("learning_goals") or [],
+        )
+        candidates = catalog.query(
+            difficulties=(target_difficulty,),
+            exclude_ids=[unit.id for unit in path.learning_units] if path else (),
+        )
+        values = unit_values(catalog, candidates, request)
+        best = candidates[np.argsort(-values, kind="stable")[:count]]
+        return [catalog.unit(int(index), order=order) for order, index in enumerate(best)]
+
+    async def reset_learning_path(self, user_id: str) -> LearningPath:
+        """
+        Replace a user's active path with a new one generated from their profile.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            LearningPath: The new learning path
+        """
+        user_data = await get_database().users.get(user_id) or {}
+        return await self.generate_learning_path(
+            user_id=user_id,
+            age=user_data.get("age") or 10,
+            proficiency_level=user_data.get("proficiency_level") or "beginner",
+            learning_goals=user_data.get("learning_goals") or [],
+            time_commitment={},
+        )
@@ -0,0 +1,5 @@
+"""
+Pronunciation assessment services for the Quranic Quest application.
+"""
+
+from services.pronunciation.service import PronunciationService, distance_score, score_recitation
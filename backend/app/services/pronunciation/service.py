@@ -0,0 +1,398 @@
+"""
+Pronunciation assessment service for the Quranic Quest application.
+Runs an upload through the audio pipeline, turns its output (processed
+audio, features, reference alignments and model scores) into a scored
+assessment, stores it, and answers feedback, history and progress queries
+from the stored assessments.
+"""
+
+import os
+import math
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from models.pronunciation import PronunciationAssessment, PronunciationFeedback, WordAssessment
+from services.audio import AudioProcessingService
+from services.audio.buffer import AudioBuffer, AudioSource
+from services.audio.cache import assessment_cache, make_cache_key
+from services.db import get_database
+from utils.tajweed_rules import get_verse_tajweed
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Scoring settings
+PRONUNCIATION_MAX_DISTANCE = float(os.getenv("PRONUNCIATION_MAX_DISTANCE", "5.0"))  # Alignment distance that scores 0
+PRONUNCIATION_MODEL_WEIGHT = float(os.getenv("PRONUNCIATION_MODEL_WEIGHT", "0.5"))  # Share of the model in the overall score
+PRONUNCIATION_PRACTICE_SCORE = float(os.getenv("PRONUNCIATION_PRACTICE_SCORE", "60"))  # Words below this need practice
+PRONUNCIATION_STRONG_SCORE = float(os.getenv("PRONUNCIATION_STRONG_SCORE", "85"))  # Words at or above this are strengths
+
+def distance_score(distance: float) -> float:
+    """
+    Convert a mean per-frame alignment distance to a 0-100 score.
+
+    Args:
+        distance: Mean distance between normalized attempt and reference frames
+
+    Returns:
+        float: The score, 100 for an exact match and 0 at PRONUNCIATION_MAX_DISTANCE or beyond
+    """
+    if not math.isfinite(distance):
+        return 0.0
+    return round(100 * min(1.0, max(0.0, 1 - distance / PRONUNCIATION_MAX_DISTANCE)), 1)
+
+def score_recitation(
+    assessment_id: str,
+    user_id: str,
+    verse_id: Optional[str],
+    duration_seconds: float,
+    features: Optional[dict] = None,
+    alignments: Optional[List[dict]] = None,
+    model_scores: Optional[List[float]] = None,
+    timestamp: Optional[datetime] = None
+) -> PronunciationAssessment:
+    """
+    Score a recitation from its pipeline results.
+
+    The accuracy score comes from the best (lowest distance) alignment that
+    was not abandoned, and each of its words is scored the same way. The
+    model's first output is read as the probability that the recitation is
+    correct. The overall score mixes the two by PRONUNCIATION_MODEL_WEIGHT,
+    or is whichever one is available.
+
+    Args:
+        assessment_id: ID for the assessment
+        user_id: ID of the assessed user
+        verse_id: The recited verse, if known
+        duration_seconds: Duration of the processed recording
+        features: Summary audio features of the recording
+        alignments: Alignments against the verse's reference recitations, best first
+        model_scores: Outputs of the pronunciation model
+        timestamp: When the assessment was made (defaults to now)
+
+    Returns:
+        PronunciationAssessment: The scored assessment
+    """
+    best = next(
+        (alignment for alignment in alignments or []
+         if not alignment.get("abandoned") and math.isfinite(alignment["distance"])),
+        None
+    )
+
+    accuracy_score = distance_score(best["distance"]) if best else None
+    words = [
+        WordAssessment(
+            index=word["index"],
+            text=word["text"],
+            start_seconds=word["start_seconds"],
+            end_seconds=word["end_seconds"],
+            score=distance_score(word["distance"]),
+            needs_practice=distance_score(word["distance"]) < PRONUNCIATION_PRACTICE_SCORE
+        )
+        for word in (best["words"] if best else [])
+    ]
+
+    model_score = None
+    if model_scores:
+        model_score = round(100 * min(1.0, max(0.0, float(model_scores[0]))), 1)
+
+    if accuracy_score is not None and model_score is not None:
+        overall_score = round((1 - PRONUNCIATION_MODEL_WEIGHT) * accuracy_score + PRONUNCIATION_MODEL_WEIGHT * model_score, 1)
+    else:
+        overall_score = accuracy_score if accuracy_score is not None else model_score
+
+    feedback = []
+    if overall_score is None:
+        feedback.append("This recitation could not be scored: no reference recitation or model is available for it.")
+    elif overall_score >= PRONUNCIATION_STRONG_SCORE:
+        feedback.append("Excellent recitation, keep it up!")
+    elif overall_score >= PRONUNCIATION_PRACTICE_SCORE:
+        feedback.append("Good recitation. A little more practice will make it even better.")
+    else:
+        feedback.append("Keep practicing this verse along with the reference recitation.")
+
+    practice = [word.text for word in words if word.needs_practice]
+    if practice:
+        feedback.append(f"Practice these words: {', '.join(practice)}")
+
+    return PronunciationAssessment(
+        id=assessment_id,
+        user_id=user_id,
+        verse_id=verse_id,
+        timestamp=timestamp or datetime.now(),
+        overall_score=overall_score,
+        accuracy_score=accuracy_score,
+        model_score=model_score,
+        duration_seconds=duration_seconds,
+        reciter=best["reciter"] if best else None,
+        words=words,
+        features=features or {},
+        feedback=feedback
+    )
+
+class PronunciationService:
+    """Service for scoring recitations and reporting on stored assessments."""
+
+    def __init__(self, audio_service: Optional[AudioProcessingService] = None):
+        """
+        Initialize the pronunciation service.
+
+        Args:
+            audio_service: Audio service that runs the pipeline (defaults to one on the shared pool)
+        """
+        self.audio_service = audio_service or AudioProcessingService()
+
+    async def assess_upload(
+        self,
+        source: AudioSource,
+        filename: str,
+        audio_sha256: str,
+        verse_id: Optional[str],
+        user_id: str
+    ) -> PronunciationAssessment:
+        """
+        Assess an uploaded recitation, end to end.
+
+        This is the path shared by /assess and the job workers. Resubmissions
+        of the same clip are answered from the assessment cache, and a clip
+        seen before (e.g. for another verse) reuses its cached features.
+
+        Args:
+            source: Encoded audio bytes or a path to a spooled upload
+            filename: Original filename of the upload
+            audio_sha256: SHA-256 hex digest of the encoded upload
+            verse_id: The verse the user says they recited, if any
+            user_id: ID of the assessed user
+
+        Returns:
+            PronunciationAssessment: The assessment
+        """
+        key = make_cache_key(audio_sha256, "assessment", verse_id, user_id)
+        cached = await assessment_cache.get(key)
+        if cached is not None:
+            logger.info(f"Cached pronunciation assessment returned for user {user_id}, verse {verse_id}")
+            return cached
+
+        # Decode once, then denoise, normalize, trim and extract features in memory
+        processed, features = await self.audio_service.prepare_audio(source, filename, audio_sha256)
+
+        assessment = await self.assess_processed(processed, features, verse_id, user_id)
+        await assessment_cache.set(key, assessment)
+        return assessment
+
+    async def assess_processed(
+        self,
+        processed: AudioBuffer,
+        features: dict,
+        verse_id: Optional[str],
+        user_id: str
+    ) -> PronunciationAssessment:
+        """
+        Assess a recitation the pipeline has already processed.
+
+        The verse is identified from the fingerprint index when it is missing
+        or clearly wrong. Alignment and model scoring then run concurrently,
+        so model requests from concurrent assessments share micro-batches.
+
+        Args:
+            processed: The processed attempt audio
+            features: Its summary audio features
+            verse_id: The verse the user says they recited, if any
+            user_id: ID of the assessed user
+
+        Returns:
+            PronunciationAssessment: The stored assessment
+        """
+        verse_id = await self.audio_service.resolve_verse_id(processed, verse_id)
+
+        alignments, model_scores = await asyncio.gather(
+            self.audio_service.align_to_references(processed, verse_id) if verse_id else asyncio.sleep(0, []),
+            self.audio_service.score_with_model(processed)
+        )
+
+        return await self.assess_pronunciation(
+            processed,
+            verse_id,
+            user_id,
+            features=features,
+            alignments=alignments,
+            model_scores=model_scores
+        )
+
+    async def assess_pronunciation(
+        self,
+        buffer: AudioBuffer,
+        verse_id: Optional[str],
+        user_id: str,
+        features: Optional[dict] = None,
+        alignments: Optional[List[dict]] = None,
+        model_scores: Optional[List[float]] = None
+    ) -> PronunciationAssessment:
+        """
+        Score a processed recitation and store the assessment.
+
+        The audio pipeline has already run: the caller passes the processed
+        audio along with its features, reference alignments and model scores.
+
+        Args:
+            buffer: The processed attempt audio
+            verse_id: The recited verse, if known
+            user_id: ID of the assessed user
+            features: Summary audio features of the recording
+            alignments: Alignments against the verse's reference recitations, best first
+            model_scores: Outputs of the pronunciation model, if one is configured
+
+        Returns:
+            PronunciationAssessment: The stored assessment
+        """
+        assessment = score_recitation(
+            str(uuid.uuid4()),
+            user_id,
+            verse_id,
+            buffer.duration,
+            features=features,
+            alignments=alignments,
+            model_scores=model_scores
+        )
+
+        await get_database().assessments.add(
+            assessment.id,
+            user_id,
+            jsonable_encoder(assessment),
+            verse_id=verse_id,
+            overall_score=assessment.overall_score,
+            created_at=assessment.timestamp
+        )
+
+        return assessment
+
+    async def get_assessment(self, assessment_id: str, user_id: str) -> Optional[PronunciationAssessment]:
+        """
+        Get a stored assessment.
+
+        Args:
+            assessment_id: ID of the assessment
+            user_id: ID of the user asking (assessments of other users are not returned)
+
+        Returns:
+            Optional[PronunciationAssessment]: The assessment, or None if not found
+        """
+        data = await get_database().assessments.get(assessment_id)
+        if data is None or data.get("user_id") != user_id:
+            return None
+        return PronunciationAssessment.model_validate(data)
+
+    async def get_detailed_feedback(self, assessment_id: str, user_id: str) -> Optional[PronunciationFeedback]:
+        """
+        Get detailed feedback for a stored assessment.
+
+        Args:
+            assessment_id: ID of the assessment
+            user_id: ID of the user asking
+
+        Returns:
+            Optional[PronunciationFeedback]: The feedback, or None if the assessment was not found
+        """
+        assessment = await self.get_assessment(assessment_id, user_id)
+        if assessment is None:
+            return None
+
+        # The tajweed index is built on first use, which reads the whole corpus
+        tajweed_rules = await run_in_threadpool(get_verse_tajweed, assessment.verse_id) if assessment.verse_id else []
+
+        practice = sorted((word for word in assessment.words if word.needs_practice), key=lambda word: word.score)
+        suggestions = list(assessment.feedback[:1])
+        for word in practice:
+            suggestions.append(
+                f"Listen to \"{word.text}\" in the reference recitation and repeat it slowly "
+                f"(at {word.start_seconds:.1f}s in your recording)"
+            )
+        if tajweed_rules:
+            rules = sorted({annotation["rule"] for annotation in tajweed_rules})
+            suggestions.append(f"Pay attention to these tajweed rules in this verse: {', '.join(rules)}")
+
+        return PronunciationFeedback(
+            assessment_id=assessment.id,
+            verse_id=assessment.verse_id,
+            overall_score=assessment.overall_score,
+            strengths=[word for word in assessment.words if word.score >= PRONUNCIATION_STRONG_SCORE],
+            words_to_practice=practice,
+            tajweed_rules=tajweed_rules,
+            suggestions=suggestions
+        )
+
+    async def get_user_history(self, user_id: str, limit: int = 10, offset: int = 0) -> List[PronunciationAssessment]:
+        """
+        Get a user's assessments, newest first.
+
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of assessments to return
+            offset: Number of assessments to skip
+
+        Returns:
+            List[PronunciationAssessment]: The assessments
+        """
+        rows = await get_database().assessments.list_for_user(user_id, limit, offset)
+        return [PronunciationAssessment.model_validate(data) for data in rows]
+
+    async def get_progress_metrics(
+        self,
+        user_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Summarize a user's scores over a period.
+
+        Only the indexed summary columns are read, so this stays cheap for
+        users with long histories.
+
+        Args:
+            user_id: ID of the user
+            start_date: Start of the period (defaults to the first assessment)
+            end_date: End of the period (defaults to now)
+
+        Returns:
+            Dict[str, Any]: Counts, average/best/latest scores, the change between
+                the first and second half of the period, and per-verse and per-day summaries
+        """
+        rows = await get_database().assessments.scores_for_user(user_id, start_date, end_date)
+        scored = [row for row in rows if row["overall_score"] is not None]
+        scores = [row["overall_score"] for row in scored]
+
+        def summarize(values: List[float]) -> Dict[str, Any]:
+            return {
+                "count": len(values),
+                "average_score": round(sum(values) / len(values), 1) if values else None,
+                "best_score": max(values) if values else None,
+            }
+
+        by_verse: Dict[str, List[float]] = {}
+        by_day: Dict[str, List[float]] = {}
+        for row in scored:
+            if row["verse_id"]:
+                by_verse.setdefault(row["verse_id"], []).append(row["overall_score"])
+            by_day.setdefault(row["created_at"].date().isoformat(), []).append(row["overall_score"])
+
+        half = len(scores) // 2
+        improvement = None
+        if half:
+            improvement = round(sum(scores[-half:]) / half - sum(scores[:half]) / half, 1)
+
+        return {
+            "user_id": user_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "assessments": len(rows),
+            **summarize(scores),
+            "latest_score": scores[-1] if scores else None,
+            "improvement": improvement,
+            "verses": {verse_id: summarize(values) for verse_id, values in by_verse.items()},
+            "daily": [{"date": day, **summarize(values)} for day, values in by_day.items()],
+        }
@@ -0,0 +1,5 @@
+"""
+Quran text services for the Quranic Quest application.
+"""
+
+from services.quran.corpus import QuranCorpus, VerseSlice, compile_corpus, ensure_corpus, get_corpus
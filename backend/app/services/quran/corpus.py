@@ -0,0 +1,466 @@
+"""
+Compiled Quran corpus store for the Quranic Quest application.
+The per-surah JSON files under data/quran_text are compiled once into a
+single binary file: a header, fixed-width surah and verse records, and a
+deduplicated UTF-8 string table that the records point into. Workers
+memory-map the file, so every process shares one copy in the page cache.
+Verse lookup is an index computation, verse ranges are slices of the record
+array, and QuranVerse objects are only built for the verses actually read.
+
+Build the corpus (from the backend/app directory):
+    python -m services.quran.corpus --source data/quran_text --output data/quran_corpus.bin
+"""
+
+import os
+import glob
+import json
+import mmap
+import struct
+import logging
+import argparse
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from models.quran import QuranSurah, QuranVerse
+from utils.arabic_npl import verse_segments
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Corpus settings
+QURAN_TEXT_DIRECTORY = os.getenv("QURAN_TEXT_DIRECTORY", "data/quran_text")
+QURAN_CORPUS_PATH = os.getenv("QURAN_CORPUS_PATH", "data/quran_corpus.bin")
+
+# File layout: header, surah records, verse records, string table (sections 8-byte aligned)
+CORPUS_MAGIC = b"QQCORP01"
+HEADER = struct.Struct("<8sIIQQQQ")  # magic, surah count, verse count, section offsets, string table size
+
+# String fields are stored as offset and length columns into the string table
+SURAH_STRING_FIELDS = ("name_arabic", "name_english", "english_meaning", "revelation_type", "summary")
+VERSE_STRING_FIELDS = ("arabic_text", "transliteration", "translation")
+VERSE_JSON_FIELDS = ("tajweed_rules", "phonetic_segments")
+
+def _string_columns(fields: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    """Offset and length columns for string fields."""
+    return [(f"{field}_{part}", "<u4") for field in fields for part in ("offset", "length")]
+
+# Fixed-width records; every column is a scalar so record.item() yields plain ints
+SURAH_DTYPE = np.dtype(
+    [("number", "<u2"), ("verses_count", "<u2"), ("first_verse", "<u4")]
+    + _string_columns(SURAH_STRING_FIELDS)
+)
+VERSE_DTYPE = np.dtype(
+    [("surah_number", "<u2"), ("ayah_number", "<u2"), ("difficulty_level", "<u4")]
+    + _string_columns(VERSE_STRING_FIELDS + VERSE_JSON_FIELDS)
+)
+
+VerseKey = Union[str, Tuple[int, int]]
+
+def _align(offset: int) -> int:
+    """Round an offset up to the next multiple of 8."""
+    return (offset + 7) & ~7
+
+class _StringTable:
+    """Accumulates deduplicated UTF-8 strings during a build."""
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self._data = bytearray()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, value: str) -> Tuple[int, int]:
+        """Add a string, returning its (offset, length) reference."""
+        reference = self._offsets.get(value)
+        if reference is None:
+            encoded = value.encode("utf-8")
+            reference = (len(self._data), len(encoded))
+            self._data += encoded
+            self._offsets[value] = reference
+        return reference
+
+    def to_bytes(self) -> bytes:
+        """Get the table's contents."""
+        return bytes(self._data)
+
+def _load_source(path: str) -> Optional[Tuple[QuranSurah, List[QuranVerse]]]:
+    """
+    Load and validate one surah's JSON file.
+
+    The file holds the QuranSurah fields plus a "verses" list of QuranVerse
+    fields; verse ids, surah numbers and the verse count are filled in when
+    they are omitted.
+
+    Args:
+        path: Path to the surah JSON file
+
+    Returns:
+        Optional[Tuple[QuranSurah, List[QuranVerse]]]: The surah and its verses, or None if the file is empty
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        content = file.read()
+    if not content.strip():
+        logger.warning(f"Skipping empty Quran text file: {path}")
+        return None
+
+    data = json.loads(content)
+    raw_verses = data.pop("verses", [])
+    data.setdefault("verses_count", len(raw_verses))
+    surah = QuranSurah.model_validate(data)
+
+    verses = []
+    for raw_verse in raw_verses:
+        raw_verse.setdefault("surah_number", surah.number)
+        raw_verse.setdefault("id", f"{raw_verse['surah_number']}:{raw_verse['ayah_number']}")
+        verses.append(QuranVerse.model_validate(raw_verse))
+
+    verses.sort(key=lambda verse: verse.ayah_number)
+    if [verse.ayah_number for verse in verses] != list(range(1, len(verses) + 1)):
+        raise ValueError(f"Surah {surah.number} in {path} does not have consecutive ayahs starting at 1")
+    return surah, verses
+
+def compile_corpus(source_directory: str = QURAN_TEXT_DIRECTORY, output_path: str = QURAN_CORPUS_PATH) -> Dict[str, int]:
+    """
+    Compile the per-surah JSON files into the binary corpus.
+
+    Validation happens here, once, so readers can build models without it.
+    The file is written to a temporary path and renamed into place, so
+    processes that already mapped the previous corpus are unaffected.
+
+    Args:
+        source_directory: Directory of per-surah JSON files
+        output_path: Path of the compiled corpus
+
+    Returns:
+        Dict[str, int]: Surah and verse counts and the size of the compiled file
+    """
+    sources = [_load_source(path) for path in glob.glob(os.path.join(source_directory, "*.json"))]
+    sources = sorted((source for source in sources if source is not None), key=lambda source: source[0].number)
+
+    strings = _StringTable()
+    surah_records = np.zeros(len(sources), dtype=SURAH_DTYPE)
+    verse_records = np.zeros(sum(len(verses) for _, verses in sources), dtype=VERSE_DTYPE)
+
+    verse_index = 0
+    for surah_index, (surah, verses) in enumerate(sources):
+        record = surah_records[surah_index]
+        record["number"] = surah.number
+        record["verses_count"] = len(verses)
+        record["first_verse"] = verse_index
+        for field in SURAH_STRING_FIELDS:
+            record[f"{field}_offset"], record[f"{field}_length"] = strings.add(getattr(surah, field))
+
+        for verse in verses:
+            record = verse_records[verse_index]
+            record["surah_number"] = verse.surah_number
+            record["ayah_number"] = verse.ayah_number
+            record["difficulty_level"] = verse.difficulty_level
+            for field in VERSE_STRING_FIELDS:
+                record[f"{field}_offset"], record[f"{field}_length"] = strings.add(getattr(verse, field))
+            for field in VERSE_JSON_FIELDS:
+                encoded = json.dumps(getattr(verse, field), ensure_ascii=False, separators=(",", ":"))
+                record[f"{field}_offset"], record[f"{field}_length"] = strings.add(encoded)
+            verse_index += 1
+
+    string_data = strings.to_bytes()
+    surah_offset = _align(HEADER.size)
+    verse_offset = _align(surah_offset + surah_records.nbytes)
+    strings_offset = _align(verse_offset + verse_records.nbytes)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(
+            CORPUS_MAGIC, len(surah_records), len(verse_records),
+            surah_offset, verse_offset, strings_offset, len(string_data)
+        ))
+        for offset, payload in ((surah_offset, surah_records.tobytes()), (verse_offset, verse_records.tobytes()), (strings_offset, string_data)):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(payload)
+    os.replace(temp_path, output_path)
+
+    stats = {"surahs": len(surah_records), "verses": len(verse_records), "bytes": os.path.getsize(output_path)}
+    logger.info(f"Compiled Quran corpus to {output_path}: {stats}")
+    return stats
+
+def ensure_corpus(source_directory: str = QURAN_TEXT_DIRECTORY, output_path: str = QURAN_CORPUS_PATH) -> bool:
+    """
+    Compile the corpus if it is missing or older than any source file.
+
+    Args:
+        source_directory: Directory of per-surah JSON files
+        output_path: Path of the compiled corpus
+
+    Returns:
+        bool: True if the corpus was (re)compiled
+    """
+    source_paths = glob.glob(os.path.join(source_directory, "*.json"))
+    if os.path.exists(output_path):
+        compiled_at = os.path.getmtime(output_path)
+        if all(os.path.getmtime(path) <= compiled_at for path in source_paths):
+            return False
+
+    compile_corpus(source_directory, output_path)
+    return True
+
+class VerseSlice(Sequence):
+    """A contiguous run of verses, materialized one at a time on access."""
+
+    def __init__(self, corpus: "QuranCorpus", start: int, stop: int):
+        """
+        Initialize the slice.
+
+        Args:
+            corpus: The corpus the verses belong to
+            start: Index of the first verse record
+            stop: Index one past the last verse record
+        """
+        self._corpus = corpus
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[QuranVerse, "VerseSlice"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Verse slices do not support steps")
+            return VerseSlice(self._corpus, self._start + start, self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Verse index out of range")
+        return self._corpus.verse_at(self._start + index)
+
+    def __iter__(self) -> Iterator[QuranVerse]:
+        for index in range(self._start, self._stop):
+            yield self._corpus.verse_at(index)
+
+    @property
+    def ids(self) -> List[str]:
+        """Verse ids in the slice, without materializing the verses."""
+        records = self._corpus.verse_records[self._start:self._stop]
+        return [f"{surah}:{ayah}" for surah, ayah in zip(records["surah_number"].tolist(), records["ayah_number"].tolist())]
+
+class QuranCorpus:
+    """Read-only view of a compiled, memory-mapped Quran corpus."""
+
+    def __init__(self, path: str = QURAN_CORPUS_PATH):
+        """
+        Map a compiled corpus.
+
+        Args:
+            path: Path of the compiled corpus
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, surah_count, verse_count, surah_offset, verse_offset, strings_offset, strings_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != CORPUS_MAGIC:
+            raise ValueError(f"{path} is not a compiled Quran corpus")
+
+        self.surah_records = np.frombuffer(self._mmap, dtype=SURAH_DTYPE, count=surah_count, offset=surah_offset)
+        self.verse_records = np.frombuffer(self._mmap, dtype=VERSE_DTYPE, count=verse_count, offset=verse_offset)
+        self._strings = memoryview(self._mmap)[strings_offset:strings_offset + strings_size]
+
+        # Surah number -> row in surah_records (-1 for surahs not in the corpus)
+        self._surah_rows = np.full(int(self.surah_records["number"].max(initial=0)) + 1, -1, dtype=np.int32)
+        self._surah_rows[self.surah_records["number"]] = np.arange(surah_count, dtype=np.int32)
+
+        # Supplies tajweed annotations for verses whose source text has none
+        # (set by utils.tajweed_rules once its index is loaded)
+        self.tajweed_lookup: Optional[Callable[[str], List[Dict[str, Any]]]] = None
+
+    def __len__(self) -> int:
+        return len(self.verse_records)
+
+    def _decode_strings(self, references: Tuple[int, ...]) -> List[str]:
+        """Decode strings from flattened (offset, length) pairs."""
+        strings = self._strings
+        return [
+            str(strings[offset:offset + length], "utf-8")
+            for offset, length in zip(references[::2], references[1::2])
+        ]
+
+    def _surah_row(self, surah_number: int) -> Optional[np.void]:
+        """Get a surah's record, or None if it is not in the corpus."""
+        if not 0 < surah_number < len(self._surah_rows) or self._surah_rows[surah_number] < 0:
+            return None
+        return self.surah_records[self._surah_rows[surah_number]]
+
+    def verse_index(self, surah_number: int, ayah_number: int) -> Optional[int]:
+        """
+        Get the record index of a verse.
+
+        Args:
+            surah_number: Surah number
+            ayah_number: Ayah number within the surah
+
+        Returns:
+            Optional[int]: The verse's record index, or None if it is not in the corpus
+        """
+        surah = self._surah_row(surah_number)
+        if surah is None or not 0 < ayah_number <= surah["verses_count"]:
+            return None
+        return int(surah["first_verse"]) + ayah_number - 1
+
+    def _resolve(self, key: VerseKey) -> Optional[int]:
+        """Get the record index for a "surah:ayah" id or (surah, ayah) pair."""
+        if isinstance(key, str):
+            try:
+                surah_number, ayah_number = (int(part) for part in key.split(":"))
+            except ValueError:
+                return None
+        else:
+            surah_number, ayah_number = key
+        return self.verse_index(surah_number, ayah_number)
+
+    def verse_at(self, index: int) -> QuranVerse:
+        """
+        Materialize the verse at a record index.
+
+        Args:
+            index: The verse's record index
+
+        Returns:
+            QuranVerse: The verse (built without re-validation; the compiler validated it),
+                with tajweed annotations from the tajweed index and memoized phonetic
+                segments when its source has none
+        """
+        surah_number, ayah_number, difficulty_level, *references = self.verse_records[index].item()
+        arabic_text, transliteration, translation, tajweed_rules, phonetic_segments = self._decode_strings(references)
+        verse_id = f"{surah_number}:{ayah_number}"
+
+        tajweed_rules = json.loads(tajweed_rules)
+        if not tajweed_rules and self.tajweed_lookup is not None:
+            tajweed_rules = self.tajweed_lookup(verse_id)
+
+        verse = QuranVerse.model_construct(
+            id=verse_id,
+            surah_number=surah_number,
+            ayah_number=ayah_number,
+            arabic_text=arabic_text,
+            transliteration=transliteration,
+            translation=translation,
+            tajweed_rules=tajweed_rules,
+            phonetic_segments=json.loads(phonetic_segments),
+            difficulty_level=difficulty_level,
+        )
+        if not verse.phonetic_segments:
+            verse.phonetic_segments = verse_segments(verse)
+        return verse
+
+    def get_verse(self, key: VerseKey) -> Optional[QuranVerse]:
+        """
+        Get a verse.
+
+        Args:
+            key: The verse id ("surah:ayah") or a (surah, ayah) pair
+
+        Returns:
+            Optional[QuranVerse]: The verse, or None if it is not in the corpus
+        """
+        index = self._resolve(key)
+        return self.verse_at(index) if index is not None else None
+
+    def verse_range(self, start: VerseKey, end: VerseKey) -> VerseSlice:
+        """
+        Get an inclusive range of verses, e.g. "2:255" to "2:260".
+
+        Ranges may cross surah boundaries, since verses are stored in order.
+
+        Args:
+            start: The first verse in the range
+            end: The last verse in the range
+
+        Returns:
+            VerseSlice: The verses in the range
+        """
+        start_index, end_index = self._resolve(start), self._resolve(end)
+        if start_index is None or end_index is None:
+            raise KeyError(f"Verse range {start}-{end} is not in the corpus")
+        if end_index < start_index:
+            raise ValueError(f"Verse range {start}-{end} ends before it starts")
+        return VerseSlice(self, start_index, end_index + 1)
+
+    def surah_verses(self, surah_number: int) -> VerseSlice:
+        """
+        Get all verses of a surah.
+
+        Args:
+            surah_number: Surah number
+
+        Returns:
+            VerseSlice: The surah's verses (empty if the surah is not in the corpus)
+        """
+        surah = self._surah_row(surah_number)
+        if surah is None:
+            return VerseSlice(self, 0, 0)
+        first = int(surah["first_verse"])
+        return VerseSlice(self, first, first + int(surah["verses_count"]))
+
+    def get_surah(self, surah_number: int) -> Optional[QuranSurah]:
+        """
+        Get a surah's details.
+
+        Args:
+            surah_number: Surah number
+
+        Returns:
+            Optional[QuranSurah]: The surah, or None if it is not in the corpus
+        """
+        surah = self._surah_row(surah_number)
+        if surah is None:
+            return None
+        number, verses_count, _, *references = surah.item()
+        return QuranSurah.model_construct(
+            number=number,
+            verses_count=verses_count,
+            **dict(zip(SURAH_STRING_FIELDS, self._decode_strings(references))),
+        )
+
+    def get_surahs(self) -> List[QuranSurah]:
+        """
+        Get every surah in the corpus, in order.
+
+        Returns:
+            List[QuranSurah]: The surahs
+        """
+        return [self.get_surah(int(number)) for number in self.surah_records["number"]]
+
+    def close(self) -> None:
+        """Unmap the corpus (models already built stay valid)."""
+        self.surah_records = self.surah_records[:0].copy()
+        self.verse_records = self.verse_records[:0].copy()
+        self._strings.release()
+        self._mmap.close()
+
+_corpus: Optional[QuranCorpus] = None
+
+def get_corpus() -> QuranCorpus:
+    """
+    Get the shared corpus for this process, compiling it first if needed.
+
+    Returns:
+        QuranCorpus: The memory-mapped corpus
+    """
+    global _corpus
+    if _corpus is None:
+        ensure_corpus()
+        _corpus = QuranCorpus(QURAN_CORPUS_PATH)
+    return _corpus
+
+def main() -> None:
+    """Command-line entry point for compiling the corpus."""
+    parser = argparse.ArgumentParser(description="Compile the Quran text into a memory-mapped corpus")
+    parser.add_argument("--source", default=QURAN_TEXT_DIRECTORY)
+    parser.add_argument("--output", default=QURAN_CORPUS_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    compile_corpus(args.source, args.output)
+
+if __name__ == "__main__":
+    main()
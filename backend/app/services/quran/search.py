@@ -0,0 +1,379 @@
+"""
+Verse search for the Quranic Quest application.
+Normalized Arabic, transliteration and translation are indexed into inverted
+indexes (term -> verses) plus a character-trigram index over each field's
+vocabulary (trigram -> terms) for typo-tolerant lookup. The index is built
+from the compiled corpus and stored next to it as flat arrays, so a query
+only touches the postings of its own terms, never every verse.
+"""
+
+import os
+import re
+import logging
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+from services.quran.corpus import QURAN_CORPUS_PATH, QuranCorpus, get_corpus
+from utils.arabic_npl import normalize_batch
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Search settings
+QURAN_SEARCH_INDEX_PATH = os.getenv("QURAN_SEARCH_INDEX_PATH", os.path.splitext(QURAN_CORPUS_PATH)[0] + "_search.npz")
+SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.45"))
+SEARCH_FUZZY_CANDIDATES = int(os.getenv("SEARCH_FUZZY_CANDIDATES", "3"))
+
+# Fields and their weight in the combined score
+SEARCH_FIELDS = {"arabic": 1.0, "transliteration": 0.8, "translation": 0.6}
+SEARCH_INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Arabic proclitics stripped (in addition to indexing the full word), longest first
+ARABIC_PREFIXES = ("وال", "فال", "بال", "كال", "لل", "ال")
+LATIN_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def _fold_latin(text: str) -> str:
+    """Lowercase text and drop accents and apostrophes (ā -> a, 'ayn marks)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(character for character in decomposed if not unicodedata.combining(character)).replace("'", "").replace("`", "")
+
+def analyze(field: str, texts: List[str]) -> List[List[str]]:
+    """
+    Turn texts into index terms for a field.
+
+    Args:
+        field: The field ("arabic", "transliteration" or "translation")
+        texts: The texts
+
+    Returns:
+        List[List[str]]: The terms of each text
+    """
+    if field == "arabic":
+        analyzed = []
+        for text in normalize_batch(texts, unify_ya=True, unify_ta_marbuta=True, unify_hamza=True):
+            terms = []
+            for word in text.split():
+                terms.append(word)
+                for prefix in ARABIC_PREFIXES:
+                    if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+                        terms.append(word[len(prefix):])
+                        break
+            analyzed.append(terms)
+        return analyzed
+    return [LATIN_TOKEN_PATTERN.findall(_fold_latin(text)) for text in texts]
+
+def trigrams(term: str) -> List[str]:
+    """
+    Get the character trigrams of a term, padded so short terms and word edges count.
+
+    Args:
+        term: An index term
+
+    Returns:
+        List[str]: The term's distinct trigrams
+    """
+    padded = f"  {term} "
+    return list(dict.fromkeys(padded[index:index + 3] for index in range(len(padded) - 2)))
+
+def _offsets(lengths: Iterable[int]) -> np.ndarray:
+    """Turn list lengths into CSR-style offsets."""
+    return np.concatenate([[0], np.cumsum(np.fromiter(lengths, dtype=np.int64))]).astype(np.int64)
+
+def _encode_strings(strings: List[str]) -> np.ndarray:
+    """Pack strings into one uint8 array (newline separated)."""
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+def _decode_strings(packed: np.ndarray) -> List[str]:
+    """Unpack strings packed by _encode_strings."""
+    return packed.tobytes().decode("utf-8").split("\n") if len(packed) else []
+
+class FieldIndex:
+    """Inverted and trigram indexes for one field."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Initialize the index from its arrays.
+
+        Args:
+            arrays: terms, postings (verse indexes and term frequencies with offsets),
+                verse lengths, and trigrams with their term lists
+        """
+        self.arrays = arrays
+        self.terms = _decode_strings(arrays["terms"])
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.trigram_ids = {trigram: index for index, trigram in enumerate(_decode_strings(arrays["trigrams"]))}
+
+        self.posting_offsets = arrays["posting_offsets"]
+        self.posting_verses = arrays["posting_verses"]
+        self.posting_counts = arrays["posting_counts"]
+        self.verse_lengths = arrays["verse_lengths"]
+        self.trigram_offsets = arrays["trigram_offsets"]
+        self.trigram_terms = arrays["trigram_terms"]
+        self.term_trigram_counts = arrays["term_trigram_counts"]
+
+        verse_count = len(self.verse_lengths)
+        self.average_length = float(self.verse_lengths.mean()) if verse_count else 0.0
+        document_frequency = np.diff(self.posting_offsets)
+        self.idf = np.log(1 + (verse_count - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+
+    @classmethod
+    def build(cls, documents: List[List[str]]) -> "FieldIndex":
+        """
+        Build the index for one field.
+
+        Args:
+            documents: The terms of each verse, in record order
+
+        Returns:
+            FieldIndex: The index
+        """
+        postings: Dict[str, Dict[int, int]] = {}
+        for verse_index, terms in enumerate(documents):
+            for term in terms:
+                counts = postings.setdefault(term, {})
+                counts[verse_index] = counts.get(verse_index, 0) + 1
+
+        terms = sorted(postings)
+        term_trigrams = [trigrams(term) for term in terms]
+        trigram_terms: Dict[str, List[int]] = {}
+        for term_id, term_grams in enumerate(term_trigrams):
+            for trigram in term_grams:
+                trigram_terms.setdefault(trigram, []).append(term_id)
+        trigram_keys = sorted(trigram_terms)
+
+        return cls({
+            "terms": _encode_strings(terms),
+            "posting_offsets": _offsets(len(postings[term]) for term in terms),
+            "posting_verses": np.fromiter((verse for term in terms for verse in postings[term]), dtype=np.int32),
+            "posting_counts": np.fromiter((count for term in terms for count in postings[term].values()), dtype=np.float32),
+            "verse_lengths": np.fromiter((len(terms) for terms in documents), dtype=np.float32, count=len(documents)),
+            "trigrams": _encode_strings(trigram_keys),
+            "trigram_offsets": _offsets(len(trigram_terms[trigram]) for trigram in trigram_keys),
+            "trigram_terms": np.fromiter((term_id for trigram in trigram_keys for term_id in trigram_terms[trigram]), dtype=np.int32),
+            "term_trigram_counts": np.fromiter((len(term_grams) for term_grams in term_trigrams), dtype=np.int32, count=len(terms)),
+        })
+
+    def similar_terms(self, token: str, limit: int = SEARCH_FUZZY_CANDIDATES) -> List[Tuple[int, float]]:
+        """
+        Find vocabulary terms that look like a token, by shared trigrams.
+
+        Args:
+            token: A query term not found in the vocabulary
+            limit: Maximum number of terms to return
+
+        Returns:
+            List[Tuple[int, float]]: Term ids with their Dice similarity, best first
+        """
+        token_trigrams = [self.trigram_ids[trigram] for trigram in trigrams(token) if trigram in self.trigram_ids]
+        if not token_trigrams:
+            return []
+
+        candidates = np.concatenate([
+            self.trigram_terms[self.trigram_offsets[index]:self.trigram_offsets[index + 1]]
+            for index in token_trigrams
+        ])
+        term_ids, shared = np.unique(candidates, return_counts=True)
+        similarity = 2 * shared / (len(trigrams(token)) + self.term_trigram_counts[term_ids])
+
+        keep = similarity >= SEARCH_MIN_SIMILARITY
+        term_ids, similarity = term_ids[keep], similarity[keep]
+        best = np.argsort(-similarity, kind="stable")[:limit]
+        return list(zip(term_ids[best].tolist(), similarity[best].tolist()))
+
+    def score(self, tokens: List[str], fuzzy: bool) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Get the BM25 contributions of a query's tokens.
+
+        Args:
+            tokens: Analyzed query terms
+            fuzzy: Whether to match unknown tokens to similar terms
+
+        Returns:
+            Tuple[List[np.ndarray], List[np.ndarray]]: Verse indexes and their score contributions, per matched term
+        """
+        verses, scores = [], []
+        for token in tokens:
+            term_id = self.term_ids.get(token)
+            matches = [(term_id, 1.0)] if term_id is not None else (self.similar_terms(token) if fuzzy else [])
+
+            for matched_id, similarity in matches:
+                start, end = self.posting_offsets[matched_id], self.posting_offsets[matched_id + 1]
+                posting_verses = self.posting_verses[start:end]
+                counts = self.posting_counts[start:end]
+                normalization = BM25_K1 * (1 - BM25_B + BM25_B * self.verse_lengths[posting_verses] / self.average_length)
+                verses.append(posting_verses)
+                scores.append(similarity * self.idf[matched_id] * counts * (BM25_K1 + 1) / (counts + normalization))
+        return verses, scores
+
+class SearchIndex:
+    """Search over every field of the corpus."""
+
+    def __init__(self, fields: Dict[str, FieldIndex], fingerprint: str):
+        """
+        Initialize the index.
+
+        Args:
+            fields: Index for each searchable field
+            fingerprint: Identifies the corpus the index was built from
+        """
+        self.fields = fields
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def fingerprint_for(corpus: QuranCorpus) -> str:
+        """
+        Fingerprint a corpus, so stale indexes are rebuilt.
+
+        Args:
+            corpus: The corpus
+
+        Returns:
+            str: The fingerprint
+        """
+        stat = os.stat(corpus.path)
+        return f"{SEARCH_INDEX_VERSION}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @classmethod
+    def build(cls, corpus: QuranCorpus) -> "SearchIndex":
+        """
+        Index every verse in the corpus.
+
+        Args:
+            corpus: The corpus to index
+
+        Returns:
+            SearchIndex: The index
+        """
+        verses = [corpus.verse_at(index) for index in range(len(corpus))]
+        texts = {
+            "arabic": [verse.arabic_text for verse in verses],
+            "transliteration": [verse.transliteration for verse in verses],
+            "translation": [verse.translation for verse in verses],
+        }
+        fields = {field: FieldIndex.build(analyze(field, texts[field])) for field in SEARCH_FIELDS}
+        return cls(fields, cls.fingerprint_for(corpus))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["SearchIndex"]:
+        """
+        Load a saved index.
+
+        Args:
+            path: Path of the saved index
+
+        Returns:
+            Optional[SearchIndex]: The index, or None if it is missing or unreadable
+        """
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                fingerprint = str(saved["fingerprint"])
+                fields = {
+                    field: FieldIndex({
+                        key.split("/", 1)[1]: saved[key]
+                        for key in saved.files if key.startswith(f"{field}/")
+                    })
+                    for field in SEARCH_FIELDS
+                }
+            return cls(fields, fingerprint)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path: str) -> None:
+        """
+        Save the index next to the corpus, replacing any previous one atomically.
+
+        Args:
+            path: Path to save the index to
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(temp_path, fingerprint=np.array(self.fingerprint), **{
+            f"{field}/{key}": array
+            for field, index in self.fields.items()
+            for key, array in index.arrays.items()
+        })
+        os.replace(temp_path, path)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        fields: Optional[Iterable[str]] = None,
+        fuzzy: bool = True
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank verses for a query.
+
+        Args:
+            query: Arabic, transliterated or English query text
+            limit: Maximum number of results
+            fields: Fields to search (defaults to all of them)
+            fuzzy: Whether unknown words match similar indexed words
+
+        Returns:
+            List[Tuple[int, float]]: Verse record indexes with their scores, best first
+        """
+        verses, scores = [], []
+        for field in fields or SEARCH_FIELDS:
+            tokens = analyze(field, [query])[0]
+            field_verses, field_scores = self.fields[field].score(tokens, fuzzy)
+            verses.extend(field_verses)
+            scores.extend(score * SEARCH_FIELDS[field] for score in field_scores)
+
+        if not verses:
+            return []
+
+        # Sum contributions over only the verses that matched some term
+        matched, positions = np.unique(np.concatenate(verses), return_inverse=True)
+        totals = np.bincount(positions, weights=np.concatenate(scores))
+        best = np.argsort(-totals, kind="stable")[:limit]
+        return list(zip(matched[best].tolist(), totals[best].tolist()))
+
+def search_verses(
+    query: str,
+    limit: int = 10,
+    fields: Optional[Iterable[str]] = None,
+    fuzzy: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Search the corpus and materialize the matching verses.
+
+    Args:
+        query: Arabic, transliterated or English query text
+        limit: Maximum number of results
+        fields: Fields to search (defaults to all of them)
+        fuzzy: Whether unknown words match similar indexed words
+
+    Returns:
+        List[Dict[str, Any]]: Results with "verse" and "score", best first
+    """
+    corpus = get_corpus()
+    return [
+        {"verse": corpus.verse_at(index), "score": round(score, 4)}
+        for index, score in get_search_index().search(query, limit=limit, fields=fields, fuzzy=fuzzy)
+    ]
+
+_index: Optional[SearchIndex] = None
+
+def get_search_index() -> SearchIndex:
+    """
+    Get the shared search index, loading or rebuilding the saved one.
+
+    Returns:
+        SearchIndex: The index
+    """
+    global _index
+    if _index is None:
+        corpus = get_corpus()
+        index = SearchIndex.load(QURAN_SEARCH_INDEX_PATH)
+        if index is None or index.fingerprint != SearchIndex.fingerprint_for(corpus):
+            index = SearchIndex.build(corpus)
+            index.save(QURAN_SEARCH_INDEX_PATH)
+            logger.info(f"Built search index for {len(corpus)} verses")
+        _index = index
+    return _index
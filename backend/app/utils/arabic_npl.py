@@ -0,0 +1,294 @@
+"""
+Arabic text normalization for the Quranic Quest application.
+Normalization is done with precomputed str.translate tables, one per
+combination of options, so each call is a single pass in C. Batch functions
+translate many texts in one call, and phonetic segmentation of corpus verses
+is memoized by verse id, so tajweed matching, search and scoring share one
+implementation instead of re-tokenizing text per request.
+"""
+
+import re
+import logging
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from models.quran import QuranVerse
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Character classes
+TATWEEL = "\u0640"
+FATHA, DAMMA, KASRA = "\u064E", "\u064F", "\u0650"
+FATHATAN, DAMMATAN, KASRATAN = "\u064B", "\u064C", "\u064D"
+SHADDAH = "\u0651"
+SUKUN = "\u0652"
+QURANIC_SUKUN = "\u06E1"
+MADDAH = "\u0653"
+SUPERSCRIPT_ALEF = "\u0670"
+
+VOWELS = FATHA + DAMMA + KASRA
+TANWEEN = FATHATAN + DAMMATAN + KASRATAN + "\u08F0\u08F1\u08F2"  # Including the open tanween of Uthmani script
+SUKUNS = SUKUN + QURANIC_SUKUN
+
+# Every combining mark used on Arabic letters: harakat, Quranic annotation signs and small letters
+DIACRITICS = "".join(chr(code) for code in (
+    *range(0x0610, 0x061B), *range(0x064B, 0x0660), 0x0670,
+    *range(0x06D6, 0x06DD), *range(0x06DF, 0x06E9), *range(0x06EA, 0x06EE),
+    *range(0x08D3, 0x08E2), *range(0x08E3, 0x0900),
+))
+
+ALEF = "\u0627"
+ALEF_VARIANTS = "\u0622\u0623\u0625\u0671\u0672\u0673"  # Alef with maddah, hamza above/below, wasla and wavy hamza
+HAMZA_CARRIERS = {"\u0624": "\u0648", "\u0626": "\u064A"}  # Hamza on waw and on ya
+ALEF_MAQSURA, YA = "\u0649", "\u064A"
+TA_MARBUTA, HA = "\u0629", "\u0647"
+
+ARABIC_LETTERS = "".join(chr(code) for code in range(0x0621, 0x064B) if code != 0x0640) + "\u0671"
+
+# Sounds used by the phonetic segmenter
+LETTER_SOUNDS = {
+    "ء": "'", "آ": "'aa", "أ": "'", "ؤ": "'", "إ": "'", "ئ": "'",
+    "ا": "", "ب": "b", "ة": "h", "ت": "t", "ث": "th", "ج": "j",
+    "ح": "H", "خ": "kh", "د": "d", "ذ": "dh", "ر": "r", "ز": "z",
+    "س": "s", "ش": "sh", "ص": "S", "ض": "D", "ط": "T", "ظ": "Z",
+    "ع": "'", "غ": "gh", "ف": "f", "ق": "q", "ك": "k", "ل": "l",
+    "م": "m", "ن": "n", "ه": "h", "و": "w", "ى": "aa", "ي": "y",
+    "ٱ": "",
+}
+MARK_SOUNDS = {
+    FATHA: "a", DAMMA: "u", KASRA: "i",
+    FATHATAN: "an", DAMMATAN: "un", KASRATAN: "in",
+    "\u08F0": "an", "\u08F1": "un", "\u08F2": "in",
+    SUPERSCRIPT_ALEF: "aa", MADDAH: "aa",
+}
+
+LONG_VOWEL_LETTERS = {ALEF: "a", "\u0648": "u", YA: "i"}
+
+SEGMENT_PATTERN = re.compile(f"([{ARABIC_LETTERS}])([{DIACRITICS}]*)")
+
+# Separator for batch translation; it is not changed by any table
+BATCH_SEPARATOR = "\x00"
+
+# Translation tables are lists indexed by code point, covering every Arabic block;
+# str.translate treats characters past the end as unchanged. Indexing a list is
+# much faster than a dict lookup that misses for most characters.
+TABLE_SIZE = 0x0900
+
+@lru_cache(maxsize=None)
+def _translation_table(
+    strip_diacritics: bool,
+    unify_alef: bool,
+    remove_tatweel: bool,
+    unify_ya: bool,
+    unify_ta_marbuta: bool,
+    unify_hamza: bool
+) -> List[str]:
+    """Build (once) the translation table for a combination of options."""
+    mapping: Dict[str, str] = {}
+    if strip_diacritics:
+        mapping.update(dict.fromkeys(DIACRITICS, ""))
+    if remove_tatweel:
+        mapping[TATWEEL] = ""
+    if unify_alef:
+        mapping.update(dict.fromkeys(ALEF_VARIANTS, ALEF))
+    if unify_ya:
+        mapping[ALEF_MAQSURA] = YA
+    if unify_ta_marbuta:
+        mapping[TA_MARBUTA] = HA
+    if unify_hamza:
+        mapping.update(HAMZA_CARRIERS)
+
+    table = [chr(code) for code in range(TABLE_SIZE)]
+    for character, replacement in mapping.items():
+        table[ord(character)] = replacement
+    return table
+
+def normalize(
+    text: str,
+    strip_diacritics: bool = True,
+    unify_alef: bool = True,
+    remove_tatweel: bool = True,
+    unify_ya: bool = False,
+    unify_ta_marbuta: bool = False,
+    unify_hamza: bool = False,
+    collapse_whitespace: bool = True
+) -> str:
+    """
+    Normalize Arabic text.
+
+    Args:
+        text: Arabic text
+        strip_diacritics: Remove harakat, tanween, shaddah, sukun and Quranic marks
+        unify_alef: Map alef with hamza or maddah and alef wasla to a bare alef
+        remove_tatweel: Remove tatweel (kashida) elongation
+        unify_ya: Map alef maqsura to ya
+        unify_ta_marbuta: Map ta marbuta to ha
+        unify_hamza: Map hamza on waw or ya to the bare carrier
+        collapse_whitespace: Collapse runs of whitespace to single spaces and trim
+
+    Returns:
+        str: The normalized text
+    """
+    table = _translation_table(strip_diacritics, unify_alef, remove_tatweel, unify_ya, unify_ta_marbuta, unify_hamza)
+    text = text.translate(table)
+    if collapse_whitespace:
+        text = " ".join(text.split())
+    return text
+
+def normalize_batch(texts: Sequence[str], **options: bool) -> List[str]:
+    """
+    Normalize many texts with one translate call.
+
+    Args:
+        texts: Arabic texts
+        **options: Options for normalize()
+
+    Returns:
+        List[str]: The normalized texts, in order
+    """
+    if not texts:
+        return []
+    collapse_whitespace = options.pop("collapse_whitespace", True)
+    joined = normalize(BATCH_SEPARATOR.join(texts), collapse_whitespace=False, **options)
+    normalized = joined.split(BATCH_SEPARATOR)
+    if collapse_whitespace:
+        normalized = [" ".join(text.split()) for text in normalized]
+    return normalized
+
+def normalize_verses(verses: Iterable[QuranVerse], **options: bool) -> Dict[str, str]:
+    """
+    Normalize the Arabic text of many verses.
+
+    Args:
+        verses: The verses
+        **options: Options for normalize()
+
+    Returns:
+        Dict[str, str]: Normalized text by verse id
+    """
+    verses = list(verses)
+    return dict(zip((verse.id for verse in verses), normalize_batch([verse.arabic_text for verse in verses], **options)))
+
+def strip_diacritics(text: str) -> str:
+    """
+    Remove every diacritic, keeping letters (and tatweel) as they are.
+
+    Args:
+        text: Arabic text
+
+    Returns:
+        str: The text without diacritics
+    """
+    return text.translate(_translation_table(True, False, False, False, False, False))
+
+def prepare_for_matching(text: str) -> str:
+    """
+    Canonicalize diacritized text for pattern matching.
+
+    Tatweel is removed so marks follow their letters, and the text is put
+    into NFC so combining marks always appear in the same order (for
+    example a vowel before shaddah) whichever order they were typed in.
+
+    Args:
+        text: Arabic text with diacritics
+
+    Returns:
+        str: The canonicalized text
+    """
+    return unicodedata.normalize("NFC", text.translate(_translation_table(False, False, True, False, False, False)))
+
+def tokenize(text: str, **options: bool) -> List[str]:
+    """
+    Normalize text and split it into words.
+
+    Args:
+        text: Arabic text
+        **options: Options for normalize()
+
+    Returns:
+        List[str]: The normalized words
+    """
+    return normalize(text, **options).split()
+
+@lru_cache(maxsize=None)
+def _letter_sounds(letter: str, marks: str) -> Tuple[str, str]:
+    """Get the consonant and vowel sounds of a letter and its marks."""
+    if SUPERSCRIPT_ALEF in marks or MADDAH in marks:
+        marks = marks.replace(FATHA, "")  # Fatha with a dagger alef or maddah is one long vowel
+    vowel = "".join(MARK_SOUNDS.get(mark, "") for mark in marks)
+    consonant = LETTER_SOUNDS.get(letter, "")
+    if SHADDAH in marks:
+        consonant *= 2
+    return consonant, vowel
+
+def segment(text: str) -> List[Dict[str, str]]:
+    """
+    Split diacritized text into phonetic segments, one per letter.
+
+    Each segment holds the letter, its marks and an approximate sound: the
+    consonant (doubled by shaddah) followed by its vowel. Long vowels are
+    written as "aa", "uu" and "ii" where a bare alef, waw or ya follows the
+    matching short vowel.
+
+    Args:
+        text: Arabic text with diacritics
+
+    Returns:
+        List[Dict[str, str]]: Segments with "text", "letter", "diacritics" and "sound" keys
+    """
+    segments = []
+    for word in prepare_for_matching(text).split():
+        previous_vowel = ""
+        for letter, marks in SEGMENT_PATTERN.findall(word):
+            consonant, vowel = _letter_sounds(letter, marks)
+            if not marks and previous_vowel and LONG_VOWEL_LETTERS.get(letter) == previous_vowel:
+                consonant = previous_vowel  # Alef after fatha, waw after damma and ya after kasra lengthen the vowel
+
+            segments.append({
+                "text": letter + marks,
+                "letter": letter,
+                "diacritics": marks,
+                "sound": consonant + vowel,
+            })
+            previous_vowel = vowel[-1:]
+    return segments
+
+def segment_batch(texts: Sequence[str]) -> List[List[Dict[str, str]]]:
+    """
+    Segment many texts.
+
+    Args:
+        texts: Arabic texts with diacritics
+
+    Returns:
+        List[List[Dict[str, str]]]: Segments for each text
+    """
+    return [segment(text) for text in texts]
+
+@lru_cache(maxsize=8192)
+def _cached_segments(verse_id: str, arabic_text: str) -> Tuple[Dict[str, str], ...]:
+    """Segment a verse once per (verse id, text) pair."""
+    return tuple(segment(arabic_text))
+
+def verse_segments(verse: QuranVerse) -> List[Dict[str, str]]:
+    """
+    Get the phonetic segments of a verse, memoized by verse id.
+
+    The verse's own phonetic_segments are used when the corpus provides them.
+    Memoized segments are returned as copies, so callers may change them.
+
+    Args:
+        verse: The verse
+
+    Returns:
+        List[Dict[str, str]]: The verse's phonetic segments
+    """
+    if verse.phonetic_segments:
+        return verse.phonetic_segments
+    return [dict(segment) for segment in _cached_segments(verse.id, verse.arabic_text)]
+
+def clear_segment_cache() -> None:
+    """Clear memoized verse segments (after the corpus is recompiled)."""
+    _cached_segments.cache_clear()
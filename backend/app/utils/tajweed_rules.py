@@ -0,0 +1,288 @@
+"""
+Tajweed rule matching for the Quranic Quest application.
+Every rule in data/tajweed_rules/rules.json lists letter/diacritic patterns.
+They are compiled into one combined regular expression, so a verse is
+annotated in a single pass over its text. Annotations for the whole corpus
+are computed once and cached on disk, keyed by the rules and the corpus, so
+per-request lookups are dictionary reads.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from models.quran import TajweedRule
+from services.quran.corpus import QuranCorpus, get_corpus
+from utils.arabic_npl import ALEF, ALEF_MAQSURA, SHADDAH, SUKUNS, TANWEEN, VOWELS, prepare_for_matching
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Tajweed settings
+TAJWEED_RULES_PATH = os.getenv("TAJWEED_RULES_PATH", "data/tajweed_rules/rules.json")
+TAJWEED_INDEX_PATH = os.getenv("TAJWEED_INDEX_PATH", "data/tajweed_rules/index.json")
+
+# Macros available to rule patterns as @NAME (expanded until none remain)
+PATTERN_MACROS = {
+    "NOON_OR_TANWEEN": f"(?:\u0646@SUKUN|@TANWEEN[{ALEF}{ALEF_MAQSURA}]?)",  # Noon sakinah, or tanween and its silent alef
+    "TANWEEN": f"[{TANWEEN}]",
+    "VOWEL": f"[{VOWELS}]",
+    "SUKUN": f"[{SUKUNS}]",
+    "SHADDAH": SHADDAH,
+    "UNVOWELLED": f"(?![{TANWEEN}{VOWELS}{SHADDAH}])",
+    "GAP": "\\s*",
+}
+MACRO_PATTERN = re.compile(r"@([A-Z_]+)")
+
+def expand_pattern(pattern: str) -> str:
+    """
+    Expand @MACRO references in a rule pattern.
+
+    Args:
+        pattern: Rule pattern, possibly containing macros
+
+    Returns:
+        str: The pattern as a plain regular expression
+    """
+    while MACRO_PATTERN.search(pattern):
+        pattern = MACRO_PATTERN.sub(lambda match: PATTERN_MACROS[match.group(1)], pattern)
+    return pattern
+
+class TajweedMatcher:
+    """Annotates Arabic text with every tajweed rule in one pass."""
+
+    def __init__(self, rule_definitions: List[Dict[str, Any]]):
+        """
+        Compile the rules.
+
+        Each rule becomes a named group in one alternation. Rules are
+        expected not to start at the same position (where they do, the
+        first listed wins).
+
+        Args:
+            rule_definitions: TajweedRule fields plus a "patterns" list per rule
+        """
+        self.rules: Dict[str, TajweedRule] = {}
+        self._group_rules: Dict[str, str] = {}
+        alternatives = []
+
+        for index, definition in enumerate(rule_definitions):
+            definition = dict(definition)
+            patterns = definition.pop("patterns")
+            rule = TajweedRule.model_validate(definition)
+            self.rules[rule.id] = rule
+
+            group = f"rule{index}"
+            self._group_rules[group] = rule.id
+            combined = "|".join(expand_pattern(pattern) for pattern in patterns)
+            alternatives.append(f"(?P<{group}>{combined})")
+
+        self._pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    def annotate(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Find every tajweed rule that applies in a text.
+
+        The text is canonicalized first (see prepare_for_matching), and
+        spans refer to the canonical text.
+
+        Args:
+            text: Arabic text with diacritics
+
+        Returns:
+            List[Dict[str, Any]]: One annotation per match, with the rule id, span and matched text
+        """
+        if self._pattern is None:
+            return []
+        text = prepare_for_matching(text)
+
+        # Each search resumes one character after the previous match's start,
+        # so spans from different rules may overlap
+        annotations = []
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            start, end = match.span()
+            annotations.append({
+                "rule": self._group_rules[match.lastgroup],
+                "start": start,
+                "end": end,
+                "text": text[start:end],
+            })
+            match = search(text, start + 1)
+        return annotations
+
+    def annotate_many(self, texts: Iterable[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Annotate several texts.
+
+        Args:
+            texts: Arabic texts with diacritics
+
+        Returns:
+            List[List[Dict[str, Any]]]: Annotations for each text
+        """
+        return [self.annotate(text) for text in texts]
+
+def load_rule_definitions(path: str = TAJWEED_RULES_PATH) -> List[Dict[str, Any]]:
+    """
+    Load the rule definitions.
+
+    Args:
+        path: Path to the rules JSON file
+
+    Returns:
+        List[Dict[str, Any]]: The rule definitions (empty if the file is empty)
+    """
+    with open(path, "r", encoding="utf-8") as rules_file:
+        content = rules_file.read()
+    return json.loads(content) if content.strip() else []
+
+class TajweedIndex:
+    """Precomputed tajweed annotations for every verse in the corpus."""
+
+    def __init__(self, annotations: Dict[str, List[Dict[str, Any]]], fingerprint: str):
+        """
+        Initialize the index.
+
+        Args:
+            annotations: Annotations by verse id
+            fingerprint: Identifies the rules and corpus the annotations were computed from
+        """
+        self.annotations = annotations
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def fingerprint_for(rule_definitions: List[Dict[str, Any]], corpus: QuranCorpus) -> str:
+        """
+        Fingerprint the rules and corpus, so stale indexes are rebuilt.
+
+        Args:
+            rule_definitions: The rule definitions
+            corpus: The corpus
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        digest = hashlib.sha256(json.dumps(rule_definitions, sort_keys=True).encode("utf-8"))
+        stat = os.stat(corpus.path)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, matcher: TajweedMatcher, corpus: QuranCorpus, fingerprint: str) -> "TajweedIndex":
+        """
+        Annotate every verse in the corpus.
+
+        Args:
+            matcher: The compiled rules
+            corpus: The corpus to annotate
+            fingerprint: Fingerprint of the rules and corpus
+
+        Returns:
+            TajweedIndex: The index
+        """
+        annotations = {}
+        for index in range(len(corpus)):
+            verse = corpus.verse_at(index)
+            annotations[verse.id] = matcher.annotate(verse.arabic_text)
+        return cls(annotations, fingerprint)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TajweedIndex"]:
+        """
+        Load a saved index.
+
+        Args:
+            path: Path of the saved index
+
+        Returns:
+            Optional[TajweedIndex]: The index, or None if it is missing or unreadable
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as index_file:
+                data = json.load(index_file)
+            return cls(data["annotations"], data["fingerprint"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path: str) -> None:
+        """
+        Save the index, replacing any previous one atomically.
+
+        Args:
+            path: Path to save the index to
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump({"fingerprint": self.fingerprint, "annotations": self.annotations}, index_file, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def get(self, verse_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the annotations for a verse.
+
+        Args:
+            verse_id: Verse id ("surah:ayah")
+
+        Returns:
+            List[Dict[str, Any]]: Copies of the verse's annotations (empty if it is not in the corpus)
+        """
+        return [dict(annotation) for annotation in self.annotations.get(verse_id, [])]
+
+_matcher: Optional[TajweedMatcher] = None
+_index: Optional[TajweedIndex] = None
+
+def get_tajweed_matcher() -> TajweedMatcher:
+    """
+    Get the shared matcher for this process.
+
+    Returns:
+        TajweedMatcher: The compiled rules
+    """
+    global _matcher
+    if _matcher is None:
+        _matcher = TajweedMatcher(load_rule_definitions())
+    return _matcher
+
+def get_tajweed_index() -> TajweedIndex:
+    """
+    Get the shared corpus annotations, loading or rebuilding the cached index.
+
+    Once loaded, the index fills QuranVerse.tajweed_rules for every verse the
+    corpus builds.
+
+    Returns:
+        TajweedIndex: Annotations for every verse
+    """
+    global _index
+    if _index is None:
+        corpus = get_corpus()
+        fingerprint = TajweedIndex.fingerprint_for(load_rule_definitions(), corpus)
+
+        index = TajweedIndex.load(TAJWEED_INDEX_PATH)
+        if index is None or index.fingerprint != fingerprint:
+            index = TajweedIndex.build(get_tajweed_matcher(), corpus, fingerprint)
+            index.save(TAJWEED_INDEX_PATH)
+            logger.info(f"Built tajweed index for {len(index.annotations)} verses")
+        _index = index
+
+        # Verses built from the corpus from now on carry their annotations
+        corpus.tajweed_lookup = index.get
+    return _index
+
+def get_verse_tajweed(verse_id: str) -> List[Dict[str, Any]]:
+    """
+    Get the tajweed annotations for a verse.
+
+    Args:
+        verse_id: Verse id ("surah:ayah")
+
+    Returns:
+        List[Dict[str, Any]]: The verse's annotations
+    """
+    return get_tajweed_index().get(verse_id)
@@ -0,0 +1,149 @@
+"""
+Benchmark for progress updates with background, coalesced path adjustment.
+Simulates children sending quick runs of low-scored progress updates, each
+of which calls for a re-plan, and compares the inline handler (record, check
+and re-plan inside the request) with the adjustment scheduler (record, then
+hand off). Re-plans use the real planner over a synthetic catalog; database
+writes are simulated with a short sleep. Reports request latency, the number
+of re-plans run, and how long after a child's first update their path is
+re-planned (the last time, if the cap forced earlier re-plans).
+
+Usage (from the backend directory):
+    python benchmarks/bench_adjustment.py [--users 50] [--updates 8] [--units 100000]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from datetime import datetime
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from fastapi.concurrency import run_in_threadpool
+from models.learning_path import LearningProgress
+from services.learning_paths.catalog import UnitCatalog
+from services.learning_paths.planner import PlanRequest, plan_units
+from services.learning_paths.scheduler import AdjustmentScheduler
+from services.learning_paths.service import LearningPathService
+
+DATABASE_WRITE_SECONDS = 0.001
+
+def percentiles(timings: list) -> str:
+    """Format the median and 99th percentile of timings in milliseconds."""
+    return f"p50 {np.percentile(timings, 50) * 1000:8.2f} ms   p99 {np.percentile(timings, 99) * 1000:8.2f} ms"
+
+def synthetic_catalog(rng: np.random.Generator, count: int) -> UnitCatalog:
+    """Make a catalog of units with random difficulty, type and duration."""
+    content_types = ("recitation", "memorization", "lesson", "quiz")
+    return UnitCatalog([
+        {
+            "id": f"unit-{index}",
+            "title": f"Unit {index}",
+            "description": "Synthetic unit",
+            "content_type": content_types[index % len(content_types)],
+            "difficulty": int(rng.integers(1, 6)),
+            "estimated_duration_minutes": int(rng.integers(3, 31)),
+            "verses": [],
+            "tags": ["tajweed"] if index % 3 == 0 else ["recitation"],
+        }
+        for index in range(count)
+    ])
+
+class SimulatedService(LearningPathService):
+    """Learning path service with simulated storage and real re-planning."""
+
+    def __init__(self, catalog: UnitCatalog):
+        self.catalog = catalog
+        self.replans = 0
+        self.replanned_at = {}
+
+    async def update_learning_progress(self, progress: LearningProgress) -> LearningProgress:
+        await asyncio.sleep(DATABASE_WRITE_SECONDS)
+        return progress
+
+    async def adjust_learning_path(self, user_id: str, progress: LearningProgress):
+        request = PlanRequest(target_difficulty=2, budget_minutes=600, session_minutes=20, goals=["tajweed"])
+        await run_in_threadpool(plan_units, self.catalog, request)
+        await asyncio.sleep(DATABASE_WRITE_SECONDS)
+        self.replans += 1
+        self.replanned_at[user_id] = time.perf_counter()
+
+def progress_for(user_id: str, index: int) -> LearningProgress:
+    """Make a low-scored progress update."""
+    return LearningProgress(
+        id=f"{user_id}-{index}",
+        user_id=user_id,
+        unit_id=f"unit-{index}",
+        timestamp=datetime.now(),
+        completed=True,
+        time_spent_minutes=5,
+        accuracy_score=30,
+    )
+
+async def run_children(handle, users: int, updates: int, gap: float) -> tuple:
+    """Have every child send their updates, returning request latencies and first-update times."""
+    latencies = []
+    first_sent = {}
+
+    async def child(user_id: str) -> None:
+        for index in range(updates):
+            start = time.perf_counter()
+            first_sent.setdefault(user_id, start)
+            await handle(progress_for(user_id, index))
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(gap)
+
+    await asyncio.gather(*(child(f"user-{user}") for user in range(users)))
+    return latencies, first_sent
+
+async def run(args: argparse.Namespace) -> None:
+    """Run both scenarios and print the results."""
+    catalog = synthetic_catalog(np.random.default_rng(args.seed), args.units)
+    gap = args.gap_ms / 1000
+    print(f"{args.users} children x {args.updates} updates, {args.gap_ms:.0f} ms apart, {len(catalog)} units")
+
+    inline_service = SimulatedService(catalog)
+
+    async def inline(progress: LearningProgress) -> None:
+        await inline_service.update_learning_progress(progress)
+        if await inline_service.check_path_adjustment(progress.user_id, progress):
+            await inline_service.adjust_learning_path(progress.user_id, progress)
+
+    latencies, _ = await run_children(inline, args.users, args.updates, gap)
+    print(f"inline:    request {percentiles(latencies)}   {inline_service.replans} re-plans")
+
+    scheduled_service = SimulatedService(catalog)
+    scheduler = AdjustmentScheduler(scheduled_service, debounce_ms=args.debounce_ms, max_delay_ms=args.max_delay_ms)
+    await scheduler.start()
+
+    async def scheduled(progress: LearningProgress) -> None:
+        await scheduled_service.update_learning_progress(progress)
+        scheduler.submit(progress)
+
+    latencies, first_sent = await run_children(scheduled, args.users, args.updates, gap)
+    await asyncio.sleep(args.max_delay_ms / 1000)
+    await scheduler.stop()
+    delays = [scheduled_service.replanned_at[user_id] - sent for user_id, sent in first_sent.items()]
+    print(f"scheduled: request {percentiles(latencies)}   {scheduled_service.replans} re-plans")
+    print(f"  first update to final re-plan: {percentiles(delays)}")
+    print(f"  scheduler: {scheduler.get_stats()}")
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--updates", type=int, default=8)
+    parser.add_argument("--gap-ms", type=float, default=100)
+    parser.add_argument("--units", type=int, default=100000)
+    parser.add_argument("--debounce-ms", type=float, default=500)
+    parser.add_argument("--max-delay-ms", type=float, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
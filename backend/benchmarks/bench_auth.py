@@ -0,0 +1,120 @@
+"""
+Benchmark for per-request authentication overhead.
+Times get_current_user with the verified-token cache disabled and enabled,
+first in isolation and then behind a minimal FastAPI route driven at a fixed
+request rate (2000 requests per second by default) by many clients, each
+with its own token.
+
+Usage (from the backend directory):
+    python benchmarks/bench_auth.py [--rps 2000] [--seconds 5] [--clients 1000]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+import httpx
+from fastapi import Depends, FastAPI
+
+BACKEND_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(BACKEND_DIRECTORY, "app"))
+sys.path.insert(0, BACKEND_DIRECTORY)
+
+# Use a throwaway SQLite database seeded with the demo users
+DATABASE_DIRECTORY = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(DATABASE_DIRECTORY, 'bench.sqlite3')}"
+
+from api.dependencies import create_access_token, get_current_user
+from api.token_cache import token_cache
+from models.user import User
+from services.db import demo_users, get_database
+
+def make_tokens(count: int) -> list:
+    """Create one token per simulated client, spread over the demo users."""
+    users = demo_users()
+    return [
+        create_access_token({"sub": user["id"], "email": user["email"], "role": user["role"], "client": index})
+        for index, user in ((index, users[index % len(users)]) for index in range(count))
+    ]
+
+def percentiles(timings: list) -> str:
+    """Format the median and 99th percentile of timings in milliseconds."""
+    return f"p50 {np.percentile(timings, 50) * 1000:7.3f} ms   p99 {np.percentile(timings, 99) * 1000:7.3f} ms"
+
+async def time_dependency(tokens: list, calls: int) -> list:
+    """Time get_current_user called directly."""
+    timings = []
+    for index in range(calls):
+        start = time.perf_counter()
+        await get_current_user(tokens[index % len(tokens)])
+        timings.append(time.perf_counter() - start)
+    return timings
+
+async def run_load(app: FastAPI, tokens: list, rps: int, seconds: float) -> tuple:
+    """Send requests at a fixed rate and collect their latencies."""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def request(token: str) -> None:
+            start = time.perf_counter()
+            response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+        total = int(rps * seconds)
+        tasks = []
+        started = time.perf_counter()
+        for index in range(total):
+            delay = started + index / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(request(tokens[index % len(tokens)])))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return latencies, total / elapsed
+
+async def run(args: argparse.Namespace) -> None:
+    """Run every scenario with the cache disabled, then enabled."""
+    await get_database().start(seed_demo_users=True)
+    tokens = make_tokens(args.clients)
+
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user: User = Depends(get_current_user)) -> dict:
+        return {"id": user.id}
+
+    max_entries = token_cache.max_entries
+    for label, entries in (("no cache", 0), ("token cache", max_entries)):
+        token_cache.clear()
+        token_cache.max_entries = entries
+
+        await time_dependency(tokens, len(tokens))  # Warm up (and fill the cache)
+        dependency_timings = await time_dependency(tokens, args.calls)
+        latencies, achieved = await run_load(app, tokens, args.rps, args.seconds)
+
+        print(f"{label}:")
+        print(f"  get_current_user:    {percentiles(dependency_timings)}")
+        print(f"  request at {achieved:5.0f} rps: {percentiles(latencies)}")
+
+    token_cache.max_entries = max_entries
+    print(f"cache: {token_cache.get_stats()}")
+    await get_database().close()
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rps", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
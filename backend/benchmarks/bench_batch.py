@@ -0,0 +1,70 @@
+"""
+Benchmark for batched assessment preparation.
+Compares N sequential single-clip pipeline runs (what N separate /assess
+calls do) with one batched run (what /assess-batch does) for classroom-sized
+batches of short clips. Both start from encoded WAV bytes.
+
+Usage (from the backend directory):
+    python benchmarks/bench_batch.py [--sample-rate 16000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.audio.batch import prepare_batch_for_assessment
+from services.audio.buffer import AudioBuffer
+from services.audio.pipeline import prepare_for_assessment
+
+BATCH_SIZES = (8, 32, 64)
+
+def make_clip(rng: np.random.Generator, sr: int) -> bytes:
+    """A 2 to 8 second clip: background noise with a voiced span in the middle."""
+    seconds = rng.uniform(2, 8)
+    t = np.arange(int(seconds * sr)) / sr
+    y = 0.01 * rng.standard_normal(len(t))
+    voiced = (t > 0.6) & (t < seconds - 0.4)
+    y[voiced] += 0.4 * np.sin(2 * np.pi * rng.uniform(120, 300) * t[voiced])
+    return AudioBuffer(y.astype(np.float32), sr).to_wav_bytes()
+
+def best_of(repeat: int, func) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    # Warm up numba-compiled code paths so they are not timed
+    warm_up = [(make_clip(rng, args.sample_rate), "clip.wav") for _ in range(2)]
+    prepare_for_assessment(*warm_up[0])
+    prepare_batch_for_assessment(warm_up)
+
+    print(f"{'clips':>6} {'sequential (s)':>15} {'batched (s)':>12} {'seq clips/s':>12} {'batch clips/s':>14} {'speedup':>8}")
+    for count in BATCH_SIZES:
+        sources = [(make_clip(rng, args.sample_rate), f"clip{index}.wav") for index in range(count)]
+
+        sequential = best_of(args.repeat, lambda: [prepare_for_assessment(*source) for source in sources])
+        batched = best_of(args.repeat, lambda: prepare_batch_for_assessment(sources))
+
+        print(
+            f"{count:>6} {sequential:>15.3f} {batched:>12.3f} {count / sequential:>12.1f} "
+            f"{count / batched:>14.1f} {sequential / batched:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark for learning path generation with the indexed unit catalog.
+Compiles a synthetic catalog of learning units (recitation and memorization
+units over the whole Quran, plus tajweed lessons and quizzes), then plans
+paths for random learners. Reports compile time, the latency of the index
+query alone and of a whole plan (query plus knapsack), and a scan that
+filters the unit definitions one by one before the same knapsack. A final
+step rewrites the catalog directory and times the hot reload.
+
+Usage (from the backend directory):
+    python benchmarks/bench_catalog.py [--units 100000] [--plans 200]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.learning_paths.catalog import CatalogStore, UnitCatalog, verse_position
+from services.learning_paths.planner import PLAN_MAX_CANDIDATES, PlanRequest, knapsack, plan_units
+
+CONTENT_TYPES = ("recitation", "memorization", "lesson", "quiz")
+TAGS = ("recitation", "memorization", "tajweed", "qalqalah", "ghunnah", "ikhfa", "madd_tabii", "iqlab")
+
+def percentiles(timings: list) -> str:
+    """Format the median and 99th percentile of timings in milliseconds."""
+    return f"p50 {np.percentile(timings, 50) * 1000:7.2f} ms   p99 {np.percentile(timings, 99) * 1000:7.2f} ms"
+
+def synthetic_units(rng: np.random.Generator, count: int) -> list:
+    """Make unit definitions with random attributes."""
+    units = []
+    for index in range(count):
+        content_type = CONTENT_TYPES[rng.integers(len(CONTENT_TYPES))]
+        verses = []
+        if content_type in ("recitation", "memorization"):
+            surah = int(rng.integers(1, 115))
+            first = int(rng.integers(1, 200))
+            verses = [f"{surah}:{ayah}" for ayah in range(first, first + int(rng.integers(1, 8)))]
+        units.append({
+            "id": f"unit-{index}",
+            "title": f"Unit {index}",
+            "description": "Synthetic unit",
+            "content_type": content_type,
+            "difficulty": int(rng.integers(1, 6)),
+            "estimated_duration_minutes": int(rng.integers(3, 31)),
+            "verses": verses,
+            "tags": [TAGS[tag] for tag in rng.choice(len(TAGS), int(rng.integers(1, 3)), replace=False)],
+        })
+    return units
+
+def random_request(rng: np.random.Generator) -> PlanRequest:
+    """Make a plan request for a random learner."""
+    surah = int(rng.integers(1, 110))
+    return PlanRequest(
+        target_difficulty=int(rng.integers(1, 6)),
+        budget_minutes=int(rng.choice([60, 300, 600, 1200])),
+        session_minutes=int(rng.choice([10, 15, 20, 30])),
+        goals=[TAGS[tag] for tag in rng.choice(len(TAGS), 2, replace=False)],
+        verse_range=(f"{surah}:1", f"{surah + 5}:300") if rng.random() < 0.5 else None,
+    )
+
+def scan_plan(units: list, request: PlanRequest) -> np.ndarray:
+    """Plan by filtering every unit definition in Python, then running the same knapsack."""
+    low, high = max(1, request.target_difficulty - 1), min(5, request.target_difficulty + 1)
+    if request.verse_range:
+        first, last = verse_position(request.verse_range[0]), verse_position(request.verse_range[1])
+    goals = set(request.goals)
+
+    candidates, values, durations = [], [], []
+    for index, unit in enumerate(units):
+        if not low <= unit["difficulty"] <= high or unit["estimated_duration_minutes"] > request.session_minutes:
+            continue
+        if request.verse_range and unit["verses"]:
+            positions = [verse_position(verse_id) for verse_id in unit["verses"]]
+            if min(positions) < first or max(positions) > last:
+                continue
+        candidates.append(index)
+        values.append(1.0 + 2.0 * len(goals.intersection(unit["tags"])) + 2.0 - abs(unit["difficulty"] - request.target_difficulty))
+        durations.append(max(unit["estimated_duration_minutes"], 1))
+
+    candidates, values, durations = np.array(candidates), np.array(values), np.array(durations)
+    if len(candidates) > PLAN_MAX_CANDIDATES:
+        best = np.argsort(-values / durations, kind="stable")[:PLAN_MAX_CANDIDATES]
+        candidates, values, durations = candidates[best], values[best], durations[best]
+    return candidates[knapsack(durations, values, request.budget_minutes)]
+
+async def time_reload(units: list) -> tuple:
+    """Write the units to a catalog directory, load it, change a file, and time the hot reload."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "units.json")
+        with open(path, "w", encoding="utf-8") as catalog_file:
+            json.dump(units, catalog_file)
+        store = CatalogStore(directory, reload_seconds=0)
+        await store.get()
+
+        unchanged_start = time.perf_counter()
+        await store.get()
+        unchanged = time.perf_counter() - unchanged_start
+
+        with open(os.path.join(directory, "extra.json"), "w", encoding="utf-8") as catalog_file:
+            json.dump([dict(units[0], id="unit-extra")], catalog_file)
+        changed_start = time.perf_counter()
+        catalog = await store.get()
+        changed = time.perf_counter() - changed_start
+        return unchanged, changed, len(catalog)
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--units", type=int, default=100000)
+    parser.add_argument("--plans", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    units = synthetic_units(rng, args.units)
+
+    start = time.perf_counter()
+    catalog = UnitCatalog(units)
+    print(f"compiled {len(catalog)} units in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    requests = [random_request(rng) for _ in range(args.plans)]
+    query_timings, plan_timings, scan_timings = [], [], []
+    for request in requests:
+        start = time.perf_counter()
+        catalog.query(
+            difficulties=range(max(1, request.target_difficulty - 1), min(5, request.target_difficulty + 1) + 1),
+            max_duration=request.session_minutes,
+            verse_range=request.verse_range,
+        )
+        query_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        planned = plan_units(catalog, request)
+        plan_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        scanned = scan_plan(units, request)
+        scan_timings.append(time.perf_counter() - start)
+
+        # Both plans must fit the learner's time budget
+        assert catalog.duration[planned].sum() <= request.budget_minutes
+        assert catalog.duration[scanned].sum() <= request.budget_minutes
+
+    print(f"index query:      {percentiles(query_timings)}")
+    print(f"indexed plan:     {percentiles(plan_timings)}")
+    print(f"scan plan:        {percentiles(scan_timings)}")
+
+    unchanged, changed, count = asyncio.run(time_reload(units))
+    print(f"hot reload: unchanged check {unchanged * 1000:.1f} ms, recompile {changed * 1000:.0f} ms ({count} units)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark for the compiled Quran corpus.
+Generates a synthetic corpus with the real shape (114 surahs, 6236 verses)
+and compares loading the per-surah JSON into validated models against
+mapping the compiled corpus, then times single-verse lookups and the
+materialization of a verse range.
+
+Usage (from the backend directory):
+    python benchmarks/bench_corpus.py [--repeat 5]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from models.quran import QuranSurah, QuranVerse
+from services.quran.corpus import QuranCorpus, compile_corpus
+
+SURAHS = 114
+VERSES = 6236
+
+def best_of(repeat: int, func) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def write_sources(directory: str) -> None:
+    """Write synthetic per-surah JSON files."""
+    # Surah 2 has its real 286 verses; the rest share the remainder evenly
+    others, extra = divmod(VERSES - 286, SURAHS - 1)
+    counts = [others + (1 if index < extra else 0) for index in range(SURAHS - 1)]
+    counts.insert(1, 286)
+    for number, count in enumerate(counts, start=1):
+        surah = {
+            "number": number, "name_arabic": "سورة", "name_english": f"Surah {number}",
+            "english_meaning": "Meaning", "revelation_type": "Meccan", "summary": "Summary " * 20,
+            "verses": [{
+                "ayah_number": ayah,
+                "arabic_text": "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ " * 3,
+                "transliteration": f"bismillahi {number} {ayah}",
+                "translation": f"In the name of God, verse {number}:{ayah}",
+                "tajweed_rules": [{"rule": "madd", "start": 4, "end": 6}],
+                "difficulty_level": 1 + ayah % 5,
+            } for ayah in range(1, count + 1)],
+        }
+        with open(os.path.join(directory, f"surah_{number}.json"), "w", encoding="utf-8") as file:
+            json.dump(surah, file, ensure_ascii=False)
+
+def load_json(directory: str) -> dict:
+    """Load every surah the way the JSON files were used before: fully validated models."""
+    verses = {}
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        raw_verses = data.pop("verses")
+        surah = QuranSurah.model_validate({**data, "verses_count": len(raw_verses)})
+        for raw_verse in raw_verses:
+            verse = QuranVerse.model_validate({**raw_verse, "surah_number": surah.number, "id": f"{surah.number}:{raw_verse['ayah_number']}"})
+            verses[verse.id] = verse
+    return verses
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_sources(directory)
+        corpus_path = os.path.join(directory, "corpus.bin")
+
+        compile_seconds = best_of(1, lambda: compile_corpus(directory, corpus_path))
+        json_seconds = best_of(args.repeat, lambda: load_json(directory))
+        open_seconds = best_of(args.repeat, lambda: QuranCorpus(corpus_path).close())
+
+        corpus = QuranCorpus(corpus_path)
+        lookup_seconds = best_of(args.repeat, lambda: [corpus.get_verse("2:255") for _ in range(1000)]) / 1000
+        range_seconds = best_of(args.repeat, lambda: list(corpus.verse_range("2:255", "2:260")))
+        ids_seconds = best_of(args.repeat, lambda: corpus.surah_verses(2).ids)
+
+        print(f"compile (once):                {compile_seconds * 1000:9.1f} ms, {os.path.getsize(corpus_path) / 1024:.0f} KiB")
+        print(f"JSON load + validation:        {json_seconds * 1000:9.1f} ms")
+        print(f"map compiled corpus:           {open_seconds * 1000:9.3f} ms")
+        print(f"single verse lookup:           {lookup_seconds * 1e6:9.1f} us")
+        print(f"range 2:255-2:260 (6 verses):  {range_seconds * 1e6:9.1f} us")
+        print(f"surah 2 verse ids:             {ids_seconds * 1e6:9.1f} us")
+        corpus.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for the unified decode stage.
+Decodes a 30 second 48 kHz stereo phone-style recording in each codec
+libsndfile (and PyAV, when installed) can produce here, at the native rate
+and at the 16 kHz target rate, and reports decode cost per second of audio
+along with the processing time of the decoded buffer.
+
+Usage (from the backend directory):
+    python benchmarks/bench_decode.py [--seconds 30] [--repeat 3]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.audio.decode import decode_audio
+from services.audio.features import ASSESSMENT_FEATURES
+from services.audio.pipeline import extract_features, process_buffer
+
+NATIVE_RATE = 48000
+FORMATS = (("WAV", "PCM_16", "wav"), ("FLAC", "PCM_16", "flac"), ("OGG", "VORBIS", "ogg"), ("MP3", "MPEG_LAYER_III", "mp3"))
+
+def best_of(repeat: int, func) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    t = np.arange(args.seconds * NATIVE_RATE) / NATIVE_RATE
+    mono = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 2 * t)) + 0.01 * rng.standard_normal(len(t))
+    stereo = np.stack([mono, mono], axis=1).astype(np.float32)
+
+    print(f"{'codec':>6} {'native decode (ms/s)':>21} {'16k decode (ms/s)':>18} {'native process (s)':>19} {'16k process (s)':>16}")
+    for container, subtype, extension in FORMATS:
+        encoded = io.BytesIO()
+        try:
+            sf.write(encoded, stereo, NATIVE_RATE, format=container, subtype=subtype)
+        except (RuntimeError, TypeError, ValueError):
+            print(f"{extension:>6} (not supported by this libsndfile)")
+            continue
+        data = encoded.getvalue()
+        filename = f"clip.{extension}"
+
+        native = best_of(args.repeat, lambda: decode_audio(data, filename, target_sr=0))
+        target = best_of(args.repeat, lambda: decode_audio(data, filename, target_sr=16000))
+
+        native_buffer = decode_audio(data, filename, target_sr=0)
+        target_buffer = decode_audio(data, filename, target_sr=16000)
+        native_process = best_of(args.repeat, lambda: extract_features(process_buffer(native_buffer.with_samples(native_buffer.samples.copy())), features=ASSESSMENT_FEATURES))
+        target_process = best_of(args.repeat, lambda: extract_features(process_buffer(target_buffer.with_samples(target_buffer.samples.copy())), features=ASSESSMENT_FEATURES))
+
+        print(
+            f"{extension:>6} {native / args.seconds * 1000:>21.2f} {target / args.seconds * 1000:>18.2f} "
+            f"{native_process:>19.3f} {target_process:>16.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark for noise reduction.
+Compares the original per-sample noise gate with the spectral gate, both on
+whole recordings (in place) and streamed in 20 ms chunks, and reports the
+cost per second of audio for 5 second, 30 second and 5 minute clips.
+
+Usage (from the backend directory):
+    python benchmarks/bench_denoise.py [--sample-rate 16000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.audio.denoise import SpectralGate, spectral_gate
+from services.audio.pipeline import reduce_noise
+
+CLIP_SECONDS = (5, 30, 300)
+STREAM_CHUNK_SECONDS = 0.02
+
+def best_of(repeat: int, func, make_input) -> float:
+    """Return the fastest of several timed runs, in seconds (input preparation is not timed)."""
+    timings = []
+    for _ in range(repeat):
+        data = make_input()
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def stream(y: np.ndarray, sr: int) -> None:
+    """Denoise a recording chunk by chunk, as a live stream would."""
+    gate = SpectralGate(sr)
+    chunk = int(sr * STREAM_CHUNK_SECONDS)
+    for start in range(0, len(y), chunk):
+        gate.process(y[start:start + chunk])
+    gate.flush()
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sr = args.sample_rate
+
+    print(f"{'clip':>6} {'gate (ms/s)':>12} {'spectral (ms/s)':>16} {'streamed (ms/s)':>16}")
+    for seconds in CLIP_SECONDS:
+        y = (rng.standard_normal(seconds * sr) * 0.1).astype(np.float32)
+
+        gate = best_of(args.repeat, lambda data: reduce_noise(data, sr, "gate"), y.copy)
+        spectral = best_of(args.repeat, lambda data: spectral_gate(data, sr), y.copy)
+        streamed = best_of(args.repeat, lambda data: stream(data, sr), y.copy)
+
+        print(
+            f"{seconds:>5}s {gate / seconds * 1000:>12.2f} {spectral / seconds * 1000:>16.2f} "
+            f"{streamed / seconds * 1000:>16.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
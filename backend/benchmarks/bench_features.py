@@ -0,0 +1,74 @@
+"""
+Benchmark for audio feature extraction.
+Compares the original independent librosa calls against the shared-STFT
+FeatureExtractor on 5 second, 30 second and 5 minute clips.
+
+Usage (from the backend directory):
+    python benchmarks/bench_features.py [--sample-rate 16000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import librosa
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.audio.buffer import AudioBuffer
+from services.audio.features import ASSESSMENT_FEATURES, FeatureExtractor
+
+CLIP_SECONDS = (5, 30, 300)
+
+def legacy_features(y: np.ndarray, sr: int) -> dict:
+    """Feature extraction as it was before the shared-STFT engine."""
+    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+    spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
+    zero_crossing_rate = librosa.feature.zero_crossing_rate(y)
+    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+    tempo = librosa.beat.tempo(onset_envelope=onset_env, sr=sr)[0]
+    return {
+        "mfcc_mean": np.mean(mfccs, axis=1).tolist(),
+        "spectral_centroid_mean": float(np.mean(spectral_centroid)),
+        "zero_crossing_rate_mean": float(np.mean(zero_crossing_rate)),
+        "tempo": float(tempo),
+    }
+
+def best_of(repeat: int, func) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sr = args.sample_rate
+
+    # Warm up numba-compiled code paths so they are not timed
+    warm_up = (rng.standard_normal(sr) * 0.1).astype(np.float32)
+    legacy_features(warm_up, sr)
+    FeatureExtractor(AudioBuffer(warm_up, sr)).summarize()
+
+    print(f"{'clip':>6} {'legacy (s)':>11} {'engine all (s)':>15} {'engine assess (s)':>18} {'speedup':>8}")
+    for seconds in CLIP_SECONDS:
+        y = (rng.standard_normal(seconds * sr) * 0.1).astype(np.float32)
+        buffer = AudioBuffer(y, sr)
+
+        legacy = best_of(args.repeat, lambda: legacy_features(y, sr))
+        engine_all = best_of(args.repeat, lambda: FeatureExtractor(buffer).summarize())
+        engine_assess = best_of(args.repeat, lambda: FeatureExtractor(buffer).summarize(ASSESSMENT_FEATURES))
+
+        print(f"{seconds:>5}s {legacy:>11.3f} {engine_all:>15.3f} {engine_assess:>18.3f} {legacy / engine_assess:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark for recitation identification with the fingerprint index.
+Builds synthetic reference templates (verses as sequences of phone-like MFCC
+states, recited by reciters with different voices and paces) for a growing
+number of reciters, then identifies clips of part of a verse recited by a
+new voice. Reports build time, query latency, accuracy, and a linear scan
+that compares the clip against every template.
+
+Usage (from the backend directory):
+    python benchmarks/bench_fingerprint.py [--verses 1000] [--reciters 1,2,4,8] [--queries 200]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.audio.features import HOP_LENGTH, N_MFCC
+from services.audio.fingerprint import FingerprintIndex, code_ngrams, quantize
+from services.audio.templates import TEMPLATE_SAMPLE_RATE, VerseTemplate
+
+PHONES = 48
+
+class SyntheticStore:
+    """In-memory stand-in for a TemplateStore."""
+
+    def __init__(self, reciter: str, templates: dict):
+        self.reciter = reciter
+        self.hop_length = HOP_LENGTH
+        self.sample_rate = TEMPLATE_SAMPLE_RATE
+        self._templates = templates
+
+    def verse_ids(self) -> list:
+        return list(self._templates)
+
+    def get(self, verse_id: str) -> VerseTemplate:
+        return self._templates[verse_id]
+
+class SyntheticTemplates:
+    """In-memory stand-in for a TemplateIndex."""
+
+    def __init__(self, stores: list):
+        self.stores = {store.reciter: store for store in stores}
+
+def recite(rng: np.random.Generator, phones: np.ndarray, sequence: np.ndarray, voice: np.ndarray, pace: float) -> np.ndarray:
+    """Render a phone sequence as noisy MFCC frames in a voice and at a pace."""
+    durations = np.maximum(1, np.round(rng.integers(3, 10, len(sequence)) * pace)).astype(int)
+    frames = np.repeat(phones[sequence], durations, axis=0) + voice
+    return (frames + rng.normal(0, 0.6, frames.shape)).astype(np.float32)
+
+def percentiles(timings: list) -> str:
+    """Format the median and 99th percentile of timings in milliseconds."""
+    return f"p50 {np.percentile(timings, 50) * 1000:6.2f} ms   p99 {np.percentile(timings, 99) * 1000:6.2f} ms"
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verses", type=int, default=1000)
+    parser.add_argument("--reciters", default="1,2,4,8")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    phones = rng.normal(0, 3, (PHONES, N_MFCC))
+    sequences = {f"{index // 100 + 1}:{index % 100 + 1}": rng.integers(0, PHONES, rng.integers(20, 60))
+                 for index in range(args.verses)}
+    verse_ids = list(sequences)
+
+    # Clips cover the middle of a verse, recited by a voice no reciter has
+    clips = []
+    for _ in range(args.queries):
+        verse_id = verse_ids[rng.integers(len(verse_ids))]
+        sequence = sequences[verse_id]
+        start = rng.integers(0, len(sequence) // 3)
+        end = start + max(8, int(len(sequence) * 0.6))
+        clips.append((verse_id, recite(rng, phones, sequence[start:end], rng.normal(0, 1, N_MFCC), rng.uniform(0.8, 1.3))))
+
+    stores = []
+    for count in [int(part) for part in args.reciters.split(",")]:
+        while len(stores) < count:
+            reciter = f"reciter_{len(stores) + 1}"
+            voice, pace = rng.normal(0, 1, N_MFCC), rng.uniform(0.8, 1.2)
+            stores.append(SyntheticStore(reciter, {
+                verse_id: VerseTemplate(verse_id, reciter, TEMPLATE_SAMPLE_RATE, HOP_LENGTH,
+                                        recite(rng, phones, sequence, voice, pace), np.zeros((0, 0)), [], [])
+                for verse_id, sequence in sequences.items()
+            }))
+
+        start = time.perf_counter()
+        index = FingerprintIndex.build(SyntheticTemplates(stores[:count]), "benchmark")
+        build_seconds = time.perf_counter() - start
+
+        timings, correct = [], 0
+        for verse_id, frames in clips:
+            start = time.perf_counter()
+            candidates = index.identify(frames)
+            timings.append(time.perf_counter() - start)
+            correct += bool(candidates) and candidates[0]["verse_id"] == verse_id
+
+        # Linear scan: intersect the clip's n-grams with every template's n-grams
+        template_hashes = [
+            np.unique(code_ngrams(quantize(store.get(verse_id).mfcc, index.codebook), len(index.codebook))[0])
+            for store in stores[:count] for verse_id in store.verse_ids()
+        ]
+        scan_timings = []
+        for _, frames in clips[:20]:
+            start = time.perf_counter()
+            hashes = np.unique(code_ngrams(quantize(frames, index.codebook), len(index.codebook))[0])
+            int(np.argmax([len(np.intersect1d(hashes, other, assume_unique=True)) for other in template_hashes]))
+            scan_timings.append(time.perf_counter() - start)
+
+        print(f"{count} reciter(s), {count * args.verses} templates, {len(index)} postings, build {build_seconds:.1f} s")
+        print(f"  index: {percentiles(timings)}   accuracy {correct / len(clips):.1%}")
+        print(f"  scan:  {percentiles(scan_timings)}")
+
+if __name__ == "__main__":
+    main()
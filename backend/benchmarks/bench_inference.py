@@ -0,0 +1,104 @@
+"""
+Benchmark for micro-batched pronunciation model inference.
+Drives the BatchScheduler with concurrent clients and reports throughput and
+latency percentiles for maximum batch sizes from 1 to 32. The model is a
+stand-in with the scoring model's shape (frame encoder, masked pooling and a
+scoring head) plus a fixed per-call cost standing in for framework dispatch,
+so the numbers reflect batching rather than a particular model.
+
+Usage (from the backend directory):
+    python benchmarks/bench_inference.py [--clients 64] [--requests 2000] [--max-wait-ms 10] [--call-overhead-ms 2]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.inference.model import ScoringModel
+from services.inference.scheduler import BatchScheduler
+
+BATCH_SIZES = (1, 2, 4, 8, 16, 32)
+FRAMES_PER_SECOND = 16000 / 512
+
+class SyntheticScoringModel(ScoringModel):
+    """Frame encoder, masked mean pooling and a scoring head, in NumPy."""
+
+    def __init__(self, dims: int = 13, hidden: int = 256, outputs: int = 4, call_overhead_ms: float = 2):
+        self.call_overhead = call_overhead_ms / 1000
+        rng = np.random.default_rng(0)
+        self.encoder = [
+            (rng.standard_normal((dims, hidden)) / np.sqrt(dims)).astype(np.float32),
+            (rng.standard_normal((hidden, hidden)) / np.sqrt(hidden)).astype(np.float32),
+        ]
+        self.head = (rng.standard_normal((hidden, outputs)) / np.sqrt(hidden)).astype(np.float32)
+
+    def predict(self, batch: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        time.sleep(self.call_overhead)
+        hidden = batch
+        for weights in self.encoder:
+            hidden = np.maximum(hidden @ weights, 0)
+        mask = (np.arange(batch.shape[1])[None, :] < lengths[:, None]).astype(np.float32)
+        pooled = np.einsum("bfh,bf->bh", hidden, mask) / lengths[:, None]
+        return pooled @ self.head
+
+async def run(args: argparse.Namespace, max_batch_size: int, rng: np.random.Generator) -> dict:
+    """Run one configuration and return its throughput and latencies."""
+    clients, requests, max_wait_ms = args.clients, args.requests, args.max_wait_ms
+    model = SyntheticScoringModel(call_overhead_ms=args.call_overhead_ms)
+    scheduler = BatchScheduler(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    await scheduler.start()
+
+    # Clips of 2 to 15 seconds, like single-ayah recitations
+    attempts = [
+        rng.standard_normal((int(rng.uniform(2, 15) * FRAMES_PER_SECOND), 13)).astype(np.float32)
+        for _ in range(requests)
+    ]
+    latencies = []
+    queue = iter(attempts)
+
+    async def client() -> None:
+        for frames in queue:
+            start = time.perf_counter()
+            await scheduler.submit(frames)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    stats = scheduler.get_stats()
+    await scheduler.stop()
+    return {
+        "throughput": requests / elapsed,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "mean_batch_size": stats["mean_batch_size"],
+        "padding_overhead": stats["padding_overhead"],
+    }
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--call-overhead-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"{'max batch':>9} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'mean batch':>11} {'padding':>8}")
+    for max_batch_size in BATCH_SIZES:
+        result = asyncio.run(run(args, max_batch_size, rng))
+        print(
+            f"{max_batch_size:>9} {result['throughput']:>8.1f} {result['p50'] * 1000:>9.1f} "
+            f"{result['p99'] * 1000:>9.1f} {result['mean_batch_size']:>11.1f} {result['padding_overhead']:>7.1%}"
+        )
+
+if __name__ == "__main__":
+    main()
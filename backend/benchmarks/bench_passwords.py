@@ -0,0 +1,103 @@
+"""
+Benchmark for login throughput with bcrypt password verification.
+Simulates a burst of concurrent logins (a class signing in at once) and
+compares verifying inline on the event loop with the bounded hashing pool.
+For each, it reports logins per second, login latency and event-loop lag (how
+late a 10 ms ticker fires, i.e. how long every other request would stall).
+A final burst larger than the pool's queue shows admission control refusing
+the excess instead of queueing it.
+
+Usage (from the backend directory):
+    python benchmarks/bench_passwords.py [--logins 64] [--rounds 12]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.auth.passwords import PasswordHasher, PasswordHasherBusy
+
+TICK_SECONDS = 0.01
+
+def percentiles(timings: list) -> str:
+    """Format the median and 99th percentile of timings in milliseconds."""
+    return f"p50 {np.percentile(timings, 50) * 1000:8.1f} ms   p99 {np.percentile(timings, 99) * 1000:8.1f} ms"
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    """Record how late a periodic ticker fires while logins run."""
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+async def run_burst(login, count: int) -> tuple:
+    """Run count concurrent logins, returning latencies, lags, elapsed time and refusals."""
+    stop = asyncio.Event()
+    lags, latencies = [], []
+    refused = 0
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    await asyncio.sleep(0)
+
+    async def timed_login() -> None:
+        nonlocal refused
+        start = time.perf_counter()
+        try:
+            await login()
+            latencies.append(time.perf_counter() - start)
+        except PasswordHasherBusy:
+            refused += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed_login() for _ in range(count)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    return latencies, lags or [0.0], elapsed, refused
+
+async def run(args: argparse.Namespace) -> None:
+    """Run every scenario and print the results."""
+    hasher = PasswordHasher(rounds=args.rounds, max_workers=args.workers or (os.cpu_count() or 1), max_queue=args.queue)
+    password = "correct horse battery staple"
+    stored = hasher.context.hash(password)
+
+    async def inline_login() -> None:
+        hasher.context.verify_and_update(password, stored)
+
+    async def pooled_login() -> None:
+        await hasher.verify(password, stored)
+
+    print(f"bcrypt cost {args.rounds}, {hasher.max_workers} hashing threads, queue limit {hasher.max_queue}")
+    for label, login, count in (
+        ("inline", inline_login, args.logins),
+        ("pool", pooled_login, args.logins),
+        ("pool, oversized burst", pooled_login, (hasher.max_workers + hasher.max_queue) * 2),
+    ):
+        latencies, lags, elapsed, refused = await run_burst(login, count)
+        print(f"{label} ({count} logins): {len(latencies) / elapsed:6.1f} logins/s, {refused} refused")
+        print(f"  login latency:  {percentiles(latencies)}")
+        print(f"  event-loop lag: {percentiles(lags)}   max {max(lags) * 1000:8.1f} ms")
+
+    # A hash made with a lower cost is upgraded on the next successful login
+    old_hash = PasswordHasher(rounds=max(4, args.rounds - 2), max_workers=1).context.hash(password)
+    valid, new_hash = await hasher.verify(password, old_hash)
+    print(f"rehash on login: valid={valid}, upgraded={new_hash is not None}")
+    hasher.shutdown()
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--queue", type=int, default=64)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
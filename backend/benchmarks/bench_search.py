@@ -0,0 +1,128 @@
+"""
+Benchmark for verse search.
+Builds a synthetic corpus with the real shape (6236 verses with Arabic,
+transliteration and translation) and times index building, loading the
+saved index, and exact and typo-tolerant queries against a linear scan
+over every verse.
+
+Usage (from the backend directory):
+    python benchmarks/bench_search.py [--queries 500]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.quran.corpus import QuranCorpus, compile_corpus
+from services.quran.search import SearchIndex, analyze
+
+VERSES = 6236
+SURAHS = 114
+ARABIC_WORDS = (
+    "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ ٱلْحَمْدُ لِلَّهِ رَبِّ ٱلْعَٰلَمِينَ مَٰلِكِ يَوْمِ ٱلدِّينِ "
+    "إِيَّاكَ نَعْبُدُ وَإِيَّاكَ نَسْتَعِينُ ٱهْدِنَا ٱلصِّرَٰطَ ٱلْمُسْتَقِيمَ قُلْ هُوَ أَحَدٌ "
+    "ٱلصَّمَدُ لَمْ يَلِدْ وَلَمْ يُولَدْ كُفُوًا ٱلنَّاسِ ٱلْفَلَقِ شَرِّ غَاسِقٍ وَقَبَ حَاسِدٍ"
+).split()
+
+def make_words(rng: random.Random, count: int, length: int) -> list:
+    """Make a vocabulary of random Latin words."""
+    letters = "abdefghiklmnqrstuwyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, length))) for _ in range(count)]
+
+def write_sources(directory: str, rng: random.Random) -> None:
+    """Write synthetic per-surah JSON files."""
+    arabic = ARABIC_WORDS + ["".join(rng.sample("ابتثجحخدذرزسشصضطظعغفقكلمنهوي", 5)) for _ in range(8000)]
+    transliteration = make_words(rng, 8000, 9)
+    translation = make_words(rng, 5000, 10)
+    per_surah = VERSES // SURAHS
+    for number in range(1, SURAHS + 1):
+        count = per_surah + (VERSES - per_surah * SURAHS if number == SURAHS else 0)
+        verses = []
+        for ayah in range(1, count + 1):
+            length = rng.randint(5, 30)
+            verses.append({
+                "ayah_number": ayah,
+                "arabic_text": " ".join(rng.choice(arabic) for _ in range(length)),
+                "transliteration": " ".join(rng.choice(transliteration) for _ in range(length)),
+                "translation": " ".join(rng.choice(translation) for _ in range(length * 2)),
+            })
+        surah = {"number": number, "name_arabic": "سورة", "name_english": f"Surah {number}", "english_meaning": "",
+                 "revelation_type": "Meccan", "summary": "", "verses": verses}
+        with open(os.path.join(directory, f"surah_{number}.json"), "w", encoding="utf-8") as file:
+            json.dump(surah, file, ensure_ascii=False)
+
+def scan(documents: list, tokens: list) -> list:
+    """Rank verses by scanning every one for the query terms."""
+    token_set = set(tokens)
+    scores = [sum(term in token_set for term in terms) for terms in documents]
+    return sorted(range(len(scores)), key=lambda index: -scores[index])[:10]
+
+def typo(rng: random.Random, word: str) -> str:
+    """Drop or swap one character."""
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1:] if rng.random() < 0.5 else word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+def percentiles(timings: list) -> str:
+    """Format the median and 99th percentile of timings in milliseconds."""
+    return f"p50 {np.percentile(timings, 50) * 1000:6.2f} ms   p99 {np.percentile(timings, 99) * 1000:6.2f} ms"
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_sources(directory, rng)
+        corpus_path = os.path.join(directory, "corpus.bin")
+        compile_corpus(directory, corpus_path)
+        corpus = QuranCorpus(corpus_path)
+
+        start = time.perf_counter()
+        index = SearchIndex.build(corpus)
+        build_seconds = time.perf_counter() - start
+
+        index_path = os.path.join(directory, "search.npz")
+        index.save(index_path)
+        start = time.perf_counter()
+        index = SearchIndex.load(index_path)
+        load_seconds = time.perf_counter() - start
+
+        verses = [corpus.verse_at(position) for position in range(len(corpus))]
+        documents = analyze("translation", [verse.translation for verse in verses])
+        queries = {"arabic": [], "transliteration": [], "translation": []}
+        for _ in range(args.queries):
+            verse = rng.choice(verses)
+            for field, text in (("arabic", verse.arabic_text), ("transliteration", verse.transliteration), ("translation", verse.translation)):
+                words = text.split()
+                start_word = rng.randrange(max(1, len(words) - 3))
+                queries[field].append(" ".join(words[start_word:start_word + 3]))
+        fuzzy_queries = [" ".join(typo(rng, word) for word in query.split()) for query in queries["transliteration"]]
+
+        print(f"build index: {build_seconds * 1000:.0f} ms   load saved index: {load_seconds * 1000:.1f} ms")
+        for name, query_list in (*queries.items(), ("transliteration with typos", fuzzy_queries)):
+            timings = []
+            for query in query_list:
+                start = time.perf_counter()
+                index.search(query)
+                timings.append(time.perf_counter() - start)
+            print(f"{name:>27}: {percentiles(timings)}")
+
+        timings = []
+        for query in queries["translation"][:50]:
+            start = time.perf_counter()
+            scan(documents, analyze("translation", [query])[0])
+            timings.append(time.perf_counter() - start)
+        print(f"{'linear scan (translation)':>27}: {percentiles(timings)}")
+        corpus.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark for the tajweed rule matcher.
+Builds a synthetic corpus with the real shape (6236 verses of diacritized
+text), then times annotating every verse with the combined matcher against
+running each rule pattern separately, and the per-request index lookup.
+
+Usage (from the backend directory):
+    python benchmarks/bench_tajweed.py [--words 20]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.quran.corpus import QuranCorpus, compile_corpus
+from utils.tajweed_rules import TAJWEED_RULES_PATH, TajweedIndex, TajweedMatcher, expand_pattern, load_rule_definitions
+
+VERSES = 6236
+SURAHS = 114
+
+def write_sources(directory: str, rule_definitions: list, words_per_verse: int) -> None:
+    """Write synthetic per-surah JSON files built from the rule examples."""
+    rng = random.Random(0)
+    vocabulary = [word for definition in rule_definitions for example in definition["examples"] for word in example["text"].split()]
+    per_surah = VERSES // SURAHS
+    for number in range(1, SURAHS + 1):
+        count = per_surah + (VERSES - per_surah * SURAHS if number == SURAHS else 0)
+        surah = {
+            "number": number, "name_arabic": "سورة", "name_english": f"Surah {number}",
+            "english_meaning": "Meaning", "revelation_type": "Meccan", "summary": "Summary",
+            "verses": [{
+                "ayah_number": ayah,
+                "arabic_text": " ".join(rng.choice(vocabulary) for _ in range(words_per_verse)),
+                "transliteration": "", "translation": "",
+            } for ayah in range(1, count + 1)],
+        }
+        with open(os.path.join(directory, f"surah_{number}.json"), "w", encoding="utf-8") as file:
+            json.dump(surah, file, ensure_ascii=False)
+
+def annotate_separately(patterns: list, text: str) -> list:
+    """Annotate by running every rule's pattern over the text in turn, then ordering the matches."""
+    annotations = []
+    for rule_id, pattern in patterns:
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            annotations.append({"rule": rule_id, "start": start, "end": end, "text": text[start:end]})
+    annotations.sort(key=lambda annotation: annotation["start"])
+    return annotations
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=20)
+    args = parser.parse_args()
+
+    rule_definitions = load_rule_definitions(TAJWEED_RULES_PATH)
+    matcher = TajweedMatcher(rule_definitions)
+    patterns = [
+        (definition["id"], re.compile("|".join(expand_pattern(pattern) for pattern in definition["patterns"])))
+        for definition in rule_definitions
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_sources(directory, rule_definitions, args.words)
+        corpus_path = os.path.join(directory, "corpus.bin")
+        compile_corpus(directory, corpus_path)
+        corpus = QuranCorpus(corpus_path)
+        texts = [corpus.verse_at(index).arabic_text for index in range(len(corpus))]
+
+        start = time.perf_counter()
+        index = TajweedIndex.build(matcher, corpus, "benchmark")
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        combined_count = sum(len(matcher.annotate(text)) for text in texts)
+        combined_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        separate_count = sum(len(annotate_separately(patterns, text)) for text in texts)
+        separate_seconds = time.perf_counter() - start
+
+        index_path = os.path.join(directory, "index.json")
+        index.save(index_path)
+        start = time.perf_counter()
+        TajweedIndex.load(index_path)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(100000):
+            index.get("2:255")
+        lookup_seconds = (time.perf_counter() - start) / 100000
+        corpus.close()
+
+    print(f"annotations: {combined_count} combined, {separate_count} per-rule passes")
+    print(f"build corpus index ({VERSES} verses):  {build_seconds * 1000:8.1f} ms")
+    print(f"combined matcher over all verses:     {combined_seconds * 1000:8.1f} ms")
+    print(f"one pass per rule over all verses:    {separate_seconds * 1000:8.1f} ms")
+    print(f"load cached index:                    {load_seconds * 1000:8.1f} ms")
+    print(f"per-request lookup:                   {lookup_seconds * 1e9:8.0f} ns")
+
+if __name__ == "__main__":
+    main()
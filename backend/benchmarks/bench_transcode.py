@@ -0,0 +1,80 @@
+"""
+Benchmark for audio transcoding.
+Converts a 30 second 48 kHz WAV recording to each format this environment
+can encode, first cold (decode and encode on the audio pool) and then again
+for the same content (served from the transcode cache), and reports the
+throughput of concurrent cold conversions under the concurrency cap.
+
+Usage (from the backend directory):
+    python benchmarks/bench_transcode.py [--seconds 30] [--concurrency 8]
+"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+import argparse
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from services.audio.audio import AudioProcessingService
+from services.audio.cache import transcode_cache
+from services.audio.executor import AudioExecutor
+from services.audio.transcode import TRANSCODE_FORMATS
+
+NATIVE_RATE = 48000
+
+def make_clip(seconds: int, seed: int) -> bytes:
+    """Encode a synthetic recording as WAV bytes."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * NATIVE_RATE) / NATIVE_RATE
+    y = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.01 * rng.standard_normal(len(t))
+    encoded = io.BytesIO()
+    sf.write(encoded, y.astype(np.float32), NATIVE_RATE, format="WAV", subtype="PCM_16")
+    return encoded.getvalue()
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the benchmark and print a results table."""
+    executor = AudioExecutor(mode="process", warm_up=False)
+    await executor.start()
+    service = AudioProcessingService(executor=executor)
+    data = make_clip(args.seconds, 0)
+
+    print(f"{'format':>6} {'cold (ms)':>10} {'cached (ms)':>12} {'size (KiB)':>11}")
+    for target_format in TRANSCODE_FORMATS:
+        transcode_cache.clear()
+        start = time.perf_counter()
+        try:
+            encoded = await service.transcode(data, "clip.wav", target_format)
+        except (RuntimeError, TypeError, ValueError):
+            print(f"{target_format:>6} (no encoder available)")
+            continue
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await service.transcode(data, "clip.wav", target_format)
+        cached = time.perf_counter() - start
+
+        print(f"{target_format:>6} {cold * 1000:>10.1f} {cached * 1000:>12.3f} {len(encoded) / 1024:>11.1f}")
+
+    clips = [make_clip(args.seconds, seed) for seed in range(1, args.concurrency + 1)]
+    start = time.perf_counter()
+    await asyncio.gather(*[service.transcode(clip, "clip.wav", "flac") for clip in clips])
+    elapsed = time.perf_counter() - start
+    print(f"\n{args.concurrency} concurrent flac transcodes on {executor.max_workers} workers: {elapsed:.2f}s "
+          f"({args.concurrency * args.seconds / elapsed:.0f}x real time)")
+
+    executor.shutdown()
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
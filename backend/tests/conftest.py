@@ -0,0 +1,72 @@
+"""
+Shared test setup for the Quranic Quest backend.
+Tests run from the backend directory; the app modules import each other from
+backend/app and the API modules from backend, so both are put on the path.
+"""
+
+import os
+import sys
+import json
+import pytest
+
+BACKEND_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIRECTORY)
+sys.path.insert(0, os.path.join(BACKEND_DIRECTORY, "app"))
+
+# Al-Fatiha and the first ayah of Al-Ikhlas, as (arabic, transliteration, translation)
+FATIHA = [
+    ("بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ", "Bismi Allāhi ar-Raḥmāni ar-Raḥīm",
+     "In the name of Allah, the Entirely Merciful, the Especially Merciful."),
+    ("ٱلْحَمْدُ لِلَّهِ رَبِّ ٱلْعَٰلَمِينَ", "Al-ḥamdu lillāhi rabbi al-ʿālamīn",
+     "All praise is due to Allah, Lord of the worlds"),
+    ("ٱلرَّحْمَٰنِ ٱلرَّحِيمِ", "Ar-Raḥmāni ar-Raḥīm",
+     "The Entirely Merciful, the Especially Merciful,"),
+    ("مَٰلِكِ يَوْمِ ٱلدِّينِ", "Māliki yawmi ad-dīn",
+     "Sovereign of the Day of Recompense."),
+    ("إِيَّاكَ نَعْبُدُ وَإِيَّاكَ نَسْتَعِينُ", "Iyyāka naʿbudu wa iyyāka nastaʿīn",
+     "It is You we worship and You we ask for help."),
+    ("ٱهْدِنَا ٱلصِّرَٰطَ ٱلْمُسْتَقِيمَ", "Ihdinā aṣ-ṣirāṭa al-mustaqīm",
+     "Guide us to the straight path"),
+]
+IKHLAS = [
+    ("قُلْ هُوَ ٱللَّهُ أَحَدٌ", "Qul huwa Allāhu aḥad", "Say, He is Allah, [who is] One,"),
+]
+
+def write_surah(directory: str, number: int, name: str, verses: list) -> None:
+    """Write one surah source file in the format the corpus compiler reads."""
+    surah = {
+        "number": number,
+        "name_arabic": name,
+        "name_english": name,
+        "english_meaning": name,
+        "revelation_type": "Meccan",
+        "summary": "",
+        "verses": [
+            {"ayah_number": ayah, "arabic_text": arabic, "transliteration": transliteration, "translation": translation}
+            for ayah, (arabic, transliteration, translation) in enumerate(verses, start=1)
+        ],
+    }
+    with open(os.path.join(directory, f"surah_{number}.json"), "w", encoding="utf-8") as surah_file:
+        json.dump(surah, surah_file, ensure_ascii=False)
+
+@pytest.fixture
+def backend_directory() -> str:
+    """The backend directory, which data paths are relative to."""
+    return BACKEND_DIRECTORY
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A compiled corpus of Al-Fatiha, a generated surah 2 and Al-Ikhlas."""
+    from services.quran.corpus import QuranCorpus, compile_corpus
+
+    source = tmp_path / "quran_text"
+    source.mkdir()
+    write_surah(str(source), 1, "Al-Fatiha", FATIHA)
+    write_surah(str(source), 2, "Al-Baqarah", [(f"آية {ayah}", f"ayah {ayah}", f"Verse 2:{ayah}") for ayah in range(1, 287)])
+    write_surah(str(source), 112, "Al-Ikhlas", IKHLAS)
+
+    output = tmp_path / "quran_corpus.bin"
+    compile_corpus(str(source), str(output))
+    corpus = QuranCorpus(str(output))
+    yield corpus
+    corpus.close()
@@ -0,0 +1,129 @@
+"""
+Tests for coalescing progress updates into learning path adjustments.
+"""
+
+import asyncio
+from datetime import datetime
+import pytest
+
+# The learning_paths package also exports the database-backed service
+pytest.importorskip("sqlalchemy")
+
+from models.learning_path import LearningProgress
+from services.learning_paths.scheduler import AdjustmentScheduler, coalesce_progress
+from services.learning_paths.service import ADJUST_HIGH_SCORE, ADJUST_LOW_SCORE
+
+def progress(unit_id: str, score, user_id: str = "user1") -> LearningProgress:
+    """Make a progress update with an accuracy score."""
+    return LearningProgress(
+        id=f"{user_id}-{unit_id}-{score}",
+        user_id=user_id,
+        unit_id=unit_id,
+        timestamp=datetime.now(),
+        completed=True,
+        time_spent_minutes=5,
+        accuracy_score=score,
+    )
+
+class RecordingService:
+    """Stands in for LearningPathService, recording the adjustments it is asked for."""
+
+    def __init__(self, adjust_seconds: float = 0.0):
+        self.adjust_seconds = adjust_seconds
+        self.adjustments = []
+
+    async def check_path_adjustment(self, user_id: str, progress: LearningProgress) -> bool:
+        score = progress.accuracy_score
+        return score is not None and (score < ADJUST_LOW_SCORE or score >= ADJUST_HIGH_SCORE)
+
+    async def adjust_learning_path(self, user_id: str, progress: LearningProgress) -> None:
+        await asyncio.sleep(self.adjust_seconds)
+        self.adjustments.append((user_id, progress.unit_id, progress.accuracy_score))
+
+def test_coalesce_keeps_a_low_score_instead_of_averaging():
+    events = [progress("unit-1", 40), progress("unit-1", 95)]
+
+    assert coalesce_progress(events)["unit-1"].accuracy_score == 40
+
+def test_coalesce_keeps_the_highest_score_when_none_is_low():
+    events = [progress("unit-1", 70), progress("unit-1", 92), progress("unit-1", 80)]
+
+    assert coalesce_progress(events)["unit-1"].accuracy_score == 92
+
+def test_coalesce_keeps_units_apart():
+    events = [progress("unit-1", 95), progress("unit-2", 30), progress("unit-1", 91)]
+
+    representatives = coalesce_progress(events)
+
+    assert list(representatives) == ["unit-1", "unit-2"]
+    assert representatives["unit-1"].accuracy_score == 95
+    assert representatives["unit-2"].accuracy_score == 30
+
+def test_coalesce_keeps_the_latest_unscored_event():
+    events = [progress("unit-1", None), progress("unit-1", None)]
+    events[1].notes = "latest"
+
+    assert coalesce_progress(events)["unit-1"].notes == "latest"
+
+def test_scheduler_runs_one_adjustment_per_run_of_updates():
+    service = RecordingService()
+
+    async def scenario():
+        scheduler = AdjustmentScheduler(service, debounce_ms=20, max_delay_ms=1000)
+        await scheduler.start()
+        for score in (30, 35, 40):
+            scheduler.submit(progress("unit-1", score))
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+        return scheduler.get_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert service.adjustments == [("user1", "unit-1", 30)]
+    assert stats["events"] == 3
+    assert stats["coalesced"] == 2
+    assert stats["adjustments"] == 1
+
+def test_scheduler_makes_the_path_easier_when_any_unit_was_a_struggle():
+    service = RecordingService()
+
+    async def scenario():
+        scheduler = AdjustmentScheduler(service, debounce_ms=20, max_delay_ms=1000)
+        scheduler.submit(progress("unit-1", 98))
+        scheduler.submit(progress("unit-2", 20))
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert service.adjustments == [("user1", "unit-2", 20)]
+
+def test_scheduler_skips_scores_that_need_no_adjustment():
+    service = RecordingService()
+
+    async def scenario():
+        scheduler = AdjustmentScheduler(service, debounce_ms=20, max_delay_ms=1000)
+        scheduler.submit(progress("unit-1", 70))
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert service.adjustments == []
+
+def test_stop_runs_pending_and_follow_up_adjustments():
+    service = RecordingService(adjust_seconds=0.05)
+
+    async def scenario():
+        scheduler = AdjustmentScheduler(service, debounce_ms=10, max_delay_ms=1000)
+        scheduler.submit(progress("unit-1", 95))
+        await asyncio.sleep(0.03)  # The first re-plan is now running
+        scheduler.submit(progress("unit-2", 10))
+        scheduler.submit(progress("unit-3", 20, user_id="user2"))
+        await scheduler.stop(timeout=2)
+        return scheduler.get_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert sorted(service.adjustments) == [("user1", "unit-1", 95), ("user1", "unit-2", 10), ("user2", "unit-3", 20)]
+    assert stats["pending_users"] == 0
+    assert stats["running"] == 0
@@ -0,0 +1,72 @@
+"""
+Tests for banded DTW alignment.
+"""
+
+import numpy as np
+import pytest
+
+from services.audio.alignment import band_limits, banded_dtw, batch_banded_dtw
+
+def naive_banded_dtw(attempt: np.ndarray, reference: np.ndarray, lows: np.ndarray, width: int) -> float:
+    """Total cost of the best path through the band, from the full O(N·M) recurrence."""
+    n, m = len(attempt), len(reference)
+    accumulated = np.full((n + 1, m + 1), np.inf)
+    accumulated[0, 0] = 0
+    for i in range(n):
+        for j in range(lows[i], min(m, lows[i] + width)):
+            cost = np.linalg.norm(attempt[i] - reference[j])
+            accumulated[i + 1, j + 1] = cost + min(accumulated[i, j], accumulated[i, j + 1], accumulated[i + 1, j])
+    return accumulated[n, m]
+
+@pytest.mark.parametrize("seed", range(10))
+def test_batch_matches_naive_dtw_within_band(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 60))
+    attempt = rng.standard_normal((n, 5)).astype(np.float32)
+    references = [rng.standard_normal((int(rng.integers(1, 80)), 5)).astype(np.float32) for _ in range(3)]
+
+    results = batch_banded_dtw(attempt, references, band_ratio=0.1)
+
+    # Every reference is aligned within the widest band of the batch
+    width = max(band_limits(n, len(reference), 0.1)[1] for reference in references)
+    for reference, (distance, path) in zip(references, results):
+        lows, _ = band_limits(n, len(reference), 0.1)
+        expected = naive_banded_dtw(attempt, reference, lows, width)
+        if np.isinf(expected):
+            assert path is None
+            continue
+
+        assert distance * len(path) == pytest.approx(expected, rel=1e-4)
+        path_cost = sum(np.linalg.norm(attempt[i] - reference[j]) for i, j in path)
+        assert path_cost == pytest.approx(expected, rel=1e-4)
+        assert path[0].tolist() == [0, 0]
+        assert path[-1].tolist() == [n - 1, len(reference) - 1]
+        assert np.all(np.diff(path, axis=0) >= 0)
+
+def test_single_reference_matches_batch():
+    rng = np.random.default_rng(0)
+    attempt = rng.standard_normal((40, 13)).astype(np.float32)
+    reference = rng.standard_normal((50, 13)).astype(np.float32)
+
+    distance, path = banded_dtw(attempt, reference)
+    batch_distance, batch_path = batch_banded_dtw(attempt, [reference])[0]
+
+    assert distance == batch_distance
+    assert np.array_equal(path, batch_path)
+
+def test_identical_sequences_align_on_the_diagonal():
+    frames = np.random.default_rng(0).standard_normal((30, 13)).astype(np.float32)
+
+    distance, path = banded_dtw(frames, frames)
+
+    assert distance == pytest.approx(0.0, abs=1e-6)
+    assert path.tolist() == [[index, index] for index in range(30)]
+
+def test_abandoned_references_have_no_path():
+    rng = np.random.default_rng(0)
+    attempt = rng.standard_normal((20, 5)).astype(np.float32)
+
+    results = batch_banded_dtw(attempt, [attempt, attempt + 100], abandon_distance=10)
+
+    assert results[0][1] is not None
+    assert results[1] == (float("inf"), None)
@@ -0,0 +1,58 @@
+"""
+Tests for Arabic normalization and phonetic segmentation.
+"""
+
+import pytest
+
+from utils.arabic_npl import normalize, normalize_batch, prepare_for_matching, segment, strip_diacritics, tokenize
+
+@pytest.mark.parametrize("text, expected", [
+    ("بِسْمِ ٱللَّهِ", "بسم الله"),
+    ("أَحَدٌ", "احد"),
+    ("الحـــمد", "الحمد"),
+    ("  قُلْ   هُوَ  ", "قل هو"),
+])
+def test_normalize(text, expected):
+    assert normalize(text) == expected
+
+def test_normalize_options():
+    assert normalize("عَلَى", unify_ya=True) == "علي"
+    assert normalize("رَحْمَة", unify_ta_marbuta=True) == "رحمه"
+    assert normalize("مُؤْمِن", unify_hamza=True) == "مومن"
+    assert normalize("أَحَدٌ", unify_alef=False) == "أحد"
+
+def test_normalize_batch_matches_normalize():
+    texts = ["بِسْمِ ٱللَّهِ", "", "  مَٰلِكِ  يَوْمِ ٱلدِّينِ ", "قُلْ"]
+    assert normalize_batch(texts) == [normalize(text) for text in texts]
+    assert normalize_batch([]) == []
+
+def test_strip_diacritics_keeps_letters_and_tatweel():
+    assert strip_diacritics("ٱلْحَـمْدُ") == "ٱلحـمد"
+
+def test_prepare_for_matching_orders_marks_canonically():
+    # Shaddah typed before or after the vowel gives the same text
+    assert prepare_for_matching("\u0631\u0651\u064e") == prepare_for_matching("\u0631\u064e\u0651")
+    assert "ـ" not in prepare_for_matching("الحـمد")
+
+def test_tokenize():
+    assert tokenize("ٱلْحَمْدُ لِلَّهِ رَبِّ") == ["الحمد", "لله", "رب"]
+
+def test_segment_sounds():
+    segments = segment("رَبِّ")
+
+    assert [part["letter"] for part in segments] == ["ر", "ب"]
+    assert segments[0]["sound"] == "ra"
+    assert segments[1]["sound"] == "bbi"
+
+def test_segment_lengthens_vowels():
+    assert [part["sound"] for part in segment("قَالَ")] == ["qa", "a", "la"]
+
+def test_verses_carry_phonetic_segments(corpus):
+    verse = corpus.get_verse("1:1")
+
+    assert verse.phonetic_segments
+    assert verse.phonetic_segments[0]["letter"] == "ب"
+
+    # Segments are copies, so changing them does not change later verses
+    verse.phonetic_segments[0]["sound"] = "changed"
+    assert corpus.get_verse("1:1").phonetic_segments[0]["sound"] != "changed"
@@ -0,0 +1,57 @@
+"""
+Tests that the batched audio pipeline matches the single-clip pipeline.
+"""
+
+import numpy as np
+import pytest
+
+from services.audio import batch, pipeline
+from services.audio.buffer import AudioBuffer
+from services.audio.features import FEATURE_NAMES
+
+def recitation(seconds: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """A tone with a slow tremolo between stretches of faint noise, like a short ayah."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = 0.01 * rng.standard_normal(len(t))
+    voiced = slice(int(0.7 * sample_rate), int((seconds - 0.4) * sample_rate))
+    samples[voiced] += 0.5 * np.sin(2 * np.pi * 220 * t[voiced]) * np.sin(2 * np.pi * 3 * t[voiced])
+    return samples.astype(np.float32)
+
+@pytest.fixture
+def clips():
+    """Clips of different lengths and two sample rates."""
+    clips = [AudioBuffer(recitation(seconds, seed=seed), 16000) for seed, seconds in enumerate((2, 3.3, 2.1, 5, 8))]
+    clips.append(AudioBuffer(recitation(2, 22050, seed=9), 22050))
+    return clips
+
+def test_process_buffers_matches_process_buffer(clips):
+    processed = batch.process_buffers(clips)
+
+    for clip, batched in zip(clips, processed):
+        single = pipeline.process_buffer(AudioBuffer(clip.samples.copy(), clip.sample_rate))
+        assert batched.sample_rate == single.sample_rate
+        assert batched.metadata["trim_start"] == single.metadata["trim_start"]
+        np.testing.assert_allclose(batched.samples, single.samples, atol=1e-6)
+
+def test_extract_features_batch_matches_extract_features(clips):
+    processed = batch.process_buffers(clips)
+    summaries = batch.extract_features_batch(processed, features=FEATURE_NAMES)
+
+    for clip, summary in zip(processed, summaries):
+        single = pipeline.extract_features(clip, features=FEATURE_NAMES)
+        assert summary.keys() == single.keys()
+        np.testing.assert_allclose(summary["mfcc_mean"], single["mfcc_mean"], atol=1e-3)
+        assert summary["spectral_centroid_mean"] == pytest.approx(single["spectral_centroid_mean"], rel=1e-5)
+        assert summary["zero_crossing_rate_mean"] == pytest.approx(single["zero_crossing_rate_mean"], rel=1e-6)
+        assert summary["tempo"] == pytest.approx(single["tempo"])
+        assert summary["duration"] == pytest.approx(single["duration"])
+
+def test_extract_features_batch_computes_only_requested_features(clips):
+    summaries = batch.extract_features_batch(clips[:2], features=["zero_crossing_rate"])
+
+    assert all(summary.keys() == {"zero_crossing_rate_mean", "duration"} for summary in summaries)
+
+def test_extract_features_batch_rejects_unknown_features(clips):
+    with pytest.raises(ValueError):
+        batch.extract_features_batch(clips[:1], features=["loudness"])
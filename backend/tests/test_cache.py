@@ -0,0 +1,71 @@
+"""
+Tests for the audio result cache.
+"""
+
+import pickle
+import asyncio
+
+from services.audio.cache import ResultCache, make_cache_key
+
+def payload_size(value) -> int:
+    """Size of a value as the cache stores it."""
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+def test_result_cache_evicts_least_recently_used():
+    value = b"x" * 100
+    cache = ResultCache("test", max_bytes=3 * payload_size(value), directory="")
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await cache.set(key, value)
+        assert await cache.get("a") == value  # "a" is now the most recently used
+        await cache.set("d", value)
+        return [await cache.get(key) for key in ("a", "b", "c", "d")]
+
+    assert asyncio.run(scenario()) == [value, None, value, value]
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["misses"] == 1
+
+def test_result_cache_skips_values_larger_than_memory():
+    cache = ResultCache("test", max_bytes=10, directory="")
+
+    async def scenario():
+        await cache.set("big", b"x" * 100)
+        return await cache.get("big")
+
+    assert asyncio.run(scenario()) is None
+
+def test_result_cache_reads_evicted_entries_from_disk(tmp_path):
+    value = {"mfcc_mean": [1.0, 2.0]}
+    cache = ResultCache("test", max_bytes=payload_size(value), directory=str(tmp_path))
+
+    async def scenario():
+        await cache.set("a", value)
+        await cache.set("b", value)  # Evicts "a" from memory
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) == value
+    assert cache.get_stats()["disk_hits"] == 1
+
+def test_cache_keys_depend_on_every_part():
+    keys = {
+        make_cache_key("abc", "features"),
+        make_cache_key("abc", "assessment"),
+        make_cache_key("abd", "features"),
+        make_cache_key("abc", "assessment", "1:1"),
+        make_cache_key("abc", "assessment", "1:2"),
+    }
+    assert len(keys) == 5
+
+def test_result_cache_concurrent_writes_of_one_key(tmp_path):
+    value = {"mfcc_mean": list(range(1000))}
+    cache = ResultCache("test", directory=str(tmp_path))
+
+    async def scenario():
+        await asyncio.gather(*(cache.set("a", value) for _ in range(16)))
+        cache.clear()
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) == value
+    assert sorted(path.name for path in (tmp_path / "test").iterdir()) == ["a.pkl"]
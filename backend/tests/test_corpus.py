@@ -0,0 +1,63 @@
+"""
+Tests for the compiled Quran corpus.
+"""
+
+import os
+import pytest
+
+from services.quran.corpus import ensure_corpus
+
+def test_get_verse_by_id_and_pair(corpus):
+    verse = corpus.get_verse("2:255")
+
+    assert verse.id == "2:255"
+    assert verse.translation == "Verse 2:255"
+    assert corpus.get_verse((1, 6)).transliteration == "Ihdinā aṣ-ṣirāṭa al-mustaqīm"
+    assert corpus.get_verse("2:287") is None
+    assert corpus.get_verse("3:1") is None
+    assert corpus.get_verse("not-a-verse") is None
+
+def test_verse_range_is_inclusive(corpus):
+    verses = corpus.verse_range("2:255", "2:260")
+
+    assert len(verses) == 6
+    assert verses.ids == [f"2:{ayah}" for ayah in range(255, 261)]
+    assert verses[0].id == "2:255"
+    assert verses[-1].id == "2:260"
+
+def test_verse_range_crosses_surahs(corpus):
+    verses = corpus.verse_range("2:285", "112:1")
+
+    assert verses.ids == ["2:285", "2:286", "112:1"]
+    assert [verse.id for verse in verses] == verses.ids
+
+def test_verse_range_slices(corpus):
+    verses = corpus.verse_range("2:10", "2:20")
+
+    assert verses[2:5].ids == ["2:12", "2:13", "2:14"]
+    assert verses[-2:].ids == ["2:19", "2:20"]
+    assert len(verses[5:2]) == 0
+    with pytest.raises(IndexError):
+        verses[11]
+    with pytest.raises(ValueError):
+        verses[::2]
+
+def test_verse_range_rejects_bad_bounds(corpus):
+    with pytest.raises(KeyError):
+        corpus.verse_range("2:1", "3:1")
+    with pytest.raises(ValueError):
+        corpus.verse_range("2:20", "2:10")
+
+def test_surah_verses(corpus):
+    assert corpus.surah_verses(1).ids == [f"1:{ayah}" for ayah in range(1, 7)]
+    assert len(corpus.surah_verses(2)) == 286
+    assert len(corpus.surah_verses(5)) == 0
+    assert [surah.number for surah in corpus.get_surahs()] == [1, 2, 112]
+
+def test_corpus_is_recompiled_only_when_sources_change(corpus, tmp_path):
+    source, output = tmp_path / "quran_text", tmp_path / "quran_corpus.bin"
+    assert not ensure_corpus(str(source), str(output))
+
+    compiled_at = output.stat().st_mtime
+    os.utime(source / "surah_1.json", (compiled_at + 10, compiled_at + 10))
+    assert ensure_corpus(str(source), str(output))
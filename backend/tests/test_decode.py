@@ -0,0 +1,105 @@
+"""
+Tests for the unified audio decode stage and its fallbacks.
+"""
+
+import io
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import soundfile as sf
+
+from services.audio import decode
+from services.audio.decode import decode_audio
+
+def wav_bytes(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encode samples as 16-bit PCM WAV."""
+    output = io.BytesIO()
+    sf.write(output, samples, sample_rate, format="WAV", subtype="PCM_16")
+    return output.getvalue()
+
+def tone(seconds: float, sample_rate: int, channels: int = 1) -> np.ndarray:
+    """A sine tone, duplicated across channels."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    return np.stack([samples] * channels, axis=1) if channels > 1 else samples
+
+def test_wav_is_decoded_by_soundfile_and_resampled():
+    buffer = decode_audio(wav_bytes(tone(1.0, 44100, channels=2), 44100), "clip.wav", 16000)
+
+    assert buffer.sample_rate == 16000
+    assert buffer.samples.ndim == 1
+    assert buffer.samples.dtype == np.float32
+    assert len(buffer.samples) == pytest.approx(16000, abs=2)
+    assert buffer.metadata["codec"] == "wav/pcm_16"
+    assert buffer.metadata["native_sample_rate"] == 44100
+    assert buffer.metadata["format"] == "wav"
+
+def test_target_rate_zero_keeps_the_native_rate(tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(wav_bytes(tone(0.5, 22050), 22050))
+
+    buffer = decode_audio(str(path), target_sr=0)
+    assert buffer.sample_rate == 22050
+    assert len(buffer.samples) == 11025
+    assert buffer.metadata["encoded_bytes"] == path.stat().st_size
+
+def test_pyav_is_tried_when_soundfile_cannot_decode(monkeypatch):
+    decoded = (np.zeros(8000, dtype=np.float32), 16000, "aac", 44100)
+    calls = []
+    monkeypatch.setattr(decode, "_decode_with_soundfile", lambda source: None)
+    monkeypatch.setattr(decode, "_decode_with_av", lambda source, target_sr: calls.append(target_sr) or decoded)
+
+    buffer = decode_audio(b"m4a bytes", "clip.m4a", 16000)
+    assert calls == [16000]
+    assert buffer.metadata["codec"] == "aac"
+    assert buffer.metadata["native_sample_rate"] == 44100
+    assert len(buffer.samples) == 8000
+
+def test_audioread_is_the_last_resort(monkeypatch):
+    calls = []
+    monkeypatch.setattr(decode, "_decode_with_soundfile", lambda source: None)
+    monkeypatch.setattr(decode, "_decode_with_av", lambda source, target_sr: None)
+    monkeypatch.setattr(
+        decode,
+        "_decode_with_audioread",
+        lambda source, extension: calls.append(extension) or (np.zeros(4000, dtype=np.float32), 8000, "audioread/amr", 8000)
+    )
+
+    buffer = decode_audio(b"amr bytes", "Clip.AMR", 16000)
+    assert calls == [".amr"]
+    assert buffer.metadata["codec"] == "audioread/amr"
+    assert len(buffer.samples) == 8000
+
+def test_pyav_is_skipped_when_not_installed(monkeypatch):
+    monkeypatch.setattr(decode, "av", None)
+    assert decode._decode_with_av(b"m4a bytes", 16000) is None
+
+def test_pyav_without_an_audio_stream_falls_back(monkeypatch):
+    class Container:
+        streams = SimpleNamespace(audio=[])
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+    monkeypatch.setattr(decode, "av", SimpleNamespace(open=lambda source: Container(), AVError=RuntimeError))
+    assert decode._decode_with_av(b"video only", 16000) is None
+
+def test_pyav_errors_fall_back(monkeypatch):
+    def open_container(source):
+        raise RuntimeError("invalid data")
+
+    monkeypatch.setattr(decode, "av", SimpleNamespace(open=open_container, AVError=RuntimeError))
+    assert decode._decode_with_av(b"garbage", 16000) is None
+
+def test_audioread_decodes_bytes_through_a_temporary_file():
+    samples, sample_rate, codec, native_rate = decode._decode_with_audioread(wav_bytes(tone(0.25, 8000), 8000), ".wav")
+
+    assert sample_rate == native_rate == 8000
+    assert codec == "audioread/wav"
+    assert len(samples) == 2000
+
+def test_soundfile_rejects_what_it_cannot_read():
+    assert decode._decode_with_soundfile(b"not audio") is None
@@ -0,0 +1,75 @@
+"""
+Tests for the spectral-gating denoiser.
+"""
+
+import numpy as np
+import pytest
+
+from services.audio.denoise import SpectralGate, spectral_gate
+
+SAMPLE_RATE = 16000
+
+def tone(seconds: float, frequency: float = 440.0, amplitude: float = 0.5) -> np.ndarray:
+    """A sine tone."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+def noise(seconds: float, amplitude: float = 0.01, seed: int = 0) -> np.ndarray:
+    """White noise."""
+    return (amplitude * np.random.default_rng(seed).normal(size=int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+def run_stream(gate: SpectralGate, samples: np.ndarray, chunk: int) -> np.ndarray:
+    """Push samples through a gate a chunk at a time, then flush it."""
+    output = [gate.process(samples[start:start + chunk]) for start in range(0, len(samples), chunk)]
+    return np.concatenate(output + [gate.flush()])
+
+def rms(samples: np.ndarray) -> float:
+    """Root mean square level."""
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+def test_gate_passes_audio_above_the_noise_unchanged():
+    gate = SpectralGate(SAMPLE_RATE, threshold_std=0)
+    gate.estimate_noise(np.zeros(SAMPLE_RATE // 10, dtype=np.float32))
+    signal = tone(1.0)
+
+    output = run_stream(gate, signal, 1000)
+    np.testing.assert_allclose(output[gate.latency:gate.latency + len(signal)], signal, atol=1e-4)
+
+@pytest.mark.parametrize("chunk", [1, 37, 512, 4096])
+def test_stream_output_does_not_depend_on_chunking(chunk):
+    signal = np.concatenate([noise(0.6), tone(0.5) + noise(0.5, seed=1)])
+    expected = run_stream(SpectralGate(SAMPLE_RATE, adaptation=0), signal, len(signal))
+    actual = run_stream(SpectralGate(SAMPLE_RATE, adaptation=0), signal, chunk)
+
+    assert len(actual) == len(expected)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+def test_stream_gates_the_opening_noise_estimate():
+    gate = SpectralGate(SAMPLE_RATE)
+    signal = np.concatenate([noise(0.5, amplitude=0.1), tone(0.5)])
+
+    output = run_stream(gate, signal, 800)[gate.latency:]
+    opening = output[:SAMPLE_RATE // 2 - gate.n_fft]
+    assert rms(opening) < 0.1 * rms(signal[:len(opening)])
+    assert gate.noise_mean is not None
+
+def test_spectral_gate_reduces_noise_and_keeps_speech():
+    background = noise(2.0)
+    signal = background.copy()
+    signal[SAMPLE_RATE:] += tone(1.0)
+    original = signal.copy()
+
+    output = spectral_gate(signal, SAMPLE_RATE)
+    assert output is signal
+    assert len(output) == len(original)
+
+    # Noise-only stretch after the estimate window, away from the tone onset
+    quiet = slice(int(0.6 * SAMPLE_RATE), int(0.9 * SAMPLE_RATE))
+    assert rms(output[quiet]) < 0.3 * rms(original[quiet])
+
+    voiced = slice(int(1.2 * SAMPLE_RATE), int(1.8 * SAMPLE_RATE))
+    assert rms(output[voiced]) == pytest.approx(rms(tone(1.0)), rel=0.1)
+
+def test_spectral_gate_handles_clips_shorter_than_a_frame():
+    signal = noise(0.01)
+    assert len(spectral_gate(signal, SAMPLE_RATE)) == len(noise(0.01))
@@ -0,0 +1,137 @@
+"""
+Tests for recitation fingerprinting.
+"""
+
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+from services.audio.fingerprint import FINGERPRINT_OFFSET_BIN, FingerprintIndex, choose_verse, code_ngrams
+from services.audio.templates import VerseTemplate
+
+HOP_LENGTH = 512
+SAMPLE_RATE = 16000
+VERSE_IDS = ["1:1", "1:2", "1:3", "112:1", "112:2"]
+
+class FakeStore:
+    """Stands in for a memory-mapped TemplateStore."""
+
+    def __init__(self, reciter: str, mfccs: dict):
+        self.reciter = reciter
+        self.hop_length = HOP_LENGTH
+        self.sample_rate = SAMPLE_RATE
+        self._mfccs = mfccs
+
+    def verse_ids(self):
+        return list(self._mfccs)
+
+    def get(self, verse_id):
+        return VerseTemplate(
+            verse_id=verse_id,
+            reciter=self.reciter,
+            sample_rate=SAMPLE_RATE,
+            hop_length=HOP_LENGTH,
+            mfcc=self._mfccs[verse_id],
+            mel=np.zeros((0, 0), dtype=np.float32),
+            word_boundaries=[],
+            words=[],
+        )
+
+def recitation(seed: int, sounds: int = 120) -> np.ndarray:
+    """Synthetic MFCC frames: a run of steady sounds, each held for a few frames."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((sounds, 13)).astype(np.float32)
+    return np.repeat(vectors, rng.integers(3, 8, size=sounds), axis=0)
+
+def stretch(frames: np.ndarray, rate: float) -> np.ndarray:
+    """Resample frames in time, as a faster or slower recitation would."""
+    positions = np.minimum((np.arange(int(len(frames) / rate)) * rate).astype(int), len(frames) - 1)
+    return frames[positions]
+
+@pytest.fixture(scope="module")
+def mfccs():
+    """Synthetic reference frames for each verse."""
+    return {verse_id: recitation(seed) for seed, verse_id in enumerate(VERSE_IDS)}
+
+@pytest.fixture(scope="module")
+def index(mfccs):
+    """A fingerprint index over the synthetic references."""
+    template_index = SimpleNamespace(stores={"reciter": FakeStore("reciter", mfccs)})
+    return FingerprintIndex.build(template_index, "fingerprint")
+
+def test_code_ngrams_collapses_repeated_codes():
+    hashes, starts = code_ngrams(np.array([1, 1, 2, 2, 2, 3, 1]), 4, n=2)
+
+    assert hashes.tolist() == [1 * 4 + 2, 2 * 4 + 3, 3 * 4 + 1]
+    assert starts.tolist() == [0, 2, 5]
+
+def test_code_ngrams_of_a_short_clip_is_empty():
+    hashes, starts = code_ngrams(np.array([5, 5, 5]), 8, n=2)
+    assert len(hashes) == len(starts) == 0
+
+def test_build_indexes_every_template(index):
+    assert len(index.templates) == len(VERSE_IDS)
+    assert len(index) > 0
+    assert np.all(np.diff(index.keys) > 0)
+    assert index.starts[-1] == len(index)
+
+@pytest.mark.parametrize("verse_id", VERSE_IDS)
+def test_identify_finds_the_recited_verse(index, mfccs, verse_id):
+    candidates = index.identify(mfccs[verse_id])
+
+    assert candidates[0]["verse_id"] == verse_id
+    assert candidates[0]["reciter"] == "reciter"
+    assert candidates[0]["offset_seconds"] == 0
+
+@pytest.mark.parametrize("rate", [0.85, 1.2])
+def test_identify_tolerates_a_different_pace(index, mfccs, rate):
+    clip = stretch(mfccs["1:3"], rate)
+    clip += 0.05 * np.random.default_rng(0).standard_normal(clip.shape).astype(np.float32)
+
+    candidates = index.identify(clip)
+    assert candidates[0]["verse_id"] == "1:3"
+    assert len(candidates) == 1 or candidates[0]["votes"] > candidates[1]["votes"]
+
+def test_identify_reports_the_offset_of_a_partial_clip(index, mfccs):
+    frames = mfccs["112:1"]
+    start = len(frames) // 2
+
+    candidates = index.identify(frames[start:])
+    assert candidates[0]["verse_id"] == "112:1"
+
+    # Offsets are reported at the start of their (pooled) histogram bin
+    start_seconds = start * HOP_LENGTH / SAMPLE_RATE
+    bin_seconds = FINGERPRINT_OFFSET_BIN * HOP_LENGTH / SAMPLE_RATE
+    assert start_seconds - 2 * bin_seconds <= candidates[0]["offset_seconds"] <= start_seconds
+
+def test_identify_returns_each_verse_once_up_to_the_limit(index, mfccs):
+    candidates = index.identify(np.concatenate([mfccs["1:1"], mfccs["1:2"]]), limit=2)
+
+    assert len(candidates) == 2
+    assert {candidate["verse_id"] for candidate in candidates} == {"1:1", "1:2"}
+    assert all(0 < candidate["confidence"] <= 1 for candidate in candidates)
+
+def test_identify_empty_clip(index):
+    assert index.identify(np.zeros((0, 13), dtype=np.float32)) == []
+
+def test_saved_index_identifies_the_same(index, mfccs, tmp_path):
+    path = str(tmp_path / "fingerprints.npz")
+    index.save(path)
+    loaded = FingerprintIndex.load(path)
+
+    assert loaded.fingerprint == "fingerprint"
+    assert loaded.templates == index.templates
+    assert loaded.identify(mfccs["1:2"]) == index.identify(mfccs["1:2"])
+
+def test_load_of_a_missing_index_returns_none(tmp_path):
+    assert FingerprintIndex.load(str(tmp_path / "missing.npz")) is None
+
+def test_choose_verse():
+    candidates = [{"verse_id": "1:2", "votes": 40}, {"verse_id": "1:3", "votes": 10}]
+
+    assert choose_verse(candidates) == "1:2"
+    assert choose_verse(candidates, "1:2") == "1:2"
+    assert choose_verse(candidates, "1:3") == "1:2"
+    assert choose_verse([{"verse_id": "1:2", "votes": 15}, {"verse_id": "1:3", "votes": 10}], "1:3") == "1:3"
+    assert choose_verse([{"verse_id": "1:2", "votes": 2}], "1:3") == "1:3"
+    assert choose_verse([], None) is None
@@ -0,0 +1,141 @@
+"""
+Tests for the durable job queue and its workers.
+"""
+
+import asyncio
+import pytest
+
+from services.jobs import queue
+from services.jobs.queue import (
+    JOB_RETRY_BASE_SECONDS,
+    JOB_VISIBILITY_TIMEOUT_SECONDS,
+    PRIORITY_LANES,
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    Job,
+    SQLiteBroker,
+)
+from services.jobs.worker import Worker
+
+class FakeClock:
+    """Stands in for the time module, so backoff and claim expiry can be tested without sleeping."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake clock, installed in place of the queue's time module."""
+    clock = FakeClock()
+    monkeypatch.setattr(queue, "time", clock)
+    return clock
+
+@pytest.fixture
+def broker(tmp_path, clock):
+    """A broker on a fresh database."""
+    return SQLiteBroker(str(tmp_path / "jobs.sqlite3"))
+
+def submit(broker: SQLiteBroker, clock: FakeClock, job_id: str, lane: str = "default", **fields) -> Job:
+    """Submit a job that is available now on the fake clock."""
+    return broker.submit(Job(
+        id=job_id,
+        kind="test",
+        payload={},
+        priority=PRIORITY_LANES[lane],
+        available_at=clock.now,
+        created_at=clock.now,
+        updated_at=clock.now,
+        **fields,
+    ))
+
+def test_claim_takes_the_highest_priority_first(broker, clock):
+    submit(broker, clock, "bulk", "bulk")
+    submit(broker, clock, "default")
+    submit(broker, clock, "interactive", "interactive")
+
+    assert [job.id for job in broker.claim("worker1", 2)] == ["interactive", "default"]
+    assert [job.id for job in broker.claim("worker2", 2)] == ["bulk"]
+    assert broker.claim("worker3", 2) == []
+
+def test_only_the_claim_holder_records_the_outcome(broker, clock):
+    submit(broker, clock, "job")
+    broker.claim("worker1")
+
+    assert not broker.complete("job", "worker2", {"score": 1})
+    assert not broker.fail("job", "worker2", "error")
+    assert broker.complete("job", "worker1", {"score": 1})
+
+    job = broker.get("job")
+    assert job.status == STATUS_COMPLETED
+    assert job.result == {"score": 1}
+
+def test_expired_claims_are_taken_over(broker, clock):
+    submit(broker, clock, "job")
+    broker.claim("worker1")
+
+    clock.now += JOB_VISIBILITY_TIMEOUT_SECONDS + 1
+    assert [job.id for job in broker.claim("worker2")] == ["job"]
+
+    # The first worker finishing late does not overwrite the new claim
+    assert not broker.complete("job", "worker1", {"stale": True})
+    assert broker.complete("job", "worker2", {"stale": False})
+    assert broker.get("job").result == {"stale": False}
+
+def test_failures_retry_with_exponential_backoff(broker, clock):
+    submit(broker, clock, "job", max_attempts=3)
+
+    for attempt in (1, 2):
+        assert broker.claim("worker1")[0].attempts == attempt
+        assert broker.fail("job", "worker1", f"error {attempt}")
+
+        job = broker.get("job")
+        assert job.status == STATUS_QUEUED
+        backoff = JOB_RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+        assert job.available_at == pytest.approx(clock.now + backoff)
+
+        clock.now += backoff - 0.01
+        assert broker.claim("worker1") == []
+        clock.now += 0.02
+
+    broker.claim("worker1")
+    assert broker.fail("job", "worker1", "error 3")
+    job = broker.get("job")
+    assert job.status == STATUS_FAILED
+    assert job.error == "error 3"
+    assert broker.claim("worker1") == []
+
+def test_worker_records_results_and_removes_the_upload(broker, clock, tmp_path):
+    upload = tmp_path / "upload.wav"
+    upload.write_bytes(b"audio")
+    broker.submit(Job(id="job", kind="test", payload={"path": str(upload)}, available_at=clock.now))
+
+    async def handler(job: Job) -> dict:
+        return {"path": job.payload["path"]}
+
+    assert asyncio.run(Worker("worker1", broker, {"test": handler}).run_once()) == 1
+    assert broker.get("job").result == {"path": str(upload)}
+    assert not upload.exists()
+
+def test_worker_keeps_the_upload_until_the_last_attempt(broker, clock, tmp_path):
+    upload = tmp_path / "upload.wav"
+    upload.write_bytes(b"audio")
+    broker.submit(Job(id="job", kind="test", payload={"path": str(upload)}, max_attempts=2, available_at=clock.now))
+
+    async def handler(job: Job) -> dict:
+        raise RuntimeError("decode failed")
+
+    worker = Worker("worker1", broker, {"test": handler})
+    asyncio.run(worker.run_once())
+    assert broker.get("job").status == STATUS_QUEUED
+    assert upload.exists()
+
+    clock.now += JOB_RETRY_BASE_SECONDS
+    asyncio.run(worker.run_once())
+    job = broker.get("job")
+    assert job.status == STATUS_FAILED
+    assert job.error == "decode failed"
+    assert not upload.exists()
@@ -0,0 +1,128 @@
+"""
+Tests for the unit catalog indexes and learning path planning.
+"""
+
+import os
+import itertools
+import numpy as np
+import pytest
+
+# The learning_paths package also exports the database-backed service
+pytest.importorskip("sqlalchemy")
+
+from services.learning_paths.catalog import UnitCatalog, load_catalog, verse_position
+from services.learning_paths.planner import PlanRequest, knapsack, plan_units
+
+CONTENT_TYPES = ("recitation", "memorization", "lesson", "quiz")
+
+def synthetic_definitions(count: int, seed: int = 0) -> list:
+    """Unit definitions with random attributes; every third unit has no verses."""
+    rng = np.random.default_rng(seed)
+    definitions = []
+    for index in range(count):
+        surah = int(rng.integers(1, 10))
+        first = int(rng.integers(1, 20))
+        definitions.append({
+            "id": f"unit-{index}",
+            "title": f"Unit {index}",
+            "description": "Synthetic unit",
+            "content_type": CONTENT_TYPES[index % len(CONTENT_TYPES)],
+            "difficulty": int(rng.integers(1, 6)),
+            "estimated_duration_minutes": int(rng.integers(3, 31)),
+            "verses": [] if index % 3 == 0 else [f"{surah}:{ayah}" for ayah in range(first, first + int(rng.integers(1, 5)))],
+            "tags": ["tajweed"] if index % 2 else ["recitation"],
+        })
+    return definitions
+
+def matches(definition: dict, difficulties, content_types, tags, max_duration, verse_range, exclude_ids) -> bool:
+    """Whether a unit passes every filter, checked directly on its definition."""
+    if difficulties is not None and definition["difficulty"] not in difficulties:
+        return False
+    if content_types is not None and definition["content_type"] not in content_types:
+        return False
+    if tags is not None and not set(definition["tags"]) & set(tags):
+        return False
+    if max_duration is not None and definition["estimated_duration_minutes"] > max_duration:
+        return False
+    if verse_range is not None and definition["verses"]:
+        positions = [verse_position(verse_id) for verse_id in definition["verses"]]
+        if min(positions) < verse_position(verse_range[0]) or max(positions) > verse_position(verse_range[1]):
+            return False
+    return definition["id"] not in exclude_ids
+
+def test_knapsack_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        count = int(rng.integers(1, 11))
+        weights = rng.integers(1, 15, size=count)
+        values = rng.random(count) * 10
+        capacity = int(rng.integers(0, 40))
+
+        subsets = (list(subset) for size in range(count + 1) for subset in itertools.combinations(range(count), size))
+        best = max(values[subset].sum() for subset in subsets if weights[subset].sum() <= capacity)
+        chosen = knapsack(weights, values, capacity)
+
+        assert weights[chosen].sum() <= capacity
+        assert values[chosen].sum() == pytest.approx(best)
+        assert len(set(chosen.tolist())) == len(chosen)
+
+def test_knapsack_skips_items_heavier_than_capacity():
+    chosen = knapsack(np.array([50, 5, 5]), np.array([100.0, 1.0, 1.0]), 10)
+
+    assert chosen.tolist() == [1, 2]
+
+@pytest.mark.parametrize("filters", [
+    {"difficulties": (2, 3)},
+    {"content_types": ("quiz", "lesson")},
+    {"tags": ("tajweed",)},
+    {"max_duration": 10},
+    {"verse_range": ("2:5", "6:10")},
+    {"exclude_ids": ("unit-1", "unit-2", "missing")},
+    {"difficulties": (1,), "content_types": ("recitation",), "max_duration": 20, "verse_range": ("1:1", "9:30")},
+])
+def test_catalog_query_matches_direct_filtering(filters):
+    definitions = synthetic_definitions(300)
+    catalog = UnitCatalog(definitions)
+    arguments = {"difficulties": None, "content_types": None, "tags": None, "max_duration": None,
+                 "verse_range": None, "exclude_ids": (), **filters}
+
+    expected = [index for index, definition in enumerate(definitions) if matches(definition, **arguments)]
+
+    assert catalog.query(**arguments).tolist() == expected
+
+def test_catalog_ignores_unknown_tags():
+    catalog = UnitCatalog(synthetic_definitions(20))
+
+    assert len(catalog.query(tags=["unknown"])) == len(catalog)
+
+def test_plan_units_fits_the_budget_and_session():
+    catalog = UnitCatalog(synthetic_definitions(500))
+    request = PlanRequest(target_difficulty=3, budget_minutes=120, session_minutes=15, goals=["tajweed"],
+                          exclude_ids=["unit-0", "unit-5"])
+
+    chosen = plan_units(catalog, request)
+
+    assert 0 < catalog.duration[chosen].sum() <= 120
+    assert np.all(catalog.duration[chosen] <= 15)
+    assert set(catalog.difficulty[chosen].tolist()) <= {2, 3, 4}
+    assert not {"unit-0", "unit-5"} & {catalog.ids[index] for index in chosen}
+
+    # Easiest first, then in verse order
+    order = list(zip(catalog.difficulty[chosen].tolist(), catalog.verse_start[chosen].tolist()))
+    assert order == sorted(order)
+
+def test_plan_units_with_no_candidates():
+    catalog = UnitCatalog(synthetic_definitions(20))
+
+    chosen = plan_units(catalog, PlanRequest(target_difficulty=3, budget_minutes=60, session_minutes=1))
+
+    assert len(chosen) == 0
+
+def test_repository_catalog_loads(backend_directory):
+    catalog = load_catalog(os.path.join(backend_directory, "data", "learning_units"))
+
+    assert len(catalog) > 0
+    assert len(set(catalog.ids)) == len(catalog)
+    unit = catalog.unit(0, order=3)
+    assert unit.id == catalog.ids[0]
+    assert unit.order == 3
@@ -0,0 +1,45 @@
+"""
+Tests for verse search.
+"""
+
+import pytest
+
+from services.quran.search import SearchIndex
+
+@pytest.fixture
+def search_index(corpus):
+    """A search index over the test corpus."""
+    return SearchIndex.build(corpus)
+
+def top_verse(corpus, search_index, query: str, **options) -> str:
+    """The id of the best-ranked verse for a query."""
+    results = search_index.search(query, limit=3, **options)
+    assert results, f"No results for {query!r}"
+    return corpus.verse_at(results[0][0]).id
+
+@pytest.mark.parametrize("query, verse_id", [
+    ("الحمد لله", "1:2"),
+    ("مالك يوم الدين", "1:4"),
+    ("قل هو الله احد", "112:1"),
+    ("straight path", "1:6"),
+    ("iyyaka nabudu", "1:5"),
+])
+def test_search_ranks_the_matching_verse_first(corpus, search_index, query, verse_id):
+    assert top_verse(corpus, search_index, query) == verse_id
+
+def test_search_tolerates_misspellings(corpus, search_index):
+    assert top_verse(corpus, search_index, "strait pth") == "1:6"
+    assert search_index.search("strait pth", fuzzy=False) == []
+
+def test_search_scores_are_descending(search_index):
+    scores = [score for _, score in search_index.search("merciful", limit=10)]
+
+    assert len(scores) >= 2
+    assert scores == sorted(scores, reverse=True)
+
+def test_search_restricted_to_one_field(corpus, search_index):
+    assert search_index.search("الحمد لله", fields=["translation"]) == []
+    assert top_verse(corpus, search_index, "praise", fields=["translation"]) == "1:2"
+
+def test_search_without_matches(search_index):
+    assert search_index.search("xyzzy") == []
@@ -0,0 +1,145 @@
+"""
+Tests for online alignment and streaming pronunciation feedback.
+"""
+
+import numpy as np
+import pytest
+
+from services.audio import streaming
+from services.audio.alignment import OnlineAligner, attempt_frames
+from services.audio.buffer import AudioBuffer
+from services.audio.features import HOP_LENGTH, N_MELS
+from services.audio.streaming import StreamingLimitError, StreamingSession
+from services.audio.templates import VerseTemplate
+
+SAMPLE_RATE = 16000
+
+def make_template(mfcc: np.ndarray, word_count: int = 4) -> VerseTemplate:
+    """Make a template whose words split the reference frames evenly."""
+    bounds = np.linspace(0, len(mfcc), word_count + 1).astype(int)
+    return VerseTemplate(
+        verse_id="1:1",
+        reciter="test",
+        sample_rate=SAMPLE_RATE,
+        hop_length=HOP_LENGTH,
+        mfcc=mfcc.astype(np.float32),
+        mel=np.zeros((len(mfcc), N_MELS), dtype=np.float32),
+        word_boundaries=[(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])],
+        words=[f"word{index}" for index in range(word_count)],
+    )
+
+@pytest.fixture
+def reference() -> np.ndarray:
+    """Smoothly varying MFCC-like frames."""
+    rng = np.random.default_rng(0)
+    return np.cumsum(rng.normal(size=(240, 13)), axis=0)
+
+def push_in_chunks(aligner: OnlineAligner, frames: np.ndarray, chunk: int) -> list:
+    """Push frames a chunk at a time and collect the reported words."""
+    words = []
+    for start in range(0, len(frames), chunk):
+        words.extend(aligner.push(frames[start:start + chunk]))
+    return words
+
+def test_online_aligner_reports_every_word_in_order(reference):
+    template = make_template(reference)
+    aligner = OnlineAligner(template)
+
+    words = push_in_chunks(aligner, reference, 7)
+    assert [word.index for word in words] == list(range(len(words)))
+    assert len(words) >= 2
+
+    result = aligner.finish()
+    assert not result.abandoned
+    assert [word.index for word in result.words] == [0, 1, 2, 3]
+    starts = [word.start_seconds for word in result.words]
+    assert starts == sorted(starts)
+
+def test_online_aligner_scores_a_matching_attempt_better(reference):
+    template = make_template(reference)
+    matching = OnlineAligner(template)
+    matching.push(reference)
+    unrelated = OnlineAligner(template)
+    unrelated.push(np.cumsum(np.random.default_rng(2).normal(size=reference.shape), axis=0))
+
+    assert matching.finish().distance < unrelated.finish().distance
+
+def test_online_aligner_result_does_not_depend_on_chunking(reference):
+    template = make_template(reference)
+    whole = OnlineAligner(template)
+    whole.push(reference)
+    framewise = OnlineAligner(template)
+    push_in_chunks(framewise, reference, 1)
+
+    expected, actual = whole.finish(), framewise.finish()
+    assert actual.distance == pytest.approx(expected.distance)
+    np.testing.assert_array_equal(actual.path, expected.path)
+
+def test_online_aligner_follows_a_slower_attempt(reference):
+    template = make_template(reference)
+    aligner = OnlineAligner(template)
+    aligner.push(np.repeat(reference, 2, axis=0))
+
+    result = aligner.finish()
+    assert result.words[-1].end_seconds == pytest.approx(2 * template.duration, rel=0.05)
+
+def test_online_aligner_without_frames_is_abandoned(reference):
+    result = OnlineAligner(make_template(reference)).finish()
+    assert result.abandoned
+    assert result.words == []
+
+def recitation(sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Half a second of faint noise, then two seconds of changing tones."""
+    rng = np.random.default_rng(1)
+    noise = 0.001 * rng.normal(size=sample_rate // 2)
+    t = np.arange(sample_rate // 2) / sample_rate
+    tones = [0.5 * np.sin(2 * np.pi * frequency * t) for frequency in (220, 440, 330, 550)]
+    return np.concatenate([noise, *tones]).astype(np.float32)
+
+def to_pcm(samples: np.ndarray) -> bytes:
+    """Encode samples as 16-bit little-endian PCM."""
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+@pytest.fixture
+def tone_template() -> VerseTemplate:
+    """A template made from the tones of the recitation."""
+    samples = recitation()[SAMPLE_RATE // 2:]
+    return make_template(attempt_frames(AudioBuffer(samples=samples, sample_rate=SAMPLE_RATE), SAMPLE_RATE))
+
+def stream(session: StreamingSession, pcm: bytes, chunk_bytes: int) -> list:
+    """Feed PCM a chunk at a time and collect the messages."""
+    messages = []
+    for start in range(0, len(pcm), chunk_bytes):
+        messages.extend(session.feed(pcm[start:start + chunk_bytes]))
+    return messages
+
+def test_streaming_session_pushes_words_and_progress(tone_template):
+    session = StreamingSession(tone_template, SAMPLE_RATE)
+    messages = stream(session, to_pcm(recitation()), 3200)
+
+    words = [message["index"] for message in messages if message["type"] == "word"]
+    assert words == list(range(len(words)))
+
+    received = [message["received_seconds"] for message in messages if message["type"] == "progress"]
+    assert received and received == sorted(received)
+    assert received[-1] == pytest.approx(2.5)
+
+    final = session.finish()
+    assert final["type"] == "complete"
+    assert final["verse_id"] == "1:1"
+    assert [word["index"] for word in final["words"]] == [0, 1, 2, 3]
+
+def test_streaming_session_resamples_other_input_rates(tone_template):
+    session = StreamingSession(tone_template, 8000)
+    messages = stream(session, to_pcm(recitation(8000)), 1600)
+
+    received = [message["received_seconds"] for message in messages if message["type"] == "progress"]
+    assert received[-1] == pytest.approx(2.5, abs=0.2)
+    assert len(session.finish()["words"]) == 4
+
+def test_streaming_session_enforces_the_length_limit(tone_template, monkeypatch):
+    monkeypatch.setattr(streaming, "STREAMING_MAX_SECONDS", 1)
+    session = StreamingSession(tone_template, SAMPLE_RATE)
+
+    with pytest.raises(StreamingLimitError):
+        stream(session, to_pcm(recitation()), 3200)
@@ -0,0 +1,61 @@
+"""
+Tests for tajweed rule matching and the per-verse tajweed index.
+"""
+
+import os
+import pytest
+
+from utils.tajweed_rules import TajweedIndex, TajweedMatcher, load_rule_definitions
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "tajweed_rules", "rules.json")
+
+@pytest.fixture(scope="module")
+def rule_definitions():
+    """The repository's tajweed rule definitions."""
+    return load_rule_definitions(RULES_PATH)
+
+@pytest.fixture(scope="module")
+def matcher(rule_definitions):
+    """A matcher compiled from the repository's rules."""
+    return TajweedMatcher(rule_definitions)
+
+def rule_examples():
+    """Every (rule id, example text) pair in the repository's rules."""
+    return [(definition["id"], example["text"]) for definition in load_rule_definitions(RULES_PATH)
+            for example in definition["examples"]]
+
+@pytest.mark.parametrize("rule_id, text", rule_examples())
+def test_every_rule_matches_its_examples(matcher, rule_id, text):
+    assert rule_id in {annotation["rule"] for annotation in matcher.annotate(text)}
+
+def test_annotation_spans_point_into_the_canonical_text(matcher):
+    for annotation in matcher.annotate("مِنْ بَعْدِ"):
+        assert annotation["end"] > annotation["start"]
+        assert len(annotation["text"]) == annotation["end"] - annotation["start"]
+
+def test_text_without_rules(matcher):
+    assert matcher.annotate("") == []
+    assert TajweedMatcher([]).annotate("مِنْ بَعْدِ") == []
+
+def test_annotate_many_matches_annotate(matcher):
+    texts = ["ٱلْحَمْدُ لِلَّهِ", "مِنْ بَعْدِ"]
+
+    assert matcher.annotate_many(texts) == [matcher.annotate(text) for text in texts]
+
+def test_index_fills_verses_and_returns_copies(matcher, rule_definitions, corpus, tmp_path):
+    index = TajweedIndex.build(matcher, corpus, TajweedIndex.fingerprint_for(rule_definitions, corpus))
+    corpus.tajweed_lookup = index.get
+
+    verse = corpus.get_verse("1:2")
+    assert verse.tajweed_rules == index.get("1:2")
+    assert verse.tajweed_rules
+
+    verse.tajweed_rules[0]["rule"] = "changed"
+    assert index.get("1:2")[0]["rule"] != "changed"
+    assert index.get("9:9") == []
+
+    path = str(tmp_path / "index.json")
+    index.save(path)
+    loaded = TajweedIndex.load(path)
+    assert loaded.fingerprint == index.fingerprint
+    assert loaded.get("1:2") == index.get("1:2")
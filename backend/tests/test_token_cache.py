@@ -0,0 +1,66 @@
+"""
+Tests for the verified-token cache.
+"""
+
+from datetime import datetime
+import pytest
+
+class FakeClock:
+    """Stands in for the time module, so expiry can be tested without sleeping."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    """A fake clock, installed in place of the token cache's time module."""
+    return FakeClock()
+
+@pytest.fixture
+def token_cache_class(monkeypatch, clock):
+    """TokenCache, reading the time from the fake clock."""
+    pytest.importorskip("email_validator")
+    from api import token_cache
+
+    monkeypatch.setattr(token_cache, "time", clock)
+    return token_cache.TokenCache
+
+def make_token(user_id: str, expires_at: float):
+    """Make token claims and a user snapshot for a cache entry."""
+    from models.user import TokenData, UserSnapshot
+
+    now = datetime.now()
+    user = UserSnapshot(id=user_id, email=f"{user_id}@example.com", name=user_id, created_at=now, updated_at=now)
+    token_data = TokenData(user_id=user_id, email=user.email, role="user", exp=datetime.fromtimestamp(expires_at))
+    return token_data, user
+
+def test_token_cache_expires_with_the_token(token_cache_class, clock):
+    cache = token_cache_class(ttl_seconds=300)
+    cache.set("token", *make_token("user1", clock.now + 60))
+
+    clock.now += 59
+    assert cache.get("token") is not None
+    clock.now += 2
+    assert cache.get("token") is None
+    assert cache.get_stats()["expirations"] == 1
+
+def test_token_cache_expires_after_its_ttl(token_cache_class, clock):
+    cache = token_cache_class(ttl_seconds=30)
+    cache.set("token", *make_token("user1", clock.now + 3600))
+
+    clock.now += 31
+    assert cache.get("token") is None
+
+def test_token_cache_evicts_and_invalidates(token_cache_class, clock):
+    cache = token_cache_class(max_entries=2)
+    cache.set("a", *make_token("user1", clock.now + 60))
+    cache.set("b", *make_token("user1", clock.now + 60))
+    cache.set("c", *make_token("user2", clock.now + 60))
+
+    assert cache.get("a") is None
+    cache.invalidate_user("user1")
+    assert cache.get("b") is None
+    assert cache.get("c") is not None